@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import hmac
+from collections.abc import AsyncIterator
+from typing import Any, cast
+
+from fastapi import Header, HTTPException, Request
+
+from app.config.settings import get_settings
+from app.services.admission import get_admission_controller
+
+
+async def _resolve_user_ids(request: Request) -> list[str]:
+    """요청 대상 사용자 ID 목록. 배치 검색은 body의 searches[].user_id를 모두 포함"""
+    user_id = request.query_params.get("user_id")
+    if user_id or request.method not in ("POST", "PUT", "PATCH"):
+        return [user_id] if user_id else []
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if not (content_type == "application/json" or content_type.endswith("+json")):
+        return []
+    try:
+        body: Any = await request.json()
+    except ValueError:
+        return []
+    user_ids = [_user_id_of(body)]
+    searches = cast(dict[str, Any], body).get("searches") if isinstance(body, dict) else None
+    if isinstance(searches, list):
+        user_ids.extend(_user_id_of(item) for item in cast(list[Any], searches))
+    return [user_id for user_id in user_ids if user_id is not None]
+
+
+def _user_id_of(value: Any) -> str | None:
+    user_id = cast(dict[str, Any], value).get("user_id") if isinstance(value, dict) else None
+    return user_id if isinstance(user_id, str) else None
+
+
+async def admit_request(request: Request) -> AsyncIterator[None]:
+    """사용자 단위 admission control. user_id가 없는 요청(스키마 조회 등)은 DB를 사용하지 않으므로 통과"""
+    user_ids = await _resolve_user_ids(request) if get_settings().admission_enabled else []
+    if not user_ids:
+        yield
+        return
+
+    async with get_admission_controller().admit(*user_ids):
+        yield
+
+
+async def require_admin_token(x_admin_token: str | None = Header(default=None)) -> None:
+    """/admin 요청의 X-Admin-Token 헤더를 설정된 ADMIN_TOKEN과 비교"""
+    expected = get_settings().admin_token
+    if expected is None or x_admin_token is None or not hmac.compare_digest(x_admin_token.encode(), expected.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import random
+import time
+from typing import Any
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.infrastructure.profiling import (
+    RequestProfile,
+    StackSampler,
+    end_profile,
+    get_slow_request_buffer,
+    start_profile,
+)
+
+
+class ProfilingMiddleware:
+    """
+    헤더(opt-in) 또는 샘플링 비율로 선택된 요청만 프로파일링합니다.
+
+    선택되지 않은 요청은 헤더 조회와 난수 비교 외에 추가 비용이 없습니다.
+    """
+
+    def __init__(self, app: ASGIApp, header: str, sample_rate: float, interval_ms: float) -> None:
+        self.app = app
+        self._header = header.lower().encode("latin-1")
+        self._sample_rate = sample_rate
+        self._interval_ms = interval_ms
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trigger = self._select(scope)
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(method=scope["method"], path=scope["path"], trigger=trigger)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                profile.status_code = message["status"]
+            await send(message)
+
+        token = start_profile(profile)
+        sampler = StackSampler(profile, self._interval_ms)
+        sampler.start()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profile.duration_ms = (time.perf_counter() - start) * 1000
+            sampler.stop()
+            end_profile(token)
+            get_slow_request_buffer().add(profile)
+
+    def _select(self, scope: Scope) -> str | None:
+        headers: list[tuple[bytes, Any]] = scope.get("headers", [])
+        for name, value in headers:
+            if name == self._header and value not in (b"", b"0", b"false"):
+                return "header"
+        if self._sample_rate > 0 and random.random() < self._sample_rate:
+            return "sampled"
+        return None
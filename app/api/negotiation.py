@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Coroutine
+from typing import Any
+
+from fastapi import Request
+from fastapi import Response as HTTPResponse
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+
+from app.infrastructure.msgpack_codec import MSGPACK_MEDIA_TYPE, MSGPACK_MEDIA_TYPES, msgpack_available, packb, unpackb
+
+_JSON_RANGES = frozenset({"application/json", "application/*", "*/*"})
+
+
+def accepts_msgpack(accept: str | None) -> bool:
+    """
+    Accept 헤더에서 MessagePack이 JSON보다 우선이면 True. (q가 같으면 먼저 나열된 쪽)
+
+    msgpack이 설치되지 않았으면 항상 JSON으로 응답합니다.
+    """
+    if not accept or not msgpack_available():
+        return False
+
+    msgpack_q = json_q = 0.0
+    msgpack_first = False
+    for media_range in accept.split(","):
+        media_type, *params = (part.strip() for part in media_range.split(";"))
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        media_type = media_type.lower()
+        if media_type in MSGPACK_MEDIA_TYPES:
+            msgpack_first = msgpack_first or (msgpack_q == 0.0 and json_q == 0.0 and q > 0)
+            msgpack_q = max(msgpack_q, q)
+        elif media_type in _JSON_RANGES:
+            json_q = max(json_q, q)
+    return msgpack_q > 0 and (msgpack_q > json_q or (msgpack_q == json_q and msgpack_first))
+
+
+def is_msgpack_content(content_type: str | None) -> bool:
+    if not content_type:
+        return False
+    return content_type.split(";")[0].strip().lower() in MSGPACK_MEDIA_TYPES
+
+
+class MsgPackResponse(HTTPResponse):
+    media_type = MSGPACK_MEDIA_TYPE
+
+    def render(self, content: Any) -> bytes:
+        return packb(content)
+
+
+def negotiate(body: BaseModel, accept: str | None, headers: dict[str, str] | None = None) -> Any:
+    """Accept가 MessagePack을 우선하면 MsgPackResponse, 아니면 body를 그대로 반환 (FastAPI가 JSON으로 직렬화)"""
+    if accepts_msgpack(accept):
+        return MsgPackResponse(body.model_dump(), headers=headers)
+    return body
+
+
+class _MsgPackRequest(Request):
+    """MessagePack body를 FastAPI의 JSON body 경로로 넘기기 위해 json()이 msgpack을 디코딩하는 Request"""
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            self._json = unpackb(await self.body())
+        return self._json
+
+
+class MsgPackRoute(APIRoute):
+    """
+    Content-Type이 MessagePack인 요청 body를 디코딩해 JSON body와 같은 방식으로 검증합니다.
+
+    pydantic body 파라미터가 있는 라우트에만 적용되며, 스트림을 직접 읽는 라우트(import 등)는 Content-Type을 직접 확인합니다.
+    msgpack이 설치되지 않았으면 415로 응답합니다.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, HTTPResponse]]:
+        handler = super().get_route_handler()
+        if self.body_field is None:
+            return handler
+
+        async def route_handler(request: Request) -> HTTPResponse:
+            if not is_msgpack_content(request.headers.get("content-type")):
+                return await handler(request)
+            if not msgpack_available():
+                return JSONResponse(
+                    status_code=415, content={"success": False, "error": "MessagePack is not supported by this server"}
+                )
+
+            # 검증 경로(JSON)로 보내도록 Content-Type만 바꾸고, body는 _MsgPackRequest.json()이 디코딩
+            scope = dict(request.scope)
+            scope["headers"] = [
+                (name, b"application/json" if name == b"content-type" else value) for name, value in scope["headers"]
+            ]
+            return await handler(_MsgPackRequest(scope, request.receive))
+
+        return route_handler
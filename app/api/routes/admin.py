@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Header, Request
+from fastapi.responses import StreamingResponse
+
+from app.api.dependencies import require_admin_token
+from app.api.negotiation import accepts_msgpack, is_msgpack_content
+from app.api.schemas import Response
+from app.config.logging_config import get_logging_stats
+from app.config.settings import get_settings
+from app.infrastructure.checkpointer import get_prune_status, prune_checkpoints
+from app.infrastructure.msgpack_codec import MSGPACK_MEDIA_TYPE, iter_objects, msgpack_available
+from app.infrastructure.partitioning import describe_partitions
+from app.infrastructure.profiling import get_slow_request_buffer
+from app.infrastructure.reembedding import get_reembed_status
+from app.infrastructure.transfer import export_memories, import_memories, iter_lines
+from app.infrastructure.vector_index import (
+    describe_vector_index,
+    get_rebuild_status,
+    index_build_params,
+    start_vector_index_rebuild,
+)
+from app.services.admission import get_admission_controller
+from app.services.consolidation import consolidate_memories, get_consolidation_status
+from app.services.retention import get_retention_status, sweep_retention
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin_token)])
+
+
+@router.get("/profiles", description="최근 가장 느린 요청들의 프로파일 조회")
+async def list_profiles(limit: int = 20, top_stacks: int = 20) -> Response:
+    settings = get_settings()
+    profiles = get_slow_request_buffer().snapshot()[:limit]
+
+    return Response(
+        success=True,
+        data={
+            "enabled": settings.profiling_enabled,
+            "sample_rate": settings.profiling_sample_rate,
+            "profiles": [profile.to_dict(top_stacks=top_stacks) for profile in profiles],
+            "count": len(profiles),
+        },
+    )
+
+
+@router.delete("/profiles", description="수집된 프로파일 초기화")
+async def clear_profiles() -> Response:
+    get_slow_request_buffer().clear()
+    return Response(success=True, data={"cleared": True})
+
+
+@router.get("/vector-index", description="벡터 인덱스 정의/크기 및 재생성 상태 조회")
+async def get_vector_index() -> Response:
+    settings = get_settings()
+    return Response(
+        success=True,
+        data={
+            "configured": {"kind": settings.vector_index_kind, "params": index_build_params(settings)},
+            "current": await describe_vector_index(),
+            "rebuild": get_rebuild_status(),
+        },
+    )
+
+
+@router.post("/vector-index/rebuild", description="현재 설정으로 벡터 인덱스를 CONCURRENTLY 재생성")
+async def rebuild_index() -> Response:
+    if not start_vector_index_rebuild():
+        return Response(success=False, error="Vector index rebuild already in progress")
+    return Response(success=True, data={"rebuild": get_rebuild_status()})
+
+
+@router.get("/reembed/{version}", description="재임베딩 작업 진행 상태 조회")
+async def reembed_status(version: str) -> Response:
+    status = await get_reembed_status(version)
+    if status is None:
+        return Response(success=False, error=f"Re-embedding job not found: {version}")
+    return Response(success=True, data=status)
+
+
+@router.get("/partitions", description="store 파티션별 행 수/크기/마지막 vacuum 조회")
+async def list_partitions() -> Response:
+    return Response(success=True, data=await describe_partitions())
+
+
+@router.get("/admission", description="admission control 대기열/거절 메트릭 조회")
+async def admission_metrics() -> Response:
+    return Response(success=True, data=get_admission_controller().metrics())
+
+
+@router.get("/logging", description="로그 큐 적재량/버려진 레코드 수 조회")
+async def logging_stats() -> Response:
+    return Response(success=True, data=get_logging_stats())
+
+
+@router.get("/checkpoints/prune", description="checkpoint 정리 작업 상태 및 마지막 실행 결과 조회")
+async def checkpoint_prune_status() -> Response:
+    return Response(success=True, data=get_prune_status())
+
+
+@router.post("/checkpoints/prune", description="checkpoint 정리를 즉시 실행")
+async def run_checkpoint_prune() -> Response:
+    return Response(success=True, data=await prune_checkpoints())
+
+
+@router.get("/consolidation", description="near-duplicate 병합 작업 상태 및 마지막 실행 리포트 조회")
+async def consolidation_status() -> Response:
+    return Response(success=True, data=get_consolidation_status())
+
+
+@router.post("/consolidation", description="near-duplicate 메모리 병합 실행 (기본 dry-run: 병합 대상만 리포트)")
+async def run_consolidation(dry_run: bool = True, full: bool = False) -> Response:
+    return Response(success=True, data=await consolidate_memories(dry_run=dry_run, full=full))
+
+
+@router.get("/retention", description="스키마별 보존 정책 및 마지막 sweep 결과 조회")
+async def retention_status() -> Response:
+    return Response(success=True, data=get_retention_status())
+
+
+@router.post("/retention/sweep", description="보존 정책(TTL/최대 개수) sweep을 즉시 실행")
+async def run_retention_sweep() -> Response:
+    return Response(success=True, data=await sweep_retention())
+
+
+@router.get(
+    "/export",
+    description="메모리를 JSONL(Accept가 MessagePack이면 MessagePack 스트림)로 내보내기 (사용자/스키마 범위, 선택적으로 임베딩 벡터 포함)",
+)
+async def export_memories_jsonl(
+    user_id: str | None = None,
+    schema_type: str | None = None,
+    include_vectors: bool = False,
+    accept: str | None = Header(default=None),
+) -> StreamingResponse:
+    if accepts_msgpack(accept):
+        return StreamingResponse(
+            export_memories(
+                user_id=user_id, schema_type=schema_type, include_vectors=include_vectors, encoding="msgpack"
+            ),
+            media_type=MSGPACK_MEDIA_TYPE,
+            headers={"Content-Disposition": 'attachment; filename="memories.msgpack"', "Vary": "Accept"},
+        )
+    return StreamingResponse(
+        export_memories(user_id=user_id, schema_type=schema_type, include_vectors=include_vectors),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="memories.jsonl"', "Vary": "Accept"},
+    )
+
+
+@router.post(
+    "/import",
+    description="export JSONL 또는 MessagePack 스트림을 가져오기 (COPY 배치, upsert 또는 기존 항목 유지)",
+)
+async def import_memories_jsonl(
+    request: Request,
+    mode: Literal["upsert", "skip"] = "upsert",
+    batch_size: int | None = None,
+) -> Response:
+    if is_msgpack_content(request.headers.get("content-type")):
+        if not msgpack_available():
+            return Response(success=False, error="MessagePack is not supported by this server")
+        records = iter_objects(request.stream())
+    else:
+        records = iter_lines(request.stream())
+    try:
+        report = await import_memories(records, mode=mode, batch_size=batch_size)
+    except ValueError as e:
+        return Response(success=False, error=str(e))
+    return Response(success=True, data=report)
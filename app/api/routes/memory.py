@@ -1,77 +1,336 @@
 from __future__ import annotations
 
-from typing import Any
+import json
+from collections.abc import AsyncIterator
+from typing import Any, Literal
 
-from fastapi import APIRouter, Body, Depends
+from fastapi import APIRouter, Body, Depends, Header, Query
+from fastapi import Response as HTTPResponse
+from fastapi.responses import StreamingResponse
 
-from app.api.schemas import Response
-from app.core.schema_registry import get_all_schemas
-from app.services import MemoryService, get_memory_service
+from app.api.dependencies import admit_request
+from app.api.negotiation import MsgPackRoute, accepts_msgpack, negotiate
+from app.api.schemas import MemoryBatchSearchRequest, MemoryRecallRequest, MemoryUpdateRequest, Response
+from app.core.base import MemoryType
+from app.core.schema_registry import get_all_schemas, get_schemas_etag
+from app.infrastructure.models import Memory
+from app.services import MemoryService, SearchRequest, get_memory_service
+from app.services.recall import rank_memories
+from app.services.service import invalid_index_fields_error
 
-router = APIRouter(prefix="/memories", tags=["memories"])
+_STREAM_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "sse": "text/event-stream"}
 
+# 요청 body는 JSON 또는 MessagePack, 목록/검색/생성 응답은 Accept에 따라 JSON 또는 MessagePack
+router = APIRouter(
+    prefix="/memories", tags=["memories"], dependencies=[Depends(admit_request)], route_class=MsgPackRoute
+)
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match 비교 (weak comparison, RFC 9110 13.1.2)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def _not_modified(etag: str) -> HTTPResponse:
+    return HTTPResponse(status_code=304, headers={"ETag": etag})
+
+
+def _parse_field_weights(fields: str | None) -> dict[str, float] | str | None:
+    """content:2,context 형식을 {"content": 2.0, "context": 1.0}으로 변환 (형식이 잘못되면 에러 메시지)"""
+    if not fields:
+        return None
+    weights: dict[str, float] = {}
+    for part in fields.split(","):
+        name, _, weight = part.strip().partition(":")
+        try:
+            weights[name] = float(weight) if weight else 1.0
+        except ValueError:
+            return f"Invalid field weight: {part.strip()}"
+    return weights
+
+
+@router.get("/schemas", description="사용 가능한 메모리 스키마 목록 조회 (ETag 지원)", response_model=Response)
+async def list_schemas(
+    response: HTTPResponse,
+    if_none_match: str | None = Header(default=None, alias="If-None-Match"),
+) -> Response | HTTPResponse:
+    etag = f'"{get_schemas_etag()}"'
+    if _etag_matches(if_none_match, etag):
+        return _not_modified(etag)
 
-@router.get("/schemas", description="사용 가능한 메모리 스키마 목록 조회")
-async def list_schemas() -> Response:
     schemas = get_all_schemas()
+    response.headers["ETag"] = etag
     return Response(success=True, data={"schemas": schemas.to_api_dict()})
 
 
-@router.get("/search", description="쿼리(사용자 질의)로 메모리 유사도 검색")
+@router.get("/stats", description="사용자의 스키마별 메모리 개수/저장 크기 및 quota 조회")
+async def get_memory_stats(
+    user_id: str,
+    service: MemoryService = Depends(get_memory_service),
+) -> Response:
+    usage = await service.usage(user_id)
+    return Response(success=True, data={"user_id": user_id, **usage})
+
+
+def _encode_event(event: str, payload: dict[str, Any], stream_format: str) -> str:
+    if stream_format == "sse":
+        return f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False, default=str)}\n\n"
+    return json.dumps({"event": event, **payload}, ensure_ascii=False, default=str) + "\n"
+
+
+async def _stream_search(
+    service: MemoryService,
+    stream_format: str,
+    user_id: str,
+    query: str,
+    schema_type: str | None,
+    limit: int,
+    ef_search: int | None,
+    probes: int | None,
+    memory_type: MemoryType | None = None,
+    fields: dict[str, float] | None = None,
+) -> AsyncIterator[str]:
+    collected: list[Memory] = []
+    failed: list[str] = []
+    async for chunk in service.search_stream(
+        user_id=user_id,
+        query=query,
+        schema_type=schema_type,
+        limit=limit,
+        ef_search=ef_search,
+        probes=probes,
+        memory_type=memory_type,
+        fields=fields,
+    ):
+        if chunk.error is not None:
+            failed.append(chunk.schema_type)
+            yield _encode_event("error", {"schema_type": chunk.schema_type, "error": chunk.error}, stream_format)
+            continue
+        collected.extend(chunk.memories)
+        yield _encode_event(
+            "partial",
+            {
+                "schema_type": chunk.schema_type,
+                "memories": [memory.to_dict() for memory in chunk.memories],
+                "count": len(chunk.memories),
+            },
+            stream_format,
+        )
+
+    ranked = rank_memories(collected)[:limit]
+    yield _encode_event(
+        "summary",
+        {
+            "user_id": user_id,
+            "query": query,
+            "ranking": [{"id": m.id, "schema_type": m.schema_type, "score": m.score} for m in ranked],
+            "count": len(ranked),
+            "failed_schema_types": failed,
+        },
+        stream_format,
+    )
+
+
+@router.get("/search", description="쿼리(사용자 질의)로 메모리 유사도 검색", response_model=Response)
 async def search_memories(
     user_id: str,
     query: str,
     schema_type: str | None = None,
+    memory_type: MemoryType | None = Query(
+        default=None, description="메모리 타입으로 검색 범위 제한 (해당 파티션만 검색)"
+    ),
+    fields: str | None = Query(
+        default=None, description="검색할 임베딩 필드와 가중치 (예: content:2,context). 지정하지 않으면 모든 벡터"
+    ),
     limit: int = 10,
+    ef_search: int | None = Query(
+        default=None, ge=1, le=1000, description="HNSW 검색 후보 수 (높을수록 recall↑, 지연↑)"
+    ),
+    probes: int | None = Query(default=None, ge=1, description="IVFFlat 탐색 리스트 수 (높을수록 recall↑, 지연↑)"),
+    stream: Literal["ndjson", "sse"] | None = Query(
+        default=None, description="스키마별 결과를 응답 순서대로 스트리밍 (마지막에 통합 순위 summary)"
+    ),
+    accept: str | None = Header(default=None),
     service: MemoryService = Depends(get_memory_service),
-) -> Response:
+) -> Response | HTTPResponse:
     """쿼리로 메모리 검색"""
-    memories = await service.search(user_id=user_id, query=query, schema_type=schema_type, limit=limit)
+    field_weights = _parse_field_weights(fields)
+    if isinstance(field_weights, str):
+        return Response(success=False, error=field_weights)
+    error = invalid_index_fields_error(field_weights, schema_type)
+    if error:
+        return Response(success=False, error=error)
+
+    if stream is not None:
+        return StreamingResponse(
+            _stream_search(
+                service, stream, user_id, query, schema_type, limit, ef_search, probes, memory_type, field_weights
+            ),
+            media_type=_STREAM_MEDIA_TYPES[stream],
+        )
+
+    memories = await service.search(
+        user_id=user_id,
+        query=query,
+        schema_type=schema_type,
+        limit=limit,
+        ef_search=ef_search,
+        probes=probes,
+        memory_type=memory_type,
+        fields=field_weights,
+    )
+
+    return negotiate(
+        Response(
+            success=True,
+            data={
+                "user_id": user_id,
+                "query": query,
+                "schema_type": schema_type,
+                "memories": [memory.to_dict() for memory in memories],
+                "count": len(memories),
+            },
+        ),
+        accept,
+    )
+
+
+@router.post(
+    "/search/batch",
+    description="여러 사용자의 검색을 한 번의 store 배치로 실행 (결과는 검색 id별)",
+    response_model=Response,
+)
+async def batch_search_memories(
+    request: MemoryBatchSearchRequest,
+    accept: str | None = Header(default=None),
+    service: MemoryService = Depends(get_memory_service),
+) -> Response | HTTPResponse:
+    keys = [item.id if item.id is not None else str(i) for i, item in enumerate(request.searches)]
+    if len(set(keys)) != len(keys):
+        return Response(success=False, error="Search ids must be unique")
+
+    results = await service.search_many(
+        [
+            SearchRequest(item.user_id, item.query, item.schema_type, item.limit, item.memory_type, item.fields)
+            for item in request.searches
+        ],
+        ef_search=request.ef_search,
+        probes=request.probes,
+    )
+
+    if isinstance(results, dict):
+        return Response(success=False, error=results["error"])
+
+    return negotiate(
+        Response(
+            success=True,
+            data={
+                "results": {
+                    key: {
+                        "user_id": item.user_id,
+                        "query": item.query,
+                        "schema_type": item.schema_type,
+                        "memories": [memory.to_dict() for memory in memories],
+                        "count": len(memories),
+                    }
+                    for key, item, memories in zip(keys, request.searches, results, strict=True)
+                },
+                "count": len(results),
+            },
+        ),
+        accept,
+    )
+
+
+@router.post("/recall", description="대화 스니펫으로 여러 스키마를 동시 검색해 토큰 예산 내 컨텍스트 구성")
+async def recall_memories(
+    request: MemoryRecallRequest,
+    service: MemoryService = Depends(get_memory_service),
+) -> Response:
+    result = await service.recall(
+        user_id=request.user_id,
+        query=request.query,
+        token_budget=request.token_budget,
+        schema_types=request.schema_types,
+        limit_per_schema=request.limit_per_schema,
+    )
+
+    if "error" in result:
+        return Response(success=False, error=result["error"])
 
     return Response(
         success=True,
-        data={
-            "user_id": user_id,
-            "query": query,
-            "schema_type": schema_type,
-            "memories": [memory.to_dict() for memory in memories],
-            "count": len(memories),
-        },
+        data={"user_id": request.user_id, "query": request.query, "token_budget": request.token_budget, **result},
     )
 
 
-@router.post("", description="새 메모리 생성")
+@router.post("", description="새 메모리 생성", response_model=Response)
 async def create_memory(
     user_id: str,
     schema_type: str,
     content: dict[str, Any] = Body(...),
+    dedupe: bool | None = Query(default=None, description="내용 해시로 ID를 생성해 동일 내용 중복 생성을 방지"),
+    idempotency_key: str | None = Header(default=None, alias="Idempotency-Key", max_length=255),
+    accept: str | None = Header(default=None),
     service: MemoryService = Depends(get_memory_service),
-) -> Response:
+) -> Response | HTTPResponse:
     """메모리 생성"""
-    result = await service.create(user_id=user_id, schema_type=schema_type, content=content)
+    result = await service.create(
+        user_id=user_id, schema_type=schema_type, content=content, idempotency_key=idempotency_key, dedupe=dedupe
+    )
 
     if "error" in result:
         return Response(success=False, error=result["error"])
 
-    return Response(success=True, data=result)
+    return negotiate(Response(success=True, data=result), accept)
 
 
-@router.get("", description="사용자의 모든 메모리 조회")
+@router.get("", description="사용자의 모든 메모리 조회 (사용자별 버전 기반 ETag 지원)", response_model=Response)
 async def get_all_memories(
     user_id: str,
+    response: HTTPResponse,
     schema_type: str | None = None,
+    memory_type: MemoryType | None = None,
+    if_none_match: str | None = Header(default=None, alias="If-None-Match"),
+    accept: str | None = Header(default=None),
     service: MemoryService = Depends(get_memory_service),
-) -> Response:
-    memories = await service.get_all(user_id=user_id, schema_type=schema_type)
+) -> Response | HTTPResponse:
+    # 목록보다 먼저 버전을 읽어, 사이에 끼어든 쓰기는 다음 요청에서 새 ETag로 드러나게 함
+    version = str(await service.version(user_id))
+    # 만료는 sweep 전까지 version을 바꾸지 않으므로 다음 만료 시각을 함께 넣어, 항목이 만료되면 ETag가 바뀌게 함
+    next_expiry = await service.next_expiry(user_id)
+    if next_expiry is not None:
+        version += f".{int(next_expiry.timestamp() * 1000)}"
+    # 표현(JSON/MessagePack)마다 ETag가 달라야 캐시가 다른 형식의 304를 재사용하지 않음
+    encoding = "-msgpack" if accepts_msgpack(accept) else ""
+    etag = f'W/"{version}-{schema_type or "*"}-{memory_type.value if memory_type else "*"}{encoding}"'
+    if _etag_matches(if_none_match, etag):
+        not_modified = _not_modified(etag)
+        not_modified.headers["Vary"] = "Accept"
+        return not_modified
 
-    return Response(
-        success=True,
-        data={
-            "user_id": user_id,
-            "schema_type": schema_type,
-            "memories": [memory.to_dict() for memory in memories],
-            "count": len(memories),
-        },
+    memories = await service.get_all(user_id=user_id, schema_type=schema_type, memory_type=memory_type)
+    headers = {"ETag": etag, "Vary": "Accept"}
+    response.headers.update(headers)
+
+    return negotiate(
+        Response(
+            success=True,
+            data={
+                "user_id": user_id,
+                "schema_type": schema_type,
+                "memory_type": memory_type,
+                "memories": [memory.to_dict() for memory in memories],
+                "count": len(memories),
+            },
+        ),
+        accept,
+        headers,
     )
 
 
@@ -90,6 +349,22 @@ async def get_memory_by_id(
     return Response(success=True, data=memory.to_dict())
 
 
+@router.patch("/{memory_id}", description="메모리 부분 수정 (JSON Merge Patch, 변경된 인덱스 필드만 재임베딩)")
+async def update_memory(
+    memory_id: str,
+    request: MemoryUpdateRequest,
+    service: MemoryService = Depends(get_memory_service),
+) -> Response:
+    result = await service.update(
+        user_id=request.user_id, memory_id=memory_id, patch=request.content, schema_type=request.schema_type
+    )
+
+    if "error" in result:
+        return Response(success=False, error=result["error"])
+
+    return Response(success=True, data=result)
+
+
 @router.delete("/{memory_id}", description="ID로 메모리 삭제")
 async def delete_memory_by_id(
     memory_id: str,
@@ -4,6 +4,8 @@ from typing import Any
 
 from pydantic import BaseModel, Field
 
+from app.core.base import MemoryType
+
 
 class APIResponse(BaseModel):
     success: bool
@@ -31,7 +33,9 @@ class MemoryCreateRequest(BaseModel):
 
 class MemoryUpdateRequest(BaseModel):
     user_id: str
-    content: str
+    # JSON Merge Patch (null 값은 필드 삭제)
+    content: dict[str, Any]
+    schema_type: str | None = None
 
 
 class MemorySearchRequest(BaseModel):
@@ -41,6 +45,32 @@ class MemorySearchRequest(BaseModel):
     limit: int = Field(default=10, ge=1, le=100)
 
 
+class MemoryBatchSearchItem(BaseModel):
+    # 결과를 찾을 때 쓰는 키 (없으면 요청 목록의 인덱스)
+    id: str | None = None
+    user_id: str
+    query: str
+    schema_type: str | None = None
+    memory_type: MemoryType | None = None
+    # 검색할 임베딩 필드 이름 -> 가중치
+    fields: dict[str, float] | None = None
+    limit: int = Field(default=10, ge=1, le=100)
+
+
+class MemoryBatchSearchRequest(BaseModel):
+    searches: list[MemoryBatchSearchItem] = Field(min_length=1)
+    ef_search: int | None = Field(default=None, ge=1, le=1000)
+    probes: int | None = Field(default=None, ge=1)
+
+
+class MemoryRecallRequest(BaseModel):
+    user_id: str
+    query: str
+    token_budget: int = Field(default=1000, ge=1, le=100_000)
+    schema_types: list[str] | None = None
+    limit_per_schema: int = Field(default=10, ge=1, le=50)
+
+
 class ManagedChatRequest(BaseModel):
     user_id: str
     message: str
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+from collections.abc import AsyncIterator
+from typing import Any
+
+from app.config.logging_config import setup_logging
+
+
+def _serve(args: argparse.Namespace) -> Any:
+    from app.server import serve
+
+    serve(host=args.host, port=args.port, workers=args.workers)
+
+
+async def _migrate(_: argparse.Namespace) -> Any:
+    from app.config.settings import get_settings
+    from app.infrastructure.checkpointer import migrate_checkpointer
+    from app.infrastructure.store import migrate_store
+
+    store = await migrate_store()
+    checkpointer = get_settings().use_checkpointer
+    if checkpointer:
+        await migrate_checkpointer()
+    return {"store": store, "checkpointer": checkpointer}
+
+
+async def _rebuild_index(_: argparse.Namespace) -> Any:
+    from app.infrastructure.vector_index import rebuild_vector_index
+
+    return await rebuild_vector_index()
+
+
+async def _benchmark_vectors(args: argparse.Namespace) -> Any:
+    from app.infrastructure.vector_benchmark import benchmark_vector_search
+
+    return await benchmark_vector_search(
+        num_queries=args.queries, k=args.k, ef_search=args.ef_search, probes=args.probes
+    )
+
+
+def _reembed_pipeline(args: argparse.Namespace) -> Any:
+    from app.infrastructure.reembedding import ReembeddingPipeline
+
+    return ReembeddingPipeline(
+        version=args.version,
+        model=args.model,
+        dims=args.dims,
+        fields=args.fields,
+        batch_size=args.batch_size,
+        max_items_per_second=args.rate,
+    )
+
+
+async def _reembed(args: argparse.Namespace) -> Any:
+    return await _reembed_pipeline(args).run()
+
+
+async def _reembed_cutover(args: argparse.Namespace) -> Any:
+    return await _reembed_pipeline(args).cutover(drop_previous=args.drop_previous)
+
+
+async def _reembed_status(args: argparse.Namespace) -> Any:
+    from app.infrastructure.reembedding import get_reembed_status
+
+    return await get_reembed_status(args.version)
+
+
+async def _prune_checkpoints(_: argparse.Namespace) -> Any:
+    from app.infrastructure.checkpointer import close_checkpointer, prune_checkpoints
+
+    try:
+        return await prune_checkpoints()
+    finally:
+        await close_checkpointer()
+
+
+async def _consolidate(args: argparse.Namespace) -> Any:
+    from app.services.consolidation import consolidate_memories
+
+    return await consolidate_memories(dry_run=args.dry_run, full=args.full)
+
+
+async def _sweep_retention(_: argparse.Namespace) -> Any:
+    from app.services.retention import sweep_retention
+
+    return await sweep_retention()
+
+
+async def _partition_store(args: argparse.Namespace) -> Any:
+    from app.infrastructure.partitioning import partition_store
+
+    return await partition_store(hash_partitions=args.hash_partitions, drop_previous=args.drop_previous)
+
+
+async def _export(args: argparse.Namespace) -> Any:
+    from app.infrastructure.transfer import export_memories
+
+    exported = 0
+    with open(args.output, "wb") as output:
+        async for chunk in export_memories(
+            user_id=args.user_id,
+            schema_type=args.schema_type,
+            include_vectors=args.include_vectors,
+            batch_size=args.batch_size,
+        ):
+            output.write(chunk)
+            exported += chunk.count(b"\n")
+    # 첫 줄은 헤더
+    return {"output": args.output, "exported": exported - 1}
+
+
+async def _read_chunks(path: str | None, chunk_size: int = 1 << 20) -> AsyncIterator[bytes]:
+    source = open(path, "rb") if path else sys.stdin.buffer
+    try:
+        while chunk := source.read(chunk_size):
+            yield chunk
+    finally:
+        if path:
+            source.close()
+
+
+async def _import(args: argparse.Namespace) -> Any:
+    from app.infrastructure.transfer import import_memories, iter_lines
+
+    return await import_memories(iter_lines(_read_chunks(args.input)), mode=args.mode, batch_size=args.batch_size)
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Agent LTM admin commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve = subparsers.add_parser("serve", help="API 서버 실행 (--workers > 1이면 모델을 로드한 뒤 워커를 fork)")
+    serve.add_argument("--host", default="0.0.0.0")
+    serve.add_argument("--port", type=int, default=8000)
+    serve.add_argument("--workers", type=int, default=1, help="워커 프로세스 수")
+    serve.set_defaults(handler=_serve)
+
+    migrate = subparsers.add_parser("migrate", help="store/checkpointer 마이그레이션 실행 (배포마다 한 번)")
+    migrate.set_defaults(handler=_migrate)
+
+    rebuild = subparsers.add_parser("rebuild-index", help="현재 설정으로 벡터 인덱스를 CONCURRENTLY 재생성")
+    rebuild.set_defaults(handler=_rebuild_index)
+
+    benchmark = subparsers.add_parser(
+        "benchmark-vectors", help="현재 벡터 설정의 recall@k, 지연 시간, 인덱스 크기 측정"
+    )
+    benchmark.add_argument("--queries", type=int, default=50)
+    benchmark.add_argument("-k", type=int, default=10)
+    benchmark.add_argument("--ef-search", type=int, default=None)
+    benchmark.add_argument("--probes", type=int, default=None)
+    benchmark.set_defaults(handler=_benchmark_vectors)
+
+    for name, handler, help_text in [
+        ("reembed", _reembed, "새 임베딩 모델/필드로 shadow 테이블에 재임베딩 (재시작 가능)"),
+        ("reembed-cutover", _reembed_cutover, "재임베딩된 shadow 테이블을 운영 벡터 테이블과 교체"),
+    ]:
+        reembed = subparsers.add_parser(name, help=help_text)
+        reembed.add_argument("--version", required=True, help="새 embedding_version 태그")
+        reembed.add_argument("--model", required=True, help="init_embeddings 모델 ID")
+        reembed.add_argument("--dims", type=int, required=True)
+        reembed.add_argument("--fields", nargs="+", default=None, help="임베딩할 필드 경로 (기본: EMBEDDING_FIELDS)")
+        reembed.add_argument("--batch-size", type=int, default=None)
+        reembed.add_argument("--rate", type=float, default=None, help="최대 처리량 (items/sec)")
+        reembed.set_defaults(handler=handler)
+    subparsers.choices["reembed-cutover"].add_argument("--drop-previous", action="store_true")
+
+    status = subparsers.add_parser("reembed-status", help="재임베딩 작업 진행 상태 조회")
+    status.add_argument("--version", required=True)
+    status.set_defaults(handler=_reembed_status)
+
+    prune = subparsers.add_parser("prune-checkpoints", help="오래된 checkpoint를 thread별로 compact/삭제")
+    prune.set_defaults(handler=_prune_checkpoints)
+
+    consolidate = subparsers.add_parser("consolidate", help="near-duplicate 메모리 병합 (마지막 실행 이후 변경분)")
+    consolidate.add_argument("--dry-run", action="store_true", help="병합하지 않고 리포트만 출력")
+    consolidate.add_argument("--full", action="store_true", help="워터마크를 무시하고 전체 메모리 비교")
+    consolidate.set_defaults(handler=_consolidate)
+
+    sweep = subparsers.add_parser("sweep-retention", help="보존 정책(TTL/최대 개수)에 따라 만료/초과 메모리 삭제")
+    sweep.set_defaults(handler=_sweep_retention)
+
+    partition = subparsers.add_parser(
+        "partition-store", help="store를 memory_type별 range + namespace hash 파티션으로 전환 (점검 시간에 실행)"
+    )
+    partition.add_argument(
+        "--hash-partitions", type=int, default=None, help="타입별 hash 파티션 수 (기본: STORE_HASH_PARTITIONS)"
+    )
+    partition.add_argument("--drop-previous", action="store_true", help="전환 후 기존 store_unpartitioned 테이블 삭제")
+    partition.set_defaults(handler=_partition_store)
+
+    export = subparsers.add_parser("export", help="메모리를 JSONL로 내보내기 (server-side cursor)")
+    export.add_argument("--user-id", default=None, help="특정 사용자만 내보내기")
+    export.add_argument("--schema-type", default=None, help="특정 스키마만 내보내기")
+    export.add_argument("--include-vectors", action="store_true", help="임베딩 벡터 포함")
+    export.add_argument("--batch-size", type=int, default=None)
+    # 로그가 stdout으로 출력되므로 파일로만 내보냄
+    export.add_argument("-o", "--output", required=True, help="출력 JSONL 파일")
+    export.set_defaults(handler=_export)
+
+    import_ = subparsers.add_parser("import", help="export JSONL을 COPY 배치로 가져오기")
+    import_.add_argument("-i", "--input", default=None, help="입력 파일 (기본: stdin)")
+    import_.add_argument("--mode", choices=["upsert", "skip"], default="upsert", help="기존 항목 덮어쓰기/유지")
+    import_.add_argument("--batch-size", type=int, default=None)
+    import_.set_defaults(handler=_import)
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    setup_logging()
+    args = _build_parser().parse_args(argv)
+    result = args.handler(args)
+    if asyncio.iscoroutine(result):
+        result = asyncio.run(result)
+    if result is not None:
+        print(json.dumps(result, ensure_ascii=False, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,13 @@ from datetime import datetime
 
 from fastapi import FastAPI
 
+from app.config.process import is_primary_process
+from app.config.settings import get_settings
+from app.infrastructure.checkpointer import close_checkpointer, get_checkpointer, start_checkpoint_pruner
+from app.infrastructure.store import close_store
+from app.services.consolidation import start_consolidation, stop_consolidation
+from app.services.retention import start_retention_sweeper, stop_retention_sweeper
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -10,6 +17,22 @@ async def lifespan(app: FastAPI):
     print("API docs: http://localhost:8000/docs")
     print("ReDoc: http://localhost:8000/redoc")
     print(f"Startup time: {datetime.now().isoformat()}")
+
+    settings = get_settings()
+    # 여러 워커로 실행하면 주기 작업은 한 워커에서만 실행 (워커마다 같은 sweep/병합을 반복하지 않도록)
+    primary = is_primary_process()
+    if settings.use_checkpointer:
+        app.state.checkpointer = await get_checkpointer()
+        if primary:
+            start_checkpoint_pruner()
+    if primary:
+        start_consolidation()
+        start_retention_sweeper()
     yield
 
     print("Shutting down system...")
+    await stop_retention_sweeper()
+    await stop_consolidation()
+    if settings.use_checkpointer:
+        await close_checkpointer()
+    await close_store()
@@ -1,22 +1,147 @@
 from __future__ import annotations
 
+import atexit
 import logging
+import os
+import queue
+import random
 import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any
+
+import orjson
+
+from app.config.settings import get_settings
+
+TEXT_FORMAT = "%(asctime)s | %(levelname)-8s | %(name)-30s | %(message)s"
+
+# LogRecord 기본 속성. 그 외 속성은 extra로 전달된 필드로 보고 JSON에 포함
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
+
+_listener: QueueListener | None = None
+_queue_handler: NonBlockingQueueHandler | None = None
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload: dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            payload["stack_info"] = self.formatStack(record.stack_info)
+        return orjson.dumps(payload, default=str).decode("utf-8")
+
+
+class DebugSampler(logging.Filter):
+    """DEBUG 레코드는 rate 비율만 통과시킵니다. (INFO 이상은 항상 통과)"""
+
+    def __init__(self, rate: float) -> None:
+        super().__init__()
+        self._rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > logging.DEBUG or self._rate >= 1.0 or random.random() < self._rate
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    호출 스레드(이벤트 루프)에서는 레코드를 큐에 넣기만 하고, 포맷팅/쓰기는 QueueListener 스레드에서 처리합니다.
+
+    큐가 가득 차면 기다리지 않고 레코드를 버리며 dropped로 집계합니다.
+    """
+
+    def __init__(self, log_queue: queue.Queue[logging.LogRecord]) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 인자가 나중에 바뀌어도 기록 시점의 메시지가 남도록 메시지만 확정 (JSON/예외 포맷팅은 listener에서)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
 
 
 def setup_logging() -> None:
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s | %(levelname)-8s | %(name)-30s | %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
-        stream=sys.stdout,
-    )
-    
-    logging.getLogger("app").setLevel(logging.INFO)
-    logging.getLogger("app.infrastructure.store").setLevel(logging.INFO)
-    
+    global _listener, _queue_handler
+    if _listener is not None:
+        return
+
+    settings = get_settings()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if settings.log_format == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter(TEXT_FORMAT, datefmt="%Y-%m-%d %H:%M:%S"))
+
+    log_queue: queue.Queue[logging.LogRecord] = queue.Queue(maxsize=settings.log_queue_size)
+    _queue_handler = NonBlockingQueueHandler(log_queue)
+    _queue_handler.addFilter(DebugSampler(settings.log_debug_sample_rate))
+
+    root = logging.getLogger()
+    root.handlers = [_queue_handler]
+    root.setLevel(settings.log_level)
+
+    logging.getLogger("app").setLevel(settings.log_level)
+
     logging.getLogger("psycopg").setLevel(logging.INFO)
-    logging.getLogger("psycopg.pool").setLevel(logging.DEBUG)
-    
+    # pool은 커넥션 획득/반환마다 DEBUG 로그를 남기므로 기본은 INFO (DEBUG로 낮추면 log_debug_sample_rate로 샘플링)
+    logging.getLogger("psycopg.pool").setLevel(settings.log_pool_level)
+
     logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
 
+    _listener = QueueListener(log_queue, stream_handler)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """큐에 남은 레코드를 모두 쓰고 listener 스레드를 종료합니다."""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    _listener = None
+
+
+def _restart_after_fork() -> None:
+    """
+    fork된 자식에는 listener 스레드가 없으므로 큐와 listener를 새로 만듭니다.
+
+    부모의 큐는 fork 시점에 listener 스레드가 잠그고 있었을 수 있어 그대로 쓰지 않습니다.
+    (부모 큐에 남은 레코드는 부모가 출력)
+    """
+    global _listener
+    if _listener is None:
+        return
+    _listener = None
+    setup_logging()
+
+
+def get_logging_stats() -> dict[str, Any]:
+    settings = get_settings()
+    return {
+        "format": settings.log_format,
+        "running": _listener is not None,
+        "queued": _queue_handler.queue.qsize() if _queue_handler else 0,  # type: ignore[attr-defined]
+        "queue_size": settings.log_queue_size,
+        "dropped": _queue_handler.dropped if _queue_handler else 0,
+        "debug_sample_rate": settings.log_debug_sample_rate,
+    }
+
+
+os.register_at_fork(after_in_child=_restart_after_fork)
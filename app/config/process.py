@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+# app.server.serve()로 fork된 워커의 순번 (단일 프로세스 실행이면 None)
+# lifespan과 server가 함께 참조하므로 app의 다른 모듈을 import하지 않음
+_worker_index: int | None = None
+
+
+def set_worker_index(index: int | None) -> None:
+    global _worker_index
+    _worker_index = index
+
+
+def is_primary_process() -> bool:
+    """
+    주기 작업(retention sweep, consolidation, checkpoint prune)을 실행할 프로세스인지 여부
+
+    단일 프로세스 실행이거나 serve()의 0번 워커일 때만 True. 0번 워커가 재시작되면 새 워커가 이어받습니다.
+    """
+    return _worker_index is None or _worker_index == 0
@@ -2,11 +2,21 @@ from __future__ import annotations
 
 import urllib.parse
 from functools import lru_cache
+from typing import Literal
 
-from pydantic import ConfigDict
+from pydantic import BaseModel, ConfigDict
 from pydantic_settings import BaseSettings
 
 
+class RetentionPolicy(BaseModel):
+    # 생성 후 만료까지의 기간 (None이면 만료 없음)
+    ttl_days: float | None = None
+    # 사용자별(스키마 namespace별) 최대 보관 개수
+    max_items: int | None = None
+    # max_items 초과 시 제거 기준: 오래된 것부터 / confidence가 낮은 것부터 (상위 N개 유지)
+    evict: Literal["oldest", "lowest_confidence"] = "oldest"
+
+
 class Settings(BaseSettings):
     model_config = ConfigDict(extra="ignore")
 
@@ -19,8 +29,37 @@ class Settings(BaseSettings):
     db_user: str = "postgres"
     db_password: str = "postgres"
     
+    db_pool_min_size: int = 1
+    db_pool_max_size: int = 10
+
+    # store 구현. memory는 프로세스 메모리에 보관하는 단일 프로세스용 store (로컬 개발/테스트, 소규모 배포)
+    # partition-store, export/import, 재임베딩, 벡터 인덱스 관리 등 Postgres 전용 관리 기능은 사용할 수 없음
+    store_backend: Literal["postgres", "memory"] = "postgres"
+    # memory store 스냅샷 파일 (None이면 저장하지 않음). 시작 시 읽고, 주기적으로(변경이 있을 때)와 종료 시 저장
+    memory_store_snapshot_path: str | None = None
+    memory_store_snapshot_interval_s: float = 300.0
+
     store_schema: str = "public"
+    # partition-store 명령으로 store를 memory_type별 range 파티션으로 나눌 때, 타입별 hash 하위 파티션 수
+    store_hash_partitions: int = 8
     checkpoint_schema: str = "public"
+    # 시작 시 store/checkpointer 마이그레이션(setup) 실행 여부
+    # 배포 단계에서 `python -m app.cli migrate`를 한 번 실행하는 경우 false로 두면 워커/레플리카마다 반복하지 않음
+    migrate_on_startup: bool = True
+
+    # AsyncPostgresSaver 생성 여부 (lifespan에서 db_pool_* 설정으로 풀 생성)
+    # None이면 store_backend가 postgres일 때만 생성 (memory store는 Postgres 없이 실행할 수 있도록)
+    checkpointer_enabled: bool | None = None
+    # 주기 pruning은 checkpoint 이력(time-travel/replay에 필요)을 삭제하므로 명시적으로 켤 때만 실행
+    checkpoint_prune_enabled: bool = False
+    checkpoint_prune_interval_s: float = 3600.0
+    checkpoint_prune_batch_size: int = 100
+    # thread(namespace)별로 남길 최신 checkpoint 수
+    checkpoint_keep_last: int = 1
+    # 마지막 checkpoint 이후 이 시간이 지나지 않은 (실행 중일 수 있는) thread는 정리하지 않음
+    checkpoint_prune_min_idle_minutes: float = 10.0
+    # 마지막 checkpoint 이후 이 기간이 지난 thread는 삭제 (None이면 삭제하지 않음)
+    checkpoint_thread_ttl_days: float | None = None
 
     redis_host: str = "localhost"
     redis_port: int = 6379
@@ -30,6 +69,101 @@ class Settings(BaseSettings):
     azure_openai_api_key: str | None = None
     azure_openai_deployment_name: str | None = None
 
+    # 임베딩 모델 (langchain init_embeddings 형식, 예: "openai:text-embedding-3-small")
+    # 설정하지 않으면 벡터 인덱스 없이 동작
+    embedding_model: str | None = None
+    embedding_dims: int = 1536
+    embedding_fields: list[str] = ["$"]
+    # 저장되는 각 메모리에 기록되는 임베딩 버전 태그 (재임베딩 cutover 시 변경)
+    embedding_version: str = "v1"
+    embedding_batch_size: int = 64
+    embedding_max_concurrency: int = 4
+
+    # 내용 해시로 메모리 ID를 만들어 동일한 내용의 중복 생성을 no-op으로 처리 (요청별 dedupe 파라미터로 override)
+    dedupe_on_create: bool = False
+
+    # near-duplicate 메모리 병합 작업 (lifespan에서 주기 실행)
+    consolidation_enabled: bool = False
+    consolidation_interval_s: float = 3600.0
+    consolidation_jaccard_threshold: float = 0.7
+    # num_perm = bands * rows. band가 많을수록 낮은 유사도 쌍도 후보로 잡힘
+    consolidation_num_perm: int = 64
+    consolidation_bands: int = 16
+    # 텍스트 MinHash 외에 벡터 검색으로도 후보 탐색 (메모리당 임베딩 1회)
+    consolidation_use_vectors: bool = False
+    consolidation_vector_threshold: float = 0.92
+
+    # 사용자별 quota (None이면 제한 없음). store_user_stats 집계 기준이라 동시 생성 시 소폭 초과될 수 있음
+    quota_max_items_per_user: int | None = None
+    quota_max_bytes_per_user: int | None = None
+    quota_max_items_per_schema: dict[str, int] = {}
+
+    # 스키마 이름 또는 MemoryType 값("episodic" 등)별 보존 정책. 스키마 이름이 우선
+    # 예: RETENTION_POLICIES='{"episodic": {"ttl_days": 90}, "UserFact": {"max_items": 500, "evict": "lowest_confidence"}}'
+    retention_policies: dict[str, RetentionPolicy] = {}
+    retention_sweep_enabled: bool = True
+    retention_sweep_interval_s: float = 300.0
+    retention_sweep_batch_size: int = 500
+    # 한 번의 sweep에서 작업별로 실행할 최대 배치 수
+    retention_sweep_max_batches: int = 20
+
+    # POST /memories/search/batch 한 요청에 담을 수 있는 최대 검색 수
+    batch_search_max_size: int = 500
+
+    # JSONL export/import 배치 크기 (server-side cursor fetch / COPY 단위)
+    transfer_batch_size: int = 1000
+
+    reembed_batch_size: int = 200
+    # 재임베딩 처리량 상한 (items/sec). 운영 트래픽 지연에 영향이 없도록 제한
+    reembed_max_items_per_second: float = 100.0
+
+    vector_index_kind: Literal["hnsw", "ivfflat", "flat"] = "hnsw"
+    vector_distance: Literal["cosine", "l2", "inner_product"] = "cosine"
+    hnsw_m: int = 16
+    hnsw_ef_construction: int = 64
+    ivfflat_lists: int = 100
+    # 검색 시 기본 recall 파라미터 (None이면 pgvector 기본값)
+    hnsw_ef_search: int | None = None
+    ivfflat_probes: int | None = None
+    vector_index_maintenance_work_mem: str | None = None
+    # 인덱스에 저장할 벡터 정밀도. full-precision 벡터는 테이블에 유지되어 상위 후보 re-rank에 사용
+    vector_quantization: Literal["none", "halfvec", "binary"] = "none"
+    # re-rank 대상 후보 수 = limit * quantization_rerank_factor
+    quantization_rerank_factor: int = 4
+
+    # 사용자별 요청률/동시 실행 제한과 전역 DB 작업 제한 (초과 시 429/503)
+    admission_enabled: bool = True
+    admission_user_rate: float = 20.0
+    admission_user_burst: int = 40
+    admission_user_max_in_flight: int = 8
+    # None이면 db_pool_max_size
+    admission_max_in_flight: int | None = None
+    admission_max_queue: int = 100
+    admission_queue_timeout_s: float = 2.0
+
+    # 로그는 큐에 넣고 백그라운드 스레드에서 포맷팅/출력 (큐가 가득 차면 버림)
+    log_level: str = "INFO"
+    log_format: Literal["json", "text"] = "json"
+    log_queue_size: int = 10_000
+    # 출력할 DEBUG 레코드 비율 (요청마다 발생하는 debug 이벤트 샘플링)
+    log_debug_sample_rate: float = 0.01
+    log_pool_level: str = "INFO"
+
+    profiling_enabled: bool = False
+    profiling_sample_rate: float = 0.0
+    profiling_header: str = "x-profile"
+    profiling_interval_ms: float = 5.0
+    profiling_buffer_size: int = 50
+
+    # /admin 엔드포인트 인증 토큰 (X-Admin-Token 헤더). None이면 /admin 라우터를 등록하지 않음 (관리 작업은 CLI로 실행)
+    admin_token: str | None = None
+
+    @property
+    def use_checkpointer(self) -> bool:
+        if self.checkpointer_enabled is None:
+            return self.store_backend == "postgres"
+        return self.checkpointer_enabled
+
 
 @lru_cache
 def get_settings() -> Settings:
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime
 from enum import Enum
-from typing import Any
+from typing import Any, ClassVar
 
 from pydantic import BaseModel, Field
 
@@ -14,5 +14,10 @@ class MemoryType(str, Enum):
 
 
 class BaseMemory(BaseModel):
+    # 보존 정책(retention_policies) 조회 시 스키마 이름 다음으로 사용하는 분류
+    memory_type: ClassVar[MemoryType] = MemoryType.SEMANTIC
+    # 필드별로 따로 임베딩할 필드 (리스트 필드는 "key_points[*]"). 비어 있으면 EMBEDDING_FIELDS 기준으로 임베딩
+    index_fields: ClassVar[tuple[str, ...]] = ()
+
     created_at: str = Field(default_factory=lambda: datetime.now().isoformat())
     confidence: float = Field(default=1.0, ge=0.0, le=1.0)
@@ -1,17 +1,41 @@
 from __future__ import annotations
 
-from app.core.base import MemoryType
+from typing import NamedTuple
 
+from app.core.base import BaseMemory, MemoryType
 
-# TODO : make type assured (or implemented data-type)
+MEMORY_NAMESPACE_ROOT = "memory"
+
+
+class MemoryNamespace(NamedTuple):
+    memory_type: str
+    user_id: str
+    schema_type: str
+
+
+def memory_type_of(schema_type: str) -> MemoryType:
+    """스키마의 MemoryType (등록되지 않은 스키마는 BaseMemory 기본값)"""
+    from app.core.schema_registry import get_schema
+
+    schema_class = get_schema(schema_type)
+    return schema_class.memory_type if schema_class is not None else BaseMemory.memory_type
+
+
+# namespace: ("memory", memory_type, user_id, schema_type)
+# memory_type이 prefix 앞쪽에 있어 store를 memory_type별 range 파티션으로 나눌 수 있음
 class MemoryNamespaceBuilder:
     @staticmethod
     def for_memory(user_id: str, schema_type: str, memory_type: MemoryType | None = None) -> tuple[str, ...]:
-        if memory_type:
-            return (
-                memory_type.value,
-                user_id,
-                "memory",
-                schema_type,
-            )
-        return "memory", user_id, schema_type
+        memory_type = memory_type or memory_type_of(schema_type)
+        return MEMORY_NAMESPACE_ROOT, memory_type.value, user_id, schema_type
+
+    @staticmethod
+    def for_memory_type(user_id: str, memory_type: MemoryType) -> tuple[str, ...]:
+        """한 사용자의 특정 MemoryType 메모리 전체를 검색하는 namespace prefix"""
+        return MEMORY_NAMESPACE_ROOT, memory_type.value, user_id
+
+    @staticmethod
+    def parse(namespace: tuple[str, ...]) -> MemoryNamespace | None:
+        if len(namespace) != 4 or namespace[0] != MEMORY_NAMESPACE_ROOT:
+            return None
+        return MemoryNamespace(*namespace[1:])
@@ -1,10 +1,16 @@
 from __future__ import annotations
 
+import hashlib
+import json
 from typing import Any
 
-from app.core.base import BaseMemory
+from app.core.base import BaseMemory, MemoryType
+
+# 스키마로 검증된 내용은 store value의 "schema" 아래에 저장됨
+INDEX_FIELD_ROOT = "schema"
 
 _schemas_loaded = False
+_etag_cache: tuple[tuple[type[BaseMemory], ...], str] | None = None
 
 
 def _ensure_schemas_loaded() -> None:
@@ -36,6 +42,8 @@ class SchemaCollection:
         return [
             {
                 "name": schema.__name__,
+                "memory_type": schema.memory_type.value,
+                "index_fields": [index_field_name(field) for field in schema.index_fields],
                 "fields": {
                     field_name: {
                         "type": str(field_info.annotation),
@@ -72,3 +80,44 @@ def get_all_schemas() -> SchemaCollection:
 
 def get_schema_names() -> list[str]:
     return [schema.__name__ for schema in _discover_schemas()]
+
+
+def get_memory_types() -> list[MemoryType]:
+    """등록된 스키마가 하나라도 있는 MemoryType (enum 선언 순서)"""
+    used = {schema.memory_type for schema in _discover_schemas()}
+    return [memory_type for memory_type in MemoryType if memory_type in used]
+
+
+def get_index_fields(schema_type: str | None) -> list[str] | None:
+    """
+    스키마가 선언한 필드별 임베딩 경로 (store value 기준, 예: "schema.key_points[*]")
+
+    선언이 없거나 등록되지 않은 스키마면 None을 반환합니다. (store의 EMBEDDING_FIELDS 설정으로 임베딩)
+    """
+    schema = get_schema(schema_type) if schema_type else None
+    if schema is None or not schema.index_fields:
+        return None
+    return [f"{INDEX_FIELD_ROOT}.{field}" for field in schema.index_fields]
+
+
+def get_index_field_names(schema_type: str | None = None) -> set[str]:
+    """필드별 검색에 지정할 수 있는 필드 이름 (schema_type이 없으면 모든 스키마)"""
+    names = [schema_type] if schema_type else get_schema_names()
+    return {index_field_name(path) for name in names for path in get_index_fields(name) or ()}
+
+
+def index_field_name(path: str) -> str:
+    """임베딩 경로의 필드 이름 ("schema.key_points[*]" -> "key_points")"""
+    return path.removeprefix(f"{INDEX_FIELD_ROOT}.").split("[", 1)[0].split(".", 1)[0]
+
+
+def get_schemas_etag() -> str:
+    """
+    스키마 목록(to_api_dict) 내용의 해시. 등록된 스키마 클래스가 바뀔 때만 다시 계산합니다.
+    """
+    global _etag_cache
+    schemas = tuple(_discover_schemas())
+    if _etag_cache is None or _etag_cache[0] != schemas:
+        payload = json.dumps(SchemaCollection(list(schemas)).to_api_dict(), sort_keys=True, default=str)
+        _etag_cache = (schemas, hashlib.sha256(payload.encode()).hexdigest()[:32])
+    return _etag_cache[1]
@@ -4,22 +4,29 @@ from typing import Literal
 
 from pydantic import Field
 
-from app.core.base import BaseMemory
+from app.core.base import BaseMemory, MemoryType
 
 
 class UserPreference(BaseMemory):
+    index_fields = ("preference",)
+
     category: Literal["ui", "language", "feature", "communication", "workflow"]
     preference: str
     importance: Literal["low", "medium", "high"] = Field(default="medium")
 
 
 class UserFact(BaseMemory):
+    index_fields = ("content",)
+
     fact_type: Literal["personal", "professional", "hobby", "goal", "background"]
     content: str
     tags: list[str] = Field(default_factory=list)
 
 
 class ConversationInsight(BaseMemory):
+    memory_type = MemoryType.EPISODIC
+    index_fields = ("topic", "key_points[*]", "context")
+
     topic: str
     sentiment: Literal["positive", "neutral", "negative"] = Field(default="neutral")
     key_points: list[str]
@@ -0,0 +1,332 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+from psycopg import AsyncConnection
+from psycopg.rows import DictRow, dict_row
+from psycopg_pool import AsyncConnectionPool
+
+from app.config.settings import Settings, get_pg_checkpointer_conn_string, get_settings
+
+logger = logging.getLogger(__name__)
+
+_checkpointer_instance: AsyncPostgresSaver | None = None
+_checkpointer_pool: AsyncConnectionPool[AsyncConnection[DictRow]] | None = None
+_prune_task: asyncio.Task[None] | None = None
+_last_prune: PruneReport | None = None
+_checkpointer_migrated = False
+
+# thread별 마지막 checkpoint 시각. checkpoints 테이블에는 timestamp 컬럼이 없어 checkpoint JSONB의 ts를 사용
+_SELECT_THREADS_SQL = """
+SELECT thread_id, count(*) AS checkpoints, max((checkpoint->>'ts')::timestamptz) AS last_ts
+FROM checkpoints
+WHERE thread_id > %(after)s
+GROUP BY thread_id
+ORDER BY thread_id
+LIMIT %(limit)s
+"""
+
+# namespace(checkpoint_ns)별 최신 keep개만 남기고, 삭제된 checkpoint에 걸린 pending write도 함께 삭제
+_COMPACT_CHECKPOINTS_SQL = """
+WITH ranked AS (
+    SELECT checkpoint_ns, checkpoint_id,
+           row_number() OVER (PARTITION BY checkpoint_ns ORDER BY checkpoint_id DESC) AS rn
+    FROM checkpoints
+    WHERE thread_id = %(thread_id)s
+), deleted AS (
+    DELETE FROM checkpoints c
+    USING ranked r
+    WHERE c.thread_id = %(thread_id)s
+      AND c.checkpoint_ns = r.checkpoint_ns
+      AND c.checkpoint_id = r.checkpoint_id
+      AND r.rn > %(keep)s
+    RETURNING c.checkpoint_ns, c.checkpoint_id
+), deleted_writes AS (
+    DELETE FROM checkpoint_writes w
+    USING deleted d
+    WHERE w.thread_id = %(thread_id)s
+      AND w.checkpoint_ns = d.checkpoint_ns
+      AND w.checkpoint_id = d.checkpoint_id
+    RETURNING 1
+)
+SELECT (SELECT count(*) FROM deleted) AS checkpoints, (SELECT count(*) FROM deleted_writes) AS writes
+"""
+
+# 남은 가장 오래된 checkpoint가 삭제된 parent를 가리키지 않도록 정리
+_DETACH_PARENTS_SQL = """
+UPDATE checkpoints c SET parent_checkpoint_id = NULL
+WHERE c.thread_id = %(thread_id)s
+  AND c.parent_checkpoint_id IS NOT NULL
+  AND NOT EXISTS (
+      SELECT 1 FROM checkpoints p
+      WHERE p.thread_id = c.thread_id
+        AND p.checkpoint_ns = c.checkpoint_ns
+        AND p.checkpoint_id = c.parent_checkpoint_id
+  )
+"""
+
+# 남은 checkpoint의 channel_versions 어디에서도 참조하지 않는 blob 삭제
+_DELETE_ORPHAN_BLOBS_SQL = """
+DELETE FROM checkpoint_blobs b
+WHERE b.thread_id = %(thread_id)s
+  AND NOT EXISTS (
+      SELECT 1 FROM checkpoints c
+      WHERE c.thread_id = b.thread_id
+        AND c.checkpoint_ns = b.checkpoint_ns
+        AND c.checkpoint -> 'channel_versions' ->> b.channel = b.version
+  )
+"""
+
+_DELETE_THREAD_SQL = (
+    "DELETE FROM checkpoint_writes WHERE thread_id = %(thread_id)s",
+    "DELETE FROM checkpoint_blobs WHERE thread_id = %(thread_id)s",
+    "DELETE FROM checkpoints WHERE thread_id = %(thread_id)s",
+)
+
+
+@dataclass
+class PruneReport:
+    started_at: str
+    finished_at: str | None = None
+    threads_scanned: int = 0
+    threads_compacted: int = 0
+    threads_deleted: int = 0
+    checkpoints_deleted: int = 0
+    writes_deleted: int = 0
+    blobs_deleted: int = 0
+    errors: list[str] = field(default_factory=list[str])
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class CheckpointPruner:
+    """
+    thread 단위 checkpoint 정리
+    - 마지막 checkpoint가 thread_ttl보다 오래된 thread는 통째로 삭제
+    - min_idle 이상 멈춰 있는 thread는 namespace별 최신 keep_last개만 남기고 compact
+      (실행 중인 thread는 건드리지 않음)
+
+    AsyncPostgresSaver는 모든 쿼리를 인스턴스 lock 아래에서 실행하므로,
+    에이전트의 checkpoint 쓰기를 막지 않도록 풀에서 직접 커넥션을 받아 사용합니다.
+    """
+
+    def __init__(
+        self,
+        pool: AsyncConnectionPool[AsyncConnection[DictRow]],
+        keep_last: int = 1,
+        min_idle: timedelta = timedelta(minutes=10),
+        thread_ttl: timedelta | None = None,
+        batch_size: int = 100,
+    ) -> None:
+        if keep_last < 1:
+            raise ValueError("keep_last must be >= 1")
+        self._pool = pool
+        self._keep_last = keep_last
+        self._min_idle = min_idle
+        self._thread_ttl = thread_ttl
+        self._batch_size = batch_size
+
+    async def run(self) -> PruneReport:
+        now = datetime.now(timezone.utc)
+        report = PruneReport(started_at=now.isoformat())
+        after = ""
+
+        while True:
+            async with self._pool.connection() as conn, conn.cursor(row_factory=dict_row) as cur:
+                await cur.execute(_SELECT_THREADS_SQL, {"after": after, "limit": self._batch_size})
+                threads = await cur.fetchall()
+            if not threads:
+                break
+
+            for thread in threads:
+                report.threads_scanned += 1
+                try:
+                    await self._prune_thread(thread, now, report)
+                except Exception as e:
+                    logger.warning(f"Failed to prune checkpoints for thread {thread['thread_id']}: {e}")
+                    report.errors.append(f"{thread['thread_id']}: {e}")
+
+            after = threads[-1]["thread_id"]
+
+        report.finished_at = datetime.now(timezone.utc).isoformat()
+        return report
+
+    async def _prune_thread(self, thread: dict[str, Any], now: datetime, report: PruneReport) -> None:
+        thread_id = thread["thread_id"]
+        last_ts: datetime | None = thread["last_ts"]
+        if last_ts is None or now - last_ts < self._min_idle:
+            return
+
+        if self._thread_ttl is not None and now - last_ts >= self._thread_ttl:
+            async with self._pool.connection() as conn, conn.transaction(), conn.cursor() as cur:
+                for statement in _DELETE_THREAD_SQL:
+                    await cur.execute(statement, {"thread_id": thread_id})
+            report.threads_deleted += 1
+            report.checkpoints_deleted += thread["checkpoints"]
+            return
+
+        if thread["checkpoints"] <= self._keep_last:
+            return
+
+        params = {"thread_id": thread_id, "keep": self._keep_last}
+        async with self._pool.connection() as conn, conn.transaction(), conn.cursor(row_factory=dict_row) as cur:
+            await cur.execute(_COMPACT_CHECKPOINTS_SQL, params)
+            deleted = await cur.fetchone()
+            await cur.execute(_DETACH_PARENTS_SQL, params)
+            await cur.execute(_DELETE_ORPHAN_BLOBS_SQL, params)
+            blobs_deleted = cur.rowcount
+
+        if deleted and deleted["checkpoints"]:
+            report.threads_compacted += 1
+            report.checkpoints_deleted += deleted["checkpoints"]
+            report.writes_deleted += deleted["writes"]
+        report.blobs_deleted += max(blobs_deleted, 0)
+
+
+def create_checkpoint_pruner(
+    pool: AsyncConnectionPool[AsyncConnection[DictRow]], settings: Settings | None = None
+) -> CheckpointPruner:
+    settings = settings or get_settings()
+    thread_ttl = timedelta(days=settings.checkpoint_thread_ttl_days) if settings.checkpoint_thread_ttl_days else None
+    return CheckpointPruner(
+        pool,
+        keep_last=settings.checkpoint_keep_last,
+        min_idle=timedelta(minutes=settings.checkpoint_prune_min_idle_minutes),
+        thread_ttl=thread_ttl,
+        batch_size=settings.checkpoint_prune_batch_size,
+    )
+
+
+async def prune_checkpoints() -> dict[str, Any]:
+    global _last_prune
+    await get_checkpointer()
+    assert _checkpointer_pool is not None
+    report = await create_checkpoint_pruner(_checkpointer_pool).run()
+    _last_prune = report
+    logger.info(
+        f"Checkpoint prune finished: scanned={report.threads_scanned} compacted={report.threads_compacted} "
+        f"deleted_threads={report.threads_deleted} checkpoints={report.checkpoints_deleted} blobs={report.blobs_deleted}"
+    )
+    return report.to_dict()
+
+
+async def _prune_loop(interval_s: float) -> None:
+    while True:
+        await asyncio.sleep(interval_s)
+        try:
+            await prune_checkpoints()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Checkpoint prune failed: {e}")
+
+
+def start_checkpoint_pruner() -> bool:
+    global _prune_task
+    settings = get_settings()
+    if not settings.checkpoint_prune_enabled:
+        return False
+    if _prune_task is not None and not _prune_task.done():
+        return False
+    _prune_task = asyncio.create_task(_prune_loop(settings.checkpoint_prune_interval_s))
+    return True
+
+
+async def stop_checkpoint_pruner() -> None:
+    global _prune_task
+    if _prune_task is None:
+        return
+    _prune_task.cancel()
+    try:
+        await _prune_task
+    except asyncio.CancelledError:
+        pass
+    _prune_task = None
+
+
+def get_prune_status() -> dict[str, Any]:
+    return {
+        "running": _prune_task is not None and not _prune_task.done(),
+        "last_run": _last_prune.to_dict() if _last_prune else None,
+    }
+
+
+async def migrate_checkpointer() -> None:
+    """checkpointer 테이블 마이그레이션을 단일 커넥션으로 한 번 실행합니다. (migrate_store와 같은 용도)"""
+    global _checkpointer_migrated
+    from app.infrastructure.store import ensure_schema_exists
+
+    settings = get_settings()
+    await ensure_schema_exists(settings.checkpoint_schema)
+    async with AsyncPostgresSaver.from_conn_string(get_pg_checkpointer_conn_string()) as checkpointer:
+        await checkpointer.setup()
+    _checkpointer_migrated = True
+
+
+async def _init_checkpointer() -> AsyncPostgresSaver:
+    global _checkpointer_instance, _checkpointer_pool
+    if _checkpointer_instance is None:
+        from app.infrastructure.store import ensure_schema_exists
+
+        settings = get_settings()
+        await ensure_schema_exists(settings.checkpoint_schema)
+
+        # store와 같은 풀 크기 설정을 사용. AsyncPostgresSaver가 요구하는 커넥션 옵션은 from_conn_string과 동일
+        pool = AsyncConnectionPool(
+            get_pg_checkpointer_conn_string(),
+            connection_class=AsyncConnection[DictRow],
+            min_size=settings.db_pool_min_size,
+            max_size=settings.db_pool_max_size,
+            kwargs={"autocommit": True, "prepare_threshold": 0, "row_factory": dict_row},
+            open=False,
+        )
+        await pool.open()
+        try:
+            checkpointer = AsyncPostgresSaver(pool)
+            if settings.migrate_on_startup and not _checkpointer_migrated:
+                await checkpointer.setup()
+        except Exception:
+            await pool.close()
+            raise
+
+        _checkpointer_pool = pool
+        _checkpointer_instance = checkpointer
+        logger.info(f"AsyncPostgresSaver initialized with connection pool (schema: {settings.checkpoint_schema})")
+
+    return _checkpointer_instance
+
+
+async def get_checkpointer() -> AsyncPostgresSaver:
+    """
+    Usage:
+        checkpointer = await get_checkpointer()
+        graph = builder.compile(checkpointer=checkpointer)
+    """
+    return await _init_checkpointer()
+
+
+async def close_checkpointer() -> None:
+    global _checkpointer_instance, _checkpointer_pool
+    await stop_checkpoint_pruner()
+    if _checkpointer_pool is not None:
+        await _checkpointer_pool.close()
+    _checkpointer_pool = None
+    _checkpointer_instance = None
+
+
+def _reset_after_fork() -> None:
+    """fork된 자식은 부모의 풀과 prune 작업을 버리고 처음 사용할 때 자신의 풀을 엽니다. (store._reset_after_fork 참고)"""
+    global _checkpointer_instance, _checkpointer_pool, _prune_task
+    _checkpointer_instance = None
+    _checkpointer_pool = None
+    _prune_task = None
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import asyncio
+import importlib
+from collections.abc import Sequence
+from functools import lru_cache
+from typing import Any
+
+from langgraph.store.base.embed import tokenize_path
+
+from app.core.schema_registry import get_index_fields
+
+
+@lru_cache(maxsize=1)
+def get_embeddings() -> Any | None:
+    from app.config.settings import get_settings
+
+    settings = get_settings()
+    if not settings.embedding_model:
+        return None
+
+    return load_embeddings(settings.embedding_model)
+
+
+def load_embeddings(model: str) -> Any:
+    langchain_embeddings: Any = importlib.import_module("langchain.embeddings")
+    return langchain_embeddings.init_embeddings(model)
+
+
+def tokenize_fields(fields: Sequence[str]) -> list[tuple[str, Any]]:
+    return list(_tokenize_fields(tuple(fields)))
+
+
+@lru_cache(maxsize=64)
+def _tokenize_fields(fields: tuple[str, ...]) -> tuple[tuple[str, Any], ...]:
+    return tuple((path, path if path == "$" else tokenize_path(path)) for path in fields)
+
+
+def index_fields_for(value: dict[str, Any], default: list[tuple[str, Any]]) -> list[tuple[str, Any]]:
+    """value의 스키마가 필드별 인덱싱을 선언했으면 그 필드, 아니면 default (EMBEDDING_FIELDS)"""
+    fields = get_index_fields(value.get("schema_type"))
+    return default if fields is None else tokenize_fields(fields)
+
+
+class EmbeddingExecutor:
+    """
+    임베딩 요청을 batch_size 단위로 나누고, 동시에 실행되는 provider 호출 수를 제한합니다.
+
+    대량 작업(재임베딩 등)이 provider rate limit과 API 서버의 임베딩 호출을 모두 잠식하지 않도록 합니다.
+    """
+
+    def __init__(self, embeddings: Any, batch_size: int = 64, max_concurrency: int = 4) -> None:
+        self._embeddings = embeddings
+        self._batch_size = batch_size
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+
+        chunks = [texts[i : i + self._batch_size] for i in range(0, len(texts), self._batch_size)]
+        results = await asyncio.gather(*(self._embed_chunk(chunk) for chunk in chunks))
+        return [vector for chunk_vectors in results for vector in chunk_vectors]
+
+    async def embed_query(self, text: str) -> list[float]:
+        async with self._semaphore:
+            return await self._embeddings.aembed_query(text)
+
+    async def _embed_chunk(self, texts: list[str]) -> list[list[float]]:
+        async with self._semaphore:
+            return await self._embeddings.aembed_documents(texts)
+
+
+def create_embedding_executor(embeddings: Any) -> EmbeddingExecutor:
+    from app.config.settings import get_settings
+
+    settings = get_settings()
+    return EmbeddingExecutor(
+        embeddings,
+        batch_size=settings.embedding_batch_size,
+        max_concurrency=settings.embedding_max_concurrency,
+    )
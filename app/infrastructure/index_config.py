@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from typing import cast
+
+from langgraph.store.postgres.base import ANNIndexConfig, PostgresIndexConfig
+
+from app.config.settings import Settings
+from app.infrastructure.embeddings import get_embeddings
+from app.infrastructure.vector_index import ann_index_config
+
+# SearchOp.filter의 예약 키. 값은 [(schema_type, 임베딩 경로, 가중치), ...]이며 SQL filter 대신 필드별 벡터 검색에 사용
+FIELD_WEIGHTS_KEY = "__field_weights__"
+
+
+def build_index_config(settings: Settings) -> PostgresIndexConfig | None:
+    """Postgres store와 memory store가 함께 쓰는 임베딩 인덱스 설정 (임베딩 모델이 없으면 None)"""
+    embeddings = get_embeddings()
+    if embeddings is None:
+        return None
+
+    return {
+        "dims": settings.embedding_dims,
+        "embed": embeddings,
+        "fields": settings.embedding_fields,
+        "distance_type": settings.vector_distance,
+        "ann_index_config": cast(ANNIndexConfig, ann_index_config(settings)),
+    }
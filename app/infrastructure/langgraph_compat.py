@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any, cast
+
+from langgraph.store.base import SearchItem
+from langgraph.store.postgres import base as _base
+from psycopg.rows import DictRow
+
+if TYPE_CHECKING:
+    from typing_extensions import LiteralString
+
+# langgraph Postgres store의 비공개 헬퍼를 타입이 지정된 함수로 감싸, 비공개 이름은 이 모듈에서만 참조합니다.
+# 공개 API가 아니므로 pyproject.toml에서 langgraph 버전 범위를 고정하고,
+# 시그니처가 바뀌면 tests/unit/test_langgraph_compat.py가 실패합니다.
+
+
+def namespace_to_text(namespace: tuple[str, ...]) -> str:
+    return _base._namespace_to_text(namespace)  # pyright: ignore[reportPrivateUsage]
+
+
+def decode_ns_bytes(namespace: str | bytes | list[str]) -> tuple[str, ...]:
+    return _base._decode_ns_bytes(namespace)  # pyright: ignore[reportPrivateUsage, reportUnknownMemberType]
+
+
+def namespace_prefix_condition(namespace_prefix: tuple[str, ...]) -> tuple[LiteralString, tuple[str, ...]]:
+    """namespace와 그 하위 namespace를 고르는 SQL 조건과 파라미터 ((path, LIKE 패턴))"""
+    condition, params = _base._namespace_prefix_condition(namespace_prefix)  # pyright: ignore[reportPrivateUsage, reportUnknownMemberType, reportUnknownVariableType]
+    return cast("LiteralString", condition), cast(tuple[str, ...], params)
+
+
+def row_to_search_item(
+    namespace: tuple[str, ...], row: DictRow, *, loader: Callable[[Any], dict[str, Any]] | None = None
+) -> SearchItem:
+    return _base._row_to_search_item(namespace, cast(Any, row), loader=loader)  # pyright: ignore[reportPrivateUsage]
+
+
+def escape_like_literal(text: str) -> str:
+    """LIKE 메타문자를 이스케이프 (패턴에 ESCAPE '\\' 필요, langgraph와 같은 규칙)"""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
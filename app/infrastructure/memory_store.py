@@ -0,0 +1,968 @@
+from __future__ import annotations
+
+import asyncio
+import importlib
+import logging
+import math
+import os
+import re
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Literal, cast
+
+import orjson
+from langgraph.store.base import (
+    GetOp,
+    IndexConfig,
+    Item,
+    ListNamespacesOp,
+    MatchCondition,
+    Op,
+    PutOp,
+    Result,
+    SearchItem,
+    SearchOp,
+    ensure_embeddings,
+)
+from langgraph.store.base.embed import get_text_at_path
+
+from app.config.settings import Settings
+from app.core.namespace_builder import MEMORY_NAMESPACE_ROOT, MemoryNamespaceBuilder, memory_type_of
+from app.infrastructure.embeddings import index_fields_for, tokenize_fields
+from app.infrastructure.index_config import FIELD_WEIGHTS_KEY, build_index_config
+from app.infrastructure.store_base import MemoryStoreBase
+
+
+def _load_numpy() -> Any | None:
+    # numpy는 선택 의존성 (agent-ltm[numpy]). 없으면 벡터 유사도를 순수 Python으로 계산
+    try:
+        return importlib.import_module("numpy")
+    except ImportError:
+        return None
+
+
+_np: Any = _load_numpy()
+HAS_NUMPY: bool = _np is not None
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = "agent-ltm-memory-store"
+SNAPSHOT_VERSION = 1
+
+_TOKEN_RE = re.compile(r"\w+")
+_ARRAY_SUFFIX_RE = re.compile(r"\.[0-9]+$")
+
+# (namespace, key)
+_Ref = tuple[tuple[str, ...], str]
+
+
+@dataclass
+class _Record:
+    item: Item
+    size: int
+    expires_at: datetime | None = None
+    ttl_minutes: float | None = None
+    # 임베딩 경로 → 벡터 (배열 필드는 path.0, path.1 ... 로 저장, Postgres store_vectors.field_name과 같은 규칙)
+    vectors: dict[str, list[float]] = field(default_factory=dict[str, list[float]])
+    # 인덱싱 경로 → 토큰 (임베딩이 없을 때 키워드 검색용)
+    tokens: dict[str, frozenset[str]] = field(default_factory=dict[str, frozenset[str]])
+
+
+class _NamespaceNode:
+    __slots__ = ("children", "records", "matrix")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _NamespaceNode] = {}
+        self.records: dict[str, _Record] = {}
+        # NumPy 검색용 (rows, 벡터 행렬, 행별 norm). 이 namespace에 쓰기가 있으면 None으로 무효화
+        self.matrix: tuple[list[tuple[str, str]], Any, Any] | None = None
+
+
+class _NamespaceTrie:
+    """namespace 라벨 단위 trie. prefix 검색은 해당 prefix 아래의 노드만 순회합니다."""
+
+    def __init__(self) -> None:
+        self.root = _NamespaceNode()
+
+    def get(self, namespace: tuple[str, ...]) -> _NamespaceNode | None:
+        node = self.root
+        for label in namespace:
+            node = node.children.get(label)  # type: ignore[assignment]
+            if node is None:
+                return None
+        return node
+
+    def get_or_create(self, namespace: tuple[str, ...]) -> _NamespaceNode:
+        node = self.root
+        for label in namespace:
+            node = node.children.setdefault(label, _NamespaceNode())
+        return node
+
+    def prune(self, namespace: tuple[str, ...]) -> None:
+        """항목이 없는 노드를 namespace 경로의 아래에서부터 제거합니다."""
+        path = [self.root]
+        for label in namespace:
+            node = path[-1].children.get(label)
+            if node is None:
+                return
+            path.append(node)
+        for depth in range(len(namespace), 0, -1):
+            node = path[depth]
+            if node.records or node.children:
+                return
+            del path[depth - 1].children[namespace[depth - 1]]
+
+    def walk(self, prefix: tuple[str, ...]) -> Iterator[tuple[tuple[str, ...], _NamespaceNode]]:
+        """prefix 아래에서 항목이 있는 (namespace, 노드)를 namespace 순서로 반환합니다."""
+        start = self.get(prefix)
+        if start is None:
+            return
+        stack = [(prefix, start)]
+        while stack:
+            namespace, node = stack.pop()
+            if node.records:
+                yield namespace, node
+            stack.extend((namespace + (label,), child) for label, child in sorted(node.children.items(), reverse=True))
+
+
+class IndexedMemoryStore(MemoryStoreBase):
+    """
+    프로세스 메모리에 보관하는 store (store_backend="memory")
+
+    MemoryStore(Postgres)와 같은 인터페이스(get/put/search/list_namespaces, aupdate, 보존 정책, 사용량/버전)를 제공합니다.
+    - namespace prefix trie: prefix 검색이 전체 항목이 아니라 해당 namespace 아래만 순회
+    - value 필드별 역색인: filter의 등호 조건(최상위 필드와 한 단계 아래 필드)을 posting 교집합으로 처리
+    - 임베딩이 설정되면 필드별 벡터를 brute-force로 검색 (NumPy가 있으면 namespace 단위 행렬 연산)
+    - 임베딩이 없으면 인덱싱 필드의 토큰으로 키워드 검색 (질의 토큰 중 일치하는 비율이 score)
+    - snapshot_path가 있으면 load_snapshot()/save_snapshot()으로 디스크에 보관 (임시 파일에 쓴 뒤 교체)
+
+    데이터는 한 프로세스 안에만 있으므로 여러 워커가 데이터를 공유해야 하는 배포에서는 Postgres store를 사용해야 합니다.
+    """
+
+    supports_ttl = True
+
+    def __init__(self, *, index: IndexConfig | None = None, snapshot_path: str | Path | None = None) -> None:
+        self.index_config = index
+        self.embeddings = ensure_embeddings(index["embed"]) if index and "embed" in index else None
+        self._distance: str = str((index or {}).get("distance_type", "cosine"))
+        self._fields = tokenize_fields((index or {}).get("fields") or ["$"])
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else None
+
+        self._trie = _NamespaceTrie()
+        self._postings: dict[tuple[str, Any], set[_Ref]] = {}
+        self._expiring: dict[_Ref, datetime] = {}
+        # (user_id, schema_type) → [item_count, total_bytes], user_id → version (store_user_stats와 같은 의미)
+        self._stats: dict[tuple[str, str], list[int]] = {}
+        self._versions: dict[str, int] = {}
+
+        self._changes = 0
+        self._snapshot_changes = 0
+        self._snapshot_task: asyncio.Task[None] | None = None
+
+    # --- BaseStore ---
+
+    def batch(self, ops: Iterable[Op]) -> list[Result]:
+        ops = list(ops)
+        texts, queries = self._embedding_requests(ops)
+        vectors: dict[str, list[float]] = {}
+        query_vectors: dict[str, list[float]] = {}
+        if self.embeddings:
+            vectors = dict(zip(texts, self.embeddings.embed_documents(texts), strict=True)) if texts else {}
+            query_vectors = {query: self.embeddings.embed_query(query) for query in queries}
+        return self._apply(ops, vectors, query_vectors)
+
+    async def abatch(self, ops: Iterable[Op]) -> list[Result]:
+        ops = list(ops)
+        texts, queries = self._embedding_requests(ops)
+        vectors: dict[str, list[float]] = {}
+        query_vectors: dict[str, list[float]] = {}
+        if self.embeddings:
+            if texts:
+                vectors = dict(zip(texts, await self.embeddings.aembed_documents(texts), strict=True))
+            if queries:
+                embedded = await asyncio.gather(*(self.embeddings.aembed_query(query) for query in queries))
+                query_vectors = dict(zip(queries, embedded, strict=True))
+        # 임베딩 이후의 적용은 await 없이 실행되므로 배치 단위로 원자적
+        return self._apply(ops, vectors, query_vectors)
+
+    def _embedding_requests(self, ops: list[Op]) -> tuple[list[str], list[str]]:
+        """배치에서 임베딩할 고유 텍스트(put)와 검색 쿼리"""
+        if not self.embeddings:
+            return [], []
+        texts: dict[str, None] = {}
+        queries: dict[str, None] = {}
+        for op in ops:
+            if isinstance(op, PutOp) and op.value is not None:
+                for _, _, text in self._field_texts(dict(op.value), self._index_fields(op.index)):
+                    texts[text] = None
+            elif isinstance(op, SearchOp) and op.query:
+                queries[op.query] = None
+        return list(texts), list(queries)
+
+    def _apply(
+        self, ops: list[Op], vectors: dict[str, list[float]], query_vectors: dict[str, list[float]]
+    ) -> list[Result]:
+        now = datetime.now(timezone.utc)
+        results: list[Result] = []
+        # 같은 (namespace, key)에 대한 put은 마지막 것만 적용 (Postgres store와 동일)
+        puts: dict[_Ref, PutOp] = {}
+        for op in ops:
+            if isinstance(op, PutOp):
+                puts[(op.namespace, op.key)] = op
+
+        for op in ops:
+            if isinstance(op, GetOp):
+                results.append(self._get(op, now))
+            elif isinstance(op, SearchOp):
+                results.append(self._search(op, now, query_vectors.get(op.query) if op.query else None))
+            elif isinstance(op, ListNamespacesOp):
+                results.append(self._list_namespaces(op))
+            else:
+                if puts[(op.namespace, op.key)] is op:
+                    self._apply_put(op, now, vectors)
+                results.append(None)
+        return results
+
+    def _get(self, op: GetOp, now: datetime) -> Item | None:
+        record = self._live_record(op.namespace, op.key, now)
+        if record is None:
+            return None
+        if op.refresh_ttl:
+            self._refresh_ttl(op.namespace, op.key, record, now)
+        return record.item
+
+    def _apply_put(self, op: PutOp, now: datetime, vectors: dict[str, list[float]]) -> None:
+        if op.value is None:
+            self._delete(op.namespace, op.key)
+            return
+
+        fields = self._index_fields(op.index)
+        current = self._record(op.namespace, op.key)
+        created_at = current.item.created_at if current else now
+        value = dict(op.value)
+        record = self._make_record(op.namespace, op.key, value, created_at, now, op.ttl, fields)
+        if self.embeddings:
+            record.vectors = {name: vectors[text] for name, _, text in self._field_texts(value, fields)}
+        self._store(op.namespace, op.key, record)
+
+    def _list_namespaces(self, op: ListNamespacesOp) -> list[tuple[str, ...]]:
+        namespaces = [namespace for namespace, _ in self._trie.walk(())]
+        if op.match_conditions:
+            namespaces = [ns for ns in namespaces if all(_namespace_matches(cond, ns) for cond in op.match_conditions)]
+        if op.max_depth is not None:
+            namespaces = sorted({ns[: op.max_depth] for ns in namespaces})
+        return namespaces[op.offset : op.offset + op.limit]
+
+    # --- 검색 ---
+
+    def _search(self, op: SearchOp, now: datetime, query_vector: list[float] | None) -> list[SearchItem]:
+        filter_ = dict(op.filter) if op.filter else {}
+        weights: list[tuple[str, str, float]] | None = None
+        if FIELD_WEIGHTS_KEY in filter_:
+            weights = [tuple(weight) for weight in filter_.pop(FIELD_WEIGHTS_KEY)]  # type: ignore[misc]
+
+        candidates = self._candidates(op.namespace_prefix, filter_, now)
+        scored: list[tuple[float | None, tuple[str, ...], str, _Record]] = []
+        if not op.query:
+            scored = [(None, ns, key, record) for ns, records in candidates.items() for key, record in records.items()]
+            scored.sort(key=lambda row: (row[3].item.updated_at, row[2]), reverse=True)
+        else:
+            for ns, records in candidates.items():
+                schema_weights = _schema_weights(ns, weights)
+                if schema_weights is not None and not schema_weights:
+                    continue
+                if query_vector is not None:
+                    scores = self._vector_scores(ns, records, query_vector, schema_weights)
+                else:
+                    scores = _keyword_scores(records, _tokens(op.query), schema_weights)
+                scored.extend((score, ns, key, records[key]) for key, score in scores.items())
+            scored.sort(key=lambda row: (row[0], row[3].item.updated_at), reverse=True)
+
+        results: list[SearchItem] = []
+        for score, ns, key, record in scored[op.offset : op.offset + op.limit]:
+            if op.refresh_ttl:
+                self._refresh_ttl(ns, key, record, now)
+            item = record.item
+            results.append(SearchItem(ns, key, item.value, item.created_at, item.updated_at, score))
+        return results
+
+    def _candidates(
+        self, prefix: tuple[str, ...], filter_: dict[str, Any], now: datetime
+    ) -> dict[tuple[str, ...], dict[str, _Record]]:
+        """namespace prefix와 filter를 만족하는 만료되지 않은 항목 (namespace별)"""
+        candidates: dict[tuple[str, ...], dict[str, _Record]] = {}
+        posting_keys = _posting_keys(filter_)
+        if posting_keys:
+            postings = sorted((self._postings.get(key, set()) for key in posting_keys), key=len)
+            refs: Iterable[_Ref] = postings[0].intersection(*postings[1:])
+            records: Iterable[tuple[tuple[str, ...], str, _Record]] = (
+                (ns, key, record)
+                for ns, key in refs
+                if ns[: len(prefix)] == prefix and (record := self._record(ns, key)) is not None
+            )
+        else:
+            records = (
+                (ns, key, record) for ns, node in self._trie.walk(prefix) for key, record in node.records.items()
+            )
+
+        for ns, key, record in records:
+            if record.expires_at is not None and record.expires_at <= now:
+                continue
+            if filter_ and not all(_matches_filter(record.item.value.get(k), v) for k, v in filter_.items()):
+                continue
+            candidates.setdefault(ns, {})[key] = record
+        return candidates
+
+    def _vector_scores(
+        self,
+        ns: tuple[str, ...],
+        records: dict[str, _Record],
+        query_vector: list[float],
+        weights: dict[str, float] | None,
+    ) -> dict[str, float]:
+        """
+        벡터가 있는 항목의 score. weights가 없으면 항목의 모든 벡터 중 최고 유사도,
+        있으면 필드별 최고 유사도의 가중 평균 (벡터가 없는 필드는 0점, Postgres의 필드별 검색과 같은 의미)
+        """
+        rows: list[tuple[str, str]]
+        similarities: Iterable[float]
+        if HAS_NUMPY:
+            rows, similarities = self._matrix_similarities(ns, query_vector)
+        else:
+            rows = [(key, name) for key, record in records.items() for name in record.vectors]
+            similarities = [_similarity(self._distance, query_vector, records[key].vectors[name]) for key, name in rows]
+
+        best: dict[str, dict[str, float]] = {}
+        for (key, name), similarity in zip(rows, similarities, strict=True):
+            if key not in records:
+                continue
+            path = _ARRAY_SUFFIX_RE.sub("", name) if weights is not None else ""
+            if weights is not None and path not in weights:
+                continue
+            per_field = best.setdefault(key, {})
+            if path not in per_field or similarity > per_field[path]:
+                per_field[path] = float(similarity)
+
+        if weights is None:
+            return {key: per_field[""] for key, per_field in best.items()}
+        total = sum(weights.values())
+        return {
+            key: sum(weights[path] * similarity for path, similarity in per_field.items()) / total
+            for key, per_field in best.items()
+        }
+
+    def _matrix_similarities(self, ns: tuple[str, ...], query_vector: list[float]) -> tuple[list[tuple[str, str]], Any]:
+        node = self._trie.get(ns)
+        assert node is not None
+        if node.matrix is None:
+            rows = [(key, name) for key, record in node.records.items() for name in record.vectors]
+            matrix = _np.array([node.records[key].vectors[name] for key, name in rows], dtype=_np.float32)
+            node.matrix = (rows, matrix, _np.linalg.norm(matrix, axis=1) if rows else None)
+        rows, matrix, norms = node.matrix
+        if not rows:
+            return rows, []
+
+        query = _np.asarray(query_vector, dtype=_np.float32)
+        if self._distance == "l2":
+            return rows, -_np.linalg.norm(matrix - query, axis=1)
+        dots = matrix @ query
+        if self._distance == "inner_product":
+            return rows, dots
+        denominator = norms * _np.linalg.norm(query)
+        return rows, _np.divide(dots, denominator, out=_np.zeros_like(dots), where=denominator > 0)
+
+    # --- Postgres MemoryStore와 같은 확장 메서드 ---
+
+    async def aupdate(
+        self,
+        namespace: tuple[str, ...],
+        key: str,
+        update: Callable[[dict[str, Any]], dict[str, Any]],
+        index: list[str] | None = None,
+        delete_keys: Sequence[str] = (),
+    ) -> dict[str, Any] | None:
+        """
+        value를 update(value)의 결과로 교체합니다. 항목이 없으면 None을 반환하고 아무것도 바꾸지 않습니다.
+        delete_keys의 같은 namespace 항목은 교체와 함께 (중간에 다른 작업 없이) 삭제합니다.
+
+        인덱싱 대상 텍스트가 바뀐 필드만 재임베딩합니다. 재임베딩을 기다리는 동안 다른 쓰기가 있었으면
+        최신 value로 다시 시도하므로 update는 부작용이 없어야 합니다.
+        """
+        while True:
+            now = datetime.now(timezone.utc)
+            current = self._live_record(namespace, key, now)
+            if current is None:
+                return None
+
+            # update가 value를 직접 수정해도 저장된 항목이 바뀌지 않도록 복사본 전달
+            updated = update(orjson.loads(orjson.dumps(current.item.value)))
+            fields = tokenize_fields(index) if index is not None else self._fields
+            changed = [
+                path
+                for path, tokens in fields
+                if get_text_at_path(current.item.value, tokens) != get_text_at_path(updated, tokens)
+            ]
+            vectors = dict(current.vectors)
+            if index is not None and vectors.pop("$", None) is not None:
+                # 필드별 인덱싱 이전에 전체 value("$")로 임베딩된 항목이면 선언된 필드를 모두 새로 임베딩
+                changed = [path for path, _ in fields]
+
+            texts = self._field_texts(updated, [(path, tokens) for path, tokens in fields if path in changed])
+            embedded: list[list[float]] = []
+            if self.embeddings and texts:
+                embedded = await self.embeddings.aembed_documents([text for _, _, text in texts])
+
+            if self._record(namespace, key) is not current:
+                continue
+
+            if self.embeddings:
+                vectors = {
+                    name: vector for name, vector in vectors.items() if _ARRAY_SUFFIX_RE.sub("", name) not in changed
+                }
+                vectors.update((name, vector) for (name, _, _), vector in zip(texts, embedded, strict=True))
+            record = self._make_record(
+                namespace, key, updated, current.item.created_at, now, current.ttl_minutes, fields
+            )
+            record.vectors = vectors if self.embeddings else {}
+            self._store(namespace, key, record)
+            for delete_key in delete_keys:
+                if delete_key != key:
+                    self._delete(namespace, delete_key)
+            return updated
+
+    async def alist_changed(
+        self,
+        namespace_prefix: tuple[str, ...],
+        since: datetime | None = None,
+        after: tuple[tuple[str, ...], str] | None = None,
+        limit: int = 1000,
+    ) -> list[tuple[tuple[str, ...], str, datetime]]:
+        """since 이후 변경된 항목을 (namespace, key) 순서로 after 다음부터 최대 limit개 반환합니다."""
+        now = datetime.now(timezone.utc)
+        after_prefix = ".".join(after[0]) if after else ""
+        changed: list[tuple[tuple[str, ...], str, datetime]] = []
+        for ns, node in sorted(self._trie.walk(namespace_prefix), key=lambda entry: ".".join(entry[0])):
+            prefix = ".".join(ns)
+            if prefix < after_prefix:
+                continue
+            for key in sorted(node.records):
+                record = node.records[key]
+                if after and (prefix, key) <= (after_prefix, after[1]):
+                    continue
+                if since is not None and record.item.updated_at <= since:
+                    continue
+                if record.expires_at is not None and record.expires_at <= now:
+                    continue
+                changed.append((ns, key, record.item.updated_at))
+                if len(changed) >= limit:
+                    return changed
+        return changed
+
+    async def alist_namespace(
+        self, namespace: tuple[str, ...], after_key: str = "", limit: int = 1000
+    ) -> list[tuple[str, dict[str, Any]]]:
+        """namespace의 만료되지 않은 항목을 key 순서로 after_key 다음부터 최대 limit개 반환합니다."""
+        node = self._trie.get(namespace)
+        if node is None:
+            return []
+        now = datetime.now(timezone.utc)
+        items: list[tuple[str, dict[str, Any]]] = []
+        for key in sorted(node.records):
+            record = node.records[key]
+            if key <= after_key or (record.expires_at is not None and record.expires_at <= now):
+                continue
+            items.append((key, record.item.value))
+            if len(items) >= limit:
+                break
+        return items
+
+    async def ausage(self, user_id: str) -> list[dict[str, Any]]:
+        """사용자의 스키마별 항목 수/크기 (쓰기 시 증분 집계)"""
+        return [
+            {"schema_type": schema_type, "item_count": count, "total_bytes": size}
+            for (stats_user, schema_type), (count, size) in self._stats.items()
+            if stats_user == user_id and count > 0
+        ]
+
+    async def aversion(self, user_id: str) -> int:
+        """사용자 메모리가 변경될 때마다 증가하는 값 (목록 ETag용)"""
+        return self._versions.get(user_id, 0)
+
+    async def anext_expiry(self, user_id: str) -> datetime | None:
+        """사용자 메모리 중 아직 만료되지 않은 가장 이른 만료 시각 (목록 ETag용)"""
+        now = datetime.now(timezone.utc)
+        upcoming = [
+            expires_at
+            for (ns, _), expires_at in self._expiring.items()
+            if expires_at > now and len(ns) > 2 and ns[0] == "memory" and ns[2] == user_id
+        ]
+        return min(upcoming, default=None)
+
+    async def asweep_expired(self, batch_size: int) -> int:
+        """만료된 항목을 만료 시각 순으로 최대 batch_size개 삭제합니다."""
+        now = datetime.now(timezone.utc)
+        expired = sorted((expires_at, ref) for ref, expires_at in self._expiring.items() if expires_at < now)
+        for _, (ns, key) in expired[:batch_size]:
+            self._delete(ns, key)
+        return min(len(expired), batch_size)
+
+    async def abackfill_ttl(self, prefix_pattern: str, ttl_minutes: float, batch_size: int) -> int:
+        """만료 시각이 없는 기존 항목에 created_at 기준 TTL을 최대 batch_size개 적용합니다."""
+        updated = 0
+        for ns, node in self._walk_pattern(prefix_pattern):
+            for key, record in node.records.items():
+                if updated >= batch_size:
+                    break
+                if record.expires_at is None:
+                    record.ttl_minutes = ttl_minutes
+                    self._set_expiry(ns, key, record, record.item.created_at + timedelta(minutes=ttl_minutes))
+                    updated += 1
+        self._changes += updated
+        return updated
+
+    async def aevict_over_limit(
+        self, schema_type: str, max_items: int, order_by: Literal["oldest", "lowest_confidence"], batch_size: int
+    ) -> int:
+        """
+        schema_type의 사용자 namespace별로 max_items를 넘는 항목을 최대 batch_size개 삭제합니다.
+
+        oldest는 최신 항목을, lowest_confidence는 schema.confidence가 높은 항목을 남깁니다.
+        """
+        now = datetime.now(timezone.utc)
+        deleted = 0
+        root = (MEMORY_NAMESPACE_ROOT, memory_type_of(schema_type).value)
+        for ns, node in list(self._trie.walk(root)):
+            if deleted >= batch_size:
+                break
+            if len(ns) != 4 or ns[3] != schema_type:
+                continue
+            live = [record for record in node.records.values() if record.expires_at is None or record.expires_at > now]
+            if len(live) <= max_items:
+                continue
+
+            # 남길 순서: created_at DESC, key (lowest_confidence는 confidence DESC NULLS LAST가 우선)
+            live.sort(key=lambda record: record.item.key)
+            live.sort(key=lambda record: record.item.created_at, reverse=True)
+            if order_by == "lowest_confidence":
+                live.sort(key=lambda record: -_confidence(record.item.value))
+            for record in live[max_items : max_items + batch_size - deleted]:
+                self._delete(ns, record.item.key)
+                deleted += 1
+        return deleted
+
+    # --- 스냅샷 ---
+
+    def load_snapshot(self, path: str | Path | None = None) -> int:
+        """스냅샷 파일의 항목을 읽어 들입니다. (파일이 없으면 0, 만료된 항목은 건너뜀)"""
+        path = Path(path) if path else self.snapshot_path
+        if path is None or not path.exists():
+            return 0
+
+        now = datetime.now(timezone.utc)
+        loaded = 0
+        missing_vectors = 0
+        with path.open("rb") as f:
+            header = orjson.loads(f.readline())
+            if header.get("format") != SNAPSHOT_FORMAT:
+                raise ValueError(f"Unsupported snapshot format: {header.get('format')}")
+            for line in f:
+                row = orjson.loads(line)
+                expires_at = datetime.fromisoformat(row["expires_at"]) if row["expires_at"] else None
+                if expires_at is not None and expires_at <= now:
+                    continue
+
+                ns, key, value = tuple(row["namespace"]), row["key"], row["value"]
+                fields = index_fields_for(value, self._fields)
+                record = self._make_record(
+                    ns,
+                    key,
+                    value,
+                    datetime.fromisoformat(row["created_at"]),
+                    datetime.fromisoformat(row["updated_at"]),
+                    None,
+                    fields,
+                )
+                record.ttl_minutes = row["ttl_minutes"]
+                record.expires_at = expires_at
+                if self.embeddings:
+                    record.vectors = row.get("vectors") or {}
+                    missing_vectors += not record.vectors and bool(fields)
+                self._store(ns, key, record)
+                loaded += 1
+
+        self._snapshot_changes = self._changes
+        if missing_vectors:
+            logger.warning("%d snapshot items have no vectors and are excluded from vector search", missing_vectors)
+        logger.info("Loaded %d items from memory store snapshot %s", loaded, path)
+        return loaded
+
+    async def save_snapshot(self, path: str | Path | None = None) -> int:
+        """
+        모든 항목을 JSONL 스냅샷으로 저장합니다. (벡터 포함, 다시 읽을 때 재임베딩하지 않음)
+
+        항목 목록은 이벤트 루프에서 한 번에 수집하고, 직렬화/쓰기는 스레드에서 임시 파일에 한 뒤 교체합니다.
+        """
+        path = Path(path) if path else self.snapshot_path
+        if path is None:
+            raise ValueError("snapshot_path is not configured")
+
+        changes = self._changes
+        rows = [
+            {
+                "namespace": ns,
+                "key": key,
+                "value": record.item.value,
+                "created_at": record.item.created_at,
+                "updated_at": record.item.updated_at,
+                "expires_at": record.expires_at,
+                "ttl_minutes": record.ttl_minutes,
+                "vectors": record.vectors or None,
+            }
+            for ns, node in self._trie.walk(())
+            for key, record in node.records.items()
+        ]
+        await asyncio.to_thread(_write_snapshot, path, rows)
+        self._snapshot_changes = changes
+        return len(rows)
+
+    def has_unsaved_changes(self) -> bool:
+        return self._changes != self._snapshot_changes
+
+    def start_snapshots(self, interval_s: float) -> bool:
+        """interval_s마다 변경이 있으면 스냅샷을 저장하는 작업을 시작합니다."""
+        if self.snapshot_path is None:
+            return False
+        if self._snapshot_task is not None and not self._snapshot_task.done():
+            return False
+        self._snapshot_task = asyncio.create_task(_snapshot_loop(self, interval_s))
+        return True
+
+    async def aclose(self) -> None:
+        """주기 스냅샷 작업을 멈추고, 마지막 스냅샷 이후 변경이 있으면 저장합니다."""
+        if self._snapshot_task is not None:
+            self._snapshot_task.cancel()
+            try:
+                await self._snapshot_task
+            except asyncio.CancelledError:
+                pass
+            self._snapshot_task = None
+        if self.snapshot_path is not None and self.has_unsaved_changes():
+            saved = await self.save_snapshot()
+            logger.info("Saved %d items to memory store snapshot %s", saved, self.snapshot_path)
+
+    # --- 내부 ---
+
+    def _index_fields(self, index: Literal[False] | list[str] | None) -> list[tuple[str, Any]]:
+        if index is False:
+            return []
+        return self._fields if index is None else tokenize_fields(index)
+
+    @staticmethod
+    def _field_texts(value: dict[str, Any], fields: list[tuple[str, Any]]) -> list[tuple[str, str, str]]:
+        """(저장 필드 이름, 인덱싱 경로, 텍스트) 목록"""
+        texts: list[tuple[str, str, str]] = []
+        for path, tokens in fields:
+            path_texts = get_text_at_path(value, tokens)
+            for i, text in enumerate(path_texts):
+                texts.append((f"{path}.{i}" if len(path_texts) > 1 else path, path, text))
+        return texts
+
+    def _make_record(
+        self,
+        namespace: tuple[str, ...],
+        key: str,
+        value: dict[str, Any],
+        created_at: datetime,
+        updated_at: datetime,
+        ttl_minutes: float | None,
+        fields: list[tuple[str, Any]],
+    ) -> _Record:
+        record = _Record(
+            item=Item(value=value, key=key, namespace=namespace, created_at=created_at, updated_at=updated_at),
+            size=len(orjson.dumps(value)),
+            ttl_minutes=ttl_minutes,
+            expires_at=updated_at + timedelta(minutes=ttl_minutes) if ttl_minutes is not None else None,
+        )
+        if not self.embeddings:
+            tokens: dict[str, set[str]] = {}
+            for _, path, text in self._field_texts(value, fields):
+                tokens.setdefault(path, set()).update(_tokens(text))
+            record.tokens = {path: frozenset(path_tokens) for path, path_tokens in tokens.items()}
+        return record
+
+    def _record(self, namespace: tuple[str, ...], key: str) -> _Record | None:
+        node = self._trie.get(namespace)
+        return node.records.get(key) if node is not None else None
+
+    def _live_record(self, namespace: tuple[str, ...], key: str, now: datetime) -> _Record | None:
+        record = self._record(namespace, key)
+        if record is None or (record.expires_at is not None and record.expires_at <= now):
+            return None
+        return record
+
+    def _store(self, namespace: tuple[str, ...], key: str, record: _Record) -> None:
+        node = self._trie.get_or_create(namespace)
+        previous = node.records.get(key)
+        if previous is not None:
+            self._unindex(namespace, key, previous)
+        node.records[key] = record
+        node.matrix = None
+        self._index(namespace, key, record)
+        self._count(namespace, record, 1)
+        self._changes += 1
+
+    def _delete(self, namespace: tuple[str, ...], key: str) -> None:
+        node = self._trie.get(namespace)
+        if node is None or key not in node.records:
+            return
+        record = node.records.pop(key)
+        node.matrix = None
+        self._unindex(namespace, key, record)
+        self._trie.prune(namespace)
+        self._changes += 1
+
+    def _index(self, namespace: tuple[str, ...], key: str, record: _Record) -> None:
+        for posting_key in _value_posting_keys(record.item.value):
+            self._postings.setdefault(posting_key, set()).add((namespace, key))
+        if record.expires_at is not None:
+            self._expiring[(namespace, key)] = record.expires_at
+
+    def _unindex(self, namespace: tuple[str, ...], key: str, record: _Record) -> None:
+        for posting_key in _value_posting_keys(record.item.value):
+            refs = self._postings.get(posting_key)
+            if refs is not None:
+                refs.discard((namespace, key))
+                if not refs:
+                    del self._postings[posting_key]
+        self._expiring.pop((namespace, key), None)
+        self._count(namespace, record, -1)
+
+    def _count(self, namespace: tuple[str, ...], record: _Record, sign: int) -> None:
+        parsed = MemoryNamespaceBuilder.parse(namespace)
+        if parsed is None:
+            return
+        stats = self._stats.setdefault((parsed.user_id, parsed.schema_type), [0, 0])
+        stats[0] += sign
+        stats[1] += sign * record.size
+        self._versions[parsed.user_id] = self._versions.get(parsed.user_id, 0) + 1
+
+    def _set_expiry(self, namespace: tuple[str, ...], key: str, record: _Record, expires_at: datetime) -> None:
+        record.expires_at = expires_at
+        self._expiring[(namespace, key)] = expires_at
+
+    def _refresh_ttl(self, namespace: tuple[str, ...], key: str, record: _Record, now: datetime) -> None:
+        if record.ttl_minutes is not None:
+            self._set_expiry(namespace, key, record, now + timedelta(minutes=record.ttl_minutes))
+
+    def _walk_pattern(self, prefix_pattern: str) -> Iterator[tuple[tuple[str, ...], _NamespaceNode]]:
+        """LIKE 패턴(ESCAPE '\\')과 일치하는 namespace. 와일드카드 앞의 완전한 라벨까지는 trie로 좁힘"""
+        regex, literal = _like_to_regex(prefix_pattern)
+        prefix = tuple(literal.split(".")[:-1])
+        for ns, node in self._trie.walk(prefix):
+            if regex.fullmatch(".".join(ns)):
+                yield ns, node
+
+
+async def _snapshot_loop(store: IndexedMemoryStore, interval_s: float) -> None:
+    while True:
+        await asyncio.sleep(interval_s)
+        if not store.has_unsaved_changes():
+            continue
+        try:
+            saved = await store.save_snapshot()
+            logger.debug("Saved %d items to memory store snapshot", saved)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("Memory store snapshot failed: %s", e)
+
+
+def _write_snapshot(path: Path, rows: list[dict[str, Any]]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    with tmp_path.open("wb") as f:
+        f.write(orjson.dumps({"format": SNAPSHOT_FORMAT, "version": SNAPSHOT_VERSION}) + b"\n")
+        for row in rows:
+            f.write(orjson.dumps(row, option=orjson.OPT_SERIALIZE_NUMPY) + b"\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _is_scalar(value: Any) -> bool:
+    return value is None or isinstance(value, (str, int, float, bool))
+
+
+def _value_posting_keys(value: dict[str, Any]) -> list[tuple[str, Any]]:
+    """역색인 키: 최상위 scalar 필드와 한 단계 아래 scalar 필드 (예: ("schema_type", "UserFact"), ("schema.category", ...))"""
+    keys: list[tuple[str, Any]] = []
+    for name, field_value in value.items():
+        if _is_scalar(field_value):
+            keys.append((name, field_value))
+        elif isinstance(field_value, dict):
+            nested = cast(dict[str, Any], field_value)
+            keys.extend((f"{name}.{sub}", sub_value) for sub, sub_value in nested.items() if _is_scalar(sub_value))
+    return keys
+
+
+def _posting_keys(filter_: dict[str, Any]) -> list[tuple[str, Any]]:
+    """filter의 등호 조건 중 역색인으로 찾을 수 있는 키 (나머지 조건은 후보에 대해 다시 검사)"""
+    keys: list[tuple[str, Any]] = []
+    for name, condition in filter_.items():
+        if _is_scalar(condition):
+            keys.append((name, condition))
+        elif isinstance(condition, dict):
+            nested = cast(dict[str, Any], condition)
+            if "$eq" in nested and _is_scalar(nested["$eq"]):
+                keys.append((name, nested["$eq"]))
+            elif not any(sub.startswith("$") for sub in nested):
+                keys.extend((f"{name}.{sub}", value) for sub, value in nested.items() if _is_scalar(value))
+    return keys
+
+
+def _matches_filter(value: Any, condition: Any) -> bool:
+    """
+    JSONB 비교와 같은 의미의 filter 검사 (Postgres store의 SQL filter와 같은 결과)
+
+    dict 조건은 중첩 필드 비교, $eq/$ne/$gt/$gte/$lt/$lte 연산자를 지원합니다. 값이 없으면 대소 비교는 항상 False.
+    """
+    if isinstance(condition, dict):
+        nested = cast(dict[str, Any], condition)
+        if any(name.startswith("$") for name in nested):
+            return all(_apply_operator(value, operator, operand) for operator, operand in nested.items())
+        if not isinstance(value, dict):
+            return False
+        fields = cast(dict[str, Any], value)
+        return all(_matches_filter(fields.get(name), sub) for name, sub in nested.items())
+    if isinstance(condition, (list, tuple)):
+        expected = cast(Sequence[Any], condition)
+        if not isinstance(value, (list, tuple)):
+            return False
+        actual = cast(Sequence[Any], value)
+        return len(actual) == len(expected) and all(
+            _matches_filter(a, e) for a, e in zip(actual, expected, strict=True)
+        )
+    return value == condition
+
+
+def _apply_operator(value: Any, operator: str, operand: Any) -> bool:
+    if operator == "$eq":
+        return value == operand
+    if operator == "$ne":
+        return value != operand
+    if value is None:
+        return False
+    if operator == "$gt":
+        return float(value) > float(operand)
+    if operator == "$gte":
+        return float(value) >= float(operand)
+    if operator == "$lt":
+        return float(value) < float(operand)
+    if operator == "$lte":
+        return float(value) <= float(operand)
+    raise ValueError(f"Unsupported operator: {operator}")
+
+
+def _namespace_matches(condition: MatchCondition, namespace: tuple[str, ...]) -> bool:
+    """list_namespaces의 prefix/suffix 조건 ("*"는 임의의 라벨)"""
+    path = condition.path
+    if len(namespace) < len(path):
+        return False
+    if condition.match_type == "prefix":
+        labels = namespace[: len(path)]
+    elif condition.match_type == "suffix":
+        labels = namespace[len(namespace) - len(path) :]
+    else:
+        raise ValueError(f"Unsupported match type: {condition.match_type}")
+    return all(expected == "*" or label == expected for label, expected in zip(labels, path, strict=True))
+
+
+def _schema_weights(
+    namespace: tuple[str, ...], weights: list[tuple[str, str, float]] | None
+) -> dict[str, float] | None:
+    """namespace 스키마의 필드별 가중치 (weights가 없으면 None, 스키마에 지정된 필드가 없으면 빈 dict)"""
+    if weights is None:
+        return None
+    schema_type = namespace[3] if len(namespace) > 3 else None
+    return {path: weight for weight_schema, path, weight in weights if weight_schema == schema_type}
+
+
+def _tokens(text: str) -> frozenset[str]:
+    return frozenset(_TOKEN_RE.findall(text.lower()))
+
+
+def _keyword_scores(
+    records: dict[str, _Record], query_tokens: frozenset[str], weights: dict[str, float] | None
+) -> dict[str, float]:
+    """질의 토큰 중 인덱싱 필드에 있는 비율 (weights가 있으면 필드별 비율의 가중 평균). 0점 항목은 제외"""
+    if not query_tokens:
+        return {}
+    scores: dict[str, float] = {}
+    for key, record in records.items():
+        if weights is None:
+            matched = frozenset[str]().union(*record.tokens.values()) & query_tokens
+            score = len(matched) / len(query_tokens)
+        else:
+            score = sum(
+                weight * len(record.tokens.get(path, frozenset()) & query_tokens) / len(query_tokens)
+                for path, weight in weights.items()
+            ) / sum(weights.values())
+        if score > 0:
+            scores[key] = score
+    return scores
+
+
+def _similarity(distance: str, query: list[float], vector: list[float]) -> float:
+    """score_sql과 같은 의미의 유사도 (cosine: 1 - 거리, l2: -거리, inner_product: 내적)"""
+    if distance == "l2":
+        return -math.sqrt(sum((a - b) ** 2 for a, b in zip(query, vector, strict=True)))
+    dot = sum(a * b for a, b in zip(query, vector, strict=True))
+    if distance == "inner_product":
+        return dot
+    norm = math.sqrt(sum(a * a for a in query)) * math.sqrt(sum(b * b for b in vector))
+    return dot / norm if norm > 0 else 0.0
+
+
+def _confidence(value: Mapping[str, Any]) -> float:
+    schema = value.get("schema")
+    confidence: Any = cast(dict[str, Any], schema).get("confidence") if isinstance(schema, dict) else None
+    try:
+        return float(confidence)
+    except (TypeError, ValueError):
+        return -math.inf
+
+
+def _like_to_regex(pattern: str) -> tuple[re.Pattern[str], str]:
+    """LIKE 패턴(ESCAPE '\\')을 정규식으로 바꾸고, 첫 와일드카드 앞의 리터럴 prefix를 함께 반환합니다."""
+    parts: list[str] = []
+    literal: list[str] = []
+    wildcard = False
+    chars = iter(pattern)
+    for char in chars:
+        if char == "\\":
+            char = next(chars, "\\")
+        elif char in "%_":
+            parts.append(".*" if char == "%" else ".")
+            wildcard = True
+            continue
+        parts.append(re.escape(char))
+        if not wildcard:
+            literal.append(char)
+    return re.compile("".join(parts), re.DOTALL), "".join(literal)
+
+
+def create_memory_store(settings: Settings) -> IndexedMemoryStore:
+    """settings로 memory store를 만들고, 스냅샷이 있으면 읽은 뒤 주기 스냅샷을 시작합니다."""
+    store = IndexedMemoryStore(index=build_index_config(settings), snapshot_path=settings.memory_store_snapshot_path)
+    if store.snapshot_path is not None:
+        store.load_snapshot()
+        store.start_snapshots(settings.memory_store_snapshot_interval_s)
+    logger.info(
+        "Memory store initialized (vector search: %s %s, snapshot: %s)",
+        "numpy" if HAS_NUMPY else "python",
+        "enabled" if store.embeddings else "disabled, keyword search",
+        store.snapshot_path,
+    )
+    return store
@@ -3,6 +3,8 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Any
 
+from app.core.namespace_builder import MemoryNamespaceBuilder
+
 
 @dataclass
 class Memory:
@@ -11,20 +13,31 @@ class Memory:
     schema_type: str
     content: dict[str, Any]
     namespace: tuple[str, ...]
+    score: float | None = None
+    memory_type: str = ""
 
     @classmethod
-    def from_store_result(cls, key: str, value: dict[str, Any], namespace: tuple[str, ...]) -> Memory:
+    def from_store_result(
+        cls, key: str, value: dict[str, Any], namespace: tuple[str, ...], score: float | None = None
+    ) -> Memory:
+        parsed = MemoryNamespaceBuilder.parse(namespace)
         return cls(
             id=key,
-            user_id=namespace[1] if len(namespace) > 1 else "",
+            user_id=parsed.user_id if parsed else (namespace[1] if len(namespace) > 1 else ""),
             schema_type=value.get("schema_type", ""),
             content=value.get("schema", value.get("content", {})),
             namespace=namespace,
+            score=score,
+            memory_type=parsed.memory_type if parsed else "",
         )
 
     def to_dict(self) -> dict[str, Any]:
-        return {
+        data: dict[str, Any] = {
             "id": self.id,
             "schema_type": self.schema_type,
+            "memory_type": self.memory_type,
             "content": self.content,
         }
+        if self.score is not None:
+            data["score"] = self.score
+        return data
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import importlib
+import sys
+from array import array
+from collections.abc import AsyncIterable, AsyncIterator
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, cast
+
+from pydantic import BaseModel
+
+
+def _load_msgpack() -> Any | None:
+    # msgpack은 선택 의존성 (agent-ltm[msgpack]). 없으면 JSON으로만 응답
+    try:
+        return importlib.import_module("msgpack")
+    except ImportError:
+        return None
+
+
+msgpack: Any = _load_msgpack()
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = frozenset({MSGPACK_MEDIA_TYPE, "application/x-msgpack", "application/vnd.msgpack"})
+
+# 벡터를 bin으로 담을 때의 형식 (export 헤더의 vector_encoding)
+VECTOR_ENCODING = "float32-le"
+
+
+def msgpack_available() -> bool:
+    return msgpack is not None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, (set, frozenset)):
+        return list(cast("set[Any] | frozenset[Any]", value))
+    raise TypeError(f"Cannot serialize {type(value).__name__} to MessagePack")
+
+
+def packb(value: Any) -> bytes:
+    return msgpack.packb(value, default=_default, use_bin_type=True)
+
+
+def unpackb(data: bytes) -> Any:
+    return msgpack.unpackb(data, raw=False)
+
+
+def pack_vector(vector: list[float]) -> bytes:
+    """float 목록을 float32 little-endian 바이트로 (pgvector 저장 정밀도와 같아 손실 없음)"""
+    packed = array("f", vector)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def unpack_vector(data: bytes) -> list[float]:
+    unpacked = array("f")
+    unpacked.frombytes(data)
+    if sys.byteorder == "big":
+        unpacked.byteswap()
+    return unpacked.tolist()
+
+
+async def iter_objects(chunks: AsyncIterable[bytes]) -> AsyncIterator[Any]:
+    """연속된 MessagePack 객체 스트림(HTTP body 등)을 객체 단위로 분리"""
+    unpacker = msgpack.Unpacker(raw=False)
+    async for chunk in chunks:
+        unpacker.feed(chunk)
+        for value in unpacker:
+            yield value
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+import psycopg
+from psycopg import sql
+from psycopg.rows import DictRow, dict_row
+
+from app.config.settings import get_pg_store_conn_string, get_settings
+from app.core.base import MemoryType
+from app.infrastructure.store import USER_STATS_TRIGGERS_SQL
+
+logger = logging.getLogger(__name__)
+
+PREVIOUS_TABLE = "store_unpartitioned"
+DEFAULT_PARTITION = "store_default"
+
+# langgraph store 테이블의 컬럼. 다른 컬럼이 추가된 버전이면 전환하지 않음
+_STORE_COLUMNS = ("prefix", "key", "value", "created_at", "updated_at", "expires_at", "ttl_minutes")
+
+# prefix를 COLLATE "C"로 두어 'memory.<type>.' ~ 'memory.<type>/' 범위가 바이트 순서대로 해당 타입 전체를 덮도록 함
+# (PK는 파티션 키를 포함해야 하므로 prefix 자체가 파티션 키)
+_CREATE_PARTITIONED_STORE_SQL = """
+CREATE TABLE store (
+    prefix text COLLATE "C" NOT NULL,
+    key text NOT NULL,
+    value jsonb NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP WITH TIME ZONE,
+    ttl_minutes INT,
+    PRIMARY KEY (prefix, key)
+) PARTITION BY RANGE (prefix)
+"""
+
+
+def memory_type_partition(memory_type: MemoryType) -> str:
+    return f"store_{memory_type.value}"
+
+
+async def _is_partitioned(cur: psycopg.AsyncCursor[DictRow]) -> bool:
+    await cur.execute(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('store')) AS partitioned"
+    )
+    row = await cur.fetchone()
+    return bool(row and row["partitioned"])
+
+
+async def partition_store(hash_partitions: int | None = None, drop_previous: bool = False) -> dict[str, Any]:
+    """
+    store를 memory_type별 range 파티션 + namespace 해시 하위 파티션 구조로 전환합니다.
+
+    - memory_type별 파티션: prefix 'memory.<type>.' 범위 → 타입 단위 검색은 해당 파티션만 읽음
+    - 타입별 hash 하위 파티션: prefix(사용자 + 스키마) 해시 → vacuum/reindex가 작은 파티션 단위로 실행
+    - 그 외 namespace(system 등)는 default 파티션
+
+    전환은 하나의 트랜잭션에서 store를 ACCESS EXCLUSIVE로 잠근 채 전체 행을 복사하므로 점검 시간에 실행해야 합니다.
+    인덱스, 외래 키(store_vectors 등), 사용자 통계 트리거는 새 테이블에 다시 생성되고,
+    기존 테이블은 store_unpartitioned로 남습니다 (drop_previous=True면 삭제).
+    실행 중인 API 서버는 재시작해야 검색에 파티션 pruning 조건이 적용됩니다.
+    """
+    modulus = hash_partitions or get_settings().store_hash_partitions
+    if modulus < 1:
+        raise ValueError("hash_partitions must be at least 1")
+
+    async with await psycopg.AsyncConnection[DictRow].connect(
+        get_pg_store_conn_string(), autocommit=True, row_factory=dict_row
+    ) as conn:
+        async with conn.cursor() as cur:
+            if await _is_partitioned(cur):
+                return {"partitioned": True, "converted": False, "partitions": await _describe(cur)}
+
+            await cur.execute(
+                "SELECT array_agg(attname::text ORDER BY attnum) AS columns FROM pg_attribute "
+                "WHERE attrelid = to_regclass('store') AND attnum > 0 AND NOT attisdropped"
+            )
+            row = await cur.fetchone()
+            columns = tuple(row["columns"] or ()) if row else ()
+            if sorted(columns) != sorted(_STORE_COLUMNS):
+                raise ValueError(f"Unexpected store columns {columns}; expected {_STORE_COLUMNS}")
+
+            async with conn.transaction():
+                await cur.execute("LOCK TABLE store IN ACCESS EXCLUSIVE MODE")
+                await _convert(cur, modulus)
+                if drop_previous:
+                    await cur.execute(sql.SQL("DROP TABLE {}").format(sql.Identifier(PREVIOUS_TABLE)))
+
+            await cur.execute("ANALYZE store")
+            logger.info(f"Partitioned store by memory_type with {modulus} hash partitions per type")
+            return {"partitioned": True, "converted": True, "partitions": await _describe(cur)}
+
+
+async def _convert(cur: psycopg.AsyncCursor[DictRow], modulus: int) -> None:
+    # 이름 변경 전에 인덱스/외래 키 정의를 읽어 두었다가 새 테이블 기준으로 다시 생성
+    await cur.execute(
+        "SELECT indexrelid::regclass::text AS name, pg_get_indexdef(indexrelid) AS definition FROM pg_index "
+        "WHERE indrelid = to_regclass('store') AND NOT indisprimary"
+    )
+    indexes = await cur.fetchall()
+    await cur.execute(
+        "SELECT conrelid::regclass::text AS table_name, conname AS name, pg_get_constraintdef(oid) AS definition "
+        "FROM pg_constraint WHERE contype = 'f' AND confrelid = to_regclass('store')"
+    )
+    foreign_keys = await cur.fetchall()
+    await cur.execute(
+        "SELECT conname AS name FROM pg_constraint WHERE contype = 'p' AND conrelid = to_regclass('store')"
+    )
+    primary_key = await cur.fetchone()
+
+    for fk in foreign_keys:
+        await cur.execute(
+            sql.SQL("ALTER TABLE {} DROP CONSTRAINT {}").format(sql.SQL(fk["table_name"]), sql.Identifier(fk["name"]))
+        )
+    await cur.execute(sql.SQL("ALTER TABLE store RENAME TO {}").format(sql.Identifier(PREVIOUS_TABLE)))
+    if primary_key:
+        # 새 테이블의 PK(store_pkey)와 이름이 겹치지 않도록 변경
+        await cur.execute(
+            sql.SQL("ALTER TABLE {} RENAME CONSTRAINT {} TO {}").format(
+                sql.Identifier(PREVIOUS_TABLE),
+                sql.Identifier(primary_key["name"]),
+                sql.Identifier(f"{PREVIOUS_TABLE}_pkey"),
+            )
+        )
+    for index in indexes:
+        await cur.execute(
+            sql.SQL("ALTER INDEX {} RENAME TO {}").format(
+                sql.SQL(index["name"]), sql.Identifier(f"{index['name'].split('.')[-1]}_unpartitioned"[:63])
+            )
+        )
+    for trigger in ("store_user_stats_insert", "store_user_stats_update", "store_user_stats_delete"):
+        await cur.execute(
+            sql.SQL("DROP TRIGGER IF EXISTS {} ON {}").format(sql.Identifier(trigger), sql.Identifier(PREVIOUS_TABLE))
+        )
+
+    await cur.execute(_CREATE_PARTITIONED_STORE_SQL)
+    for memory_type in MemoryType:
+        partition = memory_type_partition(memory_type)
+        await cur.execute(
+            sql.SQL(
+                "CREATE TABLE {} PARTITION OF store FOR VALUES FROM ({}) TO ({}) PARTITION BY HASH (prefix)"
+            ).format(
+                sql.Identifier(partition),
+                sql.Literal(f"memory.{memory_type.value}."),
+                sql.Literal(f"memory.{memory_type.value}/"),
+            )
+        )
+        for remainder in range(modulus):
+            await cur.execute(
+                sql.SQL("CREATE TABLE {} PARTITION OF {} FOR VALUES WITH (MODULUS {}, REMAINDER {})").format(
+                    sql.Identifier(f"{partition}_{remainder}"),
+                    sql.Identifier(partition),
+                    sql.Literal(modulus),
+                    sql.Literal(remainder),
+                )
+            )
+    await cur.execute(sql.SQL("CREATE TABLE {} PARTITION OF store DEFAULT").format(sql.Identifier(DEFAULT_PARTITION)))
+
+    columns = sql.SQL(", ").join(sql.Identifier(column) for column in _STORE_COLUMNS)
+    await cur.execute(
+        sql.SQL("INSERT INTO store ({}) SELECT {} FROM {}").format(columns, columns, sql.Identifier(PREVIOUS_TABLE))
+    )
+
+    # 파티션 테이블의 인덱스는 모든 하위 파티션에 생성됨 (CONCURRENTLY 불가, 이미 잠금 상태)
+    for index in indexes:
+        await cur.execute(index["definition"].replace(" CONCURRENTLY", ""))
+    for fk in foreign_keys:
+        await cur.execute(
+            sql.SQL("ALTER TABLE {} ADD CONSTRAINT {} {}").format(
+                sql.SQL(fk["table_name"]), sql.Identifier(fk["name"]), sql.SQL(fk["definition"])
+            )
+        )
+    # 복사한 행은 기존 통계에 이미 반영되어 있으므로 트리거는 복사 후에 생성
+    await cur.execute(USER_STATS_TRIGGERS_SQL)
+
+
+async def _describe(cur: psycopg.AsyncCursor[DictRow]) -> list[dict[str, Any]]:
+    await cur.execute(
+        """
+        SELECT c.relname AS name,
+               parent.relname AS parent,
+               pg_get_expr(c.relpartbound, c.oid) AS bound,
+               s.n_live_tup AS live_rows,
+               s.n_dead_tup AS dead_rows,
+               pg_total_relation_size(c.oid) AS total_bytes,
+               GREATEST(s.last_vacuum, s.last_autovacuum) AS last_vacuum
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_class parent ON parent.oid = i.inhparent
+        LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid
+        WHERE c.relkind = 'r'
+          AND (i.inhparent = to_regclass('store')
+               OR i.inhparent IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = to_regclass('store')))
+        ORDER BY c.relname
+        """
+    )
+    return [dict(row) for row in await cur.fetchall()]
+
+
+async def describe_partitions() -> dict[str, Any]:
+    """파티션별 행 수/크기/마지막 vacuum (파티션되지 않았으면 partitions는 빈 목록)"""
+    async with await psycopg.AsyncConnection[DictRow].connect(
+        get_pg_store_conn_string(), autocommit=True, row_factory=dict_row
+    ) as conn:
+        async with conn.cursor() as cur:
+            partitioned = await _is_partitioned(cur)
+            return {"partitioned": partitioned, "partitions": await _describe(cur) if partitioned else []}
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, cast
+
+_active_profile: ContextVar[RequestProfile | None] = ContextVar("active_profile", default=None)
+
+_MAX_STACK_DEPTH = 40
+
+
+@dataclass
+class StoreCallTiming:
+    op: str
+    namespace: tuple[str, ...]
+    duration_ms: float
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"op": self.op, "namespace": list(self.namespace), "duration_ms": round(self.duration_ms, 3)}
+
+
+@dataclass
+class RequestProfile:
+    method: str
+    path: str
+    trigger: str
+    started_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    duration_ms: float = 0.0
+    status_code: int | None = None
+    store_calls: list[StoreCallTiming] = field(default_factory=list[StoreCallTiming])
+    stacks: Counter[str] = field(default_factory=Counter[str])
+
+    @property
+    def store_time_ms(self) -> float:
+        return sum(call.duration_ms for call in self.store_calls)
+
+    def to_dict(self, top_stacks: int = 20) -> dict[str, Any]:
+        return {
+            "method": self.method,
+            "path": self.path,
+            "trigger": self.trigger,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration_ms, 3),
+            "status_code": self.status_code,
+            "store_time_ms": round(self.store_time_ms, 3),
+            "store_calls": [call.to_dict() for call in self.store_calls],
+            "samples": sum(self.stacks.values()),
+            "stacks": [{"stack": stack, "samples": count} for stack, count in self.stacks.most_common(top_stacks)],
+        }
+
+
+class SlowRequestBuffer:
+    """최근 요청 중 가장 느린 N개만 유지하는 bounded 버퍼 (min-heap)"""
+
+    def __init__(self, capacity: int) -> None:
+        self._capacity = capacity
+        self._heap: list[tuple[float, int, RequestProfile]] = []
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def add(self, profile: RequestProfile) -> None:
+        entry = (profile.duration_ms, next(self._counter), profile)
+        with self._lock:
+            if len(self._heap) < self._capacity:
+                heapq.heappush(self._heap, entry)
+            elif profile.duration_ms > self._heap[0][0]:
+                heapq.heapreplace(self._heap, entry)
+
+    def snapshot(self) -> list[RequestProfile]:
+        with self._lock:
+            entries = list(self._heap)
+        return [profile for _, _, profile in sorted(entries, key=lambda e: e[0], reverse=True)]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._heap.clear()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+class StackSampler:
+    """
+    대상 스레드(이벤트 루프)의 콜 스택을 주기적으로 샘플링합니다.
+
+    이벤트 루프는 여러 요청이 공유하므로, 동시에 처리 중인 다른 요청의 스택이 섞여 기록될 수 있습니다.
+    """
+
+    def __init__(self, profile: RequestProfile, interval_ms: float, thread_id: int | None = None) -> None:
+        self._profile = profile
+        self._interval = interval_ms / 1000.0
+        self._thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self._interval):
+            frame = sys._current_frames().get(self._thread_id)  # pyright: ignore[reportPrivateUsage]
+            if frame is None:
+                continue
+            self._profile.stacks[_collapse_stack(frame)] += 1
+
+
+def _collapse_stack(frame: Any) -> str:
+    parts: list[str] = []
+    while frame is not None and len(parts) < _MAX_STACK_DEPTH:
+        code = frame.f_code
+        parts.append(f"{frame.f_globals.get('__name__', '?')}:{code.co_name}:{frame.f_lineno}")
+        frame = frame.f_back
+    return ";".join(reversed(parts))
+
+
+def start_profile(profile: RequestProfile) -> Any:
+    return _active_profile.set(profile)
+
+
+def end_profile(token: Any) -> None:
+    _active_profile.reset(token)
+
+
+def get_active_profile() -> RequestProfile | None:
+    return _active_profile.get()
+
+
+class ProfiledStore:
+    """store 호출별 소요 시간을 활성 프로파일에 기록하는 프록시"""
+
+    _TIMED_METHODS = frozenset({"aget", "aput", "asearch", "adelete", "abatch", "alist_namespaces"})
+
+    def __init__(self, store: Any, profile: RequestProfile) -> None:
+        self._store = store
+        self._profile = profile
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._store, name)
+        if name not in self._TIMED_METHODS:
+            return attr
+
+        async def timed(*args: Any, **kwargs: Any) -> Any:
+            namespace = cast(tuple[str, ...], args[0]) if args and isinstance(args[0], tuple) else ()
+            start = time.perf_counter()
+            try:
+                return await attr(*args, **kwargs)
+            finally:
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                self._profile.store_calls.append(StoreCallTiming(op=name, namespace=namespace, duration_ms=elapsed_ms))
+
+        return timed
+
+
+def profiled(store: Any) -> Any:
+    profile = _active_profile.get()
+    if profile is None:
+        return store
+    return ProfiledStore(store, profile)
+
+
+_slow_requests: SlowRequestBuffer | None = None
+
+
+def get_slow_request_buffer() -> SlowRequestBuffer:
+    global _slow_requests
+    if _slow_requests is None:
+        from app.config.settings import get_settings
+
+        _slow_requests = SlowRequestBuffer(get_settings().profiling_buffer_size)
+    return _slow_requests
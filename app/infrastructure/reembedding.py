@@ -0,0 +1,375 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any
+
+import psycopg
+from langgraph.store.base.embed import get_text_at_path
+from psycopg import sql
+from psycopg.rows import DictRow, dict_row
+from psycopg.types.json import Jsonb
+
+from app.config.settings import Settings, get_pg_store_conn_string, get_settings
+from app.infrastructure.embeddings import (
+    EmbeddingExecutor,
+    create_embedding_executor,
+    index_fields_for,
+    load_embeddings,
+    tokenize_fields,
+)
+from app.infrastructure.vector_index import VECTOR_INDEX_NAME, VECTOR_TABLE, build_index_sql
+
+logger = logging.getLogger(__name__)
+
+SHADOW_TABLE = "store_vectors_next"
+PREVIOUS_TABLE = "store_vectors_prev"
+JOBS_TABLE = "store_reembed_jobs"
+
+_SHADOW_INDEX_NAME = f"{SHADOW_TABLE}_embedding_idx"
+
+
+@dataclass
+class ReembedJob:
+    version: str
+    model: str
+    dims: int
+    fields: list[str]
+    status: str
+    processed: int
+    last_prefix: str | None
+    last_key: str | None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "version": self.version,
+            "model": self.model,
+            "dims": self.dims,
+            "fields": self.fields,
+            "status": self.status,
+            "processed": self.processed,
+            "cursor": [self.last_prefix, self.last_key] if self.last_prefix is not None else None,
+        }
+
+
+class ReembeddingPipeline:
+    """
+    모든 메모리를 새 임베딩 모델/필드로 재임베딩하는 재시작 가능한 백그라운드 파이프라인
+
+    - (prefix, key) keyset으로 store를 순회하며 embedding_version 태그가 다른 항목만 처리
+    - 새 벡터는 shadow 테이블(store_vectors_next)에 기록 → cutover 전까지 검색은 기존 벡터 사용
+    - 진행 위치는 store_reembed_jobs에 배치마다 저장되어 중단 후 이어서 실행 가능
+    - cutover 이후 실행하면 남은 항목을 운영 테이블(store_vectors)에 직접 보정
+    """
+
+    def __init__(
+        self,
+        version: str,
+        model: str,
+        dims: int,
+        fields: list[str] | None = None,
+        batch_size: int | None = None,
+        max_items_per_second: float | None = None,
+        executor: EmbeddingExecutor | None = None,
+        settings: Settings | None = None,
+    ) -> None:
+        self._settings = settings or get_settings()
+        self.version = version
+        self.model = model
+        self.dims = dims
+        self.fields = fields or self._settings.embedding_fields
+        self._batch_size = batch_size or self._settings.reembed_batch_size
+        self._max_items_per_second = max_items_per_second or self._settings.reembed_max_items_per_second
+        self._executor = executor
+        self._tokenized_fields = tokenize_fields(self.fields)
+
+    async def run(self) -> dict[str, Any]:
+        async with await _connect() as conn:
+            job = await self._ensure_job(conn)
+            target = VECTOR_TABLE if job.status == "completed" else SHADOW_TABLE
+            if job.status != "completed":
+                await self._set_status(conn, "running")
+
+            processed = await self._run_pass(conn, job, target)
+
+            if job.status != "completed":
+                await self._set_status(conn, "ready")
+            logger.info(f"Re-embedding pass for '{self.version}' finished: {processed} items -> {target}")
+            return (await self._load_job(conn)).to_dict()  # type: ignore[union-attr]
+
+    async def cutover(self, drop_previous: bool = False) -> dict[str, Any]:
+        """
+        shadow 테이블에 ANN 인덱스를 만든 뒤 운영 테이블과 교체합니다.
+
+        교체 직후 애플리케이션을 새 EMBEDDING_MODEL / EMBEDDING_VERSION으로 재시작해야 쿼리 임베딩이 일치합니다.
+        """
+        async with await _connect() as conn:
+            job = await self._load_job(conn)
+            # 전체 패스를 끝까지 마친 작업만 교체 (pending/running이면 shadow 테이블이 아직 일부만 채워진 상태)
+            if job is None or job.status != "ready":
+                status = job.status if job else "missing"
+                raise ValueError(f"Re-embedding job '{self.version}' is not ready for cutover (status: {status})")
+
+            # cutover 직전까지 변경된 항목 보정
+            await self._run_pass(conn, job, SHADOW_TABLE)
+
+            index_settings = self._settings.model_copy(update={"embedding_dims": self.dims})
+            async with conn.cursor() as cur:
+                if index_settings.vector_index_kind != "flat":
+                    await cur.execute(
+                        sql.SQL("DROP INDEX CONCURRENTLY IF EXISTS {}").format(sql.Identifier(_SHADOW_INDEX_NAME))
+                    )
+                    await cur.execute(build_index_sql(index_settings, _SHADOW_INDEX_NAME, SHADOW_TABLE))
+
+                async with conn.transaction():
+                    await cur.execute(
+                        sql.SQL("LOCK TABLE {}, {} IN ACCESS EXCLUSIVE MODE").format(
+                            sql.Identifier(VECTOR_TABLE), sql.Identifier(SHADOW_TABLE)
+                        )
+                    )
+                    await cur.execute(sql.SQL("DROP TABLE IF EXISTS {}").format(sql.Identifier(PREVIOUS_TABLE)))
+                    await cur.execute(
+                        sql.SQL("ALTER INDEX IF EXISTS {} RENAME TO {}").format(
+                            sql.Identifier(VECTOR_INDEX_NAME), sql.Identifier(f"{PREVIOUS_TABLE}_embedding_idx")
+                        )
+                    )
+                    await cur.execute(
+                        sql.SQL("ALTER TABLE {} RENAME TO {}").format(
+                            sql.Identifier(VECTOR_TABLE), sql.Identifier(PREVIOUS_TABLE)
+                        )
+                    )
+                    await cur.execute(
+                        sql.SQL("ALTER TABLE {} RENAME TO {}").format(
+                            sql.Identifier(SHADOW_TABLE), sql.Identifier(VECTOR_TABLE)
+                        )
+                    )
+                    await cur.execute(
+                        sql.SQL("ALTER INDEX IF EXISTS {} RENAME TO {}").format(
+                            sql.Identifier(_SHADOW_INDEX_NAME), sql.Identifier(VECTOR_INDEX_NAME)
+                        )
+                    )
+                    await self._set_status(conn, "completed")
+
+                if drop_previous:
+                    await cur.execute(sql.SQL("DROP TABLE IF EXISTS {}").format(sql.Identifier(PREVIOUS_TABLE)))
+
+            logger.info(f"Re-embedding cutover to '{self.version}' completed")
+            return (await self._load_job(conn)).to_dict()  # type: ignore[union-attr]
+
+    async def _run_pass(self, conn: psycopg.AsyncConnection[DictRow], job: ReembedJob, target: str) -> int:
+        executor = self._executor or create_embedding_executor(load_embeddings(self.model))
+        last_prefix, last_key = job.last_prefix or "", job.last_key or ""
+        processed = 0
+
+        while True:
+            started = time.perf_counter()
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    """
+                    SELECT prefix, key, value, updated_at
+                    FROM store
+                    WHERE (prefix, key) > (%s, %s)
+                      AND value->>'embedding_version' IS DISTINCT FROM %s
+                    ORDER BY prefix, key
+                    LIMIT %s
+                    """,
+                    (last_prefix, last_key, self.version, self._batch_size),
+                )
+                rows = await cur.fetchall()
+            if not rows:
+                break
+
+            await self._process_batch(conn, executor, rows, target)
+            last_prefix, last_key = rows[-1]["prefix"], rows[-1]["key"]
+            processed += len(rows)
+            await self._save_cursor(conn, last_prefix, last_key, len(rows))
+
+            # 처리량 상한을 넘지 않도록 배치 사이에 대기
+            min_duration = len(rows) / self._max_items_per_second
+            elapsed = time.perf_counter() - started
+            if elapsed < min_duration:
+                await asyncio.sleep(min_duration - elapsed)
+
+        # 한 바퀴가 끝나면 다음 실행(보정 패스)은 처음부터 다시 훑음
+        await self._save_cursor(conn, None, None, 0)
+        return processed
+
+    async def _process_batch(
+        self,
+        conn: psycopg.AsyncConnection[DictRow],
+        executor: EmbeddingExecutor,
+        rows: list[DictRow],
+        target: str,
+    ) -> None:
+        texts: list[str] = []
+        vector_targets: list[tuple[str, str, str]] = []
+        for row in rows:
+            value = {**row["value"], "embedding_version": self.version}
+            # 필드별 인덱싱을 선언한 스키마는 선언된 필드로 (행의 기존 벡터는 아래에서 모두 지운 뒤 기록)
+            for path, tokens in index_fields_for(value, self._tokenized_fields):
+                field_texts = get_text_at_path(value, tokens)
+                for i, text in enumerate(field_texts):
+                    field_name = f"{path}.{i}" if len(field_texts) > 1 else path
+                    texts.append(text)
+                    vector_targets.append((row["prefix"], row["key"], field_name))
+
+        vectors = await executor.embed_documents(texts)
+
+        async with conn.transaction(), conn.cursor() as cur:
+            await cur.execute(
+                sql.SQL("DELETE FROM {} WHERE (prefix, key) IN (SELECT * FROM unnest(%s::text[], %s::text[]))").format(
+                    sql.Identifier(target)
+                ),
+                ([row["prefix"] for row in rows], [row["key"] for row in rows]),
+            )
+            await cur.executemany(
+                sql.SQL(
+                    """
+                    INSERT INTO {} (prefix, key, field_name, embedding)
+                    VALUES (%s, %s, %s, %s::vector)
+                    ON CONFLICT (prefix, key, field_name) DO UPDATE
+                    SET embedding = EXCLUDED.embedding, updated_at = CURRENT_TIMESTAMP
+                    """
+                ).format(sql.Identifier(target)),
+                [(*vector_target, vector) for vector_target, vector in zip(vector_targets, vectors, strict=True)],
+            )
+            # 읽은 뒤 수정된 항목은 태그를 갱신하지 않음 → 다음 패스에서 다시 처리
+            await cur.execute(
+                """
+                UPDATE store s
+                SET value = s.value || %s
+                FROM unnest(%s::text[], %s::text[], %s::timestamptz[]) AS b(prefix, key, updated_at)
+                WHERE s.prefix = b.prefix AND s.key = b.key AND s.updated_at = b.updated_at
+                """,
+                (
+                    Jsonb({"embedding_version": self.version}),
+                    [row["prefix"] for row in rows],
+                    [row["key"] for row in rows],
+                    [row["updated_at"] for row in rows],
+                ),
+            )
+
+    async def _ensure_job(self, conn: psycopg.AsyncConnection[DictRow]) -> ReembedJob:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                sql.SQL(
+                    """
+                    CREATE TABLE IF NOT EXISTS {jobs} (
+                        version text PRIMARY KEY,
+                        model text NOT NULL,
+                        dims integer NOT NULL,
+                        fields jsonb NOT NULL,
+                        status text NOT NULL DEFAULT 'pending',
+                        processed bigint NOT NULL DEFAULT 0,
+                        last_prefix text,
+                        last_key text,
+                        started_at timestamptz NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                        updated_at timestamptz NOT NULL DEFAULT CURRENT_TIMESTAMP
+                    )
+                    """
+                ).format(jobs=sql.Identifier(JOBS_TABLE))
+            )
+            await cur.execute(
+                sql.SQL(
+                    "SELECT version FROM {} WHERE status IN ('pending', 'running', 'ready') AND version <> %s"
+                ).format(sql.Identifier(JOBS_TABLE)),
+                (self.version,),
+            )
+            other = await cur.fetchone()
+            if other is not None:
+                raise ValueError(f"Another re-embedding job is in progress: {other['version']}")
+
+            await cur.execute(
+                sql.SQL(
+                    """
+                    INSERT INTO {} (version, model, dims, fields)
+                    VALUES (%s, %s, %s, %s)
+                    ON CONFLICT (version) DO NOTHING
+                    """
+                ).format(sql.Identifier(JOBS_TABLE)),
+                (self.version, self.model, self.dims, Jsonb(self.fields)),
+            )
+
+        job = await self._load_job(conn)
+        assert job is not None
+        if job.status != "completed":
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    sql.SQL(
+                        """
+                        CREATE TABLE IF NOT EXISTS {shadow} (
+                            prefix text NOT NULL,
+                            key text NOT NULL,
+                            field_name text NOT NULL,
+                            embedding vector({dims}),
+                            created_at timestamptz DEFAULT CURRENT_TIMESTAMP,
+                            updated_at timestamptz DEFAULT CURRENT_TIMESTAMP,
+                            PRIMARY KEY (prefix, key, field_name),
+                            FOREIGN KEY (prefix, key) REFERENCES store (prefix, key) ON DELETE CASCADE
+                        )
+                        """
+                    ).format(shadow=sql.Identifier(SHADOW_TABLE), dims=sql.Literal(self.dims))
+                )
+        return job
+
+    async def _load_job(self, conn: psycopg.AsyncConnection[DictRow]) -> ReembedJob | None:
+        return await load_reembed_job(conn, self.version)
+
+    async def _set_status(self, conn: psycopg.AsyncConnection[DictRow], status: str) -> None:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                sql.SQL("UPDATE {} SET status = %s, updated_at = CURRENT_TIMESTAMP WHERE version = %s").format(
+                    sql.Identifier(JOBS_TABLE)
+                ),
+                (status, self.version),
+            )
+
+    async def _save_cursor(
+        self, conn: psycopg.AsyncConnection[DictRow], last_prefix: str | None, last_key: str | None, processed: int
+    ) -> None:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                sql.SQL(
+                    """
+                    UPDATE {} SET last_prefix = %s, last_key = %s, processed = processed + %s, updated_at = CURRENT_TIMESTAMP
+                    WHERE version = %s
+                    """
+                ).format(sql.Identifier(JOBS_TABLE)),
+                (last_prefix, last_key, processed, self.version),
+            )
+
+
+async def _connect() -> psycopg.AsyncConnection[DictRow]:
+    return await psycopg.AsyncConnection[DictRow].connect(
+        get_pg_store_conn_string(), autocommit=True, row_factory=dict_row
+    )
+
+
+async def load_reembed_job(conn: psycopg.AsyncConnection[DictRow], version: str) -> ReembedJob | None:
+    async with conn.cursor() as cur:
+        await cur.execute("SELECT to_regclass(%s) IS NOT NULL AS present", (JOBS_TABLE,))
+        present = await cur.fetchone()
+        if not present or not present["present"]:
+            return None
+        await cur.execute(sql.SQL("SELECT * FROM {} WHERE version = %s").format(sql.Identifier(JOBS_TABLE)), (version,))
+        row = await cur.fetchone()
+    if row is None:
+        return None
+    return ReembedJob(
+        version=row["version"],
+        model=row["model"],
+        dims=row["dims"],
+        fields=row["fields"],
+        status=row["status"],
+        processed=row["processed"],
+        last_prefix=row["last_prefix"],
+        last_key=row["last_key"],
+    )
+
+
+async def get_reembed_status(version: str) -> dict[str, Any] | None:
+    async with await _connect() as conn:
+        job = await load_reembed_job(conn, version)
+    return job.to_dict() if job else None
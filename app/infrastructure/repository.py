@@ -1,26 +1,49 @@
 from __future__ import annotations
 
-from typing import Any
+import asyncio
+from collections.abc import AsyncIterator, Callable, Sequence
+from datetime import datetime
+from typing import Any, Literal, NamedTuple, cast
 
-from langgraph.store.postgres import AsyncPostgresStore
+from langgraph.store.base import SearchItem, SearchOp
 
-from app.core.namespace_builder import MemoryNamespaceBuilder
+from app.config.settings import get_settings
+from app.core.base import MemoryType
+from app.core.namespace_builder import MEMORY_NAMESPACE_ROOT, MemoryNamespaceBuilder, memory_type_of
+from app.core.schema_registry import get_index_fields, get_memory_types, get_schema_names, index_field_name
+from app.infrastructure.index_config import FIELD_WEIGHTS_KEY
+from app.infrastructure.langgraph_compat import escape_like_literal
+from app.infrastructure.profiling import profiled
 from app.infrastructure.store import get_store
+from app.infrastructure.store_base import MemoryStoreBase
+from app.infrastructure.vector_index import vector_search_params
+
+
+class SearchRequest(NamedTuple):
+    user_id: str
+    query: str
+    schema_type: str | None = None
+    limit: int = 10
+    memory_type: MemoryType | None = None
+    # 검색할 임베딩 필드 이름 -> 가중치 (None이면 모든 벡터)
+    fields: dict[str, float] | None = None
 
 
 class MemoryRepository:
-    def __init__(self, store: AsyncPostgresStore | None = None):
+    def __init__(self, store: MemoryStoreBase | None = None):
         self._store = store
 
-    async def _get_store(self) -> AsyncPostgresStore:
+    async def _get_store(self) -> MemoryStoreBase:
         if self._store is None:
             self._store = await get_store()
-        return self._store
+        return profiled(self._store)
 
-    async def save(self, user_id: str, schema_type: str, memory_id: str, value: dict[str, Any]) -> None:
+    async def save(
+        self, user_id: str, schema_type: str, memory_id: str, value: dict[str, Any], ttl_minutes: float | None = None
+    ) -> None:
         store = await self._get_store()
         namespace = MemoryNamespaceBuilder.for_memory(user_id, schema_type)
-        await store.aput(namespace, memory_id, value)
+        await store.aput(namespace, memory_id, value, index=get_index_fields(schema_type), ttl=ttl_minutes)
 
     async def find_by_id(self, user_id: str, memory_id: str, schema_type: str | None = None) -> dict[str, Any] | None:
         store = await self._get_store()
@@ -40,21 +63,186 @@ class MemoryRepository:
                     return result.value
         return None
 
+    async def update(
+        self,
+        user_id: str,
+        schema_type: str,
+        memory_id: str,
+        update: Callable[[dict[str, Any]], dict[str, Any]],
+        delete_ids: Sequence[str] = (),
+    ) -> dict[str, Any] | None:
+        """memory_id를 update로 교체하고, 교체된 경우에만 같은 트랜잭션에서 delete_ids를 삭제합니다."""
+        store = await self._get_store()
+        namespace = MemoryNamespaceBuilder.for_memory(user_id, schema_type)
+        return await store.aupdate(
+            namespace, memory_id, update, index=get_index_fields(schema_type), delete_keys=delete_ids
+        )
+
+    async def iter_changed(self, since: datetime | None = None, page_size: int = 1000) -> AsyncIterator[dict[str, Any]]:
+        """
+        since 이후 변경된 메모리를 (user_id, schema_type) namespace 단위로 반환
+
+        store 전체를 한 번에 집계하지 않고 (prefix, key) keyset으로 page_size개씩 읽어, namespace가 끝날 때마다 반환합니다.
+        """
+        store = await self._get_store()
+        after: tuple[tuple[str, ...], str] | None = None
+        current: dict[str, Any] | None = None
+        while True:
+            rows = await store.alist_changed((MEMORY_NAMESPACE_ROOT,), since, after, page_size)
+            for namespace, key, updated_at in rows:
+                parsed = MemoryNamespaceBuilder.parse(namespace)
+                if parsed is None:
+                    continue
+                if current is None or (current["user_id"], current["schema_type"]) != parsed[1:]:
+                    if current is not None:
+                        yield current
+                    current = {
+                        "user_id": parsed.user_id,
+                        "schema_type": parsed.schema_type,
+                        "keys": [],
+                        "updated_at": updated_at,
+                    }
+                current["keys"].append(key)
+                current["updated_at"] = max(current["updated_at"], updated_at)
+            if len(rows) < page_size:
+                break
+            after = rows[-1][:2]
+        if current is not None:
+            yield current
+
+    async def iter_all(self, user_id: str, schema_type: str, page_size: int = 1000) -> AsyncIterator[dict[str, Any]]:
+        """한 namespace의 메모리 전체를 key 순서로 page_size개씩 읽습니다. (find_all과 달리 개수 제한 없음)"""
+        store = await self._get_store()
+        namespace = MemoryNamespaceBuilder.for_memory(user_id, schema_type)
+        after_key = ""
+        while True:
+            rows = await store.alist_namespace(namespace, after_key, page_size)
+            for key, value in rows:
+                yield {"key": key, "value": value}
+            if len(rows) < page_size:
+                break
+            after_key = rows[-1][0]
+
+    async def get_state(self, name: str) -> dict[str, Any] | None:
+        """백그라운드 작업 상태(워터마크 등) 조회"""
+        store = await self._get_store()
+        result = await store.aget(("system", name), "state")
+        return result.value if result else None
+
+    async def save_state(self, name: str, state: dict[str, Any]) -> None:
+        store = await self._get_store()
+        await store.aput(("system", name), "state", state, index=False)
+
+    async def usage(self, user_id: str) -> dict[str, dict[str, int]]:
+        """스키마 타입별 {"count", "bytes"} (증분 집계 테이블 조회)"""
+        store = await self._get_store()
+        rows = await store.ausage(user_id)
+        return {row["schema_type"]: {"count": row["item_count"], "bytes": row["total_bytes"]} for row in rows}
+
+    async def version(self, user_id: str) -> int:
+        """사용자 메모리가 저장/수정/삭제될 때마다 증가하는 버전"""
+        store = await self._get_store()
+        return await store.aversion(user_id)
+
+    async def next_expiry(self, user_id: str) -> datetime | None:
+        """아직 만료되지 않은 사용자 메모리 중 가장 이른 만료 시각 (TTL이 없으면 None)"""
+        store = await self._get_store()
+        return await store.anext_expiry(user_id)
+
+    async def sweep_expired(self, batch_size: int) -> int:
+        store = await self._get_store()
+        return await store.asweep_expired(batch_size)
+
+    async def backfill_ttl(self, schema_type: str, ttl_minutes: float, batch_size: int) -> int:
+        store = await self._get_store()
+        return await store.abackfill_ttl(_schema_prefix_pattern(schema_type), ttl_minutes, batch_size)
+
+    async def evict_over_limit(
+        self, schema_type: str, max_items: int, order_by: Literal["oldest", "lowest_confidence"], batch_size: int
+    ) -> int:
+        store = await self._get_store()
+        return await store.aevict_over_limit(schema_type, max_items, order_by, batch_size)
+
     async def search(
-        self, user_id: str, query: str, schema_type: str | None = None, limit: int = 10
+        self,
+        user_id: str,
+        query: str,
+        schema_type: str | None = None,
+        limit: int = 10,
+        ef_search: int | None = None,
+        probes: int | None = None,
+        memory_type: MemoryType | None = None,
+        fields: dict[str, float] | None = None,
     ) -> list[dict[str, Any]]:
         store = await self._get_store()
 
-        if schema_type:
-            namespace = MemoryNamespaceBuilder.for_memory(user_id, schema_type)
-            results = await store.asearch(namespace, query=query, limit=limit)
+        namespaces = _search_namespaces(user_id, schema_type, memory_type)
+        if not namespaces:
+            return []
+        filter_ = _field_weights_filter(schema_type, memory_type, fields) if query else None
+
+        settings = get_settings()
+        ef_search = ef_search if ef_search is not None else settings.hnsw_ef_search
+        probes = probes if probes is not None else settings.ivfflat_probes
+
+        results: list[SearchItem]
+        if query and (ef_search is not None or probes is not None):
+            # recall 파라미터는 커서 단위로 적용되므로, 다른 요청과 묶이는 배치 큐를 거치지 않고 직접 실행
+            with vector_search_params(ef_search=ef_search, probes=probes):
+                batches = cast(
+                    list[list[SearchItem]],
+                    await store.abatch([SearchOp(namespace, filter_, limit, 0, query) for namespace in namespaces]),
+                )
         else:
-            # 모든 메모리 검색 (namespace prefix 사용)
-            namespace = ("memory", user_id)
-            # TODO:  filter로 schema_type이 있는 항목만 필터링 가능하지만, namespace 구조상 prefix 검색이 더 효율적
-            results: SearchItem = await store.asearch(namespace, query=query, limit=limit)  # noqa: F821
+            batches = await asyncio.gather(
+                *(store.asearch(namespace, query=query, filter=filter_, limit=limit) for namespace in namespaces)
+            )
+        results = _merge_results(batches, limit, by_score=bool(query)) if len(batches) > 1 else batches[0]
+
+        return [{"key": result.key, "value": result.value, "score": result.score} for result in results]
+
+    async def search_many(
+        self, requests: Sequence[SearchRequest], ef_search: int | None = None, probes: int | None = None
+    ) -> list[list[dict[str, Any]]]:
+        """
+        여러 (사용자, 쿼리) 검색을 하나의 SearchOp 배치로 실행합니다.
+
+        커넥션을 한 번만 얻고, 벡터 검색 쿼리는 한 번의 임베딩 호출로 묶어 처리합니다.
+        결과는 requests와 같은 순서입니다.
+        """
+        store = await self._get_store()
 
-        return [{"key": result.key, "value": result.value} for result in results]
+        ops: list[SearchOp] = []
+        spans: list[tuple[int, int]] = []
+        for request in requests:
+            namespaces = _search_namespaces(request.user_id, request.schema_type, request.memory_type)
+            filter_ = (
+                _field_weights_filter(request.schema_type, request.memory_type, request.fields)
+                if request.query
+                else None
+            )
+            spans.append((len(ops), len(ops) + len(namespaces)))
+            ops.extend(
+                SearchOp(namespace, filter_, request.limit, 0, request.query or None) for namespace in namespaces
+            )
+        if not ops:
+            return [[] for _ in requests]
+
+        settings = get_settings()
+        ef_search = ef_search if ef_search is not None else settings.hnsw_ef_search
+        probes = probes if probes is not None else settings.ivfflat_probes
+
+        # abatch는 배치 큐를 거치지 않고 하나의 커서에서 실행되므로 recall 파라미터도 그대로 적용됨
+        with vector_search_params(ef_search=ef_search, probes=probes):
+            batches: list[list[SearchItem]] = await store.abatch(ops)  # type: ignore[assignment]
+
+        return [
+            [
+                {"key": result.key, "value": result.value, "score": result.score}
+                for result in _merge_results(batches[start:end], request.limit, by_score=bool(request.query))
+            ]
+            for request, (start, end) in zip(requests, spans, strict=True)
+        ]
 
     async def find_all(self, user_id: str, schema_type: str | None = None) -> list[dict[str, Any]]:
         return await self.search(user_id, query="", schema_type=schema_type, limit=1000)
@@ -82,3 +270,46 @@ class MemoryRepository:
                 except Exception:
                     continue
         return False
+
+
+def _search_namespaces(user_id: str, schema_type: str | None, memory_type: MemoryType | None) -> list[tuple[str, ...]]:
+    if schema_type:
+        if memory_type is not None and memory_type_of(schema_type) != memory_type:
+            return []
+        return [MemoryNamespaceBuilder.for_memory(user_id, schema_type)]
+    # namespace가 memory_type으로 시작하므로 타입별 prefix로 나눠 검색 (파티션 단위로 pruning)
+    memory_types = [memory_type] if memory_type is not None else get_memory_types()
+    return [MemoryNamespaceBuilder.for_memory_type(user_id, t) for t in memory_types]
+
+
+def _field_weights_filter(
+    schema_type: str | None, memory_type: MemoryType | None, fields: dict[str, float] | None
+) -> dict[str, Any] | None:
+    """필드 이름별 가중치를 검색 범위 스키마의 임베딩 경로별 가중치로 변환 (store의 필드별 벡터 검색용 filter)"""
+    if not fields:
+        return None
+    schema_types = [schema_type] if schema_type else get_schema_names()
+    weights = [
+        (name, path, fields[index_field_name(path)])
+        for name in schema_types
+        if memory_type is None or memory_type_of(name) == memory_type
+        for path in get_index_fields(name) or ()
+        if index_field_name(path) in fields
+    ]
+    return {FIELD_WEIGHTS_KEY: weights}
+
+
+def _schema_prefix_pattern(schema_type: str) -> str:
+    """모든 사용자의 ("memory", memory_type, user_id, schema_type) namespace에 매칭되는 LIKE 패턴"""
+    memory_type = memory_type_of(schema_type).value
+    return f"{MEMORY_NAMESPACE_ROOT}.{memory_type}.%.{escape_like_literal(schema_type)}"
+
+
+def _merge_results(batches: list[list[SearchItem]], limit: int, by_score: bool) -> list[SearchItem]:
+    """타입별 검색 결과를 하나의 순위로 병합 (벡터 검색은 score, 목록은 최근 수정 순)"""
+    items = [item for batch in batches for item in batch]
+    if by_score:
+        items.sort(key=lambda item: item.score if item.score is not None else float("-inf"), reverse=True)
+    else:
+        items.sort(key=lambda item: item.updated_at, reverse=True)
+    return items[:limit]
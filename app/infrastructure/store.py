@@ -1,18 +1,736 @@
 from __future__ import annotations
 
 import logging
-from typing import Any
+import os
+from collections.abc import AsyncGenerator, Callable, Sequence
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Literal, cast
 
+import orjson
 import psycopg
+from langgraph.store.base import PutOp, SearchOp
+from langgraph.store.base.embed import get_text_at_path
 from langgraph.store.postgres import AsyncPostgresStore
+from langgraph.store.postgres.base import PLACEHOLDER
+from psycopg import AsyncCursor, sql
+from psycopg.rows import DictRow
+
+from app.config.settings import Settings, get_settings
+from app.core.base import BaseMemory, MemoryType
+from app.core.namespace_builder import MEMORY_NAMESPACE_ROOT, MemoryNamespaceBuilder, memory_type_of
+from app.infrastructure.embeddings import tokenize_fields
+from app.infrastructure.index_config import FIELD_WEIGHTS_KEY, build_index_config
+from app.infrastructure.langgraph_compat import (
+    decode_ns_bytes,
+    namespace_prefix_condition,
+    namespace_to_text,
+    row_to_search_item,
+)
+from app.infrastructure.store_base import MemoryStoreBase
+from app.infrastructure.vector_index import (
+    candidate_distance_sql,
+    ensure_quantized_index,
+    full_distance_sql,
+    get_vector_search_params,
+    score_sql,
+)
+
+if TYPE_CHECKING:
+    from typing_extensions import LiteralString
 
 logger = logging.getLogger(__name__)
 
-_store_instance: AsyncPostgresStore | None = None
+_store_instance: MemoryStoreBase | None = None
 _store_cm: Any = None
+# migrate_store()가 이 프로세스(또는 fork 전의 부모)에서 실행되었으면 store 초기화 시 setup()을 건너뜀
+_store_migrated = False
+
+USER_STATS_TABLE = "store_user_stats"
+
+# ("memory", memory_type, user_id, schema_type) 항목의 개수/크기를 store 변경 시 트리거로 증분 반영
+# statement 단위 트리거 + transition table로 배치 삭제(retention sweep 등)도 한 번의 upsert로 처리
+# version은 변경될 때마다 증가하며 행을 지우지 않으므로, 사용자별 합계가 목록 ETag로 쓰입니다
+# (재임베딩이 embedding_version 태그만 바꾸는 UPDATE는 목록 응답이 같으므로 version_step = 0)
+_USER_STATS_DELTA_SQL = """
+    INSERT INTO store_user_stats AS s (user_id, schema_type, item_count, total_bytes, version, updated_at)
+    SELECT split_part(prefix, '.', 3), split_part(prefix, '.', 4), {sign} count(*), {sign} sum(octet_length(value::text)), 1, NOW()
+    FROM {rows}
+    WHERE prefix LIKE 'memory.%'
+    GROUP BY 1, 2
+    ORDER BY 1, 2
+    ON CONFLICT (user_id, schema_type) DO UPDATE
+    SET item_count = s.item_count + EXCLUDED.item_count,
+        total_bytes = s.total_bytes + EXCLUDED.total_bytes,
+        version = s.version + version_step,
+        updated_at = NOW();
+"""
+
+# 트리거 함수 본문에 이 문자열들이 모두 있으면 현재 버전
+# (namespace 구조에 memory_type 포함, embedding_version 태그만 바꾼 UPDATE는 version 유지)
+_USER_STATS_FUNCTION_MARKERS = ("split_part(prefix, '.', 4)", "version_step")
+
+_USER_STATS_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION store_user_stats_apply() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    version_step int := 1;
+BEGIN
+    IF TG_OP = 'UPDATE' THEN
+        IF NOT EXISTS (
+            SELECT 1 FROM new_rows n LEFT JOIN old_rows o USING (prefix, key)
+            WHERE o.key IS NULL OR (o.value - 'embedding_version') IS DISTINCT FROM (n.value - 'embedding_version')
+        ) THEN
+            version_step := 0;
+        END IF;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        {_USER_STATS_DELTA_SQL.format(sign="-", rows="old_rows")}
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        {_USER_STATS_DELTA_SQL.format(sign="", rows="new_rows")}
+    END IF;
+    RETURN NULL;
+END;
+$$;
+"""
+
+# 파티션 전환 시 새 store 테이블에도 같은 트리거를 다시 생성
+USER_STATS_TRIGGERS_SQL = """
+CREATE TRIGGER store_user_stats_insert AFTER INSERT ON store
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION store_user_stats_apply();
+CREATE TRIGGER store_user_stats_update AFTER UPDATE ON store
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION store_user_stats_apply();
+CREATE TRIGGER store_user_stats_delete AFTER DELETE ON store
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION store_user_stats_apply();
+"""
+
+_USER_STATS_MIGRATION = f"""
+CREATE TABLE store_user_stats (
+    user_id text NOT NULL,
+    schema_type text NOT NULL,
+    item_count bigint NOT NULL DEFAULT 0,
+    total_bytes bigint NOT NULL DEFAULT 0,
+    version bigint NOT NULL DEFAULT 0,
+    updated_at timestamptz NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (user_id, schema_type)
+);
+{_USER_STATS_FUNCTION}
+{USER_STATS_TRIGGERS_SQL}
+
+INSERT INTO store_user_stats (user_id, schema_type, item_count, total_bytes, version)
+SELECT split_part(prefix, '.', 3), split_part(prefix, '.', 4), count(*), sum(octet_length(value::text)), 1
+FROM store
+WHERE prefix LIKE 'memory.%'
+GROUP BY 1, 2;
+"""
+
+# version 컬럼 이전에 생성된 store_user_stats 업그레이드
+_USER_STATS_VERSION_MIGRATION = (
+    "ALTER TABLE store_user_stats ADD COLUMN IF NOT EXISTS version bigint NOT NULL DEFAULT 1"
+)
+
+# memory_type 이전의 ("memory", user_id, schema_type) namespace → ("memory", memory_type, user_id, schema_type)
+_LEGACY_MEMORY_PREFIX = "prefix LIKE 'memory.%' AND split_part(prefix, '.', 4) = ''"
+
+
+class MemoryStore(AsyncPostgresStore, MemoryStoreBase):
+    """
+    AsyncPostgresStore 확장
+    - 검색 요청별 pgvector 파라미터(ef_search/probes)를 커서 단위로 적용
+    - 양자화(halfvec/binary) 인덱스로 후보를 찾고 full-precision 벡터로 re-rank
+    - 단일 트랜잭션 read-modify-write (변경된 인덱스 필드만 재임베딩)
+    - 보존 정책용 배치 단위 만료/초과분 삭제
+    - store가 memory_type/namespace 해시로 파티션된 경우, namespace 검색에 파티션 pruning 조건 추가
+    """
 
+    # setup()에서 store가 파티션 테이블인지 확인해 설정
+    _partitioned: bool = False
+
+    async def setup(self) -> None:
+        await super().setup()
+        await self._setup_user_stats()
+        await self.detect_partitioning()
+
+    async def detect_partitioning(self) -> None:
+        """마이그레이션을 건너뛰고 시작하는 경우(워커 등)에도 파티션 여부는 확인"""
+        async with self._cursor() as cur:
+            await cur.execute(
+                "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('store')) AS partitioned"
+            )
+            row = await cur.fetchone()
+            self._partitioned = bool(row and row["partitioned"])
+
+    async def _setup_user_stats(self) -> None:
+        async with self._cursor() as cur, cur.connection.transaction():
+            await cur.execute(
+                "SELECT to_regclass(%s) IS NOT NULL AS present, "
+                "(SELECT prosrc FROM pg_proc WHERE proname = 'store_user_stats_apply' LIMIT 1) AS function_source",
+                (USER_STATS_TABLE,),
+            )
+            row = await cur.fetchone()
+            present = bool(row and row["present"])
+            function_source = (row["function_source"] or "") if row else ""
+            if present and all(marker in function_source for marker in _USER_STATS_FUNCTION_MARKERS):
+                return
+
+            # namespace 재작성, 트리거 생성, 기존 데이터 집계 사이에 쓰기가 끼어들지 않도록 잠금
+            await cur.execute("LOCK TABLE store IN SHARE ROW EXCLUSIVE MODE")
+            migrated = await self._migrate_legacy_namespaces(cur)
+            if not present:
+                await cur.execute(_USER_STATS_MIGRATION)
+                logger.info(f"Created {USER_STATS_TABLE} with triggers and backfilled existing items")
+                return
+
+            await cur.execute(_USER_STATS_VERSION_MIGRATION)
+            await cur.execute(_USER_STATS_FUNCTION)
+            if migrated:
+                # (user_id, schema_type)별 개수/크기는 그대로지만 응답의 namespace가 바뀌므로 ETag 무효화
+                await cur.execute("UPDATE store_user_stats SET version = version + 1")
+            logger.info(f"Upgraded {USER_STATS_TABLE} trigger function")
+
+    async def _migrate_legacy_namespaces(self, cur: AsyncCursor[DictRow]) -> int:
+        """("memory", user_id, schema_type) 항목을 memory_type이 포함된 namespace로 옮깁니다."""
+        from app.core.schema_registry import get_all_schemas
+
+        await cur.execute(f"SELECT count(*) AS legacy FROM store WHERE {_LEGACY_MEMORY_PREFIX}")
+        row = await cur.fetchone()
+        legacy = int(row["legacy"]) if row else 0
+        if not legacy:
+            return 0
+
+        memory_type_case = sql.SQL("CASE split_part(prefix, '.', 3) {} ELSE {} END").format(
+            sql.SQL(" ").join(
+                sql.SQL("WHEN {} THEN {}").format(sql.Literal(schema.__name__), sql.Literal(schema.memory_type.value))
+                for schema in get_all_schemas()
+            ),
+            sql.Literal(BaseMemory.memory_type.value),
+        )
+        new_prefix = sql.SQL(
+            "'memory.' || {} || '.' || split_part(prefix, '.', 2) || '.' || split_part(prefix, '.', 3)"
+        ).format(memory_type_case)
+        legacy_filter = sql.SQL(_LEGACY_MEMORY_PREFIX)
+
+        await cur.execute(
+            "SELECT conrelid::regclass::text AS referencing FROM pg_constraint "
+            "WHERE contype = 'f' AND confrelid = to_regclass('store')"
+        )
+        referencing = [row["referencing"] for row in await cur.fetchall()]
+
+        # 행 이동 중에는 통계 트리거를 끄고, (user_id, schema_type) 집계는 이동 전후가 같으므로 그대로 둠
+        await cur.execute("ALTER TABLE store DISABLE TRIGGER USER")
+        await cur.execute(
+            sql.SQL(
+                "INSERT INTO store (prefix, key, value, created_at, updated_at, expires_at, ttl_minutes) "
+                "SELECT {}, key, value, created_at, updated_at, expires_at, ttl_minutes FROM store WHERE {}"
+            ).format(new_prefix, legacy_filter)
+        )
+        for table in referencing:
+            await cur.execute(
+                sql.SQL("UPDATE {} SET prefix = {} WHERE {}").format(sql.SQL(table), new_prefix, legacy_filter)
+            )
+        await cur.execute(sql.SQL("DELETE FROM store WHERE {}").format(legacy_filter))
+        await cur.execute("ALTER TABLE store ENABLE TRIGGER USER")
+        logger.info(f"Moved {legacy} memories to the ('memory', memory_type, user_id, schema_type) namespace layout")
+        return legacy
+
+    async def ausage(self, user_id: str) -> list[dict[str, Any]]:
+        """사용자의 스키마별 항목 수/크기 (store_user_stats, 스캔 없음)"""
+        async with self._cursor() as cur:
+            await cur.execute(
+                "SELECT schema_type, item_count, total_bytes FROM store_user_stats WHERE user_id = %s AND item_count > 0",
+                (user_id,),
+            )
+            return [dict(row) for row in await cur.fetchall()]
+
+    async def aversion(self, user_id: str) -> int:
+        """사용자 메모리가 변경될 때마다 증가하는 값 (목록 ETag용, 단일 인덱스 조회)"""
+        async with self._cursor() as cur:
+            await cur.execute(
+                "SELECT COALESCE(sum(version), 0) AS version FROM store_user_stats WHERE user_id = %s", (user_id,)
+            )
+            row = await cur.fetchone()
+            return int(row["version"]) if row else 0
+
+    async def anext_expiry(self, user_id: str) -> datetime | None:
+        """
+        사용자 메모리 중 아직 만료되지 않은 가장 이른 expires_at (목록 ETag용)
+
+        만료된 항목은 조회에서 바로 빠지지만 version은 sweep이 삭제할 때 증가하므로,
+        ETag에 이 값을 함께 넣어 만료 시점에 ETag가 바뀌도록 합니다. 사용자 namespace 범위만 PK 인덱스로 읽습니다.
+        """
+        bounds: list[str] = []
+        for memory_type in MemoryType:
+            path = f"memory.{memory_type.value}.{user_id}"
+            bounds.extend([f"{path}.", f"{path}/"])
+        ranges = sql.SQL(" OR ").join([sql.SQL("(prefix >= %s AND prefix < %s)")] * len(MemoryType))
+        query = sql.SQL("SELECT min(expires_at) AS next_expiry FROM store WHERE expires_at > NOW() AND ({})")
+        async with self._cursor() as cur:
+            await cur.execute(query.format(ranges), bounds)
+            row = await cur.fetchone()
+            return row["next_expiry"] if row else None
+
+    async def aupdate(
+        self,
+        namespace: tuple[str, ...],
+        key: str,
+        update: Callable[[dict[str, Any]], dict[str, Any]],
+        index: list[str] | None = None,
+        delete_keys: Sequence[str] = (),
+    ) -> dict[str, Any] | None:
+        """
+        행을 잠근 채로 value를 읽어 update(value)의 결과로 교체합니다.
+
+        update가 예외를 던지면 트랜잭션이 롤백됩니다. 항목이 없으면 None을 반환하고 아무것도 바꾸지 않습니다.
+        delete_keys의 같은 namespace 항목은 교체와 같은 트랜잭션에서 삭제합니다 (중복 병합).
+        인덱싱 대상 텍스트가 바뀌지 않았으면 기존 벡터를 그대로 두고, 바뀐 필드만 재임베딩합니다.
+        index가 주어지면 (스키마의 필드별 인덱싱) 기본 인덱싱 필드 대신 해당 경로를 기준으로 비교합니다.
+        """
+        prefix = namespace_to_text(namespace)
+        async with self._cursor() as cur, cur.connection.transaction():
+            await cur.execute(
+                "SELECT value, ttl_minutes FROM store WHERE prefix = %s AND key = %s "
+                "AND (expires_at IS NULL OR expires_at > NOW()) FOR UPDATE",
+                (prefix, key),
+            )
+            row = await cur.fetchone()
+            if row is None:
+                return None
+
+            current = cast(
+                dict[str, Any], row["value"] if isinstance(row["value"], dict) else orjson.loads(row["value"])
+            )
+            updated = update(current)
+            fields = tokenize_fields(index) if index is not None else None
+            changed = self._changed_index_fields(current, updated, fields)
+            if fields is not None and self.index_config:
+                # 필드별 인덱싱 이전에 전체 value("$")로 임베딩된 항목이면 선언된 필드를 모두 새로 임베딩
+                await cur.execute(
+                    "DELETE FROM store_vectors WHERE prefix = %s AND key = %s AND field_name = '$'", (prefix, key)
+                )
+                if cur.rowcount > 0:
+                    changed = [path for path, _ in fields]
+
+            put_index: Literal[False] | list[str] | None = False
+            if changed:
+                # 배열 필드는 field.0, field.1 ... 로 저장되므로 길이가 줄어든 경우를 위해 먼저 삭제
+                await cur.execute(
+                    "DELETE FROM store_vectors WHERE prefix = %s AND key = %s "
+                    "AND regexp_replace(field_name, '\\.[0-9]+$', '') = ANY(%s)",
+                    (prefix, key, changed),
+                )
+                if fields is not None:
+                    put_index = changed
+                else:
+                    put_index = None if len(changed) == len(self.index_config["__tokenized_fields"]) else changed  # type: ignore[index]
+            await self._batch_put_ops(
+                [
+                    (0, PutOp(namespace, key, updated, index=put_index, ttl=row["ttl_minutes"])),
+                    *((i, PutOp(namespace, k, None)) for i, k in enumerate(delete_keys, 1) if k != key),
+                ],
+                cur,
+            )
+        return updated
+
+    async def alist_changed(
+        self,
+        namespace_prefix: tuple[str, ...],
+        since: datetime | None = None,
+        after: tuple[tuple[str, ...], str] | None = None,
+        limit: int = 1000,
+    ) -> list[tuple[tuple[str, ...], str, datetime]]:
+        """
+        since 이후 변경된 항목을 (namespace, key) 순서로 최대 limit개 반환합니다.
+
+        after에 이전 페이지의 마지막 (namespace, key)를 넘기면 그 다음부터 PK 순서(keyset)로 이어서 읽습니다.
+        """
+        condition, params = namespace_prefix_condition(namespace_prefix)
+        after_prefix, after_key = (".".join(after[0]), after[1]) if after else ("", "")
+        async with self._cursor() as cur:
+            await cur.execute(
+                f"""
+                SELECT store.prefix, store.key, store.updated_at
+                FROM store
+                WHERE {condition} AND (store.prefix, store.key) > (%s, %s)
+                  AND (%s::timestamptz IS NULL OR store.updated_at > %s)
+                  AND (store.expires_at IS NULL OR store.expires_at > NOW())
+                ORDER BY store.prefix, store.key
+                LIMIT %s
+                """,
+                (*params, after_prefix, after_key, since, since, limit),
+            )
+            rows = await cur.fetchall()
+        return [(tuple(row["prefix"].split(".")), row["key"], row["updated_at"]) for row in rows]
+
+    async def alist_namespace(
+        self, namespace: tuple[str, ...], after_key: str = "", limit: int = 1000
+    ) -> list[tuple[str, dict[str, Any]]]:
+        """namespace의 만료되지 않은 항목을 key 순서로 after_key 다음부터 최대 limit개 반환합니다. (keyset)"""
+        async with self._cursor() as cur:
+            await cur.execute(
+                """
+                SELECT key, value FROM store
+                WHERE prefix = %s AND key > %s AND (expires_at IS NULL OR expires_at > NOW())
+                ORDER BY key
+                LIMIT %s
+                """,
+                (".".join(namespace), after_key, limit),
+            )
+            rows = await cur.fetchall()
+        return [
+            (row["key"], row["value"] if isinstance(row["value"], dict) else orjson.loads(row["value"])) for row in rows
+        ]
+
+    async def asweep_expired(self, batch_size: int) -> int:
+        """만료된 항목을 expires_at 인덱스 순으로 최대 batch_size개 삭제합니다. (벡터는 FK cascade로 삭제)"""
+        async with self._cursor() as cur:
+            await cur.execute(
+                """
+                DELETE FROM store s
+                USING (
+                    SELECT prefix, key FROM store
+                    WHERE expires_at IS NOT NULL AND expires_at < NOW()
+                    ORDER BY expires_at
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                ) expired
+                WHERE s.prefix = expired.prefix AND s.key = expired.key
+                """,
+                (batch_size,),
+            )
+            return cur.rowcount
+
+    async def abackfill_ttl(self, prefix_pattern: str, ttl_minutes: float, batch_size: int) -> int:
+        """만료 시각이 없는 기존 항목에 created_at 기준 TTL을 최대 batch_size개 적용합니다."""
+        async with self._cursor() as cur:
+            await cur.execute(
+                r"""
+                UPDATE store s
+                SET expires_at = s.created_at + %s * interval '1 minute', ttl_minutes = %s
+                FROM (
+                    SELECT prefix, key FROM store
+                    WHERE prefix LIKE %s ESCAPE '\' AND expires_at IS NULL
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                ) t
+                WHERE s.prefix = t.prefix AND s.key = t.key
+                """,
+                (ttl_minutes, ttl_minutes, prefix_pattern, batch_size),
+            )
+            return cur.rowcount
+
+    async def aevict_over_limit(
+        self, schema_type: str, max_items: int, order_by: Literal["oldest", "lowest_confidence"], batch_size: int
+    ) -> int:
+        """
+        schema_type의 사용자 namespace별로 max_items를 넘는 항목을 최대 batch_size개 삭제합니다.
+
+        oldest는 최신 항목을, lowest_confidence는 schema.confidence가 높은 항목을 남깁니다.
+        대상 namespace는 store 전체를 집계하지 않고 store_user_stats의 item_count로 고르며,
+        삭제는 namespace 하나씩 PK(prefix, key) 범위 안에서 처리합니다.
+        item_count에는 아직 sweep되지 않은 만료 항목도 포함되므로, 실제로 초과하지 않은 사용자는 건너뛰고 다음 사용자로 넘어갑니다.
+        """
+        order = {
+            "oldest": sql.SQL("created_at DESC, key"),
+            "lowest_confidence": sql.SQL(
+                "(value->'schema'->>'confidence')::float DESC NULLS LAST, created_at DESC, key"
+            ),
+        }[order_by]
+        delete_excess = sql.SQL(
+            """
+            DELETE FROM store s
+            USING (
+                SELECT key FROM store
+                WHERE prefix = %s AND (expires_at IS NULL OR expires_at > NOW())
+                ORDER BY {order}
+                OFFSET %s
+                LIMIT %s
+            ) excess
+            WHERE s.prefix = %s AND s.key = excess.key
+            """
+        ).format(order=order)
+        memory_type = memory_type_of(schema_type).value
+
+        deleted = 0
+        last_user_id = ""
+        async with self._cursor() as cur:
+            while deleted < batch_size:
+                await cur.execute(
+                    """
+                    SELECT user_id FROM store_user_stats
+                    WHERE schema_type = %s AND item_count > %s AND user_id > %s
+                    ORDER BY user_id
+                    LIMIT %s
+                    """,
+                    (schema_type, max_items, last_user_id, batch_size),
+                )
+                user_ids: list[str] = [row["user_id"] for row in await cur.fetchall()]
+                if not user_ids:
+                    break
+                for user_id in user_ids:
+                    if deleted >= batch_size:
+                        break
+                    prefix = f"{MEMORY_NAMESPACE_ROOT}.{memory_type}.{user_id}.{schema_type}"
+                    await cur.execute(delete_excess, (prefix, max_items, batch_size - deleted, prefix))
+                    deleted += max(cur.rowcount, 0)
+                last_user_id = user_ids[-1]
+        return deleted
+
+    def _changed_index_fields(
+        self, current: dict[str, Any], updated: dict[str, Any], fields: list[tuple[str, Any]] | None = None
+    ) -> list[str]:
+        if not self.index_config:
+            return []
+
+        if fields is None:
+            fields = cast(list[tuple[str, Any]], self.index_config["__tokenized_fields"])  # type: ignore[typeddict-item]
+        return [
+            path for path, tokens in fields if get_text_at_path(current, tokens) != get_text_at_path(updated, tokens)
+        ]
+
+    @asynccontextmanager
+    async def _cursor(self, *, pipeline: bool = False) -> AsyncGenerator[AsyncCursor[DictRow], None]:
+        async with super()._cursor(pipeline=pipeline) as cur:
+            search_params = get_vector_search_params()
+            if not search_params:
+                yield cur
+                return
+
+            for name, value in search_params.items():
+                await cur.execute("SELECT set_config(%s, %s, false)", (name, str(value)))
+            try:
+                yield cur
+            finally:
+                # 풀에 반환되는 커넥션에 세션 설정이 남지 않도록 복원
+                try:
+                    for name in search_params:
+                        await cur.execute(
+                            sql.SQL("RESET {}").format(sql.SQL(".").join(map(sql.Identifier, name.split("."))))
+                        )
+                except Exception as e:
+                    logger.warning("Failed to reset vector search params: %s", e)
+
+    async def _batch_search_ops(
+        self,
+        search_ops: Sequence[tuple[int, SearchOp]],
+        results: list[Any],
+        cur: AsyncCursor[DictRow],
+    ) -> None:
+        queries, embedding_requests = self._prepare_batch_search_queries(search_ops)
+
+        if embedding_requests and self.embeddings:
+            # 배치 검색은 같은 쿼리를 여러 namespace(memory_type, 사용자)에 보내므로 고유한 텍스트만 한 번에 임베딩
+            texts = list(dict.fromkeys(text for _, text in embedding_requests))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Embedding search queries", extra={"ops": len(search_ops), "texts": len(texts)})
+            vectors = dict(zip(texts, await self.embeddings.aembed_documents(texts), strict=True))
+            for idx, text in embedding_requests:
+                params = queries[idx][1]
+                for i, param in enumerate(params):
+                    if param is PLACEHOLDER:
+                        params[i] = vectors[text]
+
+        for (idx, _), (query, params) in zip(search_ops, queries, strict=True):
+            # 쿼리는 langgraph와 이 모듈이 상수와 플레이스홀더로만 조립한 문자열
+            await cur.execute(cast("LiteralString", query), params)
+            rows = await cur.fetchall()
+            results[idx] = [
+                row_to_search_item(decode_ns_bytes(row["prefix"]), row, loader=self._deserializer)  # type: ignore[arg-type]
+                for row in rows
+            ]
+
+    def _prepare_batch_search_queries(
+        self, search_ops: Sequence[tuple[int, SearchOp]]
+    ) -> tuple[list[tuple[str, list[Any]]], list[tuple[int, str]]]:
+        # 필드 가중치는 filter의 예약 키로 전달되므로 SQL filter로 만들어지기 전에 분리
+        field_weights: dict[int, list[tuple[str, str, float]]] = {}
+        ops: list[tuple[int, SearchOp]] = []
+        for idx, (op_idx, op) in enumerate(search_ops):
+            if op.filter and FIELD_WEIGHTS_KEY in op.filter:
+                filter_ = dict(op.filter)
+                weights = filter_.pop(FIELD_WEIGHTS_KEY)
+                op = op._replace(filter=filter_ or None)
+                if op.query and self.index_config:
+                    field_weights[idx] = [tuple(weight) for weight in weights]
+            ops.append((op_idx, op))
+
+        queries, embedding_requests = super()._prepare_batch_search_queries(ops)
 
-async def _ensure_schema_exists(schema_name: str) -> None:
+        settings = get_settings()
+        for idx, _ in embedding_requests:
+            _, op = ops[idx]
+            if idx in field_weights:
+                queries[idx] = self._field_search_query(op, settings, field_weights[idx])
+            elif settings.vector_quantization != "none":
+                queries[idx] = self._quantized_search_query(op, settings)
+
+        if self._partitioned:
+            for idx, (_, op) in enumerate(ops):
+                if op.namespace_prefix:
+                    queries[idx] = _with_partition_bounds(*queries[idx], op.namespace_prefix)
+        return queries, embedding_requests
+
+    def _search_conditions(self, op: SearchOp) -> tuple[str, list[Any]]:
+        """namespace/filter/만료 조건 (store 테이블 기준)"""
+        ns_condition, ns_params = (
+            namespace_prefix_condition(op.namespace_prefix) if op.namespace_prefix else ("TRUE", ())
+        )
+
+        filter_clauses: list[str] = []
+        filter_params: list[Any] = []
+        for key, value in (op.filter or {}).items():
+            if isinstance(value, dict):
+                for op_name, val in cast(dict[str, Any], value).items():
+                    condition, params_ = self._filter_condition(key, op_name, val)
+                    filter_clauses.append(condition)
+                    filter_params.extend(params_)
+            else:
+                filter_clauses.append("value->%s = %s::jsonb")
+                filter_params.extend([key, orjson.dumps(value).decode("utf-8")])
+        extra_filters = " AND " + " AND ".join(filter_clauses) if filter_clauses else ""
+        expiry_clause = "AND (store.expires_at IS NULL OR store.expires_at > NOW())" if self._omit_expired else ""
+        return f"{ns_condition} {extra_filters} {expiry_clause}", [*ns_params, *filter_params]
+
+    def _filter_condition(self, key: str, op: str, value: Any) -> tuple[str, list[Any]]:
+        return self._get_filter_condition(key, op, value)  # pyright: ignore[reportUnknownMemberType, reportUnknownVariableType]
+
+    def _quantized_search_query(self, op: SearchOp, settings: Settings) -> tuple[str, list[Any]]:
+        conditions, condition_params = self._search_conditions(op)
+        candidate_limit = (op.limit + op.offset) * settings.quantization_rerank_factor
+        query = f"""
+            WITH candidates AS (
+                SELECT sv.prefix, sv.key, sv.embedding
+                FROM store_vectors sv
+                JOIN store ON store.prefix = sv.prefix AND store.key = sv.key
+                WHERE {conditions}
+                ORDER BY {candidate_distance_sql(settings, "sv.embedding")}
+                LIMIT %s
+            ),
+            reranked AS (
+                SELECT DISTINCT ON (c.prefix, c.key) c.prefix, c.key, {full_distance_sql(settings, "c.embedding")} AS neg_score
+                FROM candidates c
+                ORDER BY c.prefix, c.key, neg_score ASC
+            )
+            SELECT store.prefix, store.key, store.value, store.created_at, store.updated_at,
+                {score_sql(settings, "r.neg_score")} AS score
+            FROM reranked r
+            JOIN store ON store.prefix = r.prefix AND store.key = r.key
+            ORDER BY score DESC
+            LIMIT %s
+            OFFSET %s
+        """
+        params: list[Any] = [
+            *condition_params,
+            PLACEHOLDER,
+            candidate_limit,
+            PLACEHOLDER,
+            op.limit,
+            op.offset,
+        ]
+        return _with_ttl_refresh(query, op), params
+
+    def _field_search_query(
+        self, op: SearchOp, settings: Settings, weights: list[tuple[str, str, float]]
+    ) -> tuple[str, list[Any]]:
+        """
+        지정한 필드의 벡터만 검색하고, 필드별 최고 유사도를 가중 평균해 score로 사용합니다.
+
+        weights는 (schema_type, 임베딩 경로, 가중치) 목록입니다. 평균은 스키마별로 지정된 필드의 가중치 합으로 나누므로,
+        후보에 들지 못한 필드는 0점으로 계산됩니다.
+        """
+        conditions, condition_params = self._search_conditions(op)
+        totals: dict[str, float] = {}
+        for schema_type, _, weight in weights:
+            totals[schema_type] = totals.get(schema_type, 0.0) + weight
+
+        candidate_limit = (op.limit + op.offset) * len(weights) * settings.quantization_rerank_factor
+        query = f"""
+            WITH candidates AS (
+                SELECT sv.prefix, sv.key, w.path, w.weight, w.total, sv.embedding
+                FROM store_vectors sv
+                JOIN unnest(%s::text[], %s::text[], %s::float8[], %s::float8[]) AS w(schema_type, path, weight, total)
+                    ON split_part(sv.prefix, '.', 4) = w.schema_type
+                    AND regexp_replace(sv.field_name, '\\.[0-9]+$', '') = w.path
+                JOIN store ON store.prefix = sv.prefix AND store.key = sv.key
+                WHERE {conditions}
+                ORDER BY {candidate_distance_sql(settings, "sv.embedding")}
+                LIMIT %s
+            ),
+            per_field AS (
+                SELECT DISTINCT ON (c.prefix, c.key, c.path) c.prefix, c.key, c.weight, c.total,
+                    {full_distance_sql(settings, "c.embedding")} AS neg_score
+                FROM candidates c
+                ORDER BY c.prefix, c.key, c.path, neg_score ASC
+            ),
+            scored AS (
+                SELECT prefix, key, sum(weight * ({score_sql(settings, "neg_score")})) / max(total) AS score
+                FROM per_field
+                GROUP BY prefix, key
+            )
+            SELECT store.prefix, store.key, store.value, store.created_at, store.updated_at, s.score
+            FROM scored s
+            JOIN store ON store.prefix = s.prefix AND store.key = s.key
+            ORDER BY score DESC
+            LIMIT %s
+            OFFSET %s
+        """
+        params: list[Any] = [
+            [schema_type for schema_type, _, _ in weights],
+            [path for _, path, _ in weights],
+            [weight for _, _, weight in weights],
+            [totals[schema_type] for schema_type, _, _ in weights],
+            *condition_params,
+            PLACEHOLDER,
+            candidate_limit,
+            PLACEHOLDER,
+            op.limit,
+            op.offset,
+        ]
+        return _with_ttl_refresh(query, op), params
+
+
+def _with_ttl_refresh(query: str, op: SearchOp) -> str:
+    if not op.refresh_ttl:
+        return query
+    return f"""
+        WITH search_results AS ({query}),
+        updated AS (
+            UPDATE store s
+            SET expires_at = NOW() + (s.ttl_minutes || ' minutes')::interval
+            FROM search_results sr
+            WHERE s.prefix = sr.prefix AND s.key = sr.key AND s.ttl_minutes IS NOT NULL
+        )
+        SELECT sr.prefix, sr.key, sr.value, sr.created_at, sr.updated_at, sr.score
+        FROM search_results sr
+    """
+
+
+def _with_partition_bounds(query: str, params: list[Any], namespace_prefix: tuple[str, ...]) -> tuple[str, list[Any]]:
+    """
+    namespace 조건에 prefix 범위 조건을 추가해 파티션 pruning이 되도록 합니다.
+
+    LIKE 조건으로는 range/hash 파티션이 pruning되지 않으므로, [path, path || '/') 범위(메모리 namespace는 등호)를 함께 지정합니다.
+    (파티션된 store의 prefix는 COLLATE "C"라 '.' 다음 문자인 '/'로 상한을 표현할 수 있음)
+    범위는 기존 조건의 상위 집합이라 결과는 바뀌지 않습니다.
+    """
+    condition, ns_params = namespace_prefix_condition(namespace_prefix)
+    if query.count(condition) != 1:
+        return query, params
+    for i in range(len(params) - 1):
+        if params[i] == ns_params[0] and params[i + 1] == ns_params[1]:
+            break
+    else:
+        return query, params
+
+    path = ns_params[0]
+    if MemoryNamespaceBuilder.parse(namespace_prefix) is not None:
+        # 메모리 namespace 아래에는 하위 namespace가 없으므로 등호 조건으로 hash 하위 파티션까지 pruning
+        bounded, bounds = f"({condition} AND store.prefix = %s)", [path]
+    else:
+        bounded, bounds = f"({condition} AND store.prefix >= %s AND store.prefix < %s)", [path, f"{path}/"]
+    return query.replace(condition, bounded), [*params[: i + 2], *bounds, *params[i + 2 :]]
+
+
+async def ensure_schema_exists(schema_name: str) -> None:
     if schema_name == "public":
         return
 
@@ -48,49 +766,106 @@ def _log_migrations() -> None:
     logger.info("VECTOR MIGRATIONS TO BE EXECUTED:")
     logger.info("=" * 80)
 
-    if hasattr(AsyncPostgresStore, 'VECTOR_MIGRATIONS'):
+    if hasattr(AsyncPostgresStore, "VECTOR_MIGRATIONS"):
         for i, migration in enumerate(AsyncPostgresStore.VECTOR_MIGRATIONS):
             logger.info(f"\n--- Vector Migration {i} ---")
             logger.info(f"SQL: {migration.sql.strip()}")
-            if hasattr(migration, 'params') and migration.params:
+            if hasattr(migration, "params") and migration.params:
                 logger.info(f"Params: {migration.params}")
 
     logger.info("\n" + "=" * 80)
 
 
-async def _init_store() -> AsyncPostgresStore:
+def _open_store(settings: Settings, *, pool: bool = True) -> Any:
+    from app.config.settings import get_pg_store_conn_string
+
+    index_config = build_index_config(settings)
+    if index_config:
+        logger.info(
+            f"Vector index: {settings.vector_index_kind} ({settings.vector_distance}, dims={settings.embedding_dims}, "
+            f"quantization={settings.vector_quantization})"
+        )
+
+    return MemoryStore.from_conn_string(
+        get_pg_store_conn_string(),
+        index=index_config,
+        # 만료된 항목은 sweep 전이라도 조회 결과에서 제외 (삭제는 retention sweeper가 배치로 수행)
+        ttl={"omit_expired": True, "refresh_on_read": False},
+        pool_config={"min_size": settings.db_pool_min_size, "max_size": settings.db_pool_max_size} if pool else None,
+    )
+
+
+async def _run_store_setup(store: MemoryStore, settings: Settings) -> None:
+    logger.info("=" * 80)
+    logger.info("Executing store.setup()")
+    logger.info("=" * 80)
+
+    await store.setup()
+    if store.index_config:
+        await ensure_quantized_index(settings)
+
+    logger.info("=" * 80)
+    logger.info("store.setup() completed successfully")
+    logger.info(f"Tables created in schema: {settings.store_schema}")
+    logger.info("=" * 80)
+
+
+async def migrate_store() -> bool:
+    """
+    store 마이그레이션(setup)을 단일 커넥션으로 한 번 실행합니다.
+
+    배포 단계(`python -m app.cli migrate`)나 워커를 fork하기 전의 master에서 실행하며,
+    이후 이 프로세스와 fork된 워커의 store 초기화는 setup()을 건너뜁니다. memory store는 마이그레이션이 없습니다.
+    """
+    global _store_migrated
+    from app.config.settings import get_settings
+
+    settings = get_settings()
+    if settings.store_backend == "memory":
+        return False
+
+    await ensure_schema_exists(settings.store_schema)
+    _log_migrations()
+    async with _open_store(settings, pool=False) as store:
+        await _run_store_setup(store, settings)
+    _store_migrated = True
+    return True
+
+
+async def _init_store() -> MemoryStoreBase:
     global _store_instance, _store_cm
     if _store_instance is None:
         from app.config.settings import get_pg_store_conn_string, get_settings
 
         settings = get_settings()
+        if settings.store_backend == "memory":
+            from app.infrastructure.memory_store import create_memory_store
+
+            _store_instance = create_memory_store(settings)
+            return _store_instance
+
         conn_string = get_pg_store_conn_string()
 
         logger.info("=" * 80)
         logger.info("Initializing AsyncPostgresStore")
         logger.info(f"Schema: {settings.store_schema}")
-        masked_conn = conn_string.split('@')[0].split('//')[1] if '@' in conn_string else '***'
+        masked_conn = conn_string.split("@")[0].split("//")[1] if "@" in conn_string else "***"
         logger.info(f"Connection String: {conn_string.replace(masked_conn, '***')}")
         logger.info("=" * 80)
 
-        await _ensure_schema_exists(settings.store_schema)
-
-        _log_migrations()
-
-        _store_cm = AsyncPostgresStore.from_conn_string(conn_string)
+        migrate = settings.migrate_on_startup and not _store_migrated
+        if migrate:
+            await ensure_schema_exists(settings.store_schema)
+            _log_migrations()
 
+        _store_cm = _open_store(settings)
         store = await _store_cm.__aenter__()  # type: ignore[union-attr]
 
-        logger.info("=" * 80)
-        logger.info("Executing store.setup()")
-        logger.info("=" * 80)
-
-        await store.setup()  # type: ignore[union-attr]
-
-        logger.info("=" * 80)
-        logger.info("store.setup() completed successfully")
-        logger.info(f"Tables created in schema: {settings.store_schema}")
-        logger.info("=" * 80)
+        if migrate:
+            await _run_store_setup(store, settings)
+        else:
+            await store.detect_partitioning()
+            logger.info("Skipping store.setup() (migrations already applied)")
 
         _store_instance = store
         logger.info("AsyncPostgresStore initialized with connection pool (singleton)")
@@ -99,7 +874,7 @@ async def _init_store() -> AsyncPostgresStore:
     return _store_instance
 
 
-async def get_store() -> AsyncPostgresStore:
+async def get_store() -> MemoryStoreBase:
     """
     Usage:
         store = await get_store()
@@ -108,3 +883,29 @@ async def get_store() -> AsyncPostgresStore:
     return await _init_store()
 
 
+async def close_store() -> None:
+    """memory store는 스냅샷을 저장하고, Postgres store는 커넥션 풀을 닫습니다. (lifespan 종료 시)"""
+    global _store_instance, _store_cm
+    if _store_instance is None:
+        return
+    if _store_cm is not None:
+        await _store_cm.__aexit__(None, None, None)
+    else:
+        await _store_instance.aclose()  # type: ignore[attr-defined]
+    _store_instance = None
+    _store_cm = None
+
+
+def _reset_after_fork() -> None:
+    """
+    fork된 자식 프로세스는 부모의 커넥션 풀을 닫지 않고 버립니다.
+
+    풀의 소켓은 부모와 공유되므로 자식에서 닫거나 사용하면 부모의 커넥션이 깨집니다.
+    자식은 처음 get_store()를 호출할 때 자신의 풀을 엽니다. (_store_migrated는 유지)
+    """
+    global _store_instance, _store_cm
+    _store_instance = None
+    _store_cm = None
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from abc import abstractmethod
+from collections.abc import Callable, Sequence
+from datetime import datetime
+from typing import Any, Literal
+
+from langgraph.store.base import BaseStore
+
+
+class MemoryStoreBase(BaseStore):
+    """
+    MemoryRepository가 사용하는 store 인터페이스
+
+    langgraph BaseStore에 read-modify-write, keyset 조회, 보존 정책, 사용량/버전 메서드를 더합니다.
+    MemoryStore(Postgres)와 IndexedMemoryStore(memory)가 구현합니다.
+    """
+
+    @abstractmethod
+    async def aupdate(
+        self,
+        namespace: tuple[str, ...],
+        key: str,
+        update: Callable[[dict[str, Any]], dict[str, Any]],
+        index: list[str] | None = None,
+        delete_keys: Sequence[str] = (),
+    ) -> dict[str, Any] | None: ...
+
+    @abstractmethod
+    async def alist_changed(
+        self,
+        namespace_prefix: tuple[str, ...],
+        since: datetime | None = None,
+        after: tuple[tuple[str, ...], str] | None = None,
+        limit: int = 1000,
+    ) -> list[tuple[tuple[str, ...], str, datetime]]: ...
+
+    @abstractmethod
+    async def alist_namespace(
+        self, namespace: tuple[str, ...], after_key: str = "", limit: int = 1000
+    ) -> list[tuple[str, dict[str, Any]]]: ...
+
+    @abstractmethod
+    async def ausage(self, user_id: str) -> list[dict[str, Any]]: ...
+
+    @abstractmethod
+    async def aversion(self, user_id: str) -> int: ...
+
+    @abstractmethod
+    async def anext_expiry(self, user_id: str) -> datetime | None: ...
+
+    @abstractmethod
+    async def asweep_expired(self, batch_size: int) -> int: ...
+
+    @abstractmethod
+    async def abackfill_ttl(self, prefix_pattern: str, ttl_minutes: float, batch_size: int) -> int: ...
+
+    @abstractmethod
+    async def aevict_over_limit(
+        self, schema_type: str, max_items: int, order_by: Literal["oldest", "lowest_confidence"], batch_size: int
+    ) -> int: ...
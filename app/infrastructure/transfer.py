@@ -0,0 +1,409 @@
+from __future__ import annotations
+
+import logging
+from collections.abc import AsyncIterable, AsyncIterator
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Literal, cast
+
+import orjson
+import psycopg
+from langgraph.store.base.embed import get_text_at_path
+from psycopg.rows import DictRow, dict_row
+from psycopg.types.json import Jsonb
+
+from app.config.settings import Settings, get_pg_store_conn_string, get_settings
+from app.core.namespace_builder import MEMORY_NAMESPACE_ROOT, MemoryNamespaceBuilder, memory_type_of
+from app.infrastructure.embeddings import (
+    EmbeddingExecutor,
+    create_embedding_executor,
+    get_embeddings,
+    index_fields_for,
+    tokenize_fields,
+)
+from app.infrastructure.langgraph_compat import escape_like_literal
+from app.infrastructure.msgpack_codec import VECTOR_ENCODING, pack_vector, packb, unpack_vector
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMAT = "agent-ltm-memories"
+EXPORT_FORMAT_VERSION = 1
+
+ExportEncoding = Literal["jsonl", "msgpack"]
+
+_MAX_REPORTED_ERRORS = 20
+
+_EXPORT_SQL = """
+    SELECT s.prefix, s.key, s.value, s.created_at, s.updated_at, s.expires_at, s.ttl_minutes
+    FROM store s
+    WHERE s.prefix LIKE %(pattern)s
+      AND (s.expires_at IS NULL OR s.expires_at > NOW())
+    ORDER BY s.prefix, s.key
+"""
+
+# embedding::text는 vector/halfvec 모두 '[0.1,0.2,...]' 형식이라 그대로 jsonb 배열로 변환 가능
+_EXPORT_WITH_VECTORS_SQL = """
+    SELECT s.prefix, s.key, s.value, s.created_at, s.updated_at, s.expires_at, s.ttl_minutes, v.vectors
+    FROM store s
+    LEFT JOIN LATERAL (
+        SELECT jsonb_object_agg(sv.field_name, sv.embedding::text::jsonb) AS vectors
+        FROM store_vectors sv
+        WHERE sv.prefix = s.prefix AND sv.key = s.key
+    ) v ON true
+    WHERE s.prefix LIKE %(pattern)s
+      AND (s.expires_at IS NULL OR s.expires_at > NOW())
+    ORDER BY s.prefix, s.key
+"""
+
+# ON COMMIT DELETE ROWS: 배치 트랜잭션마다 비워지므로 세션 동안 재사용
+_CREATE_IMPORT_TABLES_SQL = """
+    CREATE TEMP TABLE IF NOT EXISTS memory_import (LIKE store INCLUDING DEFAULTS) ON COMMIT DELETE ROWS;
+"""
+_CREATE_IMPORT_VECTORS_TABLE_SQL = """
+    CREATE TEMP TABLE IF NOT EXISTS memory_import_vectors (LIKE store_vectors INCLUDING DEFAULTS) ON COMMIT DELETE ROWS;
+"""
+
+_COPY_IMPORT_SQL = "COPY memory_import (prefix, key, value, created_at, updated_at, expires_at, ttl_minutes) FROM STDIN"
+_COPY_IMPORT_VECTORS_SQL = "COPY memory_import_vectors (prefix, key, field_name, embedding) FROM STDIN"
+
+_MERGE_IMPORT_SQL = """
+    INSERT INTO store (prefix, key, value, created_at, updated_at, expires_at, ttl_minutes)
+    SELECT prefix, key, value, COALESCE(created_at, NOW()), COALESCE(updated_at, NOW()), expires_at, ttl_minutes
+    FROM memory_import
+    WHERE expires_at IS NULL OR expires_at > NOW()
+    ON CONFLICT (prefix, key) DO {action}
+    RETURNING prefix, key
+"""
+_UPSERT_ACTION = """UPDATE
+    SET value = EXCLUDED.value,
+        updated_at = EXCLUDED.updated_at,
+        expires_at = EXCLUDED.expires_at,
+        ttl_minutes = EXCLUDED.ttl_minutes"""
+
+_DELETE_VECTORS_SQL = """
+    DELETE FROM store_vectors
+    WHERE (prefix, key) IN (SELECT * FROM unnest(%s::text[], %s::text[]))
+"""
+_MERGE_VECTORS_SQL = """
+    INSERT INTO store_vectors (prefix, key, field_name, embedding)
+    SELECT prefix, key, field_name, embedding FROM memory_import_vectors
+    ON CONFLICT (prefix, key, field_name) DO UPDATE
+    SET embedding = EXCLUDED.embedding, updated_at = CURRENT_TIMESTAMP
+"""
+
+
+def prefix_pattern(user_id: str | None = None, schema_type: str | None = None) -> str:
+    """("memory", memory_type, user_id, schema_type) namespace 중 내보낼 범위의 LIKE 패턴"""
+    memory_type = memory_type_of(schema_type).value if schema_type else "%"
+    user = escape_like_literal(user_id) if user_id else "%"
+    schema = escape_like_literal(schema_type) if schema_type else "%"
+    return f"{MEMORY_NAMESPACE_ROOT}.{memory_type}.{user}.{schema}"
+
+
+def encode_line(record: dict[str, Any]) -> bytes:
+    return orjson.dumps(record) + b"\n"
+
+
+def encode_msgpack(record: dict[str, Any]) -> bytes:
+    """MessagePack 객체 하나. 벡터는 float 배열 대신 float32 little-endian bin으로 담음"""
+    if record.get("vectors"):
+        record = {**record, "vectors": {name: pack_vector(vector) for name, vector in record["vectors"].items()}}
+    return packb(record)
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    """임의 크기의 바이트 청크(HTTP body, 파일)를 줄 단위로 분리. 빈 줄은 건너뜀"""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if buffer.strip():
+        yield buffer
+
+
+def _export_header(settings: Settings, include_vectors: bool, encoding: ExportEncoding = "jsonl") -> dict[str, Any]:
+    header = {
+        "format": EXPORT_FORMAT,
+        "version": EXPORT_FORMAT_VERSION,
+        "exported_at": datetime.now(timezone.utc).isoformat(),
+        "include_vectors": include_vectors,
+        "embedding_model": settings.embedding_model,
+        "embedding_dims": settings.embedding_dims,
+        "embedding_version": settings.embedding_version,
+    }
+    if encoding == "msgpack":
+        header["vector_encoding"] = VECTOR_ENCODING
+    return header
+
+
+def _row_to_record(row: DictRow) -> dict[str, Any]:
+    record: dict[str, Any] = {
+        "namespace": row["prefix"].split("."),
+        "key": row["key"],
+        "value": row["value"],
+        "created_at": row["created_at"],
+        "updated_at": row["updated_at"],
+        "expires_at": row["expires_at"],
+        "ttl_minutes": row["ttl_minutes"],
+    }
+    if row.get("vectors"):
+        record["vectors"] = row["vectors"]
+    return record
+
+
+async def export_memories(
+    user_id: str | None = None,
+    schema_type: str | None = None,
+    include_vectors: bool = False,
+    batch_size: int | None = None,
+    encoding: ExportEncoding = "jsonl",
+) -> AsyncIterator[bytes]:
+    """
+    메모리를 JSONL로 내보냅니다. 첫 줄은 포맷/임베딩 정보 헤더, 이후 한 줄에 메모리 하나입니다.
+    encoding="msgpack"이면 같은 레코드를 연속된 MessagePack 객체로 내보냅니다. (벡터는 float32 bin)
+
+    server-side cursor로 batch_size개씩 읽으므로 전체 크기와 무관하게 메모리 사용량이 일정합니다.
+    만료된 항목은 제외됩니다.
+    """
+    settings = get_settings()
+    batch_size = batch_size or settings.transfer_batch_size
+    include_vectors = include_vectors and get_embeddings() is not None
+    encode = encode_msgpack if encoding == "msgpack" else encode_line
+
+    yield encode(_export_header(settings, include_vectors, encoding))
+
+    query = _EXPORT_WITH_VECTORS_SQL if include_vectors else _EXPORT_SQL
+    exported = 0
+    async with await psycopg.AsyncConnection[DictRow].connect(get_pg_store_conn_string(), row_factory=dict_row) as conn:
+        # named cursor는 트랜잭션 안에서만 유지되므로 export 전체를 하나의 읽기 트랜잭션으로 실행
+        async with conn.transaction(), conn.cursor(name="memory_export") as cur:
+            await cur.execute(query, {"pattern": prefix_pattern(user_id, schema_type)})
+            while rows := await cur.fetchmany(batch_size):
+                exported += len(rows)
+                yield b"".join(encode(_row_to_record(row)) for row in rows)
+
+    logger.info(
+        "Exported %d memories (user=%s, schema=%s, vectors=%s)", exported, user_id, schema_type, include_vectors
+    )
+
+
+@dataclass
+class ImportReport:
+    mode: str
+    read: int = 0
+    written: int = 0
+    skipped: int = 0
+    invalid: int = 0
+    vectors_imported: int = 0
+    embedded: int = 0
+    errors: list[str] = field(default_factory=list[str])
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    def add_error(self, message: str) -> None:
+        self.invalid += 1
+        if len(self.errors) < _MAX_REPORTED_ERRORS:
+            self.errors.append(message)
+
+
+class MemoryImporter:
+    """
+    export_memories가 만든 JSONL을 batch_size개씩 COPY로 임시 테이블에 적재한 뒤 store에 병합합니다.
+
+    - mode="upsert": 같은 (namespace, key)가 있으면 덮어씀 / mode="skip": 기존 항목 유지
+    - 헤더의 임베딩 모델/차원이 현재 설정과 같으면 벡터를 그대로 COPY
+    - 벡터가 없거나 호환되지 않는 항목은 현재 모델로 임베딩 (EmbeddingExecutor 동시성 제한 적용)
+    """
+
+    def __init__(
+        self,
+        mode: Literal["upsert", "skip"] = "upsert",
+        batch_size: int | None = None,
+        executor: EmbeddingExecutor | None = None,
+        settings: Settings | None = None,
+    ) -> None:
+        self._settings = settings or get_settings()
+        self._mode = mode
+        self._batch_size = batch_size or self._settings.transfer_batch_size
+        embeddings = get_embeddings()
+        self._indexed = embeddings is not None
+        self._executor = executor or (create_embedding_executor(embeddings) if self._indexed else None)
+        self._tokenized_fields = tokenize_fields(self._settings.embedding_fields)
+        self._vectors_compatible = False
+
+    async def run(self, lines: AsyncIterable[bytes] | AsyncIterable[Any]) -> ImportReport:
+        """lines는 JSONL 줄(bytes) 또는 이미 디코딩된 레코드(MessagePack 스트림)입니다."""
+        report = ImportReport(mode=self._mode)
+        async with await psycopg.AsyncConnection[DictRow].connect(
+            get_pg_store_conn_string(), autocommit=True, row_factory=dict_row
+        ) as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(_CREATE_IMPORT_TABLES_SQL)
+                if self._indexed:
+                    await cur.execute(_CREATE_IMPORT_VECTORS_TABLE_SQL)
+
+            batch: dict[tuple[str, str], dict[str, Any]] = {}
+            line_no = 0
+            async for line in lines:
+                line_no += 1
+                if isinstance(line, bytes):
+                    record = self._parse_line(line, line_no, report)
+                else:
+                    record = self._parse_record(line, line_no, report)
+                if record is None:
+                    continue
+                report.read += 1
+                # 같은 배치 안의 중복 키는 ON CONFLICT가 처리할 수 없으므로 마지막 항목만 유지
+                batch[(".".join(record["namespace"]), record["key"])] = record
+                if len(batch) >= self._batch_size:
+                    await self._write_batch(conn, batch, report)
+                    batch = {}
+            if batch:
+                await self._write_batch(conn, batch, report)
+
+        report.skipped = report.read - report.written
+        logger.info(
+            "Imported memories: read=%d written=%d skipped=%d invalid=%d vectors=%d embedded=%d",
+            report.read,
+            report.written,
+            report.skipped,
+            report.invalid,
+            report.vectors_imported,
+            report.embedded,
+        )
+        return report
+
+    def _parse_line(self, line: bytes, line_no: int, report: ImportReport) -> dict[str, Any] | None:
+        try:
+            record = orjson.loads(line)
+        except orjson.JSONDecodeError as e:
+            report.add_error(f"line {line_no}: invalid JSON ({e})")
+            return None
+        return self._parse_record(record, line_no, report)
+
+    def _parse_record(self, raw: Any, line_no: int, report: ImportReport) -> dict[str, Any] | None:
+        if not isinstance(raw, dict):
+            report.add_error(f"line {line_no}: record must be an object")
+            return None
+        record = cast(dict[str, Any], raw)
+
+        if "format" in record:
+            if record["format"] != EXPORT_FORMAT or record.get("version") != EXPORT_FORMAT_VERSION:
+                raise ValueError(f"Unsupported export format: {record.get('format')} v{record.get('version')}")
+            self._vectors_compatible = (
+                self._indexed
+                and record.get("embedding_model") == self._settings.embedding_model
+                and record.get("embedding_dims") == self._settings.embedding_dims
+            )
+            if record.get("include_vectors") and not self._vectors_compatible:
+                logger.warning("Export embedding model/dims differ from current settings; vectors will be recomputed")
+            return None
+
+        namespace = cast(list[Any], record["namespace"]) if isinstance(record.get("namespace"), list) else None
+        key: Any = record.get("key")
+        value: Any = record.get("value")
+        if namespace is not None and len(namespace) == 3 and namespace[0] == MEMORY_NAMESPACE_ROOT:
+            # memory_type 도입 이전 export: ("memory", user_id, schema_type)
+            record["namespace"] = namespace = list(MemoryNamespaceBuilder.for_memory(namespace[1], namespace[2]))
+        if namespace is None or MemoryNamespaceBuilder.parse(tuple(namespace)) is None:
+            report.add_error(f"line {line_no}: namespace must be ['memory', memory_type, user_id, schema_type]")
+            return None
+        if not isinstance(key, str) or not isinstance(value, dict):
+            report.add_error(f"line {line_no}: key must be a string and value an object")
+            return None
+        vectors: Any = record.get("vectors")
+        if isinstance(vectors, dict):
+            # MessagePack export의 벡터는 float32 bin
+            record["vectors"] = {
+                name: unpack_vector(vector) if isinstance(vector, bytes) else vector
+                for name, vector in cast(dict[str, Any], vectors).items()
+            }
+        return record
+
+    async def _write_batch(
+        self,
+        conn: psycopg.AsyncConnection[DictRow],
+        batch: dict[tuple[str, str], dict[str, Any]],
+        report: ImportReport,
+    ) -> None:
+        to_embed: dict[tuple[str, str], dict[str, Any]] = {}
+        vector_rows: list[tuple[str, str, str, str]] = []
+        for (prefix, key), record in batch.items():
+            vectors = record.get("vectors") if self._vectors_compatible else None
+            if vectors:
+                vector_rows.extend(
+                    (prefix, key, name, orjson.dumps(vector).decode()) for name, vector in vectors.items()
+                )
+            elif self._indexed:
+                # 현재 모델로 임베딩되므로 버전 태그도 현재 값으로 교체
+                record["value"] = {**record["value"], "embedding_version": self._settings.embedding_version}
+                to_embed[(prefix, key)] = record
+
+        action = _UPSERT_ACTION if self._mode == "upsert" else "NOTHING"
+        async with conn.transaction(), conn.cursor() as cur:
+            async with cur.copy(_COPY_IMPORT_SQL) as copy:
+                for (prefix, key), record in batch.items():
+                    await copy.write_row(
+                        (
+                            prefix,
+                            key,
+                            Jsonb(record["value"]),
+                            record.get("created_at"),
+                            record.get("updated_at"),
+                            record.get("expires_at"),
+                            record.get("ttl_minutes"),
+                        )
+                    )
+            await cur.execute(_MERGE_IMPORT_SQL.format(action=action))
+            written = {(row["prefix"], row["key"]) for row in await cur.fetchall()}
+            report.written += len(written)
+
+            if self._indexed and written:
+                prefixes, keys = zip(*written, strict=True)
+                await cur.execute(_DELETE_VECTORS_SQL, (list(prefixes), list(keys)))
+                vector_rows = [row for row in vector_rows if (row[0], row[1]) in written]
+                report.vectors_imported += await self._copy_vectors(cur, vector_rows)
+
+        # 임베딩 API 호출 동안 트랜잭션을 열어두지 않도록 store 반영 후 별도 트랜잭션으로 기록
+        to_embed = {target: record for target, record in to_embed.items() if target in written}
+        if to_embed:
+            embedded_rows = await self._embed(to_embed)
+            async with conn.transaction(), conn.cursor() as cur:
+                await self._copy_vectors(cur, embedded_rows)
+            report.embedded += len(to_embed)
+
+    async def _embed(self, records: dict[tuple[str, str], dict[str, Any]]) -> list[tuple[str, str, str, str]]:
+        texts: list[str] = []
+        targets: list[tuple[str, str, str]] = []
+        for (prefix, key), record in records.items():
+            for path, tokens in index_fields_for(record["value"], self._tokenized_fields):
+                field_texts = get_text_at_path(record["value"], tokens)
+                for i, text in enumerate(field_texts):
+                    texts.append(text)
+                    targets.append((prefix, key, f"{path}.{i}" if len(field_texts) > 1 else path))
+
+        vectors = await self._executor.embed_documents(texts)  # type: ignore[union-attr]
+        return [(*target, orjson.dumps(vector).decode()) for target, vector in zip(targets, vectors, strict=True)]
+
+    async def _copy_vectors(self, cur: psycopg.AsyncCursor[Any], rows: list[tuple[str, str, str, str]]) -> int:
+        if not rows:
+            return 0
+        # 텍스트 COPY는 vector 타입 입력 함수로 '[...]' 리터럴을 그대로 파싱
+        async with cur.copy(_COPY_IMPORT_VECTORS_SQL) as copy:
+            for row in rows:
+                await copy.write_row(row)
+        await cur.execute(_MERGE_VECTORS_SQL)
+        return len(rows)
+
+
+async def import_memories(
+    lines: AsyncIterable[bytes] | AsyncIterable[Any],
+    mode: Literal["upsert", "skip"] = "upsert",
+    batch_size: int | None = None,
+) -> dict[str, Any]:
+    report = await MemoryImporter(mode=mode, batch_size=batch_size).run(lines)
+    return report.to_dict()
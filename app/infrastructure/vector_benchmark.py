@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import statistics
+import time
+from typing import TYPE_CHECKING, Any, cast
+
+import psycopg
+
+from app.config.settings import Settings, get_pg_store_conn_string, get_settings
+from app.infrastructure.vector_index import VECTOR_TABLE, candidate_distance_sql, full_distance_sql
+
+if TYPE_CHECKING:
+    from typing_extensions import LiteralString
+
+
+def _percentile(values: list[float], q: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100)[q - 1]
+
+
+async def benchmark_vector_search(
+    num_queries: int = 50,
+    k: int = 10,
+    ef_search: int | None = None,
+    probes: int | None = None,
+    settings: Settings | None = None,
+) -> dict[str, Any]:
+    """
+    저장된 벡터를 쿼리로 샘플링해 현재 인덱스/양자화 설정의 recall@k와 지연 시간을 측정합니다.
+
+    정답 셋은 인덱스를 끈 full-precision 정확 검색(seq scan) 결과입니다.
+    """
+    settings = settings or get_settings()
+    full = full_distance_sql(settings)
+    if settings.vector_quantization == "none":
+        approx_query = f"SELECT prefix, key, field_name FROM {VECTOR_TABLE} ORDER BY {full} LIMIT %s"
+    else:
+        approx_query = f"""
+            SELECT prefix, key, field_name FROM (
+                SELECT prefix, key, field_name, embedding FROM {VECTOR_TABLE}
+                ORDER BY {candidate_distance_sql(settings)}
+                LIMIT %s
+            ) candidates
+            ORDER BY {full}
+            LIMIT %s
+        """
+    exact_query = f"SELECT prefix, key, field_name FROM {VECTOR_TABLE} ORDER BY {full} LIMIT %s"
+    # 테이블 이름과 설정에서 만든 거리 식만 들어간 쿼리
+    approx_sql, exact_sql = cast("LiteralString", approx_query), cast("LiteralString", exact_query)
+
+    recalls: list[float] = []
+    approx_ms: list[float] = []
+    exact_ms: list[float] = []
+
+    async with await psycopg.AsyncConnection.connect(get_pg_store_conn_string(), autocommit=True) as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                f"SELECT embedding::real[] FROM {VECTOR_TABLE} ORDER BY random() LIMIT %s",
+                (num_queries,),
+            )
+            query_vectors = [row[0] for row in await cur.fetchall()]
+
+            if ef_search is not None:
+                await cur.execute("SELECT set_config('hnsw.ef_search', %s, false)", (str(ef_search),))
+            if probes is not None:
+                await cur.execute("SELECT set_config('ivfflat.probes', %s, false)", (str(probes),))
+
+            for vector in query_vectors:
+                approx_params: tuple[Any, ...] = (
+                    (vector, k)
+                    if settings.vector_quantization == "none"
+                    else (vector, k * settings.quantization_rerank_factor, vector, k)
+                )
+                start = time.perf_counter()
+                await cur.execute(approx_sql, approx_params)
+                approx = {tuple(row) for row in await cur.fetchall()}
+                approx_ms.append((time.perf_counter() - start) * 1000)
+
+                async with conn.transaction():
+                    await cur.execute("SET LOCAL enable_indexscan = off")
+                    start = time.perf_counter()
+                    await cur.execute(exact_sql, (vector, k))
+                    exact = {tuple(row) for row in await cur.fetchall()}
+                    exact_ms.append((time.perf_counter() - start) * 1000)
+
+                if exact:
+                    recalls.append(len(approx & exact) / len(exact))
+
+            await cur.execute(
+                """
+                SELECT indexname, indexdef, pg_relation_size(format('%%I.%%I', schemaname, indexname)::regclass)
+                FROM pg_indexes
+                WHERE tablename = %s
+                ORDER BY indexname
+                """,
+                (VECTOR_TABLE,),
+            )
+            indexes = [
+                {"name": name, "definition": definition, "size_bytes": size}
+                for name, definition, size in await cur.fetchall()
+            ]
+            await cur.execute("SELECT pg_table_size(%s::regclass)", (VECTOR_TABLE,))
+            table_row = await cur.fetchone()
+
+    return {
+        "index_kind": settings.vector_index_kind,
+        "quantization": settings.vector_quantization,
+        "queries": len(recalls),
+        "k": k,
+        "recall_at_k": round(statistics.fmean(recalls), 4) if recalls else None,
+        "approx_latency_ms": {"p50": round(_percentile(approx_ms, 50), 3), "p95": round(_percentile(approx_ms, 95), 3)},
+        "exact_latency_ms": {"p50": round(_percentile(exact_ms, 50), 3), "p95": round(_percentile(exact_ms, 95), 3)},
+        "table_size_bytes": table_row[0] if table_row else None,
+        "indexes": indexes,
+    }
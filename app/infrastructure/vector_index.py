@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Generator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any, cast
+
+import psycopg
+from psycopg import sql
+
+from app.config.settings import Settings, get_pg_store_conn_string, get_settings
+
+if TYPE_CHECKING:
+    from typing_extensions import LiteralString
+
+logger = logging.getLogger(__name__)
+
+VECTOR_TABLE = "store_vectors"
+VECTOR_INDEX_NAME = "store_vectors_embedding_idx"
+
+_OPS_BY_DISTANCE: dict[str, LiteralString] = {
+    "cosine": "cosine_ops",
+    "l2": "l2_ops",
+    "inner_product": "ip_ops",
+}
+
+_OPERATOR_BY_DISTANCE = {
+    "cosine": "<=>",
+    "l2": "<->",
+    "inner_product": "<#>",
+}
+
+# neg_score(ASC 정렬용 거리)를 사용자에게 반환하는 score로 변환
+_SCORE_BY_DISTANCE = {
+    "cosine": "1 - {neg_score}",
+    "l2": "-{neg_score}",
+    "inner_product": "-({neg_score})",
+}
+
+# 검색 시 적용할 pgvector 세션 파라미터 (GUC 이름 -> 값)
+_search_params: ContextVar[dict[str, int] | None] = ContextVar("vector_search_params", default=None)
+
+
+@contextmanager
+def vector_search_params(
+    ef_search: int | None = None, probes: int | None = None
+) -> Generator[dict[str, int], None, None]:
+    params: dict[str, int] = {}
+    if ef_search is not None:
+        params["hnsw.ef_search"] = ef_search
+    if probes is not None:
+        params["ivfflat.probes"] = probes
+
+    token = _search_params.set(params or None)
+    try:
+        yield params
+    finally:
+        _search_params.reset(token)
+
+
+def get_vector_search_params() -> dict[str, int] | None:
+    return _search_params.get()
+
+
+def ann_index_config(settings: Settings) -> dict[str, Any]:
+    if settings.vector_quantization != "none":
+        # 양자화 인덱스는 expression index로 직접 관리하므로 langgraph 마이그레이션이 full-precision 인덱스를 만들지 않게 함
+        return {"kind": "flat"}
+    if settings.vector_index_kind == "hnsw":
+        return {"kind": "hnsw", "m": settings.hnsw_m, "ef_construction": settings.hnsw_ef_construction}
+    if settings.vector_index_kind == "ivfflat":
+        return {"kind": "ivfflat", "nlist": settings.ivfflat_lists}
+    return {"kind": "flat"}
+
+
+def index_build_params(settings: Settings) -> dict[LiteralString, int]:
+    if settings.vector_index_kind == "hnsw":
+        return {"m": settings.hnsw_m, "ef_construction": settings.hnsw_ef_construction}
+    if settings.vector_index_kind == "ivfflat":
+        return {"lists": settings.ivfflat_lists}
+    return {}
+
+
+def indexed_expression(settings: Settings, column: str = "embedding") -> str:
+    dims = settings.embedding_dims
+    if settings.vector_quantization == "halfvec":
+        return f"({column})::halfvec({dims})"
+    if settings.vector_quantization == "binary":
+        return f"binary_quantize({column})::bit({dims})"
+    return column
+
+
+def _index_ops(settings: Settings) -> LiteralString:
+    if settings.vector_quantization == "binary":
+        return "bit_hamming_ops"
+    prefix = "halfvec" if settings.vector_quantization == "halfvec" else "vector"
+    return f"{prefix}_{_OPS_BY_DISTANCE[settings.vector_distance]}"
+
+
+def candidate_distance_sql(settings: Settings, column: str = "embedding") -> str:
+    """인덱스를 탈 수 있는 (양자화된) 거리 식. 쿼리 벡터 자리에 %s 하나를 사용합니다."""
+    dims = settings.embedding_dims
+    if settings.vector_quantization == "halfvec":
+        return f"{indexed_expression(settings, column)} {_OPERATOR_BY_DISTANCE[settings.vector_distance]} %s::halfvec({dims})"
+    if settings.vector_quantization == "binary":
+        return f"{indexed_expression(settings, column)} <~> binary_quantize(%s::vector)"
+    return full_distance_sql(settings, column)
+
+
+def full_distance_sql(settings: Settings, column: str = "embedding") -> str:
+    return f"{column} {_OPERATOR_BY_DISTANCE[settings.vector_distance]} %s::vector"
+
+
+def score_sql(settings: Settings, neg_score: str) -> str:
+    return _SCORE_BY_DISTANCE[settings.vector_distance].format(neg_score=neg_score)
+
+
+def build_index_sql(settings: Settings, index_name: str = VECTOR_INDEX_NAME, table: str = VECTOR_TABLE) -> sql.Composed:
+    params = index_build_params(settings)
+    with_clause = sql.SQL("")
+    if params:
+        with_clause = sql.SQL(" WITH ({})").format(
+            sql.SQL(", ").join(sql.SQL("{} = {}").format(sql.SQL(k), sql.Literal(v)) for k, v in params.items())
+        )
+
+    expression = indexed_expression(settings)
+    if expression != "embedding":
+        expression = f"({expression})"
+
+    return sql.SQL(
+        "CREATE INDEX CONCURRENTLY {index} ON {table} USING {kind} ({expression} {ops}){with_clause}"
+    ).format(
+        index=sql.Identifier(index_name),
+        table=sql.Identifier(table),
+        kind=sql.SQL(settings.vector_index_kind),
+        # 컬럼 이름, 양자화 설정과 정수 차원으로만 만든 식
+        expression=sql.SQL(cast("LiteralString", expression)),
+        ops=sql.SQL(_index_ops(settings)),
+        with_clause=with_clause,
+    )
+
+
+async def describe_vector_index() -> dict[str, Any] | None:
+    async with await psycopg.AsyncConnection.connect(get_pg_store_conn_string(), autocommit=True) as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                """
+                SELECT indexdef, pg_relation_size(format('%%I.%%I', schemaname, indexname)::regclass) AS size_bytes
+                FROM pg_indexes
+                WHERE tablename = %s AND indexname = %s
+                """,
+                (VECTOR_TABLE, VECTOR_INDEX_NAME),
+            )
+            row = await cur.fetchone()
+    if row is None:
+        return None
+    return {"name": VECTOR_INDEX_NAME, "definition": row[0], "size_bytes": row[1]}
+
+
+async def _set_maintenance_work_mem(cur: psycopg.AsyncCursor[Any], settings: Settings) -> None:
+    if settings.vector_index_maintenance_work_mem:
+        await cur.execute(
+            "SELECT set_config('maintenance_work_mem', %s, false)",
+            (settings.vector_index_maintenance_work_mem,),
+        )
+
+
+async def ensure_quantized_index(settings: Settings | None = None) -> bool:
+    """
+    양자화 설정에서 벡터 인덱스가 없으면 expression index를 동시(CONCURRENTLY) 생성합니다.
+
+    양자화 인덱스는 langgraph 마이그레이션이 만들지 않으므로 store setup 직후 호출합니다.
+    이미 인덱스가 있으면 (예: 양자화를 켜기 전의 full-precision 인덱스) 그대로 두며, 모드 전환은 rebuild-index로 합니다.
+    """
+    settings = settings or get_settings()
+    if settings.vector_quantization == "none" or settings.vector_index_kind == "flat":
+        return False
+
+    async with await psycopg.AsyncConnection.connect(get_pg_store_conn_string(), autocommit=True) as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                "SELECT 1 FROM pg_indexes WHERE tablename = %s AND indexname = %s",
+                (VECTOR_TABLE, VECTOR_INDEX_NAME),
+            )
+            if await cur.fetchone() is not None:
+                return False
+            await _set_maintenance_work_mem(cur, settings)
+            await cur.execute(build_index_sql(settings))
+
+    logger.info(
+        "Vector index '%s' created as %s (%s)",
+        VECTOR_INDEX_NAME,
+        settings.vector_index_kind,
+        settings.vector_quantization,
+    )
+    return True
+
+
+async def rebuild_vector_index(settings: Settings | None = None) -> dict[str, Any]:
+    """
+    현재 Settings의 인덱스 설정으로 벡터 인덱스를 동시(CONCURRENTLY) 재생성합니다.
+
+    새 인덱스를 임시 이름으로 만든 뒤 기존 인덱스와 교체하므로, 재생성 중에도 검색과 쓰기가 가능합니다.
+    """
+    settings = settings or get_settings()
+    if settings.vector_index_kind == "flat":
+        raise ValueError("vector_index_kind is 'flat'; there is no ANN index to rebuild")
+
+    temp_name = f"{VECTOR_INDEX_NAME}_rebuild"
+    started = time.perf_counter()
+
+    async with await psycopg.AsyncConnection.connect(get_pg_store_conn_string(), autocommit=True) as conn:
+        async with conn.cursor() as cur:
+            await _set_maintenance_work_mem(cur, settings)
+            # 이전에 실패한 재생성이 남긴 INVALID 인덱스 정리
+            await cur.execute(sql.SQL("DROP INDEX CONCURRENTLY IF EXISTS {}").format(sql.Identifier(temp_name)))
+            await cur.execute(build_index_sql(settings, temp_name))
+            await cur.execute(sql.SQL("DROP INDEX CONCURRENTLY IF EXISTS {}").format(sql.Identifier(VECTOR_INDEX_NAME)))
+            await cur.execute(
+                sql.SQL("ALTER INDEX {} RENAME TO {}").format(
+                    sql.Identifier(temp_name), sql.Identifier(VECTOR_INDEX_NAME)
+                )
+            )
+
+    duration = time.perf_counter() - started
+    logger.info(
+        f"Vector index '{VECTOR_INDEX_NAME}' rebuilt as {settings.vector_index_kind} "
+        f"({settings.vector_quantization}) in {duration:.1f}s"
+    )
+    return {
+        "index": VECTOR_INDEX_NAME,
+        "kind": settings.vector_index_kind,
+        "quantization": settings.vector_quantization,
+        "params": index_build_params(settings),
+        "duration_s": round(duration, 3),
+    }
+
+
+_rebuild_task: asyncio.Task[dict[str, Any]] | None = None
+
+
+def start_vector_index_rebuild() -> bool:
+    global _rebuild_task
+    if _rebuild_task is not None and not _rebuild_task.done():
+        return False
+    _rebuild_task = asyncio.create_task(rebuild_vector_index())
+    return True
+
+
+def get_rebuild_status() -> dict[str, Any]:
+    if _rebuild_task is None:
+        return {"state": "idle"}
+    if not _rebuild_task.done():
+        return {"state": "running"}
+    if _rebuild_task.cancelled():
+        return {"state": "cancelled"}
+    exc = _rebuild_task.exception()
+    if exc is not None:
+        return {"state": "failed", "error": str(exc)}
+    return {"state": "completed", "result": _rebuild_task.result()}
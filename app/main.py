@@ -2,12 +2,16 @@ from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
-from app.api.routes import memory
+from app.api.middleware import ProfilingMiddleware
+from app.api.routes import admin, memory
 from app.api.schemas import APIResponse, ErrorResponse
 from app.config.lifespan import lifespan
 from app.config.logging_config import setup_logging
+from app.config.settings import get_settings
+from app.services.admission import AdmissionRejectedError
 
 setup_logging()
+settings = get_settings()
 
 app = FastAPI(
     title="Agent Long-term Memory API",
@@ -16,6 +20,16 @@ app = FastAPI(
     lifespan=lifespan,
 )
 app.include_router(memory.router)
+if settings.admin_token:
+    app.include_router(admin.router)
+
+if settings.profiling_enabled:
+    app.add_middleware(
+        ProfilingMiddleware,
+        header=settings.profiling_header,
+        sample_rate=settings.profiling_sample_rate,
+        interval_ms=settings.profiling_interval_ms,
+    )
 
 app.add_middleware(
     CORSMiddleware,
@@ -36,6 +50,16 @@ async def health_check() -> APIResponse:
     return APIResponse(success=True, message="Service is healthy")
 
 
+@app.exception_handler(AdmissionRejectedError)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejectedError) -> JSONResponse:
+    error_response = ErrorResponse(success=False, error=exc.reason)
+    return JSONResponse(
+        status_code=exc.status_code,
+        content=error_response.model_dump(),
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception) -> JSONResponse:
     error_response = ErrorResponse(success=False, error="Internal server error")
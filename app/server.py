@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import asyncio
+import gc
+import logging
+import os
+import signal
+import socket
+import time
+from collections.abc import Callable
+from typing import Any
+
+from app.config.process import set_worker_index
+from app.config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# 이 시간 안에 종료된 워커는 부팅 실패로 보고, 재시작 전에 잠시 대기 (crash loop 방지)
+_MIN_WORKER_UPTIME_S = 1.0
+
+
+def preload() -> Any:
+    """
+    워커를 fork하기 전에 master에서 공유 가능한 읽기 전용 상태를 미리 로드합니다.
+
+    - store/checkpointer 마이그레이션을 한 번 실행 (워커는 setup()을 건너뜀)
+    - 스키마 레지스트리와 임베딩 모델(가중치)을 로드해 워커들이 copy-on-write로 공유
+    - 로드된 객체를 gc.freeze()로 GC 대상에서 제외해, 워커의 GC가 공유 페이지를 건드려 복사되지 않도록 함
+
+    커넥션 풀은 열지 않으며, 각 워커가 fork 후 처음 사용할 때 자신의 풀을 엽니다.
+    """
+    from app.core.schema_registry import get_all_schemas, get_schemas_etag
+    from app.infrastructure.embeddings import get_embeddings
+
+    settings = get_settings()
+    if settings.migrate_on_startup:
+        asyncio.run(_migrate(settings.use_checkpointer))
+
+    get_all_schemas()
+    get_schemas_etag()
+    if get_embeddings() is not None:
+        logger.info(f"Loaded embedding model before fork: {settings.embedding_model}")
+
+    from app.main import app
+
+    gc.collect()
+    gc.freeze()
+    return app
+
+
+async def _migrate(checkpointer: bool) -> None:
+    from app.infrastructure.checkpointer import migrate_checkpointer
+    from app.infrastructure.store import migrate_store
+
+    await migrate_store()
+    if checkpointer:
+        await migrate_checkpointer()
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+class WorkerSupervisor:
+    """
+    pre-fork 방식으로 워커 프로세스를 관리합니다.
+
+    master가 listen 소켓을 열고 preload()한 뒤 워커를 fork하며, 워커는 같은 소켓에서 accept합니다.
+    종료된 워커는 같은 순번으로 다시 fork하고, SIGTERM/SIGINT를 받으면 워커에 전달한 뒤 모두 종료될 때까지 기다립니다.
+    """
+
+    def __init__(self, workers: int, run_worker: Callable[[int], None]) -> None:
+        self._workers = workers
+        self._run_worker = run_worker
+        self._children: dict[int, tuple[int, float]] = {}
+        self._stopping = False
+
+    def run(self) -> None:
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        for index in range(self._workers):
+            self._spawn(index)
+
+        while self._children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            if pid not in self._children:
+                continue
+            index, started = self._children.pop(pid)
+            if self._stopping:
+                continue
+
+            logger.warning(f"Worker {index} (pid {pid}) exited with status {os.waitstatus_to_exitcode(status)}")
+            if time.monotonic() - started < _MIN_WORKER_UPTIME_S:
+                time.sleep(_MIN_WORKER_UPTIME_S)
+            if not self._stopping:
+                self._spawn(index)
+
+    def _spawn(self, index: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            self._child(index)
+        self._children[pid] = (index, time.monotonic())
+        logger.info(f"Booted worker {index} (pid {pid})")
+
+    def _child(self, index: int) -> None:
+        set_worker_index(index)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        code = 0
+        try:
+            self._run_worker(index)
+        except BaseException:
+            logger.exception(f"Worker {index} crashed")
+            code = 1
+        finally:
+            from app.config.logging_config import shutdown_logging
+
+            shutdown_logging()
+            # master의 나머지 코드와 atexit 핸들러를 실행하지 않도록 바로 종료
+            os._exit(code)
+
+    def _handle_stop(self, signum: int, frame: Any) -> None:
+        if self._stopping:
+            return
+        self._stopping = True
+        logger.info(f"Stopping {len(self._children)} workers")
+        for pid in self._children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+
+def serve(host: str = "0.0.0.0", port: int = 8000, workers: int = 1) -> None:
+    """
+    API 서버를 실행합니다. workers > 1이면 pre-fork 워커로 실행합니다.
+
+    `uvicorn --workers`는 워커를 spawn으로 새로 시작하므로 워커마다 모듈/모델을 다시 로드하고 마이그레이션을 반복합니다.
+    """
+    import uvicorn
+
+    settings = get_settings()
+    if workers > 1 and settings.store_backend == "memory":
+        # memory store는 프로세스 메모리에 있으므로 워커마다 다른 데이터를 갖게 됨
+        raise ValueError("STORE_BACKEND=memory supports a single process only (use --workers 1)")
+
+    sock = bind_socket(host, port)
+    app = preload()
+    # 로깅은 setup_logging()으로 이미 구성됨
+    config = uvicorn.Config(app, log_config=None, lifespan="on")
+
+    if workers <= 1:
+        uvicorn.Server(config).run(sockets=[sock])
+        return
+
+    def run_worker(index: int) -> None:
+        uvicorn.Server(config).run(sockets=[sock])
+
+    logger.info(f"Listening on {host}:{port} with {workers} workers (master pid {os.getpid()})")
+    WorkerSupervisor(workers, run_worker).run()
+    sock.close()
@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import os
+
+from app.infrastructure.repository import SearchRequest
 from app.services.service import MemoryService
 
 _service_instance: MemoryService | None = None
@@ -12,4 +15,13 @@ def get_memory_service() -> MemoryService:
     return _service_instance
 
 
-__all__ = ["MemoryService", "get_memory_service"]
+def _reset_after_fork() -> None:
+    # repository가 부모 프로세스의 store(커넥션 풀)를 잡고 있으므로 자식에서는 새로 생성
+    global _service_instance
+    _service_instance = None
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+__all__ = ["MemoryService", "SearchRequest", "get_memory_service"]
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+import statistics
+import time
+from collections import OrderedDict, deque
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+from typing import Any
+
+
+class AdmissionRejectedError(Exception):
+    def __init__(self, status_code: int, retry_after: float, reason: str) -> None:
+        super().__init__(reason)
+        self.status_code = status_code
+        self.retry_after = max(1, math.ceil(retry_after))
+        self.reason = reason
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def wait_time(self) -> float:
+        """토큰을 소비하지 않고, 토큰이 있으면 0을, 부족하면 다음 토큰까지 남은 시간(초)을 반환합니다."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def acquire(self) -> None:
+        """wait_time()이 0을 반환한 직후 (await 없이) 토큰을 하나 소비합니다."""
+        self.tokens -= 1
+
+    def refund(self) -> None:
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+
+class _UserState:
+    __slots__ = ("bucket", "in_flight")
+
+    def __init__(self, bucket: TokenBucket) -> None:
+        self.bucket = bucket
+        self.in_flight = 0
+
+
+class AdmissionController:
+    """
+    user_id별 token bucket + 동시 실행 제한과, DB 커넥션 풀 크기에 맞춘 전역 in-flight 제한
+
+    - 사용자 요청률/동시 실행 초과 → 429 (다른 테넌트에 영향 없이 즉시 거절)
+    - 전역 대기열이 가득 찼거나 대기 시간 초과 → 503
+    """
+
+    def __init__(
+        self,
+        user_rate: float,
+        user_burst: int,
+        user_max_in_flight: int,
+        max_in_flight: int,
+        max_queue: int,
+        queue_timeout_s: float,
+        max_tracked_users: int = 10_000,
+        wait_samples: int = 1024,
+    ) -> None:
+        self._user_rate = user_rate
+        self._user_burst = user_burst
+        self._user_max_in_flight = user_max_in_flight
+        self._max_in_flight = max_in_flight
+        self._max_queue = max_queue
+        self._queue_timeout_s = queue_timeout_s
+        self._max_tracked_users = max_tracked_users
+
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._users: OrderedDict[str, _UserState] = OrderedDict()
+        self._in_flight = 0
+        self._queued = 0
+
+        self._queue_waits_ms: deque[float] = deque(maxlen=wait_samples)
+        self._queue_wait_total_ms = 0.0
+        self._counters = {
+            "admitted": 0,
+            "rejected_rate_limited": 0,
+            "rejected_user_concurrency": 0,
+            "rejected_queue_full": 0,
+            "rejected_queue_timeout": 0,
+        }
+
+    @asynccontextmanager
+    async def admit(self, *user_ids: str) -> AsyncGenerator[None, None]:
+        """
+        요청을 admission 합니다. 여러 사용자의 요청(배치 검색 등)은 사용자마다 제한을 적용하고 전역 slot은 하나만 사용합니다.
+
+        한 사용자라도 거절되면 요청 전체를 거절합니다. 모든 검사를 통과한 뒤에만 사용자별 토큰을 소비하므로
+        거절된 요청은 (대기 시간 초과로 반환한 경우를 포함해) 어느 사용자의 토큰도 쓰지 않습니다.
+        """
+        users = {user_id: self._get_user(user_id) for user_id in user_ids}
+
+        for user_id, user in users.items():
+            if user.in_flight >= self._user_max_in_flight:
+                self._counters["rejected_user_concurrency"] += 1
+                raise AdmissionRejectedError(429, 1, f"Too many concurrent requests for user {user_id}")
+        if self._slots.locked() and self._queued >= self._max_queue:
+            self._counters["rejected_queue_full"] += 1
+            raise AdmissionRejectedError(503, self._queue_timeout_s, "Server is overloaded")
+        for user_id, user in users.items():
+            wait = user.bucket.wait_time()
+            if wait > 0:
+                self._counters["rejected_rate_limited"] += 1
+                raise AdmissionRejectedError(429, wait, f"Rate limit exceeded for user {user_id}")
+
+        for user in users.values():
+            user.bucket.acquire()
+            user.in_flight += 1
+        try:
+            started = time.perf_counter()
+            self._queued += 1
+            try:
+                if self._slots.locked():
+                    await asyncio.wait_for(self._slots.acquire(), timeout=self._queue_timeout_s)
+                else:
+                    await self._slots.acquire()
+            except asyncio.TimeoutError:
+                self._counters["rejected_queue_timeout"] += 1
+                for user in users.values():
+                    user.bucket.refund()
+                raise AdmissionRejectedError(503, self._queue_timeout_s, "Server is overloaded") from None
+            finally:
+                self._queued -= 1
+            self._record_wait((time.perf_counter() - started) * 1000)
+
+            self._counters["admitted"] += 1
+            self._in_flight += 1
+            try:
+                yield
+            finally:
+                self._in_flight -= 1
+                self._slots.release()
+        finally:
+            for user in users.values():
+                user.in_flight -= 1
+
+    def metrics(self) -> dict[str, Any]:
+        waits = sorted(self._queue_waits_ms)
+        admitted = self._counters["admitted"]
+        return {
+            "in_flight": self._in_flight,
+            "queued": self._queued,
+            "max_in_flight": self._max_in_flight,
+            "max_queue": self._max_queue,
+            "tracked_users": len(self._users),
+            **self._counters,
+            "queue_wait_ms": {
+                "mean": round(self._queue_wait_total_ms / admitted, 3) if admitted else 0.0,
+                "p50": round(_quantile(waits, 0.50), 3),
+                "p95": round(_quantile(waits, 0.95), 3),
+                "p99": round(_quantile(waits, 0.99), 3),
+                "max": round(waits[-1], 3) if waits else 0.0,
+            },
+        }
+
+    def _get_user(self, user_id: str) -> _UserState:
+        user = self._users.get(user_id)
+        if user is None:
+            user = _UserState(TokenBucket(self._user_rate, self._user_burst))
+            self._users[user_id] = user
+            self._evict_idle_users()
+        else:
+            self._users.move_to_end(user_id)
+        return user
+
+    def _evict_idle_users(self) -> None:
+        while len(self._users) > self._max_tracked_users:
+            user_id, user = next(iter(self._users.items()))
+            if user.in_flight:
+                self._users.move_to_end(user_id)
+                break
+            del self._users[user_id]
+
+    def _record_wait(self, wait_ms: float) -> None:
+        self._queue_waits_ms.append(wait_ms)
+        self._queue_wait_total_ms += wait_ms
+
+
+def _quantile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    return statistics.quantiles(sorted_values, n=100, method="inclusive")[int(q * 100) - 1]
+
+
+_controller: AdmissionController | None = None
+
+
+def get_admission_controller() -> AdmissionController:
+    global _controller
+    if _controller is None:
+        from app.config.settings import get_settings
+
+        settings = get_settings()
+        _controller = AdmissionController(
+            user_rate=settings.admission_user_rate,
+            user_burst=settings.admission_user_burst,
+            user_max_in_flight=settings.admission_user_max_in_flight,
+            max_in_flight=settings.admission_max_in_flight or settings.db_pool_max_size,
+            max_queue=settings.admission_max_queue,
+            queue_timeout_s=settings.admission_queue_timeout_s,
+        )
+    return _controller
+
+
+def _reset_after_fork() -> None:
+    # 처리 중 요청 수와 대기열은 프로세스별 상태이므로 fork된 워커는 새 controller로 시작
+    global _controller
+    _controller = None
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
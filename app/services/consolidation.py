@@ -0,0 +1,417 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import random
+import typing
+from collections import defaultdict
+from collections.abc import Hashable, Iterable
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, cast
+
+from app.config.settings import Settings, get_settings
+from app.core.base import BaseMemory
+from app.core.schema_registry import get_schema
+from app.infrastructure.embeddings import get_embeddings
+from app.infrastructure.repository import MemoryRepository
+
+logger = logging.getLogger(__name__)
+
+_STATE_NAME = "consolidation"
+_MERSENNE_PRIME = (1 << 61) - 1
+_SHINGLE_SIZE = 3
+
+# 병합 시 합집합으로 합치는 리스트 필드
+MERGE_UNION_FIELDS = ("tags", "key_points")
+
+_task: asyncio.Task[None] | None = None
+_last_report: ConsolidationReport | None = None
+
+
+def shingles(text: str, size: int = _SHINGLE_SIZE) -> set[str]:
+    normalized = " ".join(text.casefold().split())
+    if len(normalized) <= size:
+        return {normalized} if normalized else set()
+    return {normalized[i : i + size] for i in range(len(normalized) - size + 1)}
+
+
+def jaccard(a: set[str], b: set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class MinHasher:
+    def __init__(self, num_perm: int = 64, seed: int = 1) -> None:
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._perms = [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME)) for _ in range(num_perm)]
+
+    def signature(self, shingle_set: Iterable[str]) -> tuple[int, ...]:
+        hashes = [int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "little") for s in shingle_set]
+        if not hashes:
+            return (_MERSENNE_PRIME,) * self.num_perm
+        return tuple(min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in self._perms)
+
+
+class LSHIndex:
+    """MinHash 서명을 band 단위로 버킷팅해 Jaccard 유사도가 높은 후보만 빠르게 찾습니다."""
+
+    def __init__(self, bands: int, rows: int) -> None:
+        self._bands = bands
+        self._rows = rows
+        self._buckets: dict[tuple[int, tuple[int, ...]], list[Hashable]] = defaultdict(list)
+
+    def add(self, key: Hashable, signature: tuple[int, ...]) -> None:
+        for band in self._band_keys(signature):
+            self._buckets[band].append(key)
+
+    def candidates(self, signature: tuple[int, ...]) -> set[Hashable]:
+        found: set[Hashable] = set()
+        for band in self._band_keys(signature):
+            found.update(self._buckets.get(band, ()))
+        return found
+
+    def _band_keys(self, signature: tuple[int, ...]) -> Iterable[tuple[int, tuple[int, ...]]]:
+        for band in range(self._bands):
+            yield band, signature[band * self._rows : (band + 1) * self._rows]
+
+
+@dataclass
+class _Candidate:
+    key: str
+    schema: dict[str, Any]
+    text: str
+    shingles: set[str]
+    block: tuple[Any, ...]
+    changed: bool
+
+
+@dataclass
+class MergeGroup:
+    user_id: str
+    schema_type: str
+    survivor: str
+    merged: list[str]
+    similarity: float
+    result: dict[str, Any]
+
+
+@dataclass
+class ConsolidationReport:
+    dry_run: bool
+    started_at: str
+    finished_at: str | None = None
+    since: str | None = None
+    namespaces_scanned: int = 0
+    memories_scanned: int = 0
+    memories_changed: int = 0
+    memories_merged: int = 0
+    groups: list[MergeGroup] = field(default_factory=list[MergeGroup])
+    errors: list[str] = field(default_factory=list[str])
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def _literal_fields(schema_class: type[BaseMemory]) -> list[str]:
+    return [
+        name for name, info in schema_class.model_fields.items() if typing.get_origin(info.annotation) is typing.Literal
+    ]
+
+
+def _similarity_text(schema: dict[str, Any], excluded: set[str]) -> str:
+    parts: list[str] = []
+    for name, value in schema.items():
+        if name in excluded:
+            continue
+        if isinstance(value, str):
+            parts.append(value)
+        elif isinstance(value, list):
+            parts.extend(str(v) for v in cast(list[Any], value))
+    return " ".join(parts)
+
+
+def merge_schemas(schemas: list[dict[str, Any]]) -> dict[str, Any]:
+    """첫 항목(survivor)을 기준으로 confidence는 최댓값, tags/key_points는 순서를 유지한 합집합으로 병합"""
+    merged = dict(schemas[0])
+    merged["confidence"] = max(schema.get("confidence", 1.0) for schema in schemas)
+    for name in MERGE_UNION_FIELDS:
+        if not any(isinstance(schema.get(name), list) for schema in schemas):
+            continue
+        seen: set[str] = set()
+        union: list[Any] = []
+        for schema in schemas:
+            items: list[Any] = schema.get(name) or []
+            for item in items:
+                normalized = " ".join(str(item).casefold().split())
+                if normalized not in seen:
+                    seen.add(normalized)
+                    union.append(item)
+        merged[name] = union
+    return merged
+
+
+class _UnionFind:
+    def __init__(self) -> None:
+        self._parent: dict[str, str] = {}
+
+    def find(self, key: str) -> str:
+        self._parent.setdefault(key, key)
+        while self._parent[key] != key:
+            self._parent[key] = self._parent[self._parent[key]]
+            key = self._parent[key]
+        return key
+
+    def union(self, a: str, b: str) -> None:
+        self._parent[self.find(a)] = self.find(b)
+
+
+class ConsolidationEngine:
+    """
+    사용자 namespace 안의 near-duplicate 메모리를 찾아 하나로 병합합니다.
+
+    - 마지막 실행 이후 변경된 메모리가 있는 namespace만 읽고, 변경된 메모리가 포함된 쌍만 비교
+    - 변경 목록과 namespace의 메모리는 keyset으로 page_size개씩 읽어, 개수 제한 없이 모든 메모리를 비교
+    - 후보: 텍스트 MinHash/LSH (+ 선택적으로 벡터 유사도 검색), Jaccard로 검증
+    - Literal 필드(category, fact_type 등)가 다르면 병합하지 않음
+    - survivor는 confidence가 가장 높은(같으면 가장 오래된) 메모리
+    """
+
+    def __init__(
+        self,
+        repository: MemoryRepository | None = None,
+        jaccard_threshold: float = 0.7,
+        num_perm: int = 64,
+        bands: int = 16,
+        use_vectors: bool = False,
+        vector_threshold: float = 0.92,
+        vector_candidates: int = 5,
+        page_size: int = 1000,
+    ) -> None:
+        if num_perm % bands != 0:
+            raise ValueError("num_perm must be divisible by bands")
+        self._repository = repository or MemoryRepository()
+        self._jaccard_threshold = jaccard_threshold
+        self._hasher = MinHasher(num_perm)
+        self._bands = bands
+        self._rows = num_perm // bands
+        self._use_vectors = use_vectors
+        self._vector_threshold = vector_threshold
+        self._vector_candidates = vector_candidates
+        self._page_size = page_size
+
+    async def run(self, dry_run: bool = True, full: bool = False) -> ConsolidationReport:
+        state = None if full else await self._repository.get_state(_STATE_NAME)
+        since = datetime.fromisoformat(state["watermark"]) if state and state.get("watermark") else None
+
+        report = ConsolidationReport(
+            dry_run=dry_run,
+            started_at=datetime.now(timezone.utc).isoformat(),
+            since=since.isoformat() if since else None,
+        )
+        watermark = since
+        async for namespace in self._repository.iter_changed(since, self._page_size):
+            report.namespaces_scanned += 1
+            try:
+                await self._consolidate_namespace(
+                    namespace["user_id"], namespace["schema_type"], set(namespace["keys"]), dry_run, report
+                )
+            except Exception as e:
+                logger.warning("Consolidation failed for %s/%s: %s", namespace["user_id"], namespace["schema_type"], e)
+                report.errors.append(f"{namespace['user_id']}/{namespace['schema_type']}: {e}")
+                continue
+            if watermark is None or namespace["updated_at"] > watermark:
+                watermark = namespace["updated_at"]
+
+        if not dry_run and watermark is not None and not report.errors:
+            await self._repository.save_state(_STATE_NAME, {"watermark": watermark.isoformat()})
+
+        report.finished_at = datetime.now(timezone.utc).isoformat()
+        return report
+
+    async def _consolidate_namespace(
+        self, user_id: str, schema_type: str, changed_keys: set[str], dry_run: bool, report: ConsolidationReport
+    ) -> None:
+        schema_class = get_schema(schema_type)
+        if schema_class is None:
+            return
+
+        literal_fields = _literal_fields(schema_class)
+        excluded = {"created_at", "confidence", *literal_fields}
+        candidates: dict[str, _Candidate] = {}
+        async for item in self._repository.iter_all(user_id, schema_type, self._page_size):
+            schema = item["value"].get("schema", {})
+            text = _similarity_text(schema, excluded)
+            candidates[item["key"]] = _Candidate(
+                key=item["key"],
+                schema=schema,
+                text=text,
+                shingles=shingles(text),
+                block=tuple(schema.get(name) for name in literal_fields),
+                changed=item["key"] in changed_keys,
+            )
+        report.memories_scanned += len(candidates)
+        report.memories_changed += sum(1 for c in candidates.values() if c.changed)
+
+        pairs = self._minhash_pairs(candidates)
+        if self._use_vectors:
+            pairs.update(await self._vector_pairs(user_id, schema_type, candidates))
+
+        groups = _UnionFind()
+        similarity: dict[str, float] = {}
+        for a, b, score in pairs:
+            groups.union(a, b)
+            for key in (a, b):
+                similarity[key] = max(similarity.get(key, 0.0), score)
+
+        clusters: dict[str, list[_Candidate]] = defaultdict(list)
+        for key in similarity:
+            clusters[groups.find(key)].append(candidates[key])
+
+        for members in clusters.values():
+            members.sort(key=lambda c: (-c.schema.get("confidence", 1.0), c.schema.get("created_at", ""), c.key))
+            survivor, duplicates = members[0], members[1:]
+            merged = schema_class(**merge_schemas([m.schema for m in members])).model_dump()
+            if not dry_run and not await self._apply_merge(
+                user_id, schema_type, survivor.key, merged, [d.key for d in duplicates]
+            ):
+                # 스캔 이후 survivor가 삭제되었으면 중복을 지우지 않고 다음 실행에서 다시 판단
+                logger.warning(
+                    "Skipped merge into %s/%s: memory %s no longer exists", user_id, schema_type, survivor.key
+                )
+                continue
+            report.groups.append(
+                MergeGroup(
+                    user_id=user_id,
+                    schema_type=schema_type,
+                    survivor=survivor.key,
+                    merged=[d.key for d in duplicates],
+                    similarity=round(min(similarity[m.key] for m in members), 4),
+                    result=merged,
+                )
+            )
+            report.memories_merged += len(duplicates)
+
+    def _minhash_pairs(self, candidates: dict[str, _Candidate]) -> set[tuple[str, str, float]]:
+        index = LSHIndex(self._bands, self._rows)
+        signatures: dict[str, tuple[int, ...]] = {}
+        for key, candidate in candidates.items():
+            if not candidate.shingles:
+                continue
+            signatures[key] = self._hasher.signature(candidate.shingles)
+            index.add(key, signatures[key])
+
+        pairs: set[tuple[str, str, float]] = set()
+        for key, candidate in candidates.items():
+            if not candidate.changed or key not in signatures:
+                continue
+            for other_key in index.candidates(signatures[key]):
+                if other_key == key:
+                    continue
+                other = candidates[other_key]  # type: ignore[index]
+                if other.block != candidate.block:
+                    continue
+                score = jaccard(candidate.shingles, other.shingles)
+                if score >= self._jaccard_threshold:
+                    pairs.add((*sorted((key, other.key)), score))  # type: ignore[arg-type]
+        return pairs
+
+    async def _vector_pairs(
+        self, user_id: str, schema_type: str, candidates: dict[str, _Candidate]
+    ) -> set[tuple[str, str, float]]:
+        if get_embeddings() is None:
+            return set()
+
+        pairs: set[tuple[str, str, float]] = set()
+        for key, candidate in candidates.items():
+            if not candidate.changed or not candidate.text:
+                continue
+            results = await self._repository.search(user_id, candidate.text, schema_type, self._vector_candidates + 1)
+            for result in results:
+                other = candidates.get(result["key"])
+                score = result.get("score")
+                if other is None or other.key == key or score is None or other.block != candidate.block:
+                    continue
+                if score >= self._vector_threshold:
+                    pairs.add((*sorted((key, other.key)), score))  # type: ignore[arg-type]
+        return pairs
+
+    async def _apply_merge(
+        self, user_id: str, schema_type: str, survivor: str, merged: dict[str, Any], duplicates: list[str]
+    ) -> bool:
+        merged_fields = {name: merged[name] for name in ("confidence", *MERGE_UNION_FIELDS) if name in merged}
+
+        def apply(value: dict[str, Any]) -> dict[str, Any]:
+            return {**value, "schema": merged, "content": {**value.get("content", {}), **merged_fields}}
+
+        return await self._repository.update(user_id, schema_type, survivor, apply, delete_ids=duplicates) is not None
+
+
+def create_consolidation_engine(settings: Settings | None = None) -> ConsolidationEngine:
+    settings = settings or get_settings()
+    return ConsolidationEngine(
+        jaccard_threshold=settings.consolidation_jaccard_threshold,
+        num_perm=settings.consolidation_num_perm,
+        bands=settings.consolidation_bands,
+        use_vectors=settings.consolidation_use_vectors,
+        vector_threshold=settings.consolidation_vector_threshold,
+    )
+
+
+async def consolidate_memories(dry_run: bool = True, full: bool = False) -> dict[str, Any]:
+    global _last_report
+    report = await create_consolidation_engine().run(dry_run=dry_run, full=full)
+    _last_report = report
+    logger.info(
+        "Memory consolidation finished (dry_run=%s): namespaces=%d changed=%d groups=%d merged=%d",
+        dry_run,
+        report.namespaces_scanned,
+        report.memories_changed,
+        len(report.groups),
+        report.memories_merged,
+    )
+    return report.to_dict()
+
+
+async def _consolidation_loop(interval_s: float) -> None:
+    while True:
+        await asyncio.sleep(interval_s)
+        try:
+            await consolidate_memories(dry_run=False)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("Memory consolidation failed: %s", e)
+
+
+def start_consolidation() -> bool:
+    global _task
+    settings = get_settings()
+    if not settings.consolidation_enabled:
+        return False
+    if _task is not None and not _task.done():
+        return False
+    _task = asyncio.create_task(_consolidation_loop(settings.consolidation_interval_s))
+    return True
+
+
+async def stop_consolidation() -> None:
+    global _task
+    if _task is None:
+        return
+    _task.cancel()
+    try:
+        await _task
+    except asyncio.CancelledError:
+        pass
+    _task = None
+
+
+def get_consolidation_status() -> dict[str, Any]:
+    return {
+        "running": _task is not None and not _task.done(),
+        "last_run": _last_report.to_dict() if _last_report else None,
+    }
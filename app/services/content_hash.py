@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import uuid
+from typing import Any, cast
+
+# 결정적 메모리 ID(uuid5) 생성용 네임스페이스
+_MEMORY_ID_NAMESPACE = uuid.UUID("6f1c8a52-3d0e-4b7a-9c41-2a5e8f0d7b13")
+
+# 저장 시점마다 달라지는 필드는 내용 비교에서 제외
+_VOLATILE_FIELDS = frozenset({"created_at"})
+
+
+def normalize_payload(payload: Any) -> Any:
+    """공백/대소문자 차이와 key 순서를 무시하도록 정규화"""
+    if isinstance(payload, dict):
+        items = cast(dict[str, Any], payload).items()
+        return {key: normalize_payload(value) for key, value in items if key not in _VOLATILE_FIELDS}
+    if isinstance(payload, list):
+        return [normalize_payload(value) for value in cast(list[Any], payload)]
+    if isinstance(payload, str):
+        return " ".join(payload.split()).casefold()
+    return payload
+
+
+def content_hash(user_id: str, schema_type: str, payload: dict[str, Any]) -> str:
+    normalized = json.dumps(normalize_payload(payload), sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(f"{user_id}\x00{schema_type}\x00{normalized}".encode()).hexdigest()
+
+
+def memory_id_for_content(user_id: str, schema_type: str, payload: dict[str, Any]) -> str:
+    return str(uuid.uuid5(_MEMORY_ID_NAMESPACE, content_hash(user_id, schema_type, payload)))
+
+
+def memory_id_for_idempotency_key(user_id: str, schema_type: str, idempotency_key: str) -> str:
+    return str(uuid.uuid5(_MEMORY_ID_NAMESPACE, f"idempotency\x00{user_id}\x00{schema_type}\x00{idempotency_key}"))
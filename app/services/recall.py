@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Any, cast
+
+from app.infrastructure.models import Memory
+
+# tokenizer 의존성 없이 쓰는 보수적인 근사치 (영문 기준 약 4자/토큰)
+CHARS_PER_TOKEN = 4.0
+
+# 프롬프트 컨텍스트에 넣지 않는 메타데이터 필드
+_METADATA_FIELDS = frozenset({"created_at", "confidence"})
+
+
+@dataclass
+class PackedMemory:
+    memory: Memory
+    text: str
+    tokens: int
+
+    def to_dict(self) -> dict[str, Any]:
+        return {**self.memory.to_dict(), "text": self.text, "tokens": self.tokens}
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, math.ceil(len(text) / CHARS_PER_TOKEN))
+
+
+def render_memory(memory: Memory) -> str:
+    parts: list[str] = []
+    for field_name, value in memory.content.items():
+        if field_name in _METADATA_FIELDS or value in (None, "", []):
+            continue
+        if isinstance(value, list):
+            value = ", ".join(str(v) for v in cast(list[Any], value))
+        parts.append(f"{field_name}: {value}")
+    return f"[{memory.schema_type}] " + "; ".join(parts)
+
+
+def rank_memories(memories: list[Memory]) -> list[Memory]:
+    """유사도 점수(없으면 0) × confidence 순으로 정렬. 같은 점수는 원래 검색 순서를 유지합니다."""
+
+    def rank_key(memory: Memory) -> float:
+        confidence = memory.content.get("confidence", 1.0)
+        return (memory.score if memory.score is not None else 0.0) * (0.5 + 0.5 * confidence)
+
+    return sorted(memories, key=rank_key, reverse=True)
+
+
+def dedupe_memories(memories: list[Memory]) -> list[Memory]:
+    seen_ids: set[str] = set()
+    seen_texts: set[str] = set()
+    unique: list[Memory] = []
+    for memory in memories:
+        normalized = " ".join(render_memory(memory).lower().split())
+        if memory.id in seen_ids or normalized in seen_texts:
+            continue
+        seen_ids.add(memory.id)
+        seen_texts.add(normalized)
+        unique.append(memory)
+    return unique
+
+
+def pack_memories(memories: list[Memory], token_budget: int) -> tuple[list[PackedMemory], int]:
+    """
+    순위대로 예산에 들어가는 메모리를 채웁니다.
+
+    예산을 넘는 항목은 건너뛰고 다음(더 짧은) 항목을 계속 시도합니다.
+    """
+    packed: list[PackedMemory] = []
+    used = 0
+    for memory in memories:
+        text = render_memory(memory)
+        tokens = estimate_tokens(text)
+        if used + tokens > token_budget:
+            continue
+        packed.append(PackedMemory(memory=memory, text=text, tokens=tokens))
+        used += tokens
+    return packed, used
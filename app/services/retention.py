@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from functools import partial
+from typing import Any
+
+from app.config.settings import RetentionPolicy, Settings, get_settings
+from app.core.schema_registry import get_schema, get_schema_names
+from app.infrastructure.repository import MemoryRepository
+
+logger = logging.getLogger(__name__)
+
+_task: asyncio.Task[None] | None = None
+_last_report: SweepReport | None = None
+
+
+def resolve_policy(schema_type: str, settings: Settings | None = None) -> RetentionPolicy | None:
+    """스키마 이름에 대한 정책이 있으면 그것을, 없으면 스키마의 MemoryType 정책을 사용합니다."""
+    policies = (settings or get_settings()).retention_policies
+    if schema_type in policies:
+        return policies[schema_type]
+
+    schema_class = get_schema(schema_type)
+    if schema_class is None:
+        return None
+    return policies.get(schema_class.memory_type.value)
+
+
+def ttl_minutes_for(schema_type: str, settings: Settings | None = None) -> float | None:
+    policy = resolve_policy(schema_type, settings)
+    if policy is None or policy.ttl_days is None:
+        return None
+    return policy.ttl_days * 24 * 60
+
+
+@dataclass
+class SweepReport:
+    started_at: str
+    finished_at: str | None = None
+    expired_deleted: int = 0
+    ttl_backfilled: dict[str, int] = field(default_factory=dict[str, int])
+    evicted: dict[str, int] = field(default_factory=dict[str, int])
+    errors: list[str] = field(default_factory=list[str])
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class RetentionSweeper:
+    """
+    보존 정책을 배치 단위로 적용합니다.
+
+    1. TTL 정책이 있는 스키마의 기존 항목 중 만료 시각이 없는 항목에 created_at 기준 만료 시각 설정
+    2. 만료된 항목 삭제 (expires_at 인덱스 순)
+    3. max_items를 넘는 namespace의 초과분 삭제
+
+    각 작업은 batch_size개씩 최대 max_batches번 실행되어, 한 번의 sweep이 DB를 오래 점유하지 않습니다.
+    """
+
+    def __init__(
+        self,
+        repository: MemoryRepository | None = None,
+        settings: Settings | None = None,
+        batch_size: int = 500,
+        max_batches: int = 20,
+    ) -> None:
+        self._repository = repository or MemoryRepository()
+        self._settings = settings or get_settings()
+        self._batch_size = batch_size
+        self._max_batches = max_batches
+
+    async def run(self) -> SweepReport:
+        report = SweepReport(started_at=datetime.now(timezone.utc).isoformat())
+
+        for schema_type in get_schema_names():
+            policy = resolve_policy(schema_type, self._settings)
+            if policy is None:
+                continue
+            try:
+                ttl_minutes = ttl_minutes_for(schema_type, self._settings)
+                if ttl_minutes is not None:
+                    report.ttl_backfilled[schema_type] = await self._drain(
+                        partial(self._repository.backfill_ttl, schema_type, ttl_minutes, self._batch_size)
+                    )
+                if policy.max_items is not None:
+                    report.evicted[schema_type] = await self._drain(
+                        partial(
+                            self._repository.evict_over_limit,
+                            schema_type,
+                            policy.max_items,
+                            policy.evict,
+                            self._batch_size,
+                        )
+                    )
+            except Exception as e:
+                logger.warning("Retention sweep failed for schema %s: %s", schema_type, e)
+                report.errors.append(f"{schema_type}: {e}")
+
+        try:
+            report.expired_deleted = await self._drain(partial(self._repository.sweep_expired, self._batch_size))
+        except Exception as e:
+            logger.warning("Expired memory sweep failed: %s", e)
+            report.errors.append(f"expired: {e}")
+
+        report.finished_at = datetime.now(timezone.utc).isoformat()
+        return report
+
+    async def _drain(self, run_batch: Callable[[], Awaitable[int]]) -> int:
+        total = 0
+        for _ in range(self._max_batches):
+            affected = await run_batch()
+            total += affected
+            if affected < self._batch_size:
+                break
+            # 배치 사이에 다른 요청이 커넥션/락을 얻을 수 있도록 양보
+            await asyncio.sleep(0)
+        return total
+
+
+async def sweep_retention() -> dict[str, Any]:
+    global _last_report
+    settings = get_settings()
+    report = await RetentionSweeper(
+        settings=settings,
+        batch_size=settings.retention_sweep_batch_size,
+        max_batches=settings.retention_sweep_max_batches,
+    ).run()
+    _last_report = report
+    logger.info(
+        "Retention sweep finished: expired=%d backfilled=%d evicted=%d",
+        report.expired_deleted,
+        sum(report.ttl_backfilled.values()),
+        sum(report.evicted.values()),
+    )
+    return report.to_dict()
+
+
+async def _sweep_loop(interval_s: float) -> None:
+    while True:
+        await asyncio.sleep(interval_s)
+        try:
+            await sweep_retention()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("Retention sweep failed: %s", e)
+
+
+def start_retention_sweeper() -> bool:
+    global _task
+    settings = get_settings()
+    if not settings.retention_sweep_enabled:
+        return False
+    if _task is not None and not _task.done():
+        return False
+    _task = asyncio.create_task(_sweep_loop(settings.retention_sweep_interval_s))
+    return True
+
+
+async def stop_retention_sweeper() -> None:
+    global _task
+    if _task is None:
+        return
+    _task.cancel()
+    try:
+        await _task
+    except asyncio.CancelledError:
+        pass
+    _task = None
+
+
+def get_retention_status() -> dict[str, Any]:
+    settings = get_settings()
+    return {
+        "running": _task is not None and not _task.done(),
+        "policies": {
+            schema_type: policy.model_dump()
+            for schema_type in get_schema_names()
+            if (policy := resolve_policy(schema_type, settings)) is not None
+        },
+        "last_run": _last_report.to_dict() if _last_report else None,
+    }
@@ -1,18 +1,73 @@
 from __future__ import annotations
 
+import asyncio
+import json
+import logging
 import uuid
-from typing import Any
+from collections.abc import AsyncIterator
+from datetime import datetime
+from typing import Any, NamedTuple, cast
 
-from app.core.schema_registry import get_schema, get_schema_names
+from app.config.settings import get_settings
+from app.core.base import MemoryType
+from app.core.namespace_builder import MemoryNamespaceBuilder, memory_type_of
+from app.core.schema_registry import get_index_field_names, get_schema, get_schema_names
 from app.infrastructure.models import Memory
-from app.infrastructure.repository import MemoryRepository
+from app.infrastructure.repository import MemoryRepository, SearchRequest
+from app.services.content_hash import content_hash, memory_id_for_content, memory_id_for_idempotency_key
+from app.services.recall import dedupe_memories, pack_memories, rank_memories
+from app.services.retention import ttl_minutes_for
+
+logger = logging.getLogger(__name__)
+
+
+class SearchChunk(NamedTuple):
+    schema_type: str
+    memories: list[Memory]
+    error: str | None = None
+
+
+def invalid_index_fields_error(fields: dict[str, float] | None, schema_type: str | None = None) -> str | None:
+    """필드별 검색에 지정한 필드/가중치 검증 (문제가 없으면 None)"""
+    if not fields:
+        return None
+    available = get_index_field_names(schema_type)
+    unknown = sorted(set(fields) - available)
+    if unknown:
+        return f"Unknown index field: {', '.join(unknown)}. Available fields: {', '.join(sorted(available))}"
+    if any(weight <= 0 for weight in fields.values()):
+        return "Field weights must be positive"
+    return None
 
 
 class MemoryService:
     def __init__(self, repository: MemoryRepository | None = None):
         self._repository = repository or MemoryRepository()
 
-    async def create(self, user_id: str, schema_type: str, content: dict[str, Any]) -> dict[str, Any]:
+    async def create(
+        self,
+        user_id: str,
+        schema_type: str,
+        content: dict[str, Any],
+        idempotency_key: str | None = None,
+        dedupe: bool | None = None,
+    ) -> dict[str, Any]:
+        """
+        메모리를 생성합니다.
+
+        idempotency_key가 주어지거나 dedupe가 켜져 있으면 ID를 결정적으로 만들고,
+        같은 ID의 메모리가 이미 있으면 저장(및 임베딩) 없이 기존 메모리를 반환합니다.
+
+        Args:
+            user_id: 사용자 ID
+            schema_type: 스키마 타입
+            content: 메모리 내용
+            idempotency_key: 재시도 요청 식별 키 (사용자/스키마 단위)
+            dedupe: 내용 해시로 ID 생성 (None이면 settings.dedupe_on_create)
+
+        Returns:
+            생성된(또는 기존) 메모리와 created 여부, 또는 error
+        """
         schema_class = get_schema(schema_type)
         if schema_class is None:
             return {"error": f"Invalid schema type: {schema_type}. Available types: {', '.join(get_schema_names())}"}
@@ -22,23 +77,169 @@ class MemoryService:
         except Exception as e:
             return {"error": f"Invalid content for schema {schema_type}: {str(e)}"}
 
+        dedupe = get_settings().dedupe_on_create if dedupe is None else dedupe
+        if idempotency_key:
+            memory_id = memory_id_for_idempotency_key(user_id, schema_type, idempotency_key)
+        elif dedupe:
+            memory_id = memory_id_for_content(user_id, schema_type, memory_instance.model_dump())
+        else:
+            memory_id = str(uuid.uuid4())
+
+        if idempotency_key or dedupe:
+            existing = await self._repository.find_by_id(user_id, memory_id, schema_type)
+            if existing is not None:
+                existing_schema = existing.get("schema", {})
+                if idempotency_key and content_hash(user_id, schema_type, existing_schema) != content_hash(
+                    user_id, schema_type, memory_instance.model_dump()
+                ):
+                    return {"error": "Idempotency-Key was already used with a different payload"}
+                return {"id": memory_id, "schema_type": schema_type, "content": existing_schema, "created": False}
+
         # 저장할 데이터 구성
-        memory_id = str(uuid.uuid4())
         value = {
             "schema_type": schema_type,
             "schema": memory_instance.model_dump(),
             "content": content,
+            "embedding_version": get_settings().embedding_version,
         }
 
-        # 저장
-        await self._repository.save(user_id, schema_type, memory_id, value)
+        quota_error = await self._check_quota(user_id, schema_type, value)
+        if quota_error:
+            return {"error": quota_error}
+
+        # 저장 (보존 정책의 TTL이 있으면 만료 시각과 함께 저장)
+        await self._repository.save(user_id, schema_type, memory_id, value, ttl_minutes=ttl_minutes_for(schema_type))
 
         return {
             "id": memory_id,
             "schema_type": schema_type,
             "content": memory_instance.model_dump(),
+            "created": True,
+        }
+
+    async def update(
+        self, user_id: str, memory_id: str, patch: dict[str, Any], schema_type: str | None = None
+    ) -> dict[str, Any]:
+        """
+        JSON Merge Patch(RFC 7386)로 메모리를 부분 수정합니다.
+
+        병합 결과는 스키마 클래스로 다시 검증되며, 조회-수정-저장은 하나의 트랜잭션에서 실행됩니다.
+
+        Args:
+            user_id: 사용자 ID
+            memory_id: 메모리 ID
+            patch: 병합할 필드 (null 값은 해당 필드 삭제)
+            schema_type: 스키마 타입 (None이면 저장된 메모리에서 확인)
+
+        Returns:
+            수정된 메모리 또는 error
+        """
+        if schema_type is None:
+            current = await self._repository.find_by_id(user_id, memory_id)
+            if current is None:
+                return {"error": "Memory not found"}
+            schema_type = str(current.get("schema_type") or "")
+
+        schema_class = get_schema(schema_type)
+        if schema_class is None:
+            return {"error": f"Invalid schema type: {schema_type}. Available types: {', '.join(get_schema_names())}"}
+
+        def apply_patch(value: dict[str, Any]) -> dict[str, Any]:
+            content = _merge_patch(value.get("content", {}), patch)
+            # created_at 등 생성 시 채워진 기본값이 유지되도록 검증된 schema 위에 병합
+            memory_instance = schema_class(**_merge_patch(value.get("schema", content), patch))
+            return {**value, "schema": memory_instance.model_dump(), "content": content}
+
+        try:
+            updated = await self._repository.update(user_id, schema_type, memory_id, apply_patch)
+        except ValueError as e:
+            return {"error": f"Invalid content for schema {schema_type}: {str(e)}"}
+
+        if updated is None:
+            return {"error": "Memory not found"}
+
+        return {
+            "id": memory_id,
+            "schema_type": schema_type,
+            "content": updated["schema"],
         }
 
+    async def usage(self, user_id: str) -> dict[str, Any]:
+        """
+        사용자의 스키마별 메모리 개수/크기와 quota를 조회합니다.
+
+        Args:
+            user_id: 사용자 ID
+
+        Returns:
+            스키마별/전체 사용량과 설정된 quota
+        """
+        schemas = await self._repository.usage(user_id)
+        settings = get_settings()
+        return {
+            "schemas": schemas,
+            "total": {
+                "count": sum(item["count"] for item in schemas.values()),
+                "bytes": sum(item["bytes"] for item in schemas.values()),
+            },
+            "quota": {
+                "max_items": settings.quota_max_items_per_user,
+                "max_bytes": settings.quota_max_bytes_per_user,
+                "max_items_per_schema": settings.quota_max_items_per_schema,
+            },
+        }
+
+    async def version(self, user_id: str) -> int:
+        """
+        사용자 메모리 목록의 버전을 조회합니다. 메모리가 저장/수정/삭제되면 증가합니다.
+
+        Args:
+            user_id: 사용자 ID
+
+        Returns:
+            단조 증가하는 버전 번호
+        """
+        return await self._repository.version(user_id)
+
+    async def next_expiry(self, user_id: str) -> datetime | None:
+        """
+        사용자 메모리 중 다음에 만료될 시각을 조회합니다.
+
+        만료된 메모리는 조회에서 바로 제외되지만 버전은 sweep이 삭제할 때 바뀌므로, 목록 ETag에 함께 사용합니다.
+
+        Args:
+            user_id: 사용자 ID
+
+        Returns:
+            아직 만료되지 않은 가장 이른 만료 시각 (TTL이 있는 메모리가 없으면 None)
+        """
+        return await self._repository.next_expiry(user_id)
+
+    async def _check_quota(self, user_id: str, schema_type: str, value: dict[str, Any]) -> str | None:
+        settings = get_settings()
+        schema_limit = settings.quota_max_items_per_schema.get(schema_type)
+        limits = (settings.quota_max_items_per_user, settings.quota_max_bytes_per_user, schema_limit)
+        if all(limit is None for limit in limits):
+            return None
+
+        usage = await self._repository.usage(user_id)
+        total_count = sum(item["count"] for item in usage.values())
+        total_bytes = sum(item["bytes"] for item in usage.values())
+        schema_count = usage.get(schema_type, {}).get("count", 0)
+
+        if settings.quota_max_items_per_user is not None and total_count + 1 > settings.quota_max_items_per_user:
+            return f"Quota exceeded: user has {total_count} memories (max {settings.quota_max_items_per_user})"
+        if schema_limit is not None and schema_count + 1 > schema_limit:
+            return f"Quota exceeded: user has {schema_count} {schema_type} memories (max {schema_limit})"
+        if settings.quota_max_bytes_per_user is not None:
+            size = len(json.dumps(value, ensure_ascii=False).encode())
+            if total_bytes + size > settings.quota_max_bytes_per_user:
+                return (
+                    f"Quota exceeded: storage would reach {total_bytes + size} bytes "
+                    f"(max {settings.quota_max_bytes_per_user})"
+                )
+        return None
+
     async def get_by_id(self, user_id: str, memory_id: str, schema_type: str | None = None) -> Memory | None:
         result = await self._repository.find_by_id(user_id, memory_id, schema_type)
         if result is None:
@@ -49,34 +250,162 @@ class MemoryService:
         namespace = self._build_namespace(user_id, result_schema_type)
         return Memory.from_store_result(memory_id, result, namespace)
 
-    async def search(self, user_id: str, query: str, schema_type: str | None = None, limit: int = 10) -> list[Memory]:
-        results = await self._repository.search(user_id, query, schema_type, limit)
+    async def search(
+        self,
+        user_id: str,
+        query: str,
+        schema_type: str | None = None,
+        limit: int = 10,
+        ef_search: int | None = None,
+        probes: int | None = None,
+        memory_type: MemoryType | None = None,
+        fields: dict[str, float] | None = None,
+    ) -> list[Memory]:
+        results = await self._repository.search(
+            user_id,
+            query,
+            schema_type,
+            limit,
+            ef_search=ef_search,
+            probes=probes,
+            memory_type=memory_type,
+            fields=fields,
+        )
+        return self._to_memories(user_id, schema_type, results)
 
-        # BaseStore의 결과를 Memory 엔티티로 변환
-        memories = []
-        for result in results:
-            memory_data = result["value"]
-            memory_id = result["key"]
+    async def search_many(
+        self, requests: list[SearchRequest], ef_search: int | None = None, probes: int | None = None
+    ) -> list[list[Memory]] | dict[str, Any]:
+        """
+        여러 사용자의 검색을 한 번의 store 배치로 실행합니다.
 
-            result_schema_type = memory_data.get("schema_type") or schema_type
-            namespace = self._build_namespace(user_id, result_schema_type)
+        Args:
+            requests: (user_id, query, schema_type, limit, memory_type, fields) 검색 목록
+            ef_search: HNSW 검색 후보 수 (모든 검색에 적용)
+            probes: IVFFlat 탐색 리스트 수 (모든 검색에 적용)
 
-            memories.append(Memory.from_store_result(memory_id, memory_data, namespace))  # type: ignore[arg-type]
+        Returns:
+            requests와 같은 순서의 검색 결과 목록, 또는 error
+        """
+        max_size = get_settings().batch_search_max_size
+        if len(requests) > max_size:
+            return {"error": f"Too many searches in one batch: {len(requests)} (max {max_size})"}
+        invalid = sorted({r.schema_type for r in requests if r.schema_type and get_schema(r.schema_type) is None})
+        if invalid:
+            return {
+                "error": f"Invalid schema type: {', '.join(invalid)}. Available types: {', '.join(get_schema_names())}"
+            }
+        for request in requests:
+            error = invalid_index_fields_error(request.fields, request.schema_type)
+            if error:
+                return {"error": error}
 
-        return memories
+        results = await self._repository.search_many(requests, ef_search=ef_search, probes=probes)
+        return [
+            self._to_memories(request.user_id, request.schema_type, request_results)
+            for request, request_results in zip(requests, results, strict=True)
+        ]
 
-    async def get_all(self, user_id: str, schema_type: str | None = None) -> list[Memory]:
+    async def search_stream(
+        self,
+        user_id: str,
+        query: str,
+        schema_type: str | None = None,
+        limit: int = 10,
+        ef_search: int | None = None,
+        probes: int | None = None,
+        memory_type: MemoryType | None = None,
+        fields: dict[str, float] | None = None,
+    ) -> AsyncIterator[SearchChunk]:
+        """
+        스키마별 검색을 동시에 실행하고, 먼저 응답한 네임스페이스의 결과부터 순서대로 내보냅니다.
+
+        한 스키마의 검색이 실패해도 나머지 결과는 계속 전달되며, 실패는 error가 채워진 chunk로 전달됩니다.
+        """
+        schema_types = [schema_type] if schema_type else get_schema_names()
+        if memory_type is not None:
+            schema_types = [name for name in schema_types if memory_type_of(name) == memory_type]
+        tasks = {
+            asyncio.create_task(
+                self.search(user_id, query, name, limit, ef_search=ef_search, probes=probes, fields=fields)
+            ): name
+            for name in schema_types
+        }
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = tasks[task]
+                    exc = task.exception()
+                    if exc is not None:
+                        logger.warning(
+                            "Streaming search failed for schema %s: %s", name, exc, extra={"user_id": user_id}
+                        )
+                        yield SearchChunk(name, [], error=str(exc))
+                    else:
+                        yield SearchChunk(name, task.result())
+        finally:
+            # 클라이언트 연결이 끊기면 남은 검색을 취소
+            for task in pending:
+                task.cancel()
+
+    async def recall(
+        self,
+        user_id: str,
+        query: str,
+        token_budget: int,
+        schema_types: list[str] | None = None,
+        limit_per_schema: int = 10,
+    ) -> dict[str, Any]:
+        """
+        여러 스키마를 동시에 검색해 중복 제거/정렬 후 토큰 예산 안에서 에이전트 컨텍스트를 구성합니다.
+
+        Args:
+            user_id: 사용자 ID
+            query: 대화 스니펫 (검색 쿼리)
+            token_budget: 컨텍스트에 사용할 최대 토큰 수 (근사치)
+            schema_types: 검색할 스키마 타입 (None이면 모든 타입)
+            limit_per_schema: 스키마별 검색 후보 수
+
+        Returns:
+            선택된 메모리와 조립된 컨텍스트 문자열
+        """
+        schema_types = schema_types or get_schema_names()
+        invalid = [schema_type for schema_type in schema_types if get_schema(schema_type) is None]
+        if invalid:
+            return {
+                "error": f"Invalid schema type: {', '.join(invalid)}. Available types: {', '.join(get_schema_names())}"
+            }
+
+        results = await asyncio.gather(
+            *(self.search(user_id, query, schema_type, limit_per_schema) for schema_type in schema_types)
+        )
+        candidates = dedupe_memories(rank_memories([memory for memories in results for memory in memories]))
+        packed, used_tokens = pack_memories(candidates, token_budget)
+
+        return {
+            "memories": [item.to_dict() for item in packed],
+            "context": "\n".join(item.text for item in packed),
+            "used_tokens": used_tokens,
+            "candidates": len(candidates),
+        }
+
+    async def get_all(
+        self, user_id: str, schema_type: str | None = None, memory_type: MemoryType | None = None
+    ) -> list[Memory]:
         """
         사용자의 모든 메모리를 조회합니다.
 
         Args:
             user_id: 사용자 ID
             schema_type: 스키마 타입 필터 (None이면 모든 타입)
+            memory_type: 메모리 타입 필터 (semantic/episodic/procedural)
 
         Returns:
             Memory 인스턴스 리스트
         """
-        return await self.search(user_id, query="", schema_type=schema_type, limit=1000)
+        return await self.search(user_id, query="", schema_type=schema_type, limit=1000, memory_type=memory_type)
 
     async def delete(self, user_id: str, memory_id: str, schema_type: str | None = None) -> bool:
         """
@@ -92,10 +421,29 @@ class MemoryService:
         """
         return await self._repository.delete(user_id, memory_id, schema_type)
 
+    def _to_memories(self, user_id: str, schema_type: str | None, results: list[dict[str, Any]]) -> list[Memory]:
+        # BaseStore의 결과를 Memory 엔티티로 변환
+        memories: list[Memory] = []
+        for result in results:
+            memory_data = result["value"]
+            memory_id = result["key"]
+
+            result_schema_type = memory_data.get("schema_type") or schema_type
+            namespace = self._build_namespace(user_id, result_schema_type)
+
+            memories.append(
+                Memory.from_store_result(memory_id, memory_data, namespace, score=result.get("score"))  # type: ignore[arg-type]
+            )
+
+        return memories
+
     def _build_namespace(self, user_id: str, schema_type: str | None) -> tuple[str, ...]:
         """
         네임스페이스를 구성합니다.
 
+        schema_type을 모르면 memory_type도 정할 수 없어 ("memory", memory_type, user_id, schema_type) 형태를 만들 수 없으므로,
+        다른 namespace로 대체하지 않고 ValueError를 발생시킵니다.
+
         Args:
             user_id: 사용자 ID
             schema_type: 스키마 타입
@@ -103,8 +451,19 @@ class MemoryService:
         Returns:
             네임스페이스 tuple
         """
-        if schema_type:
-            from app.core.namespace_builder import MemoryNamespaceBuilder
+        if not schema_type:
+            raise ValueError(f"Cannot build a memory namespace without schema_type for user {user_id}")
+        return MemoryNamespaceBuilder.for_memory(user_id, schema_type)
+
+
+def _merge_patch(target: Any, patch: Any) -> Any:
+    if not isinstance(patch, dict):
+        return patch
 
-            return MemoryNamespaceBuilder.for_memory(user_id, schema_type)
-        return "memory", user_id
+    merged: dict[str, Any] = dict(cast(dict[str, Any], target)) if isinstance(target, dict) else {}
+    for key, value in cast(dict[str, Any], patch).items():
+        if value is None:
+            merged.pop(key, None)
+        else:
+            merged[key] = _merge_patch(merged.get(key), value)
+    return merged
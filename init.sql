@@ -17,8 +17,11 @@ CREATE TABLE IF NOT EXISTS memories (
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
-CREATE INDEX IF NOT EXISTS idx_memories_embedding ON memories USING ivfflat (embedding vector_cosine_ops)
-WITH (lists = 100);
+-- HNSW: ivfflat과 달리 데이터 적재 전에 생성해도 recall이 떨어지지 않음.
+-- langgraph store(store_vectors)의 인덱스는 Settings(VECTOR_INDEX_KIND 등)로 관리하고
+-- `python -m app.cli rebuild-index`로 재생성합니다.
+CREATE INDEX IF NOT EXISTS idx_memories_embedding ON memories USING hnsw (embedding vector_cosine_ops)
+WITH (m = 16, ef_construction = 64);
 
 CREATE INDEX IF NOT EXISTS idx_memories_user_type ON memories (user_id, memory_type);
 
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import dependencies
+from app.api.routes import admin
+from app.config.settings import Settings
+
+
+class TestAdminAuth:
+    def test_not_mounted_without_token(self, client: TestClient):
+        assert client.get("/admin/profiles").status_code == 404
+
+    @pytest.mark.parametrize(
+        "headers,status", [({}, 401), ({"X-Admin-Token": "wrong"}, 401), ({"X-Admin-Token": "s3cret"}, 200)]
+    )
+    def test_requires_token(self, monkeypatch: pytest.MonkeyPatch, headers: dict[str, str], status: int):
+        monkeypatch.setattr(dependencies, "get_settings", lambda: Settings(admin_token="s3cret"))
+        app = FastAPI()
+        app.include_router(admin.router)
+
+        assert TestClient(app).get("/admin/profiles", headers=headers).status_code == status
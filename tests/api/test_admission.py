@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from typing import Any
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import dependencies
+from app.services.admission import AdmissionController
+
+
+def _controller(**overrides: Any) -> AdmissionController:
+    params: dict[str, Any] = {
+        "user_rate": 1000.0,
+        "user_burst": 1000,
+        "user_max_in_flight": 10,
+        "max_in_flight": 10,
+        "max_queue": 10,
+        "queue_timeout_s": 1.0,
+    }
+    params.update(overrides)
+    return AdmissionController(**params)
+
+
+def _batch(*user_ids: str) -> dict[str, Any]:
+    return {"searches": [{"user_id": user_id, "query": "dark mode"} for user_id in user_ids]}
+
+
+class TestBatchSearchAdmission:
+    def test_batch_is_rejected_when_a_user_is_rate_limited(
+        self, client: TestClient, mock_repository: AsyncMock, monkeypatch: pytest.MonkeyPatch
+    ):
+        mock_repository.search_many.return_value = [[], []]
+        controller = _controller(user_rate=0.01, user_burst=1)
+        monkeypatch.setattr(dependencies, "get_admission_controller", lambda: controller)
+
+        first = client.post("/memories/search/batch", json=_batch("user-1", "user-2"))
+        second = client.post("/memories/search/batch", json=_batch("user-3", "user-2"))
+
+        assert first.status_code == 200
+        assert second.status_code == 429
+        assert "user-2" in second.json()["error"]
+        assert "Retry-After" in second.headers
+
+    async def test_batch_is_rejected_when_global_limit_is_full(
+        self, client: TestClient, monkeypatch: pytest.MonkeyPatch
+    ):
+        controller = _controller(max_in_flight=1, max_queue=0)
+        monkeypatch.setattr(dependencies, "get_admission_controller", lambda: controller)
+
+        async with controller.admit("user-9"):
+            response = client.post("/memories/search/batch", json=_batch("user-1"))
+
+        assert response.status_code == 503
+        assert controller.metrics()["rejected_queue_full"] == 1
@@ -0,0 +1,66 @@
+# pyright: reportPrivateUsage=false
+from __future__ import annotations
+
+from collections.abc import Generator
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.infrastructure.memory_store import IndexedMemoryStore
+from app.infrastructure.repository import MemoryRepository
+from app.main import app
+from app.services import get_memory_service
+from app.services.service import MemoryService
+
+
+@pytest.fixture
+def store() -> IndexedMemoryStore:
+    return IndexedMemoryStore()
+
+
+@pytest.fixture
+def store_client(store: IndexedMemoryStore) -> Generator[TestClient, None, None]:
+    service = MemoryService(repository=MemoryRepository(store=store))  # type: ignore[arg-type]
+    app.dependency_overrides[get_memory_service] = lambda: service
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+
+
+class TestListEtag:
+    def test_unchanged_list_returns_304(self, store_client: TestClient, test_user_id: str):
+        params = {"user_id": test_user_id, "schema_type": "UserPreference"}
+        store_client.post("/memories", params=params, json={"category": "ui", "preference": "dark mode"})
+        listed = store_client.get("/memories", params={"user_id": test_user_id})
+
+        cached = store_client.get(
+            "/memories", params={"user_id": test_user_id}, headers={"If-None-Match": listed.headers["etag"]}
+        )
+
+        assert cached.status_code == 304
+
+    def test_expired_item_changes_etag_before_sweep(
+        self, store: IndexedMemoryStore, store_client: TestClient, test_user_id: str
+    ):
+        params = {"user_id": test_user_id, "schema_type": "UserPreference"}
+        created = store_client.post("/memories", params=params, json={"category": "ui", "preference": "dark mode"})
+        listed = store_client.get("/memories", params={"user_id": test_user_id})
+        namespace = ("memory", "semantic", test_user_id, "UserPreference")
+        key = created.json()["data"]["id"]
+        record = store._record(namespace, key)
+        assert record is not None
+        store._set_expiry(namespace, key, record, datetime.now(timezone.utc) + timedelta(minutes=5))
+        with_ttl = store_client.get("/memories", params={"user_id": test_user_id})
+
+        # sweep 전에 만료 → version은 그대로지만 ETag가 바뀌어 304가 아닌 새 목록을 받음
+        store._set_expiry(namespace, key, record, datetime.now(timezone.utc) - timedelta(seconds=1))
+        after_expiry = store_client.get(
+            "/memories", params={"user_id": test_user_id}, headers={"If-None-Match": with_ttl.headers["etag"]}
+        )
+
+        assert with_ttl.headers["etag"] != listed.headers["etag"]
+        assert after_expiry.status_code == 200
+        assert after_expiry.json()["data"]["memories"] == []
+        assert after_expiry.headers["etag"] != with_ttl.headers["etag"]
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from collections.abc import Generator
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import negotiation
+from app.api.negotiation import accepts_msgpack
+from app.infrastructure.memory_store import IndexedMemoryStore
+from app.infrastructure.repository import MemoryRepository
+from app.main import app
+from app.services import get_memory_service
+from app.services.service import MemoryService
+
+msgpack = pytest.importorskip("msgpack")
+
+MSGPACK = "application/msgpack"
+
+
+@pytest.fixture
+def store_client() -> Generator[TestClient, None, None]:
+    service = MemoryService(repository=MemoryRepository(store=IndexedMemoryStore()))  # type: ignore[arg-type]
+    app.dependency_overrides[get_memory_service] = lambda: service
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+
+
+class TestAcceptNegotiation:
+    @pytest.mark.parametrize(
+        "accept,expected",
+        [
+            (None, False),
+            ("*/*", False),
+            ("application/json", False),
+            ("application/msgpack", True),
+            ("application/x-msgpack, application/json", True),
+            ("application/json, application/msgpack", False),
+            ("application/json;q=0.5, application/msgpack;q=0.9", True),
+            ("application/msgpack;q=0", False),
+        ],
+    )
+    def test_accepts_msgpack(self, accept: str | None, expected: bool):
+        assert accepts_msgpack(accept) is expected
+
+    def test_falls_back_to_json_without_msgpack(self, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(negotiation, "msgpack_available", lambda: False)
+
+        assert accepts_msgpack("application/msgpack") is False
+
+
+class TestMsgPackRoutes:
+    def test_create_and_list_with_msgpack(self, store_client: TestClient, test_user_id: str):
+        body = msgpack.packb({"category": "ui", "preference": "dark mode"})
+        created = store_client.post(
+            "/memories",
+            params={"user_id": test_user_id, "schema_type": "UserPreference"},
+            content=body,
+            headers={"Content-Type": MSGPACK, "Accept": MSGPACK},
+        )
+
+        assert created.headers["content-type"] == MSGPACK
+        assert msgpack.unpackb(created.content)["data"]["content"]["preference"] == "dark mode"
+
+        listed = store_client.get("/memories", params={"user_id": test_user_id}, headers={"Accept": MSGPACK})
+        as_json = store_client.get("/memories", params={"user_id": test_user_id})
+
+        assert listed.headers["content-type"] == MSGPACK
+        assert "Accept" in listed.headers["vary"]
+        assert msgpack.unpackb(listed.content) == as_json.json()
+        assert listed.headers["etag"] != as_json.headers["etag"]
+        not_modified = store_client.get(
+            "/memories",
+            params={"user_id": test_user_id},
+            headers={"Accept": MSGPACK, "If-None-Match": listed.headers["etag"]},
+        )
+        assert not_modified.status_code == 304
+
+    def test_batch_search_with_msgpack(self, store_client: TestClient, test_user_id: str):
+        store_client.post(
+            "/memories",
+            params={"user_id": test_user_id, "schema_type": "UserFact"},
+            json={"fact_type": "hobby", "content": "plays chess"},
+        )
+
+        response = store_client.post(
+            "/memories/search/batch",
+            content=msgpack.packb({"searches": [{"id": "a", "user_id": test_user_id, "query": "chess"}]}),
+            headers={"Content-Type": MSGPACK, "Accept": MSGPACK},
+        )
+
+        result = msgpack.unpackb(response.content)["data"]["results"]["a"]
+        assert result["count"] == 1
+        assert result["memories"][0]["content"]["content"] == "plays chess"
+
+    def test_invalid_msgpack_body_is_rejected(self, store_client: TestClient):
+        response = store_client.post(
+            "/memories/search/batch", content=msgpack.packb({"searches": "nope"}), headers={"Content-Type": MSGPACK}
+        )
+
+        assert response.status_code == 422
+
+    def test_json_clients_unchanged(self, store_client: TestClient, test_user_id: str):
+        response = store_client.get("/memories/search", params={"user_id": test_user_id, "query": "x"})
+
+        assert response.headers["content-type"] == "application/json"
+        assert response.json()["data"]["count"] == 0
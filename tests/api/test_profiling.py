@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from collections.abc import Generator
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.middleware import ProfilingMiddleware
+from app.api.routes import memory
+from app.infrastructure.profiling import get_slow_request_buffer
+from app.infrastructure.repository import MemoryRepository
+from app.services import get_memory_service
+from app.services.service import MemoryService
+from tests.unit.mocks import MockStore
+
+
+def _client(sample_rate: float) -> TestClient:
+    app = FastAPI()
+    app.include_router(memory.router)
+    app.add_middleware(ProfilingMiddleware, header="x-profile", sample_rate=sample_rate, interval_ms=1.0)
+    service = MemoryService(repository=MemoryRepository(store=MockStore({})))  # type: ignore[arg-type]
+    app.dependency_overrides[get_memory_service] = lambda: service
+    return TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def slow_requests() -> Generator[None, None, None]:
+    get_slow_request_buffer().clear()
+    yield
+    get_slow_request_buffer().clear()
+
+
+def _create(client: TestClient, user_id: str, headers: dict[str, str] | None = None) -> int:
+    response = client.post(
+        "/memories",
+        params={"user_id": user_id, "schema_type": "UserPreference"},
+        json={"category": "ui", "preference": "dark mode"},
+        headers=headers,
+    )
+    return response.status_code
+
+
+class TestProfilingMiddleware:
+    def test_header_profiles_request(self, test_user_id: str):
+        client = _client(sample_rate=0.0)
+
+        assert _create(client, test_user_id, headers={"X-Profile": "1"}) == 200
+
+        (profile,) = get_slow_request_buffer().snapshot()
+        assert (profile.method, profile.path, profile.trigger, profile.status_code) == (
+            "POST",
+            "/memories",
+            "header",
+            200,
+        )
+        assert [call.op for call in profile.store_calls] == ["aput"]
+        assert profile.duration_ms > 0
+
+    @pytest.mark.parametrize("value", ["0", "false"])
+    def test_unselected_requests_are_not_profiled(self, test_user_id: str, value: str):
+        client = _client(sample_rate=0.0)
+
+        _create(client, test_user_id)
+        _create(client, test_user_id, headers={"X-Profile": value})
+
+        assert get_slow_request_buffer().snapshot() == []
+
+    def test_sampling_profiles_without_header(self, test_user_id: str):
+        client = _client(sample_rate=1.0)
+
+        _create(client, test_user_id)
+
+        assert [profile.trigger for profile in get_slow_request_buffer().snapshot()] == ["sampled"]
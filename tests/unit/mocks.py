@@ -1,16 +1,31 @@
 from __future__ import annotations
 
+import json
+from collections.abc import AsyncGenerator, Callable
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
 from typing import Any
 from unittest.mock import MagicMock
 
+from psycopg import sql
+
 
 class MockStore:
     def __init__(self, storage: dict[str, dict[str, Any]]):
         self._storage = storage
+        self._versions: dict[str, int] = {}
+        self.batches: list[list[Any]] = []
+
+    def _bump(self, namespace: tuple[str, ...]) -> None:
+        if len(namespace) == 4 and namespace[0] == "memory":
+            self._versions[namespace[2]] = self._versions.get(namespace[2], 0) + 1
 
-    async def aput(self, namespace: tuple[str, ...], key: str, value: dict[str, Any]) -> None:
+    async def aput(
+        self, namespace: tuple[str, ...], key: str, value: dict[str, Any], index: Any = None, ttl: Any = None
+    ) -> None:
         storage_key = f"{':'.join(namespace)}:{key}"
         self._storage[storage_key] = value
+        self._bump(namespace)
 
     async def aget(self, namespace: tuple[str, ...], key: str):
         storage_key = f"{':'.join(namespace)}:{key}"
@@ -20,7 +35,56 @@ class MockStore:
             return mock_result
         return None
 
-    async def asearch(self, namespace: tuple[str, ...], query: str, limit: int = 10) -> list[Any]:
+    async def aupdate(
+        self, namespace: tuple[str, ...], key: str, update: Any, index: Any = None, delete_keys: Any = ()
+    ) -> dict[str, Any] | None:
+        storage_key = f"{':'.join(namespace)}:{key}"
+        if storage_key not in self._storage:
+            return None
+        updated = update(self._storage[storage_key])
+        self._storage[storage_key] = updated
+        for delete_key in delete_keys:
+            if delete_key != key:
+                self._storage.pop(f"{':'.join(namespace)}:{delete_key}", None)
+        self._bump(namespace)
+        return updated
+
+    async def alist_changed(
+        self, namespace_prefix: tuple[str, ...], since: Any = None, after: Any = None, limit: int = 1000
+    ) -> list[Any]:
+        # 변경 시각을 저장하지 않으므로 모든 항목을 변경된 것으로 취급
+        prefix = ":".join(namespace_prefix) + ":"
+        rows: list[tuple[tuple[str, ...], str]] = []
+        for storage_key in self._storage:
+            if storage_key.startswith(prefix):
+                *namespace, key = storage_key.split(":")
+                rows.append((tuple(namespace), key))
+        rows = sorted(row for row in rows if after is None or row > tuple(after))
+        return [(namespace, key, datetime.now(timezone.utc)) for namespace, key in rows[:limit]]
+
+    async def alist_namespace(self, namespace: tuple[str, ...], after_key: str = "", limit: int = 1000) -> list[Any]:
+        prefix = ":".join(namespace) + ":"
+        keys = sorted(k[len(prefix) :] for k in self._storage if k.startswith(prefix) and ":" not in k[len(prefix) :])
+        return [(key, self._storage[prefix + key]) for key in keys if key > after_key][:limit]
+
+    async def ausage(self, user_id: str) -> list[dict[str, Any]]:
+        usage: dict[str, dict[str, Any]] = {}
+        for storage_key, value in self._storage.items():
+            namespace = storage_key.split(":")[:-1]
+            if len(namespace) != 4 or namespace[0] != "memory" or namespace[2] != user_id:
+                continue
+            row = usage.setdefault(namespace[3], {"schema_type": namespace[3], "item_count": 0, "total_bytes": 0})
+            row["item_count"] += 1
+            row["total_bytes"] += len(json.dumps(value).encode())
+        return list(usage.values())
+
+    async def aversion(self, user_id: str) -> int:
+        return self._versions.get(user_id, 0)
+
+    async def anext_expiry(self, user_id: str) -> datetime | None:
+        return None
+
+    async def asearch(self, namespace: tuple[str, ...], query: str, limit: int = 10, filter: Any = None) -> list[Any]:
         results: list[Any] = []
         namespace_prefix = ":".join(namespace)
 
@@ -31,13 +95,84 @@ class MockStore:
                     mock_item = MagicMock()
                     mock_item.key = key
                     mock_item.value = value
+                    mock_item.score = None
+                    mock_item.updated_at = datetime.now(timezone.utc)
                     results.append(mock_item)
 
         return results[:limit]
 
+    async def abatch(self, ops: list[Any]) -> list[Any]:
+        self.batches.append(ops)
+        return [await self.asearch(op.namespace_prefix, op.query or "", op.limit, op.filter) for op in ops]
+
     async def adelete(self, namespace: tuple[str, ...], key: str) -> None:
         storage_key = f"{':'.join(namespace)}:{key}"
         if storage_key in self._storage:
             del self._storage[storage_key]
+            self._bump(namespace)
         else:
             raise KeyError(f"Key not found: {storage_key}")
+
+
+Rows = list[dict[str, Any]]
+
+
+def _no_rows(query: str, params: Any) -> Rows:
+    return []
+
+
+class RecordingCursor:
+    """
+    실행된 SQL(공백 정규화)과 파라미터를 기록하는 psycopg AsyncCursor 대역
+
+    respond(query, params)가 반환한 행을 fetchone/fetchall 결과로 쓰고, rowcount는 그 행 수입니다.
+    cursor()/transaction()을 제공하므로 psycopg AsyncConnection 대역으로도 쓸 수 있습니다.
+    """
+
+    def __init__(self, respond: Callable[[str, Any], Rows] | None = None) -> None:
+        self.executed: list[tuple[str, Any]] = []
+        self.rowcount = -1
+        self.connection = self
+        self._respond = respond or _no_rows
+        self._rows: Rows = []
+
+    async def execute(self, query: str | bytes | sql.Composable, params: Any = None) -> RecordingCursor:
+        if isinstance(query, sql.Composable):
+            query = query.as_string(None)
+        text = " ".join((query.decode() if isinstance(query, bytes) else query).split())
+        self.executed.append((text, params))
+        self._rows = list(self._respond(text, params))
+        self.rowcount = len(self._rows)
+        return self
+
+    async def executemany(self, query: str | bytes | sql.Composable, params_seq: Any) -> None:
+        for params in params_seq:
+            await self.execute(query, params)
+
+    async def fetchone(self) -> dict[str, Any] | None:
+        return self._rows[0] if self._rows else None
+
+    async def fetchall(self) -> Rows:
+        return self._rows
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncGenerator[None, None]:
+        yield
+
+    @asynccontextmanager
+    async def cursor(self) -> AsyncGenerator[RecordingCursor, None]:
+        yield self
+
+    async def __aenter__(self) -> RecordingCursor:
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        return None
+
+    @asynccontextmanager
+    async def cursor_context(self, *, pipeline: bool = False) -> AsyncGenerator[RecordingCursor, None]:
+        """MemoryStore._cursor 대체용"""
+        yield self
+
+    def statements(self, keyword: str) -> list[tuple[str, Any]]:
+        return [(query, params) for query, params in self.executed if keyword in query]
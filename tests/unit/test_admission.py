@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import pytest
+
+from app.services.admission import AdmissionController, AdmissionRejectedError
+
+
+def _controller(**overrides: Any) -> AdmissionController:
+    params: dict[str, Any] = {
+        "user_rate": 1000.0,
+        "user_burst": 1000,
+        "user_max_in_flight": 10,
+        "max_in_flight": 10,
+        "max_queue": 10,
+        "queue_timeout_s": 1.0,
+    }
+    params.update(overrides)
+    return AdmissionController(**params)
+
+
+class TestAdmissionController:
+    async def test_rate_limit_rejects_with_429(self):
+        controller = _controller(user_rate=0.5, user_burst=2)
+
+        for _ in range(2):
+            async with controller.admit("user-1"):
+                pass
+        with pytest.raises(AdmissionRejectedError) as exc_info:
+            async with controller.admit("user-1"):
+                pass
+
+        assert exc_info.value.status_code == 429
+        assert exc_info.value.retry_after >= 1
+        # 다른 사용자는 영향 없음
+        async with controller.admit("user-2"):
+            pass
+
+    async def test_user_concurrency_limit(self):
+        controller = _controller(user_max_in_flight=1)
+        entered, release = asyncio.Event(), asyncio.Event()
+
+        async def hold() -> None:
+            async with controller.admit("user-1"):
+                entered.set()
+                await release.wait()
+
+        task = asyncio.create_task(hold())
+        await entered.wait()
+        with pytest.raises(AdmissionRejectedError) as exc_info:
+            async with controller.admit("user-1"):
+                pass
+        release.set()
+        await task
+
+        assert exc_info.value.status_code == 429
+
+    async def test_global_queue_full_sheds_with_503(self):
+        controller = _controller(max_in_flight=1, max_queue=0)
+        entered, release = asyncio.Event(), asyncio.Event()
+
+        async def hold() -> None:
+            async with controller.admit("user-1"):
+                entered.set()
+                await release.wait()
+
+        task = asyncio.create_task(hold())
+        await entered.wait()
+        with pytest.raises(AdmissionRejectedError) as exc_info:
+            async with controller.admit("user-2"):
+                pass
+        release.set()
+        await task
+
+        assert exc_info.value.status_code == 503
+        assert controller.metrics()["rejected_queue_full"] == 1
+
+    async def test_queue_timeout(self):
+        controller = _controller(max_in_flight=1, queue_timeout_s=0.01)
+        entered, release = asyncio.Event(), asyncio.Event()
+
+        async def hold() -> None:
+            async with controller.admit("user-1"):
+                entered.set()
+                await release.wait()
+
+        task = asyncio.create_task(hold())
+        await entered.wait()
+        with pytest.raises(AdmissionRejectedError) as exc_info:
+            async with controller.admit("user-2"):
+                pass
+        release.set()
+        await task
+
+        assert exc_info.value.status_code == 503
+        assert controller.metrics()["in_flight"] == 0
+
+    async def test_queue_timeout_refunds_tokens(self):
+        controller = _controller(user_rate=0.001, user_burst=1, max_in_flight=1, queue_timeout_s=0.01)
+        entered, release = asyncio.Event(), asyncio.Event()
+
+        async def hold() -> None:
+            async with controller.admit("user-1"):
+                entered.set()
+                await release.wait()
+
+        task = asyncio.create_task(hold())
+        await entered.wait()
+        with pytest.raises(AdmissionRejectedError):
+            async with controller.admit("user-2"):
+                pass
+        release.set()
+        await task
+
+        async with controller.admit("user-2"):
+            pass
+
+    async def test_metrics_record_queue_wait(self):
+        controller = _controller()
+
+        async with controller.admit("user-1"):
+            pass
+
+        metrics = controller.metrics()
+        assert metrics["admitted"] == 1
+        assert metrics["queue_wait_ms"]["max"] >= 0
+
+    async def test_multi_user_request_checks_every_user(self):
+        controller = _controller(user_rate=0.5, user_burst=1)
+
+        async with controller.admit("user-1"):
+            pass
+        with pytest.raises(AdmissionRejectedError) as exc_info:
+            async with controller.admit("user-2", "user-1"):
+                pass
+
+        assert exc_info.value.status_code == 429
+        assert "user-1" in exc_info.value.reason
+        # 거절된 배치는 앞선 사용자의 토큰도 소비하지 않음
+        async with controller.admit("user-2"):
+            pass
+
+    async def test_concurrency_rejection_keeps_tokens(self):
+        controller = _controller(user_rate=0.5, user_burst=2, user_max_in_flight=1)
+        entered, release = asyncio.Event(), asyncio.Event()
+
+        async def hold() -> None:
+            async with controller.admit("user-1"):
+                entered.set()
+                await release.wait()
+
+        task = asyncio.create_task(hold())
+        await entered.wait()
+        for _ in range(3):
+            with pytest.raises(AdmissionRejectedError):
+                async with controller.admit("user-1"):
+                    pass
+        release.set()
+        await task
+
+        async with controller.admit("user-1"):
+            pass
+        assert controller.metrics()["rejected_rate_limited"] == 0
+
+    async def test_multi_user_request_takes_one_global_slot(self):
+        controller = _controller(max_in_flight=1, max_queue=0)
+
+        async with controller.admit("user-1", "user-2", "user-1"):
+            metrics = controller.metrics()
+            with pytest.raises(AdmissionRejectedError) as exc_info:
+                async with controller.admit("user-3"):
+                    pass
+
+        assert metrics["in_flight"] == 1
+        assert metrics["admitted"] == 1
+        assert exc_info.value.status_code == 503
+        assert controller.metrics()["in_flight"] == 0
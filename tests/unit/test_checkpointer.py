@@ -0,0 +1,108 @@
+# pyright: reportPrivateUsage=false
+from __future__ import annotations
+
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import pytest
+
+from app.config.settings import Settings
+from app.infrastructure import checkpointer as checkpointer_module
+from app.infrastructure.checkpointer import CheckpointPruner
+
+
+class FakeCursor:
+    def __init__(self, pool: FakePool) -> None:
+        self._pool = pool
+        self._result: list[dict[str, Any]] = []
+        self.rowcount = 0
+
+    async def execute(self, query: str, params: dict[str, Any]) -> None:
+        self._pool.executed.append((query, params))
+        self.rowcount = 0
+        if query is checkpointer_module._SELECT_THREADS_SQL:
+            self._result = [t for t in self._pool.threads if t["thread_id"] > params["after"]][: params["limit"]]
+        elif query is checkpointer_module._COMPACT_CHECKPOINTS_SQL:
+            thread = next(t for t in self._pool.threads if t["thread_id"] == params["thread_id"])
+            self._result = [{"checkpoints": thread["checkpoints"] - params["keep"], "writes": 2}]
+        elif query is checkpointer_module._DELETE_ORPHAN_BLOBS_SQL:
+            self.rowcount = 3
+
+    async def fetchall(self) -> list[dict[str, Any]]:
+        return self._result
+
+    async def fetchone(self) -> dict[str, Any] | None:
+        return self._result[0] if self._result else None
+
+
+class FakeConnection:
+    def __init__(self, pool: FakePool) -> None:
+        self._pool = pool
+
+    @asynccontextmanager
+    async def cursor(self, **_: Any):
+        yield FakeCursor(self._pool)
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+
+class FakePool:
+    def __init__(self, threads: list[dict[str, Any]]) -> None:
+        self.threads = threads
+        self.executed: list[tuple[str, dict[str, Any]]] = []
+
+    @asynccontextmanager
+    async def connection(self):
+        yield FakeConnection(self)
+
+    def statements_for(self, thread_id: str) -> list[str]:
+        return [query for query, params in self.executed if params.get("thread_id") == thread_id]
+
+
+def _thread(thread_id: str, checkpoints: int, idle: timedelta) -> dict[str, Any]:
+    return {"thread_id": thread_id, "checkpoints": checkpoints, "last_ts": datetime.now(timezone.utc) - idle}
+
+
+class TestCheckpointPruner:
+    async def test_compacts_idle_threads_and_deletes_expired(self):
+        pool = FakePool(
+            [
+                _thread("active", 5, timedelta(minutes=1)),
+                _thread("expired", 4, timedelta(days=40)),
+                _thread("idle", 6, timedelta(hours=2)),
+                _thread("small", 1, timedelta(hours=2)),
+            ]
+        )
+        pruner = CheckpointPruner(
+            pool,  # type: ignore[arg-type]
+            keep_last=2,
+            min_idle=timedelta(minutes=10),
+            thread_ttl=timedelta(days=30),
+            batch_size=2,
+        )
+
+        report = await pruner.run()
+
+        assert report.threads_scanned == 4
+        assert report.threads_deleted == 1
+        assert report.threads_compacted == 1
+        assert report.checkpoints_deleted == 4 + 4
+        assert report.writes_deleted == 2
+        assert report.blobs_deleted == 3
+        assert pool.statements_for("active") == []
+        assert pool.statements_for("small") == []
+        assert pool.statements_for("expired") == list(checkpointer_module._DELETE_THREAD_SQL)
+        assert checkpointer_module._COMPACT_CHECKPOINTS_SQL in pool.statements_for("idle")
+
+    def test_keep_last_must_be_positive(self):
+        with pytest.raises(ValueError):
+            CheckpointPruner(FakePool([]), keep_last=0)  # type: ignore[arg-type]
+
+    def test_periodic_pruning_is_opt_in(self, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.delenv("CHECKPOINT_PRUNE_ENABLED", raising=False)
+        monkeypatch.setattr(checkpointer_module, "get_settings", Settings)
+
+        assert checkpointer_module.start_checkpoint_pruner() is False
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import uuid
+from typing import Any
+
+import pytest
+
+from app.infrastructure.memory_store import IndexedMemoryStore
+from app.infrastructure.repository import MemoryRepository
+from app.services.consolidation import ConsolidationEngine, jaccard, merge_schemas, shingles
+from app.services.service import MemoryService
+from tests.unit.mocks import MockStore
+
+
+@pytest.fixture
+def repository() -> MemoryRepository:
+    storage: dict[str, dict[str, Any]] = {}
+    return MemoryRepository(store=MockStore(storage))  # type: ignore[arg-type]
+
+
+@pytest.fixture
+def service(repository: MemoryRepository) -> MemoryService:
+    return MemoryService(repository=repository)
+
+
+class TestSimilarity:
+    def test_paraphrase_is_more_similar_than_different_fact(self):
+        base = shingles("Works as a backend software engineer at Acme")
+
+        assert jaccard(base, shingles("works as a backend software engineer at acme corp")) > 0.7
+        assert jaccard(base, shingles("Enjoys hiking in the mountains")) < 0.3
+
+    def test_merge_keeps_max_confidence_and_unions_lists(self):
+        merged = merge_schemas(
+            [
+                {"content": "a", "confidence": 0.6, "tags": ["work", "Tech"]},
+                {"content": "b", "confidence": 0.9, "tags": ["tech", "career"]},
+            ]
+        )
+
+        assert merged["content"] == "a"
+        assert merged["confidence"] == 0.9
+        assert merged["tags"] == ["work", "Tech", "career"]
+
+
+class TestConsolidationEngine:
+    async def test_dry_run_reports_without_merging(
+        self, service: MemoryService, repository: MemoryRepository, test_user_id: str
+    ):
+        await service.create(
+            test_user_id,
+            "UserFact",
+            {"fact_type": "professional", "content": "Works as a backend software engineer at Acme", "tags": ["work"]},
+        )
+        await service.create(
+            test_user_id,
+            "UserFact",
+            {
+                "fact_type": "professional",
+                "content": "works as a backend software engineer at Acme",
+                "tags": ["career"],
+                "confidence": 0.9,
+            },
+        )
+
+        report = await ConsolidationEngine(repository).run(dry_run=True)
+
+        assert report.memories_merged == 1
+        assert report.groups[0].result["tags"] == ["work", "career"]
+        assert report.groups[0].result["confidence"] == 1.0
+        assert len(await service.get_all(test_user_id)) == 2
+
+    async def test_merges_duplicates(self, service: MemoryService, repository: MemoryRepository, test_user_id: str):
+        first = await service.create(
+            test_user_id,
+            "UserFact",
+            {"fact_type": "hobby", "content": "Plays chess every weekend", "tags": ["games"], "confidence": 0.7},
+        )
+        await service.create(
+            test_user_id,
+            "UserFact",
+            {"fact_type": "hobby", "content": "plays chess every weekend!", "tags": ["weekend"], "confidence": 0.5},
+        )
+        await service.create(test_user_id, "UserFact", {"fact_type": "hobby", "content": "Collects vinyl records"})
+
+        report = await ConsolidationEngine(repository).run(dry_run=False)
+        memories = await service.get_all(test_user_id)
+
+        assert report.memories_merged == 1
+        assert len(memories) == 2
+        survivor = await service.get_by_id(test_user_id, first["id"], "UserFact")
+        assert survivor is not None
+        assert survivor.content["tags"] == ["games", "weekend"]
+        assert survivor.content["confidence"] == 0.7
+
+    async def test_vanished_survivor_keeps_duplicates(self, test_user_id: str):
+        store = IndexedMemoryStore()
+        repository = MemoryRepository(store=store)  # type: ignore[arg-type]
+        service = MemoryService(repository=repository)
+        first = await service.create(
+            test_user_id, "UserFact", {"fact_type": "hobby", "content": "Plays chess every weekend", "confidence": 0.9}
+        )
+        second = await service.create(
+            test_user_id, "UserFact", {"fact_type": "hobby", "content": "plays chess every weekend!", "confidence": 0.5}
+        )
+        update = store.aupdate
+
+        async def delete_then_update(namespace: tuple[str, ...], key: str, *args: Any, **kwargs: Any) -> Any:
+            # 스캔과 병합 사이에 survivor가 삭제된 경우
+            await store.adelete(namespace, key)
+            return await update(namespace, key, *args, **kwargs)
+
+        store.aupdate = delete_then_update  # type: ignore[method-assign]
+
+        report = await ConsolidationEngine(repository).run(dry_run=False)
+
+        assert report.memories_merged == 0
+        assert report.groups == []
+        assert await service.get_by_id(test_user_id, first["id"], "UserFact") is None
+        assert await service.get_by_id(test_user_id, second["id"], "UserFact") is not None
+
+    async def test_different_literal_fields_are_not_merged(
+        self, service: MemoryService, repository: MemoryRepository, test_user_id: str
+    ):
+        await service.create(test_user_id, "UserPreference", {"category": "ui", "preference": "dark mode"})
+        await service.create(test_user_id, "UserPreference", {"category": "workflow", "preference": "dark mode"})
+
+        report = await ConsolidationEngine(repository).run(dry_run=True)
+
+        assert report.groups == []
+
+    async def test_scans_past_the_find_all_cap(self, test_user_id: str):
+        repository = MemoryRepository(store=IndexedMemoryStore())  # type: ignore[arg-type]
+        service = MemoryService(repository=repository)
+        # 중복 쌍을 먼저 만들어, 최신 순으로 1000개만 읽으면 빠지도록 함
+        await service.create(test_user_id, "UserFact", {"fact_type": "hobby", "content": "Plays chess every weekend"})
+        await service.create(test_user_id, "UserFact", {"fact_type": "hobby", "content": "plays chess every weekend!"})
+        for _ in range(1005):
+            await service.create(test_user_id, "UserFact", {"fact_type": "background", "content": uuid.uuid4().hex})
+
+        report = await ConsolidationEngine(repository, page_size=100).run(dry_run=True)
+
+        assert report.namespaces_scanned == 1
+        assert report.memories_scanned == 1007
+        assert report.memories_merged == 1
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from app.infrastructure.embeddings import EmbeddingExecutor
+
+
+class FakeEmbeddings:
+    def __init__(self) -> None:
+        self.calls: list[list[str]] = []
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.calls.append(texts)
+        return [[float(len(text))] for text in texts]
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return [float(len(text))]
+
+
+class TestEmbeddingExecutor:
+    async def test_chunks_preserve_order(self):
+        embeddings = FakeEmbeddings()
+        executor = EmbeddingExecutor(embeddings, batch_size=2, max_concurrency=2)
+
+        vectors = await executor.embed_documents(["a", "bb", "ccc", "dddd", "eeeee"])
+
+        assert vectors == [[1.0], [2.0], [3.0], [4.0], [5.0]]
+        assert [len(call) for call in embeddings.calls] == [2, 2, 1]
+
+    async def test_empty(self):
+        executor = EmbeddingExecutor(FakeEmbeddings())
+
+        assert await executor.embed_documents([]) == []
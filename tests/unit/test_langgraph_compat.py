@@ -0,0 +1,47 @@
+# pyright: reportPrivateUsage=false, reportUnknownMemberType=false
+from __future__ import annotations
+
+import inspect
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+from langgraph.store.postgres import AsyncPostgresStore
+from langgraph.store.postgres import base as langgraph_base
+
+from app.infrastructure.langgraph_compat import escape_like_literal, namespace_prefix_condition
+
+# MemoryStore와 langgraph_compat이 의존하는 langgraph의 비공개 헬퍼와 파라미터 이름.
+# langgraph 버전을 올릴 때 이 테스트가 실패하면 해당 헬퍼의 변경 내용을 확인한 뒤 호출부와 함께 수정합니다.
+_HELPERS: list[tuple[Callable[..., Any], list[str]]] = [
+    (langgraph_base._namespace_to_text, ["namespace"]),
+    (langgraph_base._decode_ns_bytes, ["namespace"]),
+    (langgraph_base._namespace_prefix_condition, ["namespace_prefix"]),
+    (langgraph_base._row_to_search_item, ["namespace", "row", "loader"]),
+    (langgraph_base._escape_like_literal, ["text"]),
+    (AsyncPostgresStore._get_filter_condition, ["self", "key", "op", "value"]),
+    (AsyncPostgresStore._prepare_batch_search_queries, ["self", "search_ops"]),
+    (AsyncPostgresStore._batch_search_ops, ["self", "search_ops", "results", "cur"]),
+    (AsyncPostgresStore._batch_put_ops, ["self", "put_ops", "cur"]),
+    (AsyncPostgresStore._cursor, ["self", "pipeline"]),
+]
+
+
+@pytest.mark.parametrize("helper,expected", _HELPERS, ids=lambda v: getattr(v, "__qualname__", ""))
+def test_private_helper_signature(helper: Callable[..., Any], expected: list[str]):
+    assert list(inspect.signature(helper).parameters) == expected
+
+
+def test_namespace_prefix_condition_params():
+    # _with_partition_bounds는 파라미터가 (path, LIKE 패턴) 순서이고 조건이 store.prefix를 쓴다고 가정
+    condition, params = namespace_prefix_condition(("memory", "semantic", "u_1"))
+
+    assert "store.prefix" in condition
+    assert params[0] == "memory.semantic.u_1"
+    assert params[1].startswith("memory.semantic.u\\_1")
+
+
+def test_escape_like_literal_matches_langgraph():
+    text = "a_b%c\\d"
+
+    assert escape_like_literal(text) == langgraph_base._escape_like_literal(text)
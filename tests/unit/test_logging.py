@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import logging
+import queue
+
+import orjson
+
+from app.config.logging_config import DebugSampler, JsonFormatter, NonBlockingQueueHandler
+
+
+def _record(
+    level: int = logging.INFO, msg: str = "hello %s", args: tuple[object, ...] = ("world",)
+) -> logging.LogRecord:
+    return logging.LogRecord("app.test", level, __file__, 1, msg, args, None)
+
+
+class TestJsonFormatter:
+    def test_includes_extra_fields(self):
+        record = _record()
+        record.user_id = "u1"
+
+        payload = orjson.loads(JsonFormatter().format(record))
+
+        assert payload["message"] == "hello world"
+        assert payload["level"] == "INFO"
+        assert payload["logger"] == "app.test"
+        assert payload["user_id"] == "u1"
+        assert "args" not in payload
+
+
+class TestDebugSampler:
+    def test_samples_only_debug(self):
+        sampler = DebugSampler(rate=0.0)
+
+        assert sampler.filter(_record(logging.DEBUG)) is False
+        assert sampler.filter(_record(logging.INFO)) is True
+        assert DebugSampler(rate=1.0).filter(_record(logging.DEBUG)) is True
+
+
+class TestNonBlockingQueueHandler:
+    def test_drops_when_queue_is_full(self):
+        handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+
+        handler.handle(_record())
+        handler.handle(_record())
+
+        assert handler.queue.qsize() == 1  # type: ignore[attr-defined]
+        assert handler.dropped == 1
+
+    def test_message_is_fixed_at_log_time(self):
+        log_queue: queue.Queue[logging.LogRecord] = queue.Queue()
+        args = ["before"]
+        NonBlockingQueueHandler(log_queue).handle(_record(args=(args,)))
+        args[0] = "after"
+
+        assert log_queue.get_nowait().getMessage() == "hello ['before']"
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 import pytest
-from core.schemas import ConversationInsight, UserFact, UserPreference
 from pydantic import ValidationError
 
+from app.core.schema_registry import get_index_field_names, get_index_fields, get_schemas_etag, index_field_name
+from app.core.schemas import ConversationInsight, UserFact, UserPreference
+
 
 class TestUserPreference:
     def test_valid_user_preference(self):
@@ -116,3 +118,25 @@ class TestSchemaIntegration:
         assert restored.category == original.category
         assert restored.preference == original.preference
         assert restored.importance == original.importance
+
+
+class TestSchemaRegistryEtag:
+    def test_etag_is_stable_and_cached(self):
+        assert get_schemas_etag() == get_schemas_etag()
+        assert len(get_schemas_etag()) == 32
+
+
+class TestSchemaIndexFields:
+    def test_declared_fields_map_to_value_paths(self):
+        assert get_index_fields("UserPreference") == ["schema.preference"]
+        assert get_index_fields("ConversationInsight") == [
+            "schema.topic",
+            "schema.key_points[*]",
+            "schema.context",
+        ]
+        assert get_index_fields(None) is None
+
+    def test_field_names(self):
+        assert index_field_name("schema.key_points[*]") == "key_points"
+        assert get_index_field_names("UserFact") == {"content"}
+        assert {"preference", "content", "topic", "key_points", "context"} <= get_index_field_names()
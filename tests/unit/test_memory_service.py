@@ -1,8 +1,14 @@
 from __future__ import annotations
 
+from typing import Any
+from unittest.mock import AsyncMock
+
 import pytest
 
+from app.config.settings import Settings
+from app.core.base import MemoryType
 from app.infrastructure.models import Memory
+from app.services import SearchRequest
 from app.services.service import MemoryService
 
 
@@ -54,6 +60,47 @@ class TestMemoryServiceCreate:
         assert "error" in result
         assert expected_error in result["error"]
 
+    async def test_create_with_idempotency_key_is_noop_on_retry(self, memory_service: MemoryService, test_user_id: str):
+        content = {"category": "ui", "preference": "dark mode"}
+
+        first = await memory_service.create(test_user_id, "UserPreference", content, idempotency_key="req-1")
+        retry = await memory_service.create(test_user_id, "UserPreference", content, idempotency_key="req-1")
+        memories = await memory_service.get_all(test_user_id)
+
+        assert first["created"] is True
+        assert retry["created"] is False
+        assert retry["id"] == first["id"]
+        assert len(memories) == 1
+
+    async def test_create_idempotency_key_reused_with_different_payload(
+        self, memory_service: MemoryService, test_user_id: str
+    ):
+        await memory_service.create(
+            test_user_id, "UserPreference", {"category": "ui", "preference": "dark"}, idempotency_key="req-1"
+        )
+
+        result = await memory_service.create(
+            test_user_id, "UserPreference", {"category": "ui", "preference": "light"}, idempotency_key="req-1"
+        )
+
+        assert "error" in result
+
+    async def test_create_dedupe_by_normalized_content(self, memory_service: MemoryService, test_user_id: str):
+        first = await memory_service.create(
+            test_user_id, "UserFact", {"fact_type": "hobby", "content": "Plays  chess"}, dedupe=True
+        )
+        duplicate = await memory_service.create(
+            test_user_id, "UserFact", {"fact_type": "hobby", "content": "plays chess"}, dedupe=True
+        )
+        other_user = await memory_service.create(
+            "other-user", "UserFact", {"fact_type": "hobby", "content": "plays chess"}, dedupe=True
+        )
+
+        assert duplicate["created"] is False
+        assert duplicate["id"] == first["id"]
+        assert other_user["created"] is True
+        assert other_user["id"] != first["id"]
+
 
 class TestMemoryServiceGetById:
     async def test_get_by_id_success(self, memory_service: MemoryService, test_user_id: str):
@@ -81,6 +128,22 @@ class TestMemoryServiceGetById:
         assert memory is not None
         assert memory.id == memory_id
 
+    async def test_get_by_id_without_stored_schema_type(self, test_user_id: str):
+        repository = AsyncMock()
+        repository.find_by_id.return_value = {"schema": {"content": "no schema_type"}}
+
+        # namespace를 ("memory", user_id)로 대체하지 않음
+        with pytest.raises(ValueError):
+            await MemoryService(repository=repository).get_by_id(test_user_id, "memory-1")
+
+    async def test_get_by_id_uses_schema_memory_type(self, memory_service: MemoryService, test_user_id: str):
+        created = await memory_service.create(test_user_id, "ConversationInsight", {"topic": "trip", "key_points": []})
+
+        memory = await memory_service.get_by_id(test_user_id, created["id"])
+
+        assert memory is not None
+        assert memory.namespace == ("memory", "episodic", test_user_id, "ConversationInsight")
+
 
 class TestMemoryServiceSearch:
     async def test_search_success(self, memory_service: MemoryService, test_user_id: str):
@@ -107,6 +170,53 @@ class TestMemoryServiceSearch:
 
         assert len(results) >= 1
 
+    async def test_search_with_memory_type_filter(self, memory_service: MemoryService, test_user_id: str):
+        await memory_service.create(test_user_id, "UserPreference", {"category": "ui", "preference": "dark"})
+        await memory_service.create(
+            test_user_id, "ConversationInsight", {"topic": "dark mode", "key_points": ["prefers dark"]}
+        )
+
+        episodic = await memory_service.search(test_user_id, "dark", memory_type=MemoryType.EPISODIC)
+        mismatched = await memory_service.search(
+            test_user_id, "dark", schema_type="UserPreference", memory_type=MemoryType.EPISODIC
+        )
+
+        assert [m.schema_type for m in episodic] == ["ConversationInsight"]
+        assert episodic[0].memory_type == "episodic"
+        assert mismatched == []
+
+
+class TestMemoryServiceSearchMany:
+    async def test_runs_all_searches_in_one_batch(self, memory_service: MemoryService):
+        await memory_service.create("user-a", "UserPreference", {"category": "ui", "preference": "dark"})
+        await memory_service.create("user-b", "UserFact", {"fact_type": "hobby", "content": "dark roast coffee"})
+
+        results = await memory_service.search_many(
+            [
+                SearchRequest("user-a", "dark"),
+                SearchRequest("user-b", "dark", schema_type="UserFact"),
+                SearchRequest("user-c", "dark"),
+            ]
+        )
+
+        assert isinstance(results, list)
+        assert [[m.user_id for m in memories] for memories in results] == [["user-a"], ["user-b"], []]
+        assert len(memory_service._repository._store.batches) == 1  # type: ignore[attr-defined]
+
+    async def test_invalid_schema_type(self, memory_service: MemoryService):
+        result = await memory_service.search_many([SearchRequest("user-a", "dark", schema_type="Nope")])
+
+        assert isinstance(result, dict)
+        assert "Invalid schema type" in result["error"]
+
+    async def test_unknown_index_field(self, memory_service: MemoryService):
+        result = await memory_service.search_many(
+            [SearchRequest("user-a", "dark", schema_type="UserFact", fields={"preference": 1.0})]
+        )
+
+        assert isinstance(result, dict)
+        assert "Unknown index field: preference" in result["error"]
+
 
 class TestMemoryServiceGetAll:
     async def test_get_all_success(self, memory_service: MemoryService, test_user_id: str):
@@ -154,6 +264,152 @@ class TestMemoryServiceDelete:
         assert success is True
 
 
+class TestMemoryServiceQuota:
+    async def test_usage_per_schema(self, memory_service: MemoryService, test_user_id: str):
+        await memory_service.create(test_user_id, "UserPreference", {"category": "ui", "preference": "dark"})
+        await memory_service.create(test_user_id, "UserFact", {"fact_type": "hobby", "content": "chess"})
+        await memory_service.create(test_user_id, "UserFact", {"fact_type": "hobby", "content": "go"})
+
+        usage = await memory_service.usage(test_user_id)
+
+        assert usage["schemas"]["UserFact"]["count"] == 2
+        assert usage["total"]["count"] == 3
+        assert usage["total"]["bytes"] > 0
+
+    @pytest.mark.parametrize(
+        "quota",
+        [
+            {"quota_max_items_per_user": 1},
+            {"quota_max_items_per_schema": {"UserFact": 1}},
+            {"quota_max_bytes_per_user": 300},
+        ],
+    )
+    async def test_create_rejected_over_quota(
+        self, monkeypatch: pytest.MonkeyPatch, memory_service: MemoryService, test_user_id: str, quota: dict[str, Any]
+    ):
+        settings = Settings(**quota)
+        monkeypatch.setattr("app.services.service.get_settings", lambda: settings)
+        first = await memory_service.create(test_user_id, "UserFact", {"fact_type": "hobby", "content": "chess"})
+
+        result = await memory_service.create(test_user_id, "UserFact", {"fact_type": "hobby", "content": "go"})
+
+        assert "error" not in first
+        assert "Quota exceeded" in result["error"]
+
+
+class TestMemoryServiceVersion:
+    async def test_version_changes_on_writes_only(self, memory_service: MemoryService, test_user_id: str):
+        initial = await memory_service.version(test_user_id)
+
+        created = await memory_service.create(test_user_id, "UserFact", {"fact_type": "hobby", "content": "Chess"})
+        after_create = await memory_service.version(test_user_id)
+        await memory_service.get_all(test_user_id)
+        assert await memory_service.version(test_user_id) == after_create > initial
+
+        await memory_service.update(test_user_id, created["id"], {"confidence": 0.5}, "UserFact")
+        after_update = await memory_service.version(test_user_id)
+        assert after_update > after_create
+
+        await memory_service.delete(test_user_id, created["id"], "UserFact")
+        assert await memory_service.version(test_user_id) > after_update
+
+    async def test_version_is_per_user(self, memory_service: MemoryService, test_user_id: str):
+        other_before = await memory_service.version("other-user")
+
+        await memory_service.create(test_user_id, "UserFact", {"fact_type": "hobby", "content": "Chess"})
+
+        assert await memory_service.version("other-user") == other_before
+
+
+class TestMemoryServiceUpdate:
+    async def test_update_merges_and_revalidates(self, memory_service: MemoryService, test_user_id: str):
+        created = await memory_service.create(
+            test_user_id, "UserFact", {"fact_type": "hobby", "content": "plays chess", "tags": ["games"]}
+        )
+
+        result = await memory_service.update(test_user_id, created["id"], {"content": "plays go", "tags": None})
+
+        assert "error" not in result
+        assert result["content"]["content"] == "plays go"
+        assert result["content"]["fact_type"] == "hobby"
+        assert result["content"]["tags"] == []
+        assert result["content"]["created_at"] == created["content"]["created_at"]
+
+    async def test_update_invalid_content(self, memory_service: MemoryService, test_user_id: str):
+        created = await memory_service.create(test_user_id, "UserPreference", {"category": "ui", "preference": "dark"})
+
+        result = await memory_service.update(test_user_id, created["id"], {"category": "unknown"}, "UserPreference")
+        memory = await memory_service.get_by_id(test_user_id, created["id"], "UserPreference")
+
+        assert "error" in result
+        assert memory is not None
+        assert memory.content["category"] == "ui"
+
+    async def test_update_not_found(self, memory_service: MemoryService, test_user_id: str):
+        result = await memory_service.update(test_user_id, "non-existent-id", {"preference": "light"})
+
+        assert result == {"error": "Memory not found"}
+
+
+class TestMemoryServiceSearchStream:
+    async def test_stream_yields_chunk_per_schema(self, memory_service: MemoryService, test_user_id: str):
+        await memory_service.create(test_user_id, "UserPreference", {"category": "ui", "preference": "dark"})
+        await memory_service.create(test_user_id, "UserFact", {"fact_type": "hobby", "content": "dark roast coffee"})
+
+        chunks = [chunk async for chunk in memory_service.search_stream(test_user_id, "dark")]
+
+        by_schema = {chunk.schema_type: chunk for chunk in chunks}
+        assert set(by_schema) == {"UserPreference", "UserFact", "ConversationInsight"}
+        assert len(by_schema["UserPreference"].memories) == 1
+        assert len(by_schema["UserFact"].memories) == 1
+        assert all(chunk.error is None for chunk in chunks)
+
+    async def test_stream_with_schema_type(self, memory_service: MemoryService, test_user_id: str):
+        await memory_service.create(test_user_id, "UserPreference", {"category": "ui", "preference": "dark"})
+
+        chunks = [chunk async for chunk in memory_service.search_stream(test_user_id, "dark", "UserPreference")]
+
+        assert [chunk.schema_type for chunk in chunks] == ["UserPreference"]
+
+
+class TestMemoryServiceRecall:
+    async def test_recall_across_schemas(self, memory_service: MemoryService, test_user_id: str):
+        await memory_service.create(test_user_id, "UserPreference", {"category": "language", "preference": "python"})
+        await memory_service.create(test_user_id, "UserFact", {"fact_type": "professional", "content": "python dev"})
+
+        result = await memory_service.recall(test_user_id, "python", token_budget=500)
+
+        assert "error" not in result
+        assert {m["schema_type"] for m in result["memories"]} == {"UserPreference", "UserFact"}
+        assert result["used_tokens"] <= 500
+        assert "[UserFact]" in result["context"]
+
+    async def test_recall_respects_token_budget(self, memory_service: MemoryService, test_user_id: str):
+        for i in range(5):
+            await memory_service.create(
+                test_user_id, "UserFact", {"fact_type": "hobby", "content": f"python hobby number {i} " * 5}
+            )
+
+        result = await memory_service.recall(test_user_id, "python", token_budget=40)
+
+        assert 0 < len(result["memories"]) < 5
+        assert result["used_tokens"] <= 40
+
+    async def test_recall_dedupes_identical_content(self, memory_service: MemoryService, test_user_id: str):
+        content = {"category": "ui", "preference": "dark mode", "created_at": "2024-01-01T00:00:00"}
+        await memory_service.create(test_user_id, "UserPreference", content)
+        await memory_service.create(test_user_id, "UserPreference", content)
+
+        result = await memory_service.recall(test_user_id, "dark", token_budget=500)
+
+        assert len(result["memories"]) == 1
+
+    async def test_recall_invalid_schema(self, memory_service: MemoryService, test_user_id: str):
+        result = await memory_service.recall(test_user_id, "python", token_budget=100, schema_types=["Nope"])
+
+        assert "Invalid schema type" in result["error"]
+
+
 class TestMemoryServiceIntegration:
     async def test_full_crud_cycle(self, memory_service: MemoryService, test_user_id: str):
         content = {"category": "feature", "preference": "autocomplete", "importance": "high"}
@@ -0,0 +1,346 @@
+# pyright: reportPrivateUsage=false
+from __future__ import annotations
+
+from collections.abc import Sequence
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+import orjson
+import pytest
+from langgraph.store.base import IndexConfig, SearchItem
+
+from app.core.base import MemoryType
+from app.infrastructure import memory_store as memory_store_module
+from app.infrastructure.index_config import FIELD_WEIGHTS_KEY
+from app.infrastructure.memory_store import IndexedMemoryStore, _like_to_regex, _Record
+from app.infrastructure.repository import MemoryRepository
+from app.services.service import MemoryService
+
+VOCABULARY = ("dark", "mode", "chess", "python", "coffee")
+
+
+class CountingEmbeddings:
+    """단어 출현 여부로 만드는 결정적 벡터 (임베딩된 텍스트를 기록)"""
+
+    def __init__(self) -> None:
+        self.texts: list[str] = []
+
+    def __call__(self, texts: Sequence[str]) -> list[list[float]]:
+        self.texts.extend(texts)
+        return [[1.0 if word in text.lower() else 0.0 for word in VOCABULARY] for text in texts]
+
+
+def _ns(user_id: str = "user-1", schema_type: str = "UserFact") -> tuple[str, ...]:
+    return ("memory", "semantic", user_id, schema_type)
+
+
+def _value(content: str, schema_type: str = "UserFact", **schema: object) -> dict[str, Any]:
+    return {"schema_type": schema_type, "schema": {"content": content, **schema}, "content": {"content": content}}
+
+
+def _index(embeddings: CountingEmbeddings) -> IndexConfig:
+    return {"dims": len(VOCABULARY), "embed": embeddings, "fields": ["$"]}
+
+
+def _record(store: IndexedMemoryStore, namespace: tuple[str, ...], key: str) -> _Record:
+    record = store._record(namespace, key)
+    assert record is not None
+    return record
+
+
+def _scores(results: Sequence[SearchItem]) -> list[tuple[str, float | None]]:
+    return [(item.key, round(item.score, 6) if item.score is not None else None) for item in results]
+
+
+@pytest.fixture
+def embeddings() -> CountingEmbeddings:
+    return CountingEmbeddings()
+
+
+@pytest.fixture
+def vector_store(embeddings: CountingEmbeddings) -> IndexedMemoryStore:
+    return IndexedMemoryStore(index=_index(embeddings))
+
+
+class TestIndexedMemoryStore:
+    async def test_put_get_delete_prunes_namespaces(self):
+        store = IndexedMemoryStore()
+        await store.aput(_ns(), "a", _value("plays chess"))
+        await store.aput(_ns("user-2"), "b", _value("drinks coffee"))
+
+        item = await store.aget(_ns(), "a")
+        assert item is not None and item.value["schema"]["content"] == "plays chess"
+        assert await store.alist_namespaces(prefix=("memory",)) == [_ns(), _ns("user-2")]
+
+        await store.adelete(_ns(), "a")
+
+        assert await store.aget(_ns(), "a") is None
+        assert await store.alist_namespaces(prefix=("memory",)) == [_ns("user-2")]
+        assert store._trie.get(_ns()) is None
+
+    async def test_filter_uses_value_index_and_prefix(self):
+        store = IndexedMemoryStore()
+        await store.aput(_ns(), "a", _value("plays chess", fact_type="hobby"))
+        await store.aput(_ns(), "b", _value("writes python", fact_type="professional"))
+        await store.aput(_ns("user-2"), "c", _value("plays go", fact_type="hobby"))
+
+        hobbies = await store.asearch(("memory", "semantic", "user-1"), filter={"schema": {"fact_type": "hobby"}})
+        not_hobby = {"schema_type": "UserFact", "schema": {"fact_type": {"$ne": "hobby"}}}
+        ranged = await store.asearch(("memory",), filter=not_hobby)
+
+        assert [item.key for item in hobbies] == ["a"]
+        assert [item.key for item in ranged] == ["b"]
+        assert store._postings[("schema.fact_type", "hobby")] == {(_ns(), "a"), (_ns("user-2"), "c")}
+
+    async def test_keyword_search_without_embeddings(self):
+        store = IndexedMemoryStore()
+        await store.aput(_ns(), "a", _value("prefers dark mode"), index=["schema.content"])
+        await store.aput(_ns(), "b", _value("likes dark roast coffee"), index=["schema.content"])
+        await store.aput(_ns(), "c", _value("plays chess"), index=["schema.content"])
+
+        results = await store.asearch(_ns(), query="dark mode")
+
+        assert [(item.key, item.score) for item in results] == [("a", 1.0), ("b", 0.5)]
+
+    async def test_range_filters_and_namespace_conditions(self):
+        store = IndexedMemoryStore()
+        await store.aput(_ns(), "a", _value("chess", confidence=0.9))
+        await store.aput(_ns(), "b", _value("coffee", confidence=0.4))
+        await store.aput(_ns(), "c", _value("python"))
+        await store.aput(_ns("user-2", "UserPreference"), "d", _value("dark", "UserPreference"))
+
+        confident = await store.asearch(_ns(), filter={"schema": {"confidence": {"$gte": 0.5}}})
+        by_suffix = await store.alist_namespaces(suffix=("UserFact",))
+        by_wildcard = await store.alist_namespaces(prefix=("memory", "*", "user-2"))
+
+        # confidence가 없는 항목은 범위 조건과 일치하지 않음 (JSONB 비교와 같음)
+        assert [item.key for item in confident] == ["a"]
+        assert by_suffix == [_ns()]
+        assert by_wildcard == [_ns("user-2", "UserPreference")]
+
+    async def test_vector_search_ranks_by_similarity(self, vector_store: IndexedMemoryStore):
+        await vector_store.aput(_ns(), "a", _value("dark mode"))
+        await vector_store.aput(_ns(), "b", _value("chess"))
+        await vector_store.aput(_ns(), "c", {"schema_type": "UserFact"}, index=False)
+
+        results = await vector_store.asearch(_ns(), query="dark mode", limit=5)
+
+        assert [item.key for item in results] == ["a", "b"]
+        assert results[0].score == pytest.approx(1.0)
+        assert results[1].score == pytest.approx(0.0)
+
+    async def test_field_weighted_search(self, vector_store: IndexedMemoryStore):
+        ns = ("memory", "episodic", "user-1", "ConversationInsight")
+        value = {"schema_type": "ConversationInsight", "schema": {"topic": "chess", "key_points": ["dark", "python"]}}
+        await vector_store.aput(ns, "a", value, index=["schema.topic", "schema.key_points[*]"])
+
+        weights = [("ConversationInsight", "schema.topic", 1.0), ("ConversationInsight", "schema.key_points[*]", 3.0)]
+        results = await vector_store.asearch(ns, query="python", filter={FIELD_WEIGHTS_KEY: weights})
+        other_schema = await vector_store.asearch(
+            ns, query="python", filter={FIELD_WEIGHTS_KEY: [("UserFact", "schema.content", 1.0)]}
+        )
+
+        vectors = _record(vector_store, ns, "a").vectors
+        assert set(vectors) == {"schema.topic", "schema.key_points[*].0", "schema.key_points[*].1"}
+        assert results[0].score == pytest.approx(0.75)
+        assert other_schema == []
+
+    async def test_numpy_and_python_scores_match(
+        self, vector_store: IndexedMemoryStore, monkeypatch: pytest.MonkeyPatch
+    ):
+        pytest.importorskip("numpy")
+        for key, text in (("a", "dark mode"), ("b", "dark chess"), ("c", "python coffee")):
+            await vector_store.aput(_ns(), key, _value(text))
+
+        with_numpy = _scores(await vector_store.asearch(_ns(), query="dark python", limit=10))
+        monkeypatch.setattr(memory_store_module, "HAS_NUMPY", False)
+        without_numpy = _scores(await vector_store.asearch(_ns(), query="dark python", limit=10))
+
+        assert with_numpy == without_numpy
+
+    async def test_update_reembeds_only_changed_fields(
+        self, vector_store: IndexedMemoryStore, embeddings: CountingEmbeddings
+    ):
+        ns = ("memory", "episodic", "user-1", "ConversationInsight")
+        fields = ["schema.topic", "schema.context"]
+        await vector_store.aput(ns, "a", {"schema": {"topic": "chess", "context": "club"}}, index=fields)
+        embeddings.texts.clear()
+
+        def update(value: dict[str, Any]) -> dict[str, Any]:
+            value["schema"]["context"] = "online python"
+            return value
+
+        updated = await vector_store.aupdate(ns, "a", update, index=fields)
+
+        assert updated == {"schema": {"topic": "chess", "context": "online python"}}
+        assert embeddings.texts == ["online python"]
+        assert (await vector_store.asearch(ns, query="python"))[0].score == pytest.approx(1.0)
+        assert await vector_store.aupdate(ns, "missing", update, index=fields) is None
+
+    async def test_update_retries_after_concurrent_write(self, vector_store: IndexedMemoryStore):
+        await vector_store.aput(_ns(), "a", _value("chess", confidence=0.5))
+        calls = 0
+
+        def update(value: dict[str, Any]) -> dict[str, Any]:
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                # 재임베딩을 기다리는 동안 다른 쓰기가 끼어든 상황
+                vector_store.put(_ns(), "a", _value("coffee", confidence=0.9))
+            value["schema"]["content"] += " and python"
+            return value
+
+        updated = await vector_store.aupdate(_ns(), "a", update)
+
+        assert calls == 2
+        assert updated is not None and updated["schema"] == {"content": "coffee and python", "confidence": 0.9}
+
+    async def test_update_deletes_keys_only_when_applied(self):
+        store = IndexedMemoryStore()
+        for key in ("a", "b", "c"):
+            await store.aput(_ns(), key, _value(f"fact {key}"))
+
+        assert await store.aupdate(_ns(), "missing", lambda value: value, delete_keys=["b"]) is None
+        assert await store.aget(_ns(), "b") is not None
+
+        assert await store.aupdate(_ns(), "a", lambda value: value, delete_keys=["a", "b", "c"]) is not None
+        assert [item.key for item in await store.asearch(_ns())] == ["a"]
+
+    async def test_ttl_sweep_backfill_and_eviction(self):
+        store = IndexedMemoryStore()
+        await store.aput(_ns(), "expired", _value("old"), ttl=1)
+        expired = datetime.now(timezone.utc) - timedelta(minutes=1)
+        store._set_expiry(_ns(), "expired", _record(store, _ns(), "expired"), expired)
+        for i, confidence in enumerate((0.9, 0.1, 0.5)):
+            await store.aput(_ns("user-2"), f"k{i}", _value(f"fact {i}", confidence=confidence))
+
+        assert await store.aget(_ns(), "expired") is None
+        assert await store.asweep_expired(10) == 1
+        assert store._record(_ns(), "expired") is None
+
+        assert await store.abackfill_ttl("memory.semantic.%.UserFact", 60, 2) == 2
+        assert await store.abackfill_ttl("memory.semantic.%.UserFact", 60, 2) == 1
+        assert await store.abackfill_ttl("memory.episodic.%", 60, 2) == 0
+
+        assert await store.aevict_over_limit("UserFact", 2, "lowest_confidence", 10) == 1
+        assert sorted(item.key for item in await store.asearch(_ns("user-2"))) == ["k0", "k2"]
+
+    async def test_next_expiry_moves_when_item_expires(self):
+        store = IndexedMemoryStore()
+        await store.aput(_ns(), "soon", _value("soon"), ttl=1)
+        await store.aput(_ns(), "later", _value("later"), ttl=60)
+        await store.aput(_ns("user-2"), "other", _value("other"), ttl=1)
+        soon = _record(store, _ns(), "soon").expires_at
+        version = await store.aversion("user-1")
+
+        assert await store.anext_expiry("user-1") == soon
+        store._set_expiry(
+            _ns(), "soon", _record(store, _ns(), "soon"), datetime.now(timezone.utc) - timedelta(seconds=1)
+        )
+
+        # sweep 전이라 version은 그대로지만 다음 만료 시각이 바뀜
+        assert await store.aversion("user-1") == version
+        assert await store.anext_expiry("user-1") == _record(store, _ns(), "later").expires_at
+        assert await store.anext_expiry("user-3") is None
+
+    async def test_usage_version_and_changes(self):
+        store = IndexedMemoryStore()
+        before = datetime.now(timezone.utc)
+        await store.aput(_ns(), "a", _value("chess"))
+        await store.aput(_ns(), "b", _value("coffee"))
+        await store.aput(("system", "consolidation"), "state", {"watermark": 1})
+
+        usage = await store.ausage("user-1")
+        version = await store.aversion("user-1")
+        await store.adelete(_ns(), "a")
+
+        total_bytes = len(orjson.dumps(_value("chess"))) + len(orjson.dumps(_value("coffee")))
+        assert usage == [{"schema_type": "UserFact", "item_count": 2, "total_bytes": total_bytes}]
+        assert await store.aversion("user-1") > version
+        assert (await store.ausage("user-1"))[0]["item_count"] == 1
+        updated_at = _record(store, _ns(), "b").item.updated_at
+        assert await store.alist_changed(("memory",), before) == [(_ns(), "b", updated_at)]
+        assert await store.alist_changed(("memory",), datetime.now(timezone.utc)) == []
+
+    async def test_keyset_pages(self):
+        store = IndexedMemoryStore()
+        for user in ("user-1", "user-2"):
+            for key in ("a", "b", "c"):
+                await store.aput(_ns(user), key, _value(key))
+
+        first = await store.alist_changed(("memory",), limit=4)
+        rest = await store.alist_changed(("memory",), after=first[-1][:2], limit=4)
+        page = await store.alist_namespace(_ns("user-2"), after_key="a", limit=1)
+
+        assert [(ns[2], key) for ns, key, _ in first + rest] == [
+            (user, key) for user in ("user-1", "user-2") for key in ("a", "b", "c")
+        ]
+        assert page == [("b", _value("b"))]
+
+    async def test_snapshot_round_trip_keeps_vectors(self, tmp_path: Path, embeddings: CountingEmbeddings):
+        path = tmp_path / "store.jsonl"
+        index = _index(embeddings)
+        store = IndexedMemoryStore(index=index, snapshot_path=path)
+        await store.aput(_ns(), "a", _value("dark mode"), ttl=60)
+        await store.aput(_ns(), "b", _value("chess"))
+
+        assert await store.save_snapshot() == 2
+        assert not path.with_name("store.jsonl.tmp").exists()
+
+        embeddings.texts.clear()
+        restored = IndexedMemoryStore(index=index, snapshot_path=path)
+
+        assert restored.load_snapshot() == 2
+        assert embeddings.texts == []
+        assert _record(restored, _ns(), "a").ttl_minutes == 60
+        assert [item.key for item in await restored.asearch(_ns(), query="dark")][0] == "a"
+        assert await restored.aversion("user-1") > 0
+
+    async def test_close_saves_only_when_changed(self, tmp_path: Path):
+        path = tmp_path / "store.jsonl"
+        store = IndexedMemoryStore(snapshot_path=path)
+
+        await store.aclose()
+        assert not path.exists()
+
+        await store.aput(_ns(), "a", _value("chess"))
+        await store.aclose()
+        assert IndexedMemoryStore(snapshot_path=path).load_snapshot() == 1
+
+    def test_like_pattern(self):
+        regex, literal = _like_to_regex("memory.%.user\\_1.UserFact")
+
+        assert literal == "memory."
+        assert regex.fullmatch("memory.semantic.user_1.UserFact")
+        assert not regex.fullmatch("memory.semantic.userX1.UserFact")
+
+    async def test_large_corpus_filtered_search(self):
+        store = IndexedMemoryStore()
+        for user in range(50):
+            for i in range(200):
+                schema = {"fact_type": "hobby" if i % 10 == 0 else "goal", "content": f"fact {i}"}
+                store.put(_ns(f"user-{user}"), f"k{i}", {"schema_type": "UserFact", "schema": schema}, index=False)
+
+        hobbies = await store.asearch(("memory",), filter={"schema": {"fact_type": "hobby"}}, limit=10_000)
+        one_user = await store.asearch(_ns("user-7"), filter={"schema": {"fact_type": "goal"}}, limit=10_000)
+
+        assert len(hobbies) == 50 * 20
+        assert len(one_user) == 180
+        assert {item.namespace for item in one_user} == {_ns("user-7")}
+
+
+class TestMemoryServiceOnIndexedStore:
+    async def test_create_search_update(self, test_user_id: str):
+        service = MemoryService(repository=MemoryRepository(store=IndexedMemoryStore()))  # type: ignore[arg-type]
+        created = await service.create(test_user_id, "UserPreference", {"category": "ui", "preference": "dark mode"})
+        await service.create(test_user_id, "ConversationInsight", {"topic": "dark theme", "key_points": ["contrast"]})
+
+        results = await service.search(test_user_id, "dark mode")
+        semantic = await service.search(test_user_id, "dark", memory_type=MemoryType.SEMANTIC)
+        await service.update(test_user_id, created["id"], {"preference": "light mode"}, "UserPreference")
+        after_update = await service.search(test_user_id, "light", schema_type="UserPreference")
+
+        assert [m.schema_type for m in results] == ["UserPreference", "ConversationInsight"]
+        assert [m.schema_type for m in semantic] == ["UserPreference"]
+        assert [m.id for m in after_update] == [created["id"]]
@@ -0,0 +1,125 @@
+# pyright: reportPrivateUsage=false
+from __future__ import annotations
+
+import re
+from typing import Any, cast
+
+from app.core.base import MemoryType
+from app.core.namespace_builder import MemoryNamespaceBuilder
+from app.infrastructure.langgraph_compat import namespace_prefix_condition
+from app.infrastructure.partitioning import (
+    _STORE_COLUMNS,
+    DEFAULT_PARTITION,
+    PREVIOUS_TABLE,
+    _convert,
+    memory_type_partition,
+)
+from app.infrastructure.store import _with_partition_bounds
+from tests.unit.mocks import RecordingCursor, Rows
+
+
+class TestMemoryNamespace:
+    def test_memory_type_leads_namespace(self):
+        assert MemoryNamespaceBuilder.for_memory("u1", "UserFact") == ("memory", "semantic", "u1", "UserFact")
+        assert MemoryNamespaceBuilder.for_memory("u1", "ConversationInsight") == (
+            "memory",
+            "episodic",
+            "u1",
+            "ConversationInsight",
+        )
+
+    def test_parse(self):
+        parsed = MemoryNamespaceBuilder.parse(("memory", "episodic", "u1", "ConversationInsight"))
+
+        assert parsed is not None
+        assert (parsed.memory_type, parsed.user_id, parsed.schema_type) == ("episodic", "u1", "ConversationInsight")
+        assert MemoryNamespaceBuilder.parse(("memory", "u1", "UserFact")) is None
+        assert MemoryNamespaceBuilder.parse(("system", "a", "b", "c")) is None
+
+
+class TestPartitionBounds:
+    def _query(self, namespace: tuple[str, ...]) -> tuple[str, list[object]]:
+        condition, ns_params = namespace_prefix_condition(namespace)
+        return f"SELECT %s::vector FROM store WHERE {condition} AND key = %s LIMIT %s", ["[1,2]", *ns_params, "k", 10]
+
+    def test_full_memory_namespace_uses_equality(self):
+        namespace = ("memory", "semantic", "u1", "UserFact")
+        query, params = _with_partition_bounds(*self._query(namespace), namespace)
+
+        assert "store.prefix = %s" in query
+        assert params[3] == "memory.semantic.u1.UserFact"
+        assert params[4:] == ["k", 10]
+
+    def test_partial_namespace_uses_range(self):
+        namespace = ("memory", "episodic", "u1")
+        query, params = _with_partition_bounds(*self._query(namespace), namespace)
+
+        assert "store.prefix >= %s AND store.prefix < %s" in query
+        assert params[3:5] == ["memory.episodic.u1", "memory.episodic.u1/"]
+        assert query.count("%s") == len(params)
+
+    def test_leaves_unknown_queries_unchanged(self):
+        query, params = "SELECT 1 WHERE TRUE", [1]
+
+        assert _with_partition_bounds(query, params, ("memory", "semantic")) == (query, params)
+
+
+_VECTORS_FK = "FOREIGN KEY (prefix, key) REFERENCES store(prefix, key) ON DELETE CASCADE"
+
+
+def _catalog(query: str, params: Any) -> Rows:
+    """_convert가 변환 전에 읽는 카탈로그 조회 결과 (store_vectors FK, 보조 인덱스, PK)"""
+    if "FROM pg_index" in query:
+        return [{"name": "store_prefix_idx", "definition": "CREATE INDEX store_prefix_idx ON public.store (prefix)"}]
+    if "contype = 'f'" in query:
+        return [{"table_name": "store_vectors", "name": "store_vectors_prefix_key_fkey", "definition": _VECTORS_FK}]
+    if "contype = 'p'" in query:
+        return [{"name": "store_pkey"}]
+    return []
+
+
+def _partition_for(prefix: str, bounds: dict[str, tuple[str, str]]) -> str:
+    # prefix는 COLLATE "C"이므로 바이트 순서로 range 파티션을 고름
+    for partition, (lower, upper) in bounds.items():
+        if lower.encode() <= prefix.encode() < upper.encode():
+            return partition
+    return DEFAULT_PARTITION
+
+
+class TestConvert:
+    async def test_recreates_foreign_keys_indexes_and_routes_memory_types(self):
+        cursor = RecordingCursor(_catalog)
+
+        await _convert(cast(Any, cursor), 2)
+
+        statements = [query for query, _ in cursor.executed]
+        columns = ", ".join(f'"{column}"' for column in _STORE_COLUMNS)
+        create_store = next(i for i, query in enumerate(statements) if query.startswith("CREATE TABLE store ("))
+        copy_rows = statements.index(f'INSERT INTO store ({columns}) SELECT {columns} FROM "{PREVIOUS_TABLE}"')
+        drop_fk = statements.index('ALTER TABLE store_vectors DROP CONSTRAINT "store_vectors_prefix_key_fkey"')
+        add_fk = statements.index(
+            f'ALTER TABLE store_vectors ADD CONSTRAINT "store_vectors_prefix_key_fkey" {_VECTORS_FK}'
+        )
+
+        # FK는 이름 변경 전에 제거하고, 새 테이블에 행을 복사한 뒤 다시 생성
+        assert drop_fk < create_store < copy_rows < add_fk
+        assert f'ALTER TABLE "{PREVIOUS_TABLE}" RENAME CONSTRAINT "store_pkey" TO "{PREVIOUS_TABLE}_pkey"' in statements
+        assert 'ALTER INDEX store_prefix_idx RENAME TO "store_prefix_idx_unpartitioned"' in statements
+        assert statements.index("CREATE INDEX store_prefix_idx ON public.store (prefix)") > copy_rows
+        assert statements[-1].startswith("CREATE TRIGGER store_user_stats_insert")
+
+        bounds = {
+            match[1]: (match[2], match[3])
+            for query in statements
+            if (
+                match := re.fullmatch(
+                    r'CREATE TABLE "(\w+)" PARTITION OF store FOR VALUES FROM \(\'(.*)\'\) TO \(\'(.*)\'\).*', query
+                )
+            )
+        }
+        assert set(bounds) == {memory_type_partition(memory_type) for memory_type in MemoryType}
+        for memory_type in MemoryType:
+            namespace = MemoryNamespaceBuilder.for_memory("user.1", "UserFact", memory_type)
+            assert _partition_for(".".join(namespace), bounds) == memory_type_partition(memory_type)
+        assert _partition_for("memory.u1.UserFact", bounds) == DEFAULT_PARTITION
+        assert _partition_for("system.consolidation", bounds) == DEFAULT_PARTITION
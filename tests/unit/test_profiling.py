@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from app.infrastructure.profiling import RequestProfile, SlowRequestBuffer, end_profile, start_profile
+from app.services.service import MemoryService
+
+
+class TestSlowRequestBuffer:
+    def test_keeps_only_slowest(self):
+        buffer = SlowRequestBuffer(capacity=3)
+        for duration in [5.0, 50.0, 1.0, 30.0, 10.0]:
+            buffer.add(RequestProfile(method="GET", path="/memories", trigger="sampled", duration_ms=duration))
+
+        durations = [profile.duration_ms for profile in buffer.snapshot()]
+
+        assert durations == [50.0, 30.0, 10.0]
+
+    def test_clear(self):
+        buffer = SlowRequestBuffer(capacity=2)
+        buffer.add(RequestProfile(method="GET", path="/", trigger="header", duration_ms=1.0))
+
+        buffer.clear()
+
+        assert buffer.snapshot() == []
+
+
+class TestStoreCallTimings:
+    async def test_store_calls_recorded_while_profiling(self, memory_service: MemoryService, test_user_id: str):
+        profile = RequestProfile(method="POST", path="/memories", trigger="header")
+        token = start_profile(profile)
+        try:
+            await memory_service.create(test_user_id, "UserPreference", {"category": "ui", "preference": "dark"})
+        finally:
+            end_profile(token)
+
+        assert [call.op for call in profile.store_calls] == ["aput"]
+        assert profile.store_calls[0].namespace == ("memory", "semantic", test_user_id, "UserPreference")
+
+    async def test_no_recording_after_profile_ends(self, memory_service: MemoryService, test_user_id: str):
+        profile = RequestProfile(method="POST", path="/memories", trigger="header")
+        token = start_profile(profile)
+        try:
+            await memory_service.create(test_user_id, "UserPreference", {"category": "ui", "preference": "dark"})
+        finally:
+            end_profile(token)
+
+        await memory_service.create(test_user_id, "UserPreference", {"category": "ui", "preference": "light"})
+
+        assert len(profile.store_calls) == 1
@@ -0,0 +1,217 @@
+# pyright: reportPrivateUsage=false
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any, cast
+
+import pytest
+
+from app.config.settings import Settings
+from app.infrastructure import reembedding
+from app.infrastructure.embeddings import EmbeddingExecutor
+from app.infrastructure.reembedding import JOBS_TABLE, PREVIOUS_TABLE, SHADOW_TABLE, ReembeddingPipeline
+from app.infrastructure.store import MemoryStore
+from app.infrastructure.vector_index import VECTOR_TABLE
+from tests.unit.mocks import RecordingCursor, Rows
+
+_UPDATED_AT = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+class FakeEmbeddings:
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [[float(len(text))] for text in texts]
+
+
+def _pipeline(**kwargs: Any) -> ReembeddingPipeline:
+    return ReembeddingPipeline(
+        version="v2",
+        model="fake:model",
+        dims=1,
+        batch_size=2,
+        max_items_per_second=1_000_000,
+        executor=EmbeddingExecutor(FakeEmbeddings()),
+        settings=Settings(vector_index_kind="flat"),
+        **kwargs,
+    )
+
+
+def _store_row(prefix: str, key: str, value: dict[str, Any]) -> dict[str, Any]:
+    return {"prefix": prefix, "key": key, "value": value, "updated_at": _UPDATED_AT}
+
+
+def _job_row(status: str, last_prefix: str | None = None, last_key: str | None = None) -> dict[str, Any]:
+    return {
+        "version": "v2",
+        "model": "fake:model",
+        "dims": 1,
+        "fields": ["$"],
+        "status": status,
+        "processed": 0,
+        "last_prefix": last_prefix,
+        "last_key": last_key,
+    }
+
+
+class FakeDatabase:
+    """store / store_reembed_jobs 조회에 응답하는 RecordingCursor responder"""
+
+    def __init__(self, job: dict[str, Any] | None, rows: list[dict[str, Any]]) -> None:
+        self.job = job
+        self.rows = rows
+
+    def __call__(self, query: str, params: Any) -> Rows:
+        if query.startswith("SELECT to_regclass"):
+            return [{"present": self.job is not None}]
+        if query.startswith(f'SELECT * FROM "{JOBS_TABLE}"'):
+            return [self.job] if self.job else []
+        if query.startswith(f'UPDATE "{JOBS_TABLE}" SET status') and self.job:
+            self.job = {**self.job, "status": params[0]}
+        if query.startswith("SELECT prefix, key, value, updated_at FROM store"):
+            last_prefix, last_key, _, limit = params
+            return [row for row in self.rows if (row["prefix"], row["key"]) > (last_prefix, last_key)][:limit]
+        return []
+
+
+def _connect_to(monkeypatch: pytest.MonkeyPatch, conn: RecordingCursor) -> None:
+    async def connect() -> Any:
+        return conn
+
+    monkeypatch.setattr(reembedding, "_connect", connect)
+
+
+class TestProcessBatch:
+    @pytest.mark.parametrize("target", [SHADOW_TABLE, VECTOR_TABLE])
+    async def test_writes_vectors_to_target(self, target: str):
+        conn = RecordingCursor()
+        rows = [
+            _store_row(
+                "memory.semantic.u1.UserFact", "f1", {"schema_type": "UserFact", "schema": {"content": "likes tea"}}
+            ),
+            _store_row(
+                "memory.episodic.u1.ConversationInsight",
+                "i1",
+                {"schema_type": "ConversationInsight", "schema": {"topic": "trip", "key_points": ["Jeju", "Busan"]}},
+            ),
+        ]
+
+        await _pipeline()._process_batch(cast(Any, conn), EmbeddingExecutor(FakeEmbeddings()), cast(Any, rows), target)
+
+        (delete,) = conn.statements("DELETE FROM")
+        assert delete[0].startswith(f'DELETE FROM "{target}"')
+        assert delete[1] == (["memory.semantic.u1.UserFact", "memory.episodic.u1.ConversationInsight"], ["f1", "i1"])
+
+        inserts = conn.statements("field_name, embedding")
+        assert all(query.startswith(f'INSERT INTO "{target}"') for query, _ in inserts)
+        assert [params[:3] for _, params in inserts] == [
+            ("memory.semantic.u1.UserFact", "f1", "schema.content"),
+            ("memory.episodic.u1.ConversationInsight", "i1", "schema.topic"),
+            ("memory.episodic.u1.ConversationInsight", "i1", "schema.key_points[*].0"),
+            ("memory.episodic.u1.ConversationInsight", "i1", "schema.key_points[*].1"),
+        ]
+
+        # 읽은 시점의 updated_at이 그대로인 행만 새 버전으로 태그
+        ((_, tag_params),) = conn.statements("UPDATE store s")
+        assert tag_params[0].obj == {"embedding_version": "v2"}
+        assert tag_params[3] == [_UPDATED_AT, _UPDATED_AT]
+
+
+class TestRun:
+    async def test_resumes_from_saved_cursor(self, monkeypatch: pytest.MonkeyPatch):
+        rows = [_store_row("memory.semantic.u1.UserFact", f"k{i}", {"content": f"fact {i}"}) for i in range(5)]
+        database = FakeDatabase(_job_row("running", "memory.semantic.u1.UserFact", "k1"), rows)
+        conn = RecordingCursor(database)
+        _connect_to(monkeypatch, conn)
+
+        result = await _pipeline().run()
+
+        # 중단된 위치 다음부터 keyset으로 이어서 읽음
+        scans = [params for _, params in conn.statements("FROM store WHERE (prefix, key) >")]
+        assert [params[:2] for params in scans] == [
+            ("memory.semantic.u1.UserFact", "k1"),
+            ("memory.semantic.u1.UserFact", "k3"),
+            ("memory.semantic.u1.UserFact", "k4"),
+        ]
+        inserted = [params[1] for _, params in conn.statements("field_name, embedding")]
+        assert inserted == ["k2", "k3", "k4"]
+        assert all(
+            query.startswith(f'INSERT INTO "{SHADOW_TABLE}"') for query, _ in conn.statements("field_name, embedding")
+        )
+
+        cursors = [params for _, params in conn.statements("SET last_prefix")]
+        assert cursors[-1] == (None, None, 0, "v2")
+        assert result["status"] == "ready"
+
+    async def test_completed_job_fixes_up_live_table(self, monkeypatch: pytest.MonkeyPatch):
+        rows = [_store_row("memory.semantic.u1.UserFact", "k0", {"content": "fact"})]
+        conn = RecordingCursor(FakeDatabase(_job_row("completed"), rows))
+        _connect_to(monkeypatch, conn)
+
+        result = await _pipeline().run()
+
+        assert all(
+            query.startswith(f'INSERT INTO "{VECTOR_TABLE}"') for query, _ in conn.statements("field_name, embedding")
+        )
+        assert not conn.statements(f'CREATE TABLE IF NOT EXISTS "{SHADOW_TABLE}"')
+        assert result["status"] == "completed"
+
+
+class TestCutover:
+    @pytest.mark.parametrize(
+        "job", [None, _job_row("pending"), _job_row("running", "memory.semantic.u1.UserFact", "k1")]
+    )
+    async def test_refuses_incomplete_shadow_table(self, monkeypatch: pytest.MonkeyPatch, job: dict[str, Any] | None):
+        conn = RecordingCursor(FakeDatabase(job, []))
+        _connect_to(monkeypatch, conn)
+
+        with pytest.raises(ValueError, match="not ready for cutover"):
+            await _pipeline().cutover()
+
+        assert not conn.statements("RENAME")
+        assert not conn.statements("field_name, embedding")
+
+    async def test_swaps_tables_after_final_pass(self, monkeypatch: pytest.MonkeyPatch):
+        rows = [_store_row("memory.semantic.u1.UserFact", "k0", {"content": "fact"})]
+        database = FakeDatabase(_job_row("ready"), rows)
+        conn = RecordingCursor(database)
+        _connect_to(monkeypatch, conn)
+
+        result = await _pipeline().cutover()
+
+        queries = [query for query, _ in conn.executed]
+        final_insert = queries.index(next(q for q in queries if q.startswith(f'INSERT INTO "{SHADOW_TABLE}"')))
+        renames = [q for q in queries if f'ALTER TABLE "{VECTOR_TABLE}"' in q or f'ALTER TABLE "{SHADOW_TABLE}"' in q]
+        assert renames == [
+            f'ALTER TABLE "{VECTOR_TABLE}" RENAME TO "{PREVIOUS_TABLE}"',
+            f'ALTER TABLE "{SHADOW_TABLE}" RENAME TO "{VECTOR_TABLE}"',
+        ]
+        assert final_insert < queries.index(renames[0])
+        assert result["status"] == "completed"
+
+
+class TestUserStatsVersion:
+    @pytest.mark.parametrize(
+        "function_source,upgraded",
+        [
+            # memory_type namespace 구조만 반영된 이전 트리거 함수 → 태그만 바꾼 UPDATE도 version을 올림
+            ("... split_part(prefix, '.', 4) ... version = s.version + 1", True),
+            ("... split_part(prefix, '.', 4) ... version = s.version + version_step", False),
+        ],
+    )
+    async def test_upgrades_function_to_skip_tag_only_updates(
+        self, monkeypatch: pytest.MonkeyPatch, function_source: str, upgraded: bool
+    ):
+        def respond(query: str, params: Any) -> Rows:
+            if query.startswith("SELECT to_regclass"):
+                return [{"present": True, "function_source": function_source}]
+            return []
+
+        cursor = RecordingCursor(respond)
+        store = MemoryStore(conn=cast(Any, None))
+        monkeypatch.setattr(store, "_cursor", cursor.cursor_context)
+
+        await store._setup_user_stats()
+
+        functions = cursor.statements("CREATE OR REPLACE FUNCTION store_user_stats_apply")
+        assert len(functions) == int(upgraded)
+        if upgraded:
+            assert "(o.value - 'embedding_version') IS DISTINCT FROM (n.value - 'embedding_version')" in functions[0][0]
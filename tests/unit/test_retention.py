@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from typing import Any, cast
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.config.settings import RetentionPolicy, Settings
+from app.infrastructure.store import MemoryStore
+from app.services.retention import RetentionSweeper, resolve_policy, ttl_minutes_for
+from app.services.service import MemoryService
+from tests.unit.mocks import RecordingCursor, Rows
+
+
+class TestResolvePolicy:
+    def test_schema_policy_overrides_memory_type(self):
+        settings = Settings(
+            retention_policies={
+                "episodic": RetentionPolicy(ttl_days=90),
+                "UserFact": RetentionPolicy(max_items=100),
+            }
+        )
+
+        assert ttl_minutes_for("ConversationInsight", settings) == 90 * 24 * 60
+        assert resolve_policy("UserFact", settings) == RetentionPolicy(max_items=100)
+        assert resolve_policy("UserPreference", settings) is None
+
+
+class TestCreateWithRetention:
+    async def test_create_passes_policy_ttl(self, monkeypatch: pytest.MonkeyPatch, test_user_id: str):
+        settings = Settings(retention_policies={"episodic": RetentionPolicy(ttl_days=1)})
+        monkeypatch.setattr("app.services.retention.get_settings", lambda: settings)
+        repository = AsyncMock()
+        service = MemoryService(repository=repository)
+
+        await service.create(test_user_id, "ConversationInsight", {"topic": "trip", "key_points": ["Jeju"]})
+        await service.create(test_user_id, "UserPreference", {"category": "ui", "preference": "dark"})
+
+        insight_call, preference_call = repository.save.await_args_list
+        assert insight_call.kwargs["ttl_minutes"] == 24 * 60
+        assert preference_call.kwargs["ttl_minutes"] is None
+
+
+class TestRetentionSweeper:
+    async def test_runs_bounded_batches(self):
+        settings = Settings(
+            retention_policies={
+                "episodic": RetentionPolicy(ttl_days=30),
+                "UserFact": RetentionPolicy(max_items=10, evict="lowest_confidence"),
+            }
+        )
+        repository = AsyncMock()
+        repository.backfill_ttl.side_effect = [2, 2, 1]
+        repository.evict_over_limit.return_value = 0
+        repository.sweep_expired.return_value = 2
+
+        report = await RetentionSweeper(repository, settings, batch_size=2, max_batches=3).run()
+
+        assert report.ttl_backfilled == {"ConversationInsight": 5}
+        assert report.evicted == {"UserFact": 0}
+        assert report.expired_deleted == 6
+        repository.evict_over_limit.assert_awaited_with("UserFact", 10, "lowest_confidence", 2)
+        assert repository.sweep_expired.await_count == 3
+
+
+class TestPostgresEviction:
+    async def test_candidates_come_from_user_stats(self, monkeypatch: pytest.MonkeyPatch):
+        # user-a는 만료 대기 항목 때문에 item_count만 초과 → 삭제 0건, 다음 사용자로 진행
+        deleted_rows = {"memory.semantic.user-a.UserFact": 0, "memory.semantic.user-b.UserFact": 3}
+
+        def respond(query: str, params: Any) -> Rows:
+            if "FROM store_user_stats" in query:
+                return [{"user_id": "user-a"}, {"user_id": "user-b"}] if params[2] == "" else []
+            if query.startswith("DELETE"):
+                return [{}] * min(deleted_rows[params[0]], params[2])
+            return []
+
+        cursor = RecordingCursor(respond)
+        store = MemoryStore(conn=cast(Any, None))
+        monkeypatch.setattr(store, "_cursor", cursor.cursor_context)
+
+        deleted = await store.aevict_over_limit("UserFact", 10, "oldest", 5)
+
+        stats_queries = cursor.statements("FROM store_user_stats")
+        deletes = cursor.statements("DELETE")
+        assert deleted == 3
+        assert [params for _, params in stats_queries] == [("UserFact", 10, "", 5), ("UserFact", 10, "user-b", 5)]
+        assert [params for _, params in deletes] == [
+            ("memory.semantic.user-a.UserFact", 10, 5, "memory.semantic.user-a.UserFact"),
+            ("memory.semantic.user-b.UserFact", 10, 5, "memory.semantic.user-b.UserFact"),
+        ]
+        assert "ORDER BY created_at DESC, key" in deletes[0][0]
+        # store 전체를 prefix로 집계하지 않음
+        assert not cursor.statements("GROUP BY")
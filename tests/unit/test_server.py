@@ -0,0 +1,99 @@
+# pyright: reportPrivateUsage=false
+from __future__ import annotations
+
+import os
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+from fastapi import FastAPI
+
+from app import server
+from app.config import lifespan, process
+from app.config.settings import Settings
+from app.infrastructure import checkpointer, store
+from app.services import admission, get_memory_service
+
+
+def _in_forked_child(check: Callable[[], bool]) -> bool:
+    pid = os.fork()
+    if pid == 0:
+        os._exit(0 if check() else 1)
+    _, status = os.waitpid(pid, 0)
+    return os.waitstatus_to_exitcode(status) == 0
+
+
+class TestForkReset:
+    def test_child_drops_inherited_connections(self, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(store, "_store_instance", object())
+        monkeypatch.setattr(store, "_store_cm", object())
+        monkeypatch.setattr(checkpointer, "_checkpointer_pool", object())
+        admission.get_admission_controller()
+        service = get_memory_service()
+
+        assert _in_forked_child(
+            lambda: (
+                store._store_instance is None
+                and store._store_cm is None
+                and checkpointer._checkpointer_pool is None
+                and admission._controller is None
+                and get_memory_service() is not service
+            )
+        )
+        # 부모의 상태는 그대로
+        assert store._store_instance is not None
+        assert get_memory_service() is service
+
+    def test_child_keeps_migrated_flag(self, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(store, "_store_migrated", True)
+
+        assert _in_forked_child(lambda: store._store_migrated is True)
+
+
+class TestPrimaryProcess:
+    @pytest.mark.parametrize("index,expected", [(None, True), (0, True), (1, False)])
+    def test_only_first_worker_runs_background_jobs(
+        self, monkeypatch: pytest.MonkeyPatch, index: int | None, expected: bool
+    ):
+        monkeypatch.setattr(process, "_worker_index", index)
+
+        assert process.is_primary_process() is expected
+
+
+class TestServe:
+    def test_memory_backend_rejects_multiple_workers(self, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(server, "get_settings", lambda: Settings(store_backend="memory"))
+
+        with pytest.raises(ValueError):
+            server.serve(port=0, workers=2)
+
+    async def test_memory_backend_has_no_migrations(self, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr("app.config.settings.get_settings", lambda: Settings(store_backend="memory"))
+
+        assert await store.migrate_store() is False
+        assert store._store_migrated is False
+
+
+class TestLifespan:
+    @pytest.mark.parametrize(
+        "backend,enabled,expected",
+        [("postgres", None, True), ("memory", None, False), ("memory", True, True), ("postgres", False, False)],
+    )
+    def test_checkpointer_follows_store_backend(self, backend: Any, enabled: bool | None, expected: bool):
+        assert Settings(store_backend=backend, checkpointer_enabled=enabled).use_checkpointer is expected
+
+    async def test_memory_backend_starts_without_database(self, monkeypatch: pytest.MonkeyPatch):
+        async def no_database() -> Any:
+            raise AssertionError("checkpointer must not connect with the memory backend")
+
+        monkeypatch.setattr(
+            lifespan, "get_settings", lambda: Settings(store_backend="memory", db_host="nowhere.invalid")
+        )
+        monkeypatch.setattr(lifespan, "get_checkpointer", no_database)
+        monkeypatch.setattr(lifespan, "close_checkpointer", no_database)
+        monkeypatch.setattr(lifespan, "start_consolidation", lambda: False)
+        monkeypatch.setattr(lifespan, "start_retention_sweeper", lambda: False)
+        app = FastAPI()
+
+        async with lifespan.lifespan(app):
+            assert not hasattr(app.state, "checkpointer")
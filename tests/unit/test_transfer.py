@@ -0,0 +1,94 @@
+# pyright: reportPrivateUsage=false
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+from datetime import datetime, timezone
+
+import orjson
+import pytest
+
+from app.infrastructure.transfer import (
+    EXPORT_FORMAT,
+    ImportReport,
+    MemoryImporter,
+    _row_to_record,
+    encode_line,
+    encode_msgpack,
+    iter_lines,
+    prefix_pattern,
+)
+
+
+async def _chunks(*chunks: bytes) -> AsyncIterator[bytes]:
+    for chunk in chunks:
+        yield chunk
+
+
+class TestJsonl:
+    async def test_iter_lines_reassembles_split_chunks(self):
+        lines = [line async for line in iter_lines(_chunks(b'{"a": 1}\n{"b"', b": 2}\n\n", b'{"c": 3}'))]
+
+        assert lines == [b'{"a": 1}', b'{"b": 2}', b'{"c": 3}']
+
+    def test_exported_row_round_trips(self):
+        created = datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+        row = {
+            "prefix": "memory.semantic.user-1.UserFact",
+            "key": "abc",
+            "value": {"schema_type": "UserFact", "content": {"content": "Plays chess"}},
+            "created_at": created,
+            "updated_at": created,
+            "expires_at": None,
+            "ttl_minutes": None,
+            "vectors": None,
+        }
+
+        record = orjson.loads(encode_line(_row_to_record(row)))
+
+        assert record["namespace"] == ["memory", "semantic", "user-1", "UserFact"]
+        assert record["created_at"] == "2026-01-02T03:04:05+00:00"
+        assert "vectors" not in record
+
+    def test_msgpack_record_packs_vectors(self):
+        msgpack = pytest.importorskip("msgpack")
+        namespace = ["memory", "semantic", "u", "UserFact"]
+        record = {"namespace": namespace, "key": "k", "value": {}, "vectors": {"$": [0.5, -1.0]}}
+
+        packed = msgpack.unpackb(encode_msgpack(record))
+        assert packed["vectors"]["$"] == b"\x00\x00\x00?\x00\x00\x80\xbf"
+
+        parsed = MemoryImporter()._parse_record(packed, 1, ImportReport(mode="upsert"))
+        assert parsed is not None and parsed["vectors"] == {"$": [0.5, -1.0]}
+
+    def test_prefix_pattern_escapes_like_wildcards(self):
+        assert prefix_pattern() == "memory.%.%.%"
+        assert prefix_pattern("user_1") == "memory.%.user\\_1.%"
+        assert prefix_pattern(schema_type="ConversationInsight") == "memory.episodic.%.ConversationInsight"
+
+
+class TestMemoryImporterParsing:
+    def test_rejects_invalid_records(self):
+        importer = MemoryImporter()
+        report = ImportReport(mode="upsert")
+
+        assert importer._parse_line(b"not json", 1, report) is None
+        assert importer._parse_line(b'{"namespace": ["system", "x"], "key": "k", "value": {}}', 2, report) is None
+        assert report.invalid == 2
+        assert importer._parse_line(
+            b'{"namespace": ["memory", "semantic", "u", "UserFact"], "key": "k", "value": {}}', 3, report
+        ) == {"namespace": ["memory", "semantic", "u", "UserFact"], "key": "k", "value": {}}
+
+    def test_upgrades_namespaces_without_memory_type(self):
+        line = b'{"namespace": ["memory", "u", "ConversationInsight"], "key": "k", "value": {}}'
+        record = MemoryImporter()._parse_line(line, 1, ImportReport(mode="upsert"))
+
+        assert record is not None
+        assert record["namespace"] == ["memory", "episodic", "u", "ConversationInsight"]
+
+    def test_header_checks_format(self):
+        importer = MemoryImporter()
+        report = ImportReport(mode="upsert")
+
+        assert importer._parse_line(orjson.dumps({"format": EXPORT_FORMAT, "version": 1}), 1, report) is None
+        with pytest.raises(ValueError):
+            importer._parse_line(orjson.dumps({"format": "other", "version": 1}), 1, report)
@@ -0,0 +1,163 @@
+# pyright: reportPrivateUsage=false
+from __future__ import annotations
+
+from typing import Any, Literal
+
+import pytest
+from langgraph.store.base import SearchOp
+from langgraph.store.postgres.base import PLACEHOLDER
+
+from app.config.settings import Settings
+from app.core.schema_registry import get_index_fields
+from app.infrastructure import store as store_module
+from app.infrastructure import vector_index
+from app.infrastructure.embeddings import tokenize_fields
+from app.infrastructure.index_config import FIELD_WEIGHTS_KEY
+from app.infrastructure.store import MemoryStore
+from app.infrastructure.vector_index import (
+    build_index_sql,
+    ensure_quantized_index,
+    get_vector_search_params,
+    vector_search_params,
+)
+from tests.unit.mocks import RecordingCursor
+
+
+class TestBuildIndexSql:
+    def test_hnsw(self):
+        statement = build_index_sql(Settings(vector_index_kind="hnsw", hnsw_m=32, hnsw_ef_construction=128))
+
+        rendered = statement.as_string(None)
+
+        assert "USING hnsw (embedding vector_cosine_ops)" in rendered
+        assert "WITH (m = 32, ef_construction = 128)" in rendered
+
+    def test_ivfflat(self):
+        statement = build_index_sql(Settings(vector_index_kind="ivfflat", ivfflat_lists=400, vector_distance="l2"))
+
+        rendered = statement.as_string(None)
+
+        assert "USING ivfflat (embedding vector_l2_ops)" in rendered
+        assert "WITH (lists = 400)" in rendered
+
+    @pytest.mark.parametrize(
+        "quantization,expected",
+        [
+            ("halfvec", "(((embedding)::halfvec(384)) halfvec_cosine_ops)"),
+            ("binary", "((binary_quantize(embedding)::bit(384)) bit_hamming_ops)"),
+        ],
+    )
+    def test_quantized_expression_index(self, quantization: Literal["halfvec", "binary"], expected: str):
+        settings = Settings(vector_quantization=quantization, embedding_dims=384)
+
+        assert expected in build_index_sql(settings).as_string(None)
+
+
+class TestQuantizedSearch:
+    async def test_candidates_reranked_at_full_precision(self, monkeypatch: pytest.MonkeyPatch):
+        settings = Settings(vector_quantization="halfvec", embedding_dims=3, quantization_rerank_factor=4)
+        monkeypatch.setattr(store_module, "get_settings", lambda: settings)
+        store = MemoryStore(
+            conn=None,  # type: ignore[arg-type]
+            index={"dims": 3, "embed": lambda texts: [[0.0, 0.0, 0.0] for _ in texts]},
+        )
+
+        queries, embedding_requests = store._prepare_batch_search_queries(
+            [(0, SearchOp(("memory", "user-1"), None, 5, 0, "dark mode"))]
+        )
+
+        query, params = queries[0]
+        assert embedding_requests == [(0, "dark mode")]
+        assert "::halfvec(3) <=> %s::halfvec(3)" in query
+        assert "c.embedding <=> %s::vector" in query
+        assert params.count(PLACEHOLDER) == 2
+        assert 20 in params
+
+
+class TestFieldSearch:
+    async def test_searches_only_weighted_fields(self, monkeypatch: pytest.MonkeyPatch):
+        settings = Settings(embedding_dims=3, quantization_rerank_factor=4)
+        monkeypatch.setattr(store_module, "get_settings", lambda: settings)
+        store = MemoryStore(
+            conn=None,  # type: ignore[arg-type]
+            index={"dims": 3, "embed": lambda texts: [[0.0, 0.0, 0.0] for _ in texts]},
+        )
+        weights = [("ConversationInsight", "schema.topic", 2.0), ("ConversationInsight", "schema.context", 1.0)]
+        op = SearchOp(("memory", "episodic", "user-1"), {FIELD_WEIGHTS_KEY: weights}, 5, 0, "dark mode")
+
+        queries, embedding_requests = store._prepare_batch_search_queries([(0, op)])
+
+        query, params = queries[0]
+        assert embedding_requests == [(0, "dark mode")]
+        assert "value->" not in query
+        assert params[:4] == [
+            ["ConversationInsight", "ConversationInsight"],
+            ["schema.topic", "schema.context"],
+            [2.0, 1.0],
+            [3.0, 3.0],
+        ]
+        assert params.count(PLACEHOLDER) == 2
+        assert 40 in params
+        assert query.count("%s") == len(params)
+
+
+class TestChangedIndexFields:
+    async def test_only_changed_fields(self):
+        store = MemoryStore(
+            conn=None,  # type: ignore[arg-type]
+            index={
+                "dims": 3,
+                "embed": lambda texts: [[0.0, 0.0, 0.0] for _ in texts],
+                "fields": ["schema.preference", "schema.category"],
+            },
+        )
+        current = {"schema": {"preference": "dark mode", "category": "ui", "confidence": 1.0}}
+
+        assert store._changed_index_fields(current, {"schema": {**current["schema"], "confidence": 0.5}}) == []
+        assert store._changed_index_fields(current, {"schema": {**current["schema"], "preference": "light"}}) == [
+            "schema.preference"
+        ]
+
+    async def test_schema_declared_fields(self):
+        store = MemoryStore(
+            conn=None,  # type: ignore[arg-type]
+            index={"dims": 3, "embed": lambda texts: [[0.0, 0.0, 0.0] for _ in texts]},
+        )
+        fields = tokenize_fields(get_index_fields("ConversationInsight") or [])
+        current = {"schema": {"topic": "editor", "key_points": ["vim"], "context": None, "confidence": 1.0}}
+        updated = {"schema": {**current["schema"], "key_points": ["vim", "tmux"], "confidence": 0.5}}
+
+        assert store._changed_index_fields(current, updated, fields) == ["schema.key_points[*]"]
+
+
+class TestVectorSearchParams:
+    def test_params_scoped_to_context(self):
+        with vector_search_params(ef_search=80, probes=10):
+            assert get_vector_search_params() == {"hnsw.ef_search": 80, "ivfflat.probes": 10}
+
+        assert get_vector_search_params() is None
+
+    def test_no_params(self):
+        with vector_search_params():
+            assert get_vector_search_params() is None
+
+
+class TestEnsureQuantizedIndex:
+    @pytest.mark.parametrize("present,created", [(False, True), (True, False)])
+    async def test_creates_missing_index(self, monkeypatch: pytest.MonkeyPatch, present: bool, created: bool):
+        conn = RecordingCursor(lambda query, _: [{"?column?": 1}] if present and "pg_indexes" in query else [])
+
+        async def connect(*args: Any, **kwargs: Any) -> RecordingCursor:
+            return conn
+
+        monkeypatch.setattr(vector_index.psycopg.AsyncConnection, "connect", connect)
+        settings = Settings(vector_quantization="halfvec", embedding_dims=3)
+
+        assert await ensure_quantized_index(settings) is created
+        assert len(conn.statements("CREATE INDEX CONCURRENTLY")) == int(created)
+
+    @pytest.mark.parametrize("quantization,kind", [("none", "hnsw"), ("binary", "flat")])
+    async def test_nothing_to_create(self, quantization: Any, kind: Any):
+        settings = Settings(vector_quantization=quantization, vector_index_kind=kind)
+
+        assert await ensure_quantized_index(settings) is False